@@ -12,6 +12,7 @@ Core GST algorithms
 
 
 import collections as _collections
+import os as _os
 import time as _time
 
 import numpy as _np
@@ -32,6 +33,7 @@ from pygsti.circuits.circuitlist import CircuitList as _CircuitList
 from pygsti.baseobjs.resourceallocation import ResourceAllocation as _ResourceAllocation
 from pygsti.optimize.customlm import CustomLMOptimizer as _CustomLMOptimizer
 from pygsti.optimize.customlm import Optimizer as _Optimizer
+from pygsti.optimize.customlm import OptimizerResult as _OptimizerResult
 
 _dummy_profiler = _DummyProfiler()
 
@@ -698,7 +700,7 @@ def run_gst_fit(mdc_store, optimizer, objective_function_builder, verbosity=0):
 
 def run_iterative_gst(dataset, start_model, circuit_lists,
                       optimizer, iteration_objfn_builders, final_objfn_builders,
-                      resource_alloc, verbosity=0):
+                      resource_alloc, verbosity=0, checkpoint_dir=None):
     """
     Performs Iterative Gate Set Tomography on the dataset.
 
@@ -717,10 +719,15 @@ def run_iterative_gst(dataset, start_model, circuit_lists,
         either a Circuit object or as a tuple of operation labels (but all must be specified
         using the same type).
         e.g. [ [ (), ('Gx',) ], [ (), ('Gx',), ('Gy',) ], [ (), ('Gx',), ('Gy',), ('Gx','Gy') ]  ]
+        When each list contains all the circuits of the previous one (as in this example) and
+        the model uses a matrix or map forward simulator, each iteration's circuit layout is
+        built by extending the previous iteration's layout rather than from scratch.
 
     optimizer : Optimizer or dict
         The optimizer to use, or a dictionary of optimizer parameters
-        from which a default optimizer can be built.
+        from which a default optimizer can be built.  If the optimizer's
+        `warm_start` attribute is True, each iteration's fits are warm-started
+        from the final state of the corresponding fit of the previous iteration.
 
     iteration_objfn_builders : list
         List of ObjectiveFunctionBuilder objects defining which objective functions
@@ -738,6 +745,13 @@ def run_iterative_gst(dataset, start_model, circuit_lists,
     verbosity : int, optional
         How much detail to send to stdout.
 
+    checkpoint_dir : str, optional
+        If not None, a directory where the results of each iteration are saved as it completes.  The
+        optimizer's state is also saved there during each optimization (see the `checkpoint_interval`
+        argument of :class:`CustomLMOptimizer`).  When this directory already holds checkpoints from a
+        previous (e.g. interrupted) run with the same starting model and circuit lists, the completed
+        iterations are loaded rather than recomputed and the optimization resumes where it stopped.
+
     Returns
     -------
     models : list of Models
@@ -760,10 +774,29 @@ def run_iterative_gst(dataset, start_model, circuit_lists,
     tStart = _time.time()
     tRef = tStart
     final_objfn = None
+    previous_circuits = None; previous_layout = None  # for reusing layouts when the circuit lists are nested
+    warm_start = getattr(optimizer, 'warm_start', False)
+    warm_start_states = {}  # iteration-builder index => optimizer's warm-start state from the previous iteration
+
+    from pygsti.forwardsims.matrixforwardsim import MatrixForwardSimulator as _MatrixFSim
+    from pygsti.forwardsims.mapforwardsim import MapForwardSimulator as _MapFSim
 
     iteration_objfn_builders = [_objfns.ObjectiveFunctionBuilder.cast(ofb) for ofb in iteration_objfn_builders]
     final_objfn_builders = [_objfns.ObjectiveFunctionBuilder.cast(ofb) for ofb in final_objfn_builders]
 
+    checkpoints = {}  # iteration index => (model vector, optimizer result) of already-completed iterations
+    if checkpoint_dir is not None:
+        if comm is None or comm.Get_rank() == 0:
+            _os.makedirs(checkpoint_dir, exist_ok=True)
+        if comm is not None: comm.barrier()
+        checkpoints = _read_iterative_gst_checkpoints(checkpoint_dir, start_model, circuit_lists)
+        if len(checkpoints) > 0:
+            printer.log("Resuming from checkpoint: %d iteration(s) already completed" % len(checkpoints))
+
+    def _checkpoint_path(i, name):
+        return _os.path.join(checkpoint_dir, 'iteration_%d_%s.npz' % (i, name)) if (checkpoint_dir is not None) \
+            else None
+
     def _max_array_types(artypes_list):  # get the maximum number of each array type and return as an array-types tuple
         max_cnts = {}
         for artypes in artypes_list:
@@ -775,65 +808,147 @@ def run_iterative_gst(dataset, start_model, circuit_lists,
         for artype, cnt in max_cnts.items(): ret += (artype,) * cnt
         return ret
 
-    with printer.progress_logging(1):
-        for (i, circuitsToEstimate) in enumerate(circuit_lists):
-            extraMessages = []
-            if isinstance(circuitsToEstimate, _CircuitList) and circuitsToEstimate.name:
-                extraMessages.append("(%s) " % circuitsToEstimate.name)
-
-            printer.show_progress(i, nIters, verbose_messages=extraMessages,
-                                  prefix="--- Iterative GST:", suffix=" %d circuits ---" % len(circuitsToEstimate))
-
-            if circuitsToEstimate is None or len(circuitsToEstimate) == 0: continue
-
-            mdl.basis = start_model.basis  # set basis in case of CPTP constraints (needed?)
-            method_names = optimizer.called_objective_methods
-            array_types = optimizer.array_types + \
-                _max_array_types([builder.compute_array_types(method_names, mdl.sim)
-                                  for builder in iteration_objfn_builders + final_objfn_builders])
-            initial_mdc_store = _objfns.ModelDatasetCircuitsStore(mdl, dataset, circuitsToEstimate, resource_alloc,
-                                                                  array_types=array_types, verbosity=printer - 1)
-            mdc_store = initial_mdc_store
+    try:
+        with printer.progress_logging(1):
+            for (i, circuitsToEstimate) in enumerate(circuit_lists):
+                extraMessages = []
+                if isinstance(circuitsToEstimate, _CircuitList) and circuitsToEstimate.name:
+                    extraMessages.append("(%s) " % circuitsToEstimate.name)
+
+                printer.show_progress(i, nIters, verbose_messages=extraMessages,
+                                      prefix="--- Iterative GST:", suffix=" %d circuits ---" % len(circuitsToEstimate))
+
+                if circuitsToEstimate is None or len(circuitsToEstimate) == 0: continue
+
+                if i in checkpoints:
+                    model_vector, opt_result = checkpoints[i]
+                    mdl.from_vector(model_vector)
+                    if i < len(circuit_lists) - 1:  # (re-run the completed final iteration to create `final_objfn`)
+                        printer.log("Loaded iteration %d from checkpoint" % (i + 1), 2)
+                        models.append(mdl.copy()); optimums.append(opt_result)
+                        continue
+
+                mdl.basis = start_model.basis  # set basis in case of CPTP constraints (needed?)
+                method_names = optimizer.called_objective_methods
+                array_types = optimizer.array_types + \
+                    _max_array_types([builder.compute_array_types(method_names, mdl.sim)
+                                      for builder in iteration_objfn_builders + final_objfn_builders])
+                precomp_layout = None
+                if previous_layout is not None and isinstance(mdl.sim, (_MatrixFSim, _MapFSim)) \
+                   and previous_circuits.issubset(circuitsToEstimate):
+                    tNxt = _time.time()
+                    precomp_layout = mdl.sim.create_layout(circuitsToEstimate, dataset, resource_alloc, array_types,
+                                                           verbosity=printer - 1, previous_layout=previous_layout)
+                    profiler.add_time('run_iterative_gst: iter %d extend layout' % (i + 1), tNxt)
+
+                initial_mdc_store = _objfns.ModelDatasetCircuitsStore(mdl, dataset, circuitsToEstimate, resource_alloc,
+                                                                      array_types=array_types,
+                                                                      precomp_layout=precomp_layout,
+                                                                      verbosity=printer - 1)
+                mdc_store = initial_mdc_store
+                previous_circuits = set(circuitsToEstimate); previous_layout = initial_mdc_store.layout
+
+                for j, obj_fn_builder in enumerate(iteration_objfn_builders):
+                    tNxt = _time.time()
+                    optimizer.fditer = optimizer.first_fditer if (i == 0 and j == 0) else 0
+                    optimizer.checkpoint_path = _checkpoint_path(i, 'fit%d' % j)
+                    if warm_start: optimizer.warm_start_state = warm_start_states.get(j, None)
+                    opt_result, mdc_store = run_gst_fit(mdc_store, optimizer, obj_fn_builder, printer - 1)
+                    if warm_start:
+                        warm_start_states[j] = (opt_result.optimizer_specific_qtys or {}).get('warm_start_state', None)
+                    profiler.add_time('run_iterative_gst: iter %d %s-opt' % (i + 1, obj_fn_builder.name), tNxt)
 
-            for j, obj_fn_builder in enumerate(iteration_objfn_builders):
                 tNxt = _time.time()
-                optimizer.fditer = optimizer.first_fditer if (i == 0 and j == 0) else 0
-                opt_result, mdc_store = run_gst_fit(mdc_store, optimizer, obj_fn_builder, printer - 1)
-                profiler.add_time('run_iterative_gst: iter %d %s-opt' % (i + 1, obj_fn_builder.name), tNxt)
+                printer.log("Iteration %d took %.1fs\n" % (i + 1, tNxt - tRef), 2)
+                tRef = tNxt
 
-            tNxt = _time.time()
-            printer.log("Iteration %d took %.1fs\n" % (i + 1, tNxt - tRef), 2)
-            tRef = tNxt
+                if i == len(circuit_lists) - 1:  # the last iteration
+                    printer.log("Last iteration:", 2)
 
-            if i == len(circuit_lists) - 1:  # the last iteration
-                printer.log("Last iteration:", 2)
+                    for j, obj_fn_builder in enumerate(final_objfn_builders):
+                        tNxt = _time.time()
+                        mdl.basis = start_model.basis
+                        optimizer.checkpoint_path = _checkpoint_path(i, 'finalfit%d' % j)
+                        if warm_start: optimizer.warm_start_state = None  # a different objective function
+                        opt_result, mdc_store = run_gst_fit(mdc_store, optimizer, obj_fn_builder, printer - 1)
+                        profiler.add_time('run_iterative_gst: final %s opt' % obj_fn_builder.name, tNxt)
 
-                for j, obj_fn_builder in enumerate(final_objfn_builders):
                     tNxt = _time.time()
-                    mdl.basis = start_model.basis
-                    opt_result, mdc_store = run_gst_fit(mdc_store, optimizer, obj_fn_builder, printer - 1)
-                    profiler.add_time('run_iterative_gst: final %s opt' % obj_fn_builder.name, tNxt)
+                    printer.log("Final optimization took %.1fs\n" % (tNxt - tRef), 2)
+                    tRef = tNxt
 
-                tNxt = _time.time()
-                printer.log("Final optimization took %.1fs\n" % (tNxt - tRef), 2)
-                tRef = tNxt
+                    models.append(mdc_store.model)  # don't copy so `mdc_store.model` *is* the final model, `models[-1]`
 
-                models.append(mdc_store.model)  # don't copy so `mdc_store.model` *is* the final model, `models[-1]`
+                    # send final objfn object back to caller to facilitate postproc  on the final
+                    # (model, circuits, dataset)
+                    # Note: initial_mdc_store is *not* an objective fn (it's just a store) so don't send it back.
+                    if mdc_store is not initial_mdc_store:
+                        final_objfn = mdc_store
+                else:
+                    models.append(mdc_store.model.copy())
 
-                # send final objfn object back to caller to facilitate postproc  on the final (model, circuits, dataset)
-                # Note: initial_mdc_store is *not* an objective fn (it's just a store) so don't send it back.
-                if mdc_store is not initial_mdc_store:
-                    final_objfn = mdc_store
-            else:
-                models.append(mdc_store.model.copy())
+                optimums.append(opt_result)
+                optimizer.checkpoint_path = None
+                if checkpoint_dir is not None:
+                    _write_iterative_gst_checkpoint(checkpoint_dir, i, models[-1], opt_result, len(circuitsToEstimate),
+                                                    comm)
 
-            optimums.append(opt_result)
+    finally:  # don't leave a (reused) optimizer writing to this run's checkpoint files
+        optimizer.checkpoint_path = None
 
+    if warm_start: optimizer.warm_start_state = None
     printer.log('Iterative GST Total Time: %.1fs' % (_time.time() - tStart))
     profiler.add_time('run_iterative_gst: total time', tStart)
     return models, optimums, final_objfn
 
 
+def _write_iterative_gst_checkpoint(checkpoint_dir, i, model, opt_result, num_circuits, comm):
+    """
+    Saves the results of iteration `i` of :function:`run_iterative_gst` to `checkpoint_dir` (on the root processor).
+
+    The optimizer's own checkpoints for this iteration are removed, as they're no longer needed.
+    """
+    if comm is not None and comm.Get_rank() != 0: return
+    path = _os.path.join(checkpoint_dir, 'iteration_%d.npz' % i)
+    jtj = opt_result.jtj if (opt_result.jtj is not None) else _np.empty((0, 0), 'd')
+    with open(path + '.tmp', 'wb') as f:  # write to a temporary file first so `path` is never left half-written
+        _np.savez(f, model_vector=model.to_vector(), num_circuits=num_circuits, x=opt_result.x,
+                  f=opt_result.f, jtj=jtj, f_no_penalties=opt_result.f_no_penalties,
+                  chi2_k_distributed_qty=opt_result.chi2_k_distributed_qty,
+                  msg=opt_result.optimizer_specific_qtys.get('msg', '') if opt_result.optimizer_specific_qtys else '')
+    _os.replace(path + '.tmp', path)
+
+    for filename in _os.listdir(checkpoint_dir):
+        if filename.startswith('iteration_%d_' % i) and filename.endswith('.npz'):
+            _os.remove(_os.path.join(checkpoint_dir, filename))
+
+
+def _read_iterative_gst_checkpoints(checkpoint_dir, start_model, circuit_lists):
+    """
+    Loads the results of the iterations of :function:`run_iterative_gst` that were saved to `checkpoint_dir`.
+
+    Returns a dictionary whose keys are the indices of the (consecutive) completed iterations and
+    whose values are `(model_vector, optimizer_result)` tuples.  The optimizer results don't hold
+    an objective function.
+    """
+    checkpoints = {}
+    for i, circuits in enumerate(circuit_lists):
+        if circuits is None or len(circuits) == 0: continue  # skipped iterations have no checkpoint
+        path = _os.path.join(checkpoint_dir, 'iteration_%d.npz' % i)
+        if not _os.path.exists(path): break
+        with _np.load(path) as checkpoint:
+            if int(checkpoint['num_circuits']) != len(circuits) \
+               or len(checkpoint['model_vector']) != start_model.num_params:
+                raise ValueError(("Checkpoint %s doesn't match the given model and circuit lists!  Use a different"
+                                  " (or empty) checkpoint directory to start a new optimization.") % path)
+            jtj = checkpoint['jtj'] if checkpoint['jtj'].size > 0 else None
+            opt_result = _OptimizerResult(None, checkpoint['x'], float(checkpoint['f']), jtj,
+                                          float(checkpoint['f_no_penalties']),
+                                          float(checkpoint['chi2_k_distributed_qty']), {'msg': str(checkpoint['msg'])})
+            checkpoints[i] = (checkpoint['model_vector'], opt_result)
+    return checkpoints
+
+
 def _do_runopt(objective, optimizer, printer):
     """
     Runs the core model-optimization step within a GST routine by optimizing
@@ -755,6 +755,7 @@ def _cptp_penalty_jac_fill(cp_penalty_vec_grad_to_fill, mdl_pre, mdl_post,
     Helper function - jacobian of CPTP penalty (sum of tracenorms of gates)
     Returns a (real) array of shape (len(mdl.operations), gauge_group_el.num_params).
     """
+    from pygsti.objectivefns.objectivefns import _choi_tracenorm_and_grad
 
     # d( sqrt(|chi|_Tr) ) = (0.5 / sqrt(|chi|_Tr)) * d( |chi|_Tr )
     # but here, unlike in core.py, chi = J(S_inv * G * S) == J(G')
@@ -773,15 +774,8 @@ def _cptp_penalty_jac_fill(cp_penalty_vec_grad_to_fill, mdl_pre, mdl_post,
     for i, (gl, gate) in enumerate(mdl_post.operations.items()):
         pre_op = mdl_pre.operations[gl]
 
-        #get sgn(chi-matrix) == d(|chi|_Tr)/dchi in std basis
-        # so sgnchi == d(|chi_std|_Tr)/dchi_std
-        chi = _tools.fast_jamiolkowski_iso_std(gate, op_basis)
-        assert(_np.linalg.norm(chi - chi.T.conjugate()) < 1e-4), \
-            "chi should be Hermitian!"
-
-        sgnchi = _tools.matrix_sign(chi)
-        assert(_np.linalg.norm(sgnchi - sgnchi.T.conjugate()) < 1e-4), \
-            "sgnchi should be Hermitian!"
+        # |chi|_Tr and d(|chi|_Tr)/dG' in op_basis, where chi == J(G') (see _choi_tracenorm_and_grad)
+        tracenorm, dtracenorm_dgate = _choi_tracenorm_and_grad(gate.to_dense(on_space='minimal'), op_basis)
 
         # Let M be the "shuffle" operation performed by fast_jamiolkowski_iso_std
         # which maps a gate onto the choi-jamiolkowsky "basis" (i.e. performs that C-J
@@ -792,23 +786,12 @@ def _cptp_penalty_jac_fill(cp_penalty_vec_grad_to_fill, mdl_pre, mdl_post,
         right = _np.swapaxes(_np.dot(pre_op, dS), 0, 1)  # shape (d1, n, d2) -> (n,d1,d2)
         result = _np.swapaxes(_np.dot(S_inv, left + right), 0, 1)  # shape (n, d1, d2)
 
-        dchi_std = _np.empty((n, d, d), 'complex')
-        for p in range(n):  # p indexes param
-            dchi_std[p] = _tools.fast_jamiolkowski_iso_std(result[p], op_basis)  # "M(results)"
-            assert(_np.linalg.norm(dchi_std[p] - dchi_std[p].T.conjugate()) < 1e-8)  # check hermitian
-
-        dchi_std = _np.conjugate(dchi_std)  # so element-wise multiply
-        # of complex number (einsum below) results in separately adding
-        # Re and Im parts (also see NOTE in spam_penalty_jac_fill below)
-
-        #contract to get (note contract along both mx indices b/c treat like a
-        # mx basis): d(|chi_std|_Tr)/dp = d(|chi_std|_Tr)/dchi_std * dchi_std/dp
-        #v =  _np.einsum("ij,aij->a",sgnchi,dchi_std)
-        v = _np.tensordot(sgnchi, dchi_std, ((0, 1), (1, 2)))
-        v *= prefactor * (0.5 / _np.sqrt(_tools.tracenorm(chi)))  # add 0.5/|chi|_Tr factor
+        #contract to get d(|chi_std|_Tr)/dp = d(|chi_std|_Tr)/dG' * dG'/dp
+        v = _np.dot(result.reshape((n, d * d)).conjugate(), dtracenorm_dgate)
+        v *= prefactor * (0.5 / _np.sqrt(tracenorm))  # add 0.5/|chi|_Tr factor
         assert(_np.linalg.norm(v.imag) < 1e-4)
         cp_penalty_vec_grad_to_fill[i, :] = v.real
-        chi = sgnchi = dchi_std = v = None  # free mem
+        result = v = None  # free mem
 
     return len(mdl_pre.operations)  # the number of leading-dim indicies we filled in
 
@@ -819,8 +802,8 @@ def _spam_penalty_jac_fill(spam_penalty_vec_grad_to_fill, mdl_pre, mdl_post,
     Helper function - jacobian of CPTP penalty (sum of tracenorms of gates)
     Returns a (real) array of shape (_spam_penalty_size(mdl), gauge_group_el.num_params).
     """
-    BMxs = op_basis.elements  # shape [mdl.dim, dmDim, dmDim]
-    ddenMxdV = dEMxdV = BMxs.conjugate()  # b/c denMx = sum( spamvec[i] * Bmx[i] ) and "V" == spamvec
+    from pygsti.objectivefns.objectivefns import _stdmx_transform
+    ddenMxdV = dEMxdV = _stdmx_transform(op_basis)  # b/c denMx = sum( spamvec[i] * Bmx[i] ) and "V" == spamvec
     #NOTE: conjugate() above is because ddenMxdV and dEMxdV will get *elementwise*
     # multiplied (einsum below) by another complex matrix (sgndm or sgnE) and summed
     # in order to gather the different components of the total derivative of the trace-norm
@@ -873,7 +856,7 @@ def _spam_penalty_jac_fill(spam_penalty_vec_grad_to_fill, mdl_pre, mdl_post,
         # d(|denMx|_Tr)/dp = d(|denMx|_Tr)/d(denMx) * d(denMx)/d(spamvec) * d(spamvec)/dp
         # [dmDim,dmDim] * [mdl.dim, dmDim,dmDim] * [mdl.dim, n]
         #v =  _np.einsum("ij,aij,ab->b",sgndm,ddenMxdV,dVdp)
-        v = _np.tensordot(_np.tensordot(sgndm, ddenMxdV, ((0, 1), (1, 2))), dVdp, (0, 0))
+        v = _np.dot(_np.dot(ddenMxdV, sgndm.flatten()), dVdp)
         v *= prefactor * (0.5 / _np.sqrt(_tools.tracenorm(denMx)))  # add 0.5/|denMx|_Tr factor
         assert(_np.linalg.norm(v.imag) < 1e-4)
         spam_penalty_vec_grad_to_fill[i, :] = v.real
@@ -915,7 +898,7 @@ def _spam_penalty_jac_fill(spam_penalty_vec_grad_to_fill, mdl_pre, mdl_post,
             # d(|EMx|_Tr)/dp = d(|EMx|_Tr)/d(EMx) * d(EMx)/d(spamvec) * d(spamvec)/dp
             # [dmDim,dmDim] * [mdl.dim, dmDim,dmDim] * [mdl.dim, n]
             #v =  _np.einsum("ij,aij,ab->b",sgnE,dEMxdV,dVdp)
-            v = _np.tensordot(_np.tensordot(sgnE, dEMxdV, ((0, 1), (1, 2))), dVdp, (0, 0))
+            v = _np.dot(_np.dot(dEMxdV, sgnE.flatten()), dVdp)
             v *= prefactor * (0.5 / _np.sqrt(_tools.tracenorm(EMx)))  # add 0.5/|EMx|_Tr factor
             assert(_np.linalg.norm(v.imag) < 1e-4)
             spam_penalty_vec_grad_to_fill[i, :] = v.real
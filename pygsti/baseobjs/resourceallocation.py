@@ -45,6 +45,16 @@ class ResourceAllocation(object):
 
     distribute_method : str, optional
         The name of a distribution strategy.
+
+    num_local_workers : int, optional
+        The number of local worker processes that distributed forward simulators (see
+        :class:`DistributableForwardSimulator`) and gauge optimization may use to perform
+        independent computations in parallel.  This doesn't require MPI, and is only used
+        when `comm` is `None` (or has a single processor).  `None` or 1 means that no
+        worker processes are used.  See :method:`local_process_pool`.  Forward simulators divide
+        work among these processes by layout atom, so only layouts with multiple atoms are
+        computed in parallel: layouts created with this allocation have at least `num_local_workers`
+        atoms unless the simulator's `num_atoms` or `processor_grid` says otherwise.
     """
 
     @classmethod
@@ -71,9 +81,11 @@ class ResourceAllocation(object):
             return arg
         else:  # assume argument is a dict of args
             return cls(arg.get('comm', None), arg.get('mem_limit', None),
-                       arg.get('profiler', None), arg.get('distribute_method', 'default'))
+                       arg.get('profiler', None), arg.get('distribute_method', 'default'),
+                       num_local_workers=arg.get('num_local_workers', None))
 
-    def __init__(self, comm=None, mem_limit=None, profiler=None, distribute_method="default", allocated_memory=0):
+    def __init__(self, comm=None, mem_limit=None, profiler=None, distribute_method="default", allocated_memory=0,
+                 num_local_workers=None):
         self.comm = comm
         self.mem_limit = mem_limit
         self.host_comm = None  # comm of the processors local to each processor's host (distinct hostname)
@@ -89,6 +101,8 @@ class ResourceAllocation(object):
         else:
             self.profiler = _dummy_profiler
         self.distribute_method = distribute_method
+        self.num_local_workers = num_local_workers
+        self._local_process_pool = None  # created when first needed and shared with copies of this object
         self.reset(allocated_memory)
 
     def build_hostcomms(self):
@@ -169,7 +183,29 @@ class ResourceAllocation(object):
         -------
         ResourceAllocation
         """
-        return ResourceAllocation(self.comm, self.mem_limit, self.profiler, self.distribute_method)
+        ret = ResourceAllocation(self.comm, self.mem_limit, self.profiler, self.distribute_method,
+                                 num_local_workers=self.num_local_workers)
+        ret._local_process_pool = self.local_process_pool()  # so copies reuse the same worker processes
+        return ret
+
+    def local_process_pool(self):
+        """
+        The pool of `num_local_workers` local worker processes that computations using this allocation may use.
+
+        The pool is created once and reused, so its worker processes are started only when first
+        needed and persist for the lifetime of this object (and its copies).
+
+        Returns
+        -------
+        LocalProcessPool or None
+            `None` when `num_local_workers` is `None` or 1, or when `comm` has multiple processors.
+        """
+        if self.num_local_workers is None or self.num_local_workers <= 1 or self.comm_size > 1:
+            return None
+        if self._local_process_pool is None:
+            from pygsti.tools.mptools import LocalProcessPool as _LocalProcessPool
+            self._local_process_pool = _LocalProcessPool(self.num_local_workers)
+        return self._local_process_pool
 
     def reset(self, allocated_memory=0):
         """
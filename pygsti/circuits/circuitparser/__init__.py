@@ -63,6 +63,10 @@ except ImportError:
 
 
 from pygsti.baseobjs import label as _lbl
+from .parsecache import CircuitParseCache
+
+# The process-wide cache of parsed circuit strings, used by CircuitParser (and so by `Circuit(string)` and every reader)
+global_parse_cache = CircuitParseCache()
 
 
 class CircuitLexer:
@@ -197,6 +201,7 @@ class CircuitParser(object):
     """ Parser for text-format operation sequences """
     tokens = CircuitLexer.tokens
     mode = "simple"
+    use_global_parse_cache = True
 
     def __init__(self, lexer_object=None, lookup={}):
         if self.mode == "ply":
@@ -214,9 +219,19 @@ class CircuitParser(object):
 
         This method will dispatch to the optimized Cython
         implementation, if available. Otherwise, the slower native
-        python implementation will be used.
+        python implementation will be used.  Results are cached in
+        `global_parse_cache` unless a lookup dictionary has been set (S<reflbl>
+        references depend on it, even though it isn't used in this mode).
         """
-        return parse_circuit(code, create_subcircuits, integerize_sslbls)
+        if not self.use_global_parse_cache or getattr(self, '_lookup', None) or not integerize_sslbls:
+            return parse_circuit(code, create_subcircuits, integerize_sslbls)
+
+        key = (code, create_subcircuits)
+        result = global_parse_cache.get(key, None)
+        if result is None:
+            result = parse_circuit(code, create_subcircuits, integerize_sslbls)
+            global_parse_cache.put(key, result)
+        return result
 
     @property
     def lookup(self):
@@ -0,0 +1,192 @@
+"""
+Defines the CircuitParseCache class, a bounded cache of parsed circuit strings.
+"""
+#***************************************************************************************************
+# Copyright 2015, 2019 National Technology & Engineering Solutions of Sandia, LLC (NTESS).
+# Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights
+# in this software.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License.  You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0 or in the LICENSE file in the root pyGSTi directory.
+#***************************************************************************************************
+
+import atexit as _atexit
+import os as _os
+import pickle as _pickle
+import threading as _threading
+from collections import OrderedDict as _OrderedDict
+
+
+class CircuitParseCache(object):
+    """
+    A thread-safe, least-recently-used cache of the results of parsing circuit strings.
+
+    The process-wide instance of this class, `pygsti.circuits.circuitparser.global_parse_cache`,
+    holds the results of :class:`CircuitParser`, which parses the strings given to `Circuit(string)` and
+    those in all the text files read by :class:`StdInputParser`.  Thus a circuit string that appears in
+    many files only needs to be parsed once.
+
+    Parameters
+    ----------
+    maxsize : int or None, optional
+        The maximum number of entries held by the cache.  When this is exceeded the
+        least-recently-used entries are discarded.  `None` means the cache is unbounded.
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = _OrderedDict()
+        self._lock = _threading.RLock()
+        self._persistence_file = None
+        self._atexit_registered = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Get a cached value, marking it as the most recently used.
+
+        Parameters
+        ----------
+        key : tuple
+            The cache key.
+
+        default : object, optional
+            The value to return when `key` isn't in the cache.
+
+        Returns
+        -------
+        object
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Add a value to the cache, discarding the least recently used values if the cache is full.
+
+        Parameters
+        ----------
+        key : tuple
+            The cache key.
+
+        value : object
+            The value to cache.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all the entries from the cache and reset its hit and miss counts.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """
+        The hit and miss statistics of this cache.
+
+        Returns
+        -------
+        dict
+            A dictionary with `"hits"`, `"misses"`, `"hit_rate"`, `"size"` and `"maxsize"` keys.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': (self.hits / lookups) if lookups > 0 else 0.0,
+                    'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def save(self, filename):
+        """
+        Write the entries of this cache to a file.
+
+        Parameters
+        ----------
+        filename : str
+            The file to write.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            items = list(self._entries.items())
+        tmp_filename = filename + ".tmp"
+        with open(tmp_filename, 'wb') as f:
+            _pickle.dump(items, f, protocol=_pickle.HIGHEST_PROTOCOL)
+        _os.replace(tmp_filename, filename)  # so a partially-written file is never read
+
+    def load(self, filename):
+        """
+        Add the entries from a file written by :method:`save` to this cache.
+
+        Parameters
+        ----------
+        filename : str
+            The file to read.
+
+        Returns
+        -------
+        None
+        """
+        with open(filename, 'rb') as f:
+            items = _pickle.load(f)
+        with self._lock:
+            for key, value in items:
+                self.put(key, value)
+
+    def set_persistence_file(self, filename):
+        """
+        Persist this cache between Python sessions using a file.
+
+        The entries in `filename`, if it exists, are loaded immediately, and the cache
+        is saved to `filename` when the Python process exits.
+
+        Parameters
+        ----------
+        filename : str or None
+            The persistence file.  `None` turns off persistence.
+
+        Returns
+        -------
+        None
+        """
+        self._persistence_file = filename
+        if filename is None: return
+        if _os.path.exists(filename):
+            self.load(filename)
+        if not self._atexit_registered:
+            _atexit.register(self._save_to_persistence_file)
+            self._atexit_registered = True
+
+    def _save_to_persistence_file(self):
+        if self._persistence_file is not None:
+            self.save(self._persistence_file)
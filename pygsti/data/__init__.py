@@ -14,6 +14,7 @@ from .dataset import DataSet
 from .multidataset import MultiDataSet
 from .datacomparator import DataComparator
 from .freedataset import FreeformDataSet
+from .streamingdataset import StreamingDataSet
 from .hypothesistest import HypothesisTest
 
 from .datasetconstruction import *
@@ -19,6 +19,7 @@ import uuid as _uuid
 import warnings as _warnings
 from collections import OrderedDict as _OrderedDict
 from collections import defaultdict as _defaultdict
+from collections.abc import Mapping as _Mapping
 
 import numpy as _np
 
@@ -40,6 +41,9 @@ Repcount_type = _np.float32
 _DATAROW_AUTOCACHECOUNT_THRESHOLD = 256
 # thought: _np.uint16 but doesn't play well with rescaling
 
+_COLUMNAR_MAGIC = b'\x93PYGSTI-COLUMNAR-DATASET'  # begins files written by DataSet.write_columnar
+_COLUMNAR_ALIGNMENT = 64  # byte alignment of the sections (columns) of a columnar DataSet file
+
 
 class _DataSetKVIterator(object):
     """
@@ -119,6 +123,85 @@ class _DataSetValueIterator(object):
     next = __next__
 
 
+class _ColumnarCircuitIndex(_Mapping):
+    """
+    A read-only, ordered map from circuits to slices of the data arrays of a static DataSet.
+
+    This is the `cirIndex` of a DataSet read by :method:`DataSet.read_columnar`.  Circuits are
+    held as a table of their string representations and are only parsed into :class:`Circuit`
+    objects when they're needed.
+
+    Parameters
+    ----------
+    circuit_table : numpy.ndarray
+        A 1D `uint8` array holding the concatenated, UTF-8 encoded string representations of the circuits.
+
+    circuit_offsets : numpy.ndarray
+        A 1D integer array of length `num_circuits + 1` giving the offset of each circuit's string in
+        `circuit_table` (followed by the length of `circuit_table`).
+
+    row_offsets : numpy.ndarray
+        A 1D integer array of length `num_circuits + 1` giving the offset of each circuit's data in
+        the data arrays (followed by the total length of the data arrays).
+    """
+
+    def __init__(self, circuit_table, circuit_offsets, row_offsets):
+        self._table = circuit_table
+        self._circuit_offsets = circuit_offsets
+        self._row_offsets = row_offsets
+        self._circuits = [None] * (len(row_offsets) - 1)  # decoded circuits, filled in as needed
+        self._positions_by_str = None  # circuit string => position, built upon the first lookup
+        self._positions = None  # Circuit => position, only built if a lookup by string fails
+
+    def _str(self, i):
+        return self._table[self._circuit_offsets[i]:self._circuit_offsets[i + 1]].tobytes().decode('utf-8')
+
+    def _circuit(self, i):
+        circuit = self._circuits[i]
+        if circuit is None:
+            circuit = self._circuits[i] = _cir.Circuit(self._str(i))
+        return circuit
+
+    def _slice(self, i):
+        return slice(int(self._row_offsets[i]), int(self._row_offsets[i + 1]))
+
+    def _position(self, circuit):
+        if self._positions_by_str is None:
+            table = self._table.tobytes(); offsets = self._circuit_offsets.tolist()
+            self._positions_by_str = {table[offsets[i]:offsets[i + 1]].decode('utf-8'): i
+                                      for i in range(len(self._circuits))}
+        i = self._positions_by_str.get(circuit.str, None)
+        if i is not None and self._circuit(i) == circuit:
+            return i
+
+        #Equal circuits needn't have the same string representation, so fall back to decoding all the circuits
+        if self._positions is None:
+            self._positions = {self._circuit(i): i for i in range(len(self._circuits))}
+        return self._positions[circuit]  # raises KeyError when `circuit` isn't present
+
+    def __getitem__(self, circuit):
+        return self._slice(self._position(_cir.Circuit.cast(circuit)))
+
+    def __contains__(self, circuit):
+        try:
+            self._position(_cir.Circuit.cast(circuit))
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return (self._circuit(i) for i in range(len(self._circuits)))
+
+    def __len__(self):
+        return len(self._circuits)
+
+    def items(self):
+        return ((self._circuit(i), self._slice(i)) for i in range(len(self._circuits)))
+
+    def values(self):
+        return (self._slice(i) for i in range(len(self._circuits)))
+
+
 class _DataSetRow(object):
     """
     Encapsulates DataSet time series data for a single circuit.
@@ -1072,7 +1155,7 @@ class DataSet(object):
             if len(self.cirIndex) > 0:
                 maxOlIndex = self.olIndex_max
                 if static:
-                    assert(max([_np.amax(self.oliData[i]) if (len(self.oliData[i]) > 0) else 0
+                    assert(max([_np.amax(self.oliData[i]) if (len(self.oliData[i]) > 0) else -1
                                 for i in self.cirIndex.values()]) <= maxOlIndex)
                     # self.oliData.shape[0] > maxIndex doesn't make sense since cirIndex holds slices
                 else:
@@ -1264,6 +1347,44 @@ class DataSet(object):
         """
         return _DataSetValueIterator(self)
 
+    def count_arrays(self, circuits):
+        """
+        The counts of a list of circuits as flat (circuit index, outcome index, count) arrays.
+
+        This is a vectorized alternative to building the count dictionary of each circuit
+        (e.g. `self[circuit].counts`), and requires this data set to be static.  A circuit's
+        count for a given outcome is the sum of the `counts` entries having its circuit and
+        outcome indices (an outcome can appear multiple times for time-dependent data).
+
+        Parameters
+        ----------
+        circuits : list
+            A list of :class:`Circuit` objects, all of which must be in this data set.
+
+        Returns
+        -------
+        circuit_indices : numpy.ndarray
+            Indices into `circuits`.
+        outcome_indices : numpy.ndarray
+            Outcome label indices, i.e. values of `self.olIndex`.
+        counts : numpy.ndarray
+            The corresponding (floating point) counts.
+        """
+        if not self.bStatic: raise ValueError("Count arrays can only be obtained from a static DataSet")
+        slices = [self.cirIndex[_cir.Circuit.cast(circuit)] for circuit in circuits]
+        starts = _np.array([slc.start for slc in slices], _np.int64)
+        lengths = _np.array([slc.stop for slc in slices], _np.int64) - starts
+
+        #Positions of each circuit's data within the 1D data arrays, concatenated in `circuits` order
+        circuit_indices = _np.repeat(_np.arange(len(circuits), dtype=_np.int64), lengths)
+        offsets = _np.repeat(starts - (_np.cumsum(lengths) - lengths), lengths)
+        positions = _np.arange(len(circuit_indices), dtype=_np.int64) + offsets
+
+        outcome_indices = self.oliData[positions].astype(_np.int64)
+        counts = self.repData[positions].astype('d') if (self.repData is not None) \
+            else _np.ones(len(positions), 'd')
+        return circuit_indices, outcome_indices, counts
+
     @property
     def outcome_labels(self):
         """
@@ -2255,13 +2376,14 @@ class DataSet(object):
         Returns
         -------
         DataSet
-            The truncated data set.
+            The truncated data set.  When this data set is static, this is a
+            static view that shares (doesn't copy) this data set's data arrays.
         """
         missingStrs = []  # to issue warning - only used if missing_action=="warn"
         if self.bStatic:
             circuitIndices = []
             circuits = []
-            used_oli = set()
+            used_oli = _np.zeros(self.olIndex_max + 1, bool)
             for opstr in list_of_circuits_to_keep:
                 circuit = opstr if isinstance(opstr, _cir.Circuit) else _cir.Circuit(opstr)
 
@@ -2282,14 +2404,15 @@ class DataSet(object):
                 if missing_action != "raise": circuits.append(circuit)
                 i = self.cirIndex[circuit]
                 circuitIndices.append(i)
-                used_oli.update(self.oliData[i])
+                used_oli[self.oliData[i]] = True
 
             if missing_action == "raise": circuits = list_of_circuits_to_keep
             trunc_cirIndex = _OrderedDict(zip(circuits, circuitIndices))
-            trunc_olIndex = _OrderedDict([(self.ol[i], i) for i in sorted(used_oli)])
+            trunc_olIndex = _OrderedDict([(self.ol[i], i) for i in _np.flatnonzero(used_oli).tolist()])
             trunc_dataset = DataSet(self.oliData, self.timeData, self.repData,
                                     circuit_indices=trunc_cirIndex,
                                     outcome_label_indices=trunc_olIndex, static=True)  # reference (don't copy) counts
+            trunc_dataset.uuid = _uuid.uuid4()
 
         else:
             trunc_dataset = DataSet(outcome_labels=[])  # let outcome labels be added automatically
@@ -2340,7 +2463,23 @@ class DataSet(object):
         Returns
         -------
         DataSet
-        """
+            When this data set is static, its timestamps are sorted and `aggregate_to_time`
+            is None, this is a static view that shares this data set's data arrays.
+        """
+        if self.bStatic and aggregate_to_time is None:
+            circuit_indices = _OrderedDict(); tot = 0
+            for circuit, slc in self.cirIndex.items():
+                times = self.timeData[slc]
+                if _np.any(_np.diff(times) < 0): break  # unsorted timestamps, so data must be copied below
+                start = slc.start + int(_np.searchsorted(times, start_time, 'left'))
+                stop = slc.start + int(_np.searchsorted(times, end_time, 'left'))
+                circuit_indices[circuit] = slice(start, stop)
+                tot += (stop - start) if (self.repData is None) else self.repData[start:stop].sum()
+            else:
+                if tot == 0:
+                    _warnings.warn("No counts in the requested time range: empty DataSet created")
+                return self._create_view(circuit_indices)
+
         tot = 0
         ds = DataSet(outcome_label_indices=self.olIndex)
         for opStr, dsRow in self.items():
@@ -2394,7 +2533,22 @@ class DataSet(object):
         OrderedDict
             A dictionary of :class:`DataSet` objects whose keys are the
             timestamp values of the original (this) data set in sorted order.
-        """
+            When this data set is static and `aggregate_to_time` is None, these
+            are static views that share this data set's data arrays.
+        """
+        if self.bStatic and aggregate_to_time is None:
+            circuit_indices_by_time = _defaultdict(_OrderedDict)
+            for circuit, slc in self.cirIndex.items():
+                times = self.timeData[slc]
+                if len(times) == 0: continue
+                assert(_np.all(_np.diff(times) >= 0)), "This function assumes timestamps are sorted!"
+                run_starts = _np.concatenate(([0], _np.flatnonzero(_np.diff(times)) + 1))  # runs of equal times
+                run_stops = _np.concatenate((run_starts[1:], [len(times)]))
+                for i0, i1 in zip(run_starts.tolist(), run_stops.tolist()):
+                    circuit_indices_by_time[times[i0]][circuit] = slice(slc.start + i0, slc.start + i1)
+            return _OrderedDict([(t, self._create_view(circuit_indices_by_time[t]))
+                                 for t in sorted(circuit_indices_by_time.keys())])
+
         dsDict = _defaultdict(lambda: DataSet(outcome_label_indices=self.olIndex))
         for opStr, dsRow in self.items():
 
@@ -2445,6 +2599,61 @@ class DataSet(object):
             ds.done_adding_data()
         return _OrderedDict([(t, dsDict[t]) for t in sorted(dsDict.keys())])
 
+    def _create_view(self, circuit_indices):
+        """
+        Create a static data set holding slices of this (static) data set's data arrays.
+
+        The returned data set references rather than copies this data set's `oliData`,
+        `timeData` and `repData` arrays, so creating it takes O(number of circuits) memory.
+        Like all static data sets it can't be modified; use :method:`copy_nonstatic` to get
+        a modifiable copy.
+
+        Parameters
+        ----------
+        circuit_indices : OrderedDict
+            A dictionary whose keys are circuits and values are slices of this data set's arrays.
+
+        Returns
+        -------
+        DataSet
+        """
+        view = DataSet(self.oliData, self.timeData, self.repData, circuit_indices=circuit_indices,
+                       outcome_label_indices=self.olIndex, static=True,
+                       collision_action=self.collisionAction, comment=self.comment)
+        view.uuid = _uuid.uuid4()
+        return view
+
+    def _compacted_static_data(self):
+        """
+        The circuit-index slices and data arrays of this static data set, without unused data.
+
+        When this data set is a view into larger arrays (e.g. one created by :method:`truncate` or
+        :method:`time_slice`) just the data it uses is copied, so that serializing a view doesn't
+        save its parent's data.
+
+        Returns
+        -------
+        cir_index_vals : list
+            The slices corresponding to `self.cirIndex.keys()`.
+        oli_data, time_data, rep_data : numpy.ndarray
+            The data arrays (`rep_data` can be None).
+        """
+        cir_index_vals = list(self.cirIndex.values())
+        offset = 0
+        for slc in cir_index_vals:
+            if slc.start != offset: break
+            offset = slc.stop
+        else:
+            if offset == len(self.oliData):  # slices tile the arrays, so there's nothing to compact
+                return cir_index_vals, self.oliData, self.timeData, self.repData
+
+        lengths = [slc.stop - slc.start for slc in cir_index_vals]
+        offsets = _np.concatenate(([0], _np.cumsum(lengths, dtype=_np.int64))).tolist()
+        gather = _np.concatenate([_np.arange(slc.start, slc.stop) for slc in cir_index_vals]) \
+            if len(cir_index_vals) > 0 else _np.zeros(0, _np.int64)
+        return ([slice(i0, i1) for i0, i1 in zip(offsets[:-1], offsets[1:])], self.oliData[gather],
+                self.timeData[gather], self.repData[gather] if (self.repData is not None) else None)
+
     def drop_zero_counts(self):
         """
         Creates a copy of this data set that doesn't include any zero counts.
@@ -2784,15 +2993,20 @@ class DataSet(object):
         self.uuid = _uuid.uuid4()
 
     def __getstate__(self):
+        if self.bStatic:
+            cirIndexVals, oliData, timeData, repData = self._compacted_static_data()
+        else:
+            cirIndexVals, oliData, timeData, repData = \
+                list(self.cirIndex.values()), self.oliData, self.timeData, self.repData
         toPickle = {'cirIndexKeys': list(map(_cir.CompressedCircuit, self.cirIndex.keys())),
-                    'cirIndexVals': list(self.cirIndex.values()),
+                    'cirIndexVals': cirIndexVals,
                     'olIndex': self.olIndex,
                     'olIndex_max': self.olIndex_max,
                     'ol': self.ol,
                     'bStatic': self.bStatic,
-                    'oliData': self.oliData,
-                    'timeData': self.timeData,
-                    'repData': self.repData,
+                    'oliData': oliData,
+                    'timeData': timeData,
+                    'repData': repData,
                     'oliType': _np.dtype(self.oliType).str,
                     'timeType': _np.dtype(self.timeType).str,
                     'repType': _np.dtype(self.repType).str,
@@ -2882,9 +3096,13 @@ class DataSet(object):
         -------
         None
         """
+        if self.bStatic:
+            cirIndexVals, oliData, timeData, repData = self._compacted_static_data()
+        else:
+            cirIndexVals = list(self.cirIndex.values())
 
         toPickle = {'cirIndexKeys': list(map(_cir.CompressedCircuit, self.cirIndex.keys())) if self.cirIndex else [],
-                    'cirIndexVals': list(self.cirIndex.values()) if self.cirIndex else [],
+                    'cirIndexVals': cirIndexVals,
                     'olIndex': self.olIndex,
                     'olIndex_max': self.olIndex_max,
                     'ol': self.ol,
@@ -2911,10 +3129,10 @@ class DataSet(object):
 
         _pickle.dump(toPickle, f)
         if self.bStatic:
-            _np.save(f, self.oliData)
-            _np.save(f, self.timeData)
-            if self.repData is not None:
-                _np.save(f, self.repData)
+            _np.save(f, oliData)
+            _np.save(f, timeData)
+            if repData is not None:
+                _np.save(f, repData)
         else:
             for row in self.oliData: _np.save(f, row)
             for row in self.timeData: _np.save(f, row)
@@ -2942,6 +3160,12 @@ class DataSet(object):
         None
         """
         bOpen = isinstance(file_or_filename, str)
+        if bOpen and not file_or_filename.endswith(".gz"):
+            with open(file_or_filename, "rb") as f:
+                bColumnar = f.read(len(_COLUMNAR_MAGIC)) == _COLUMNAR_MAGIC
+            if bColumnar:  # a file written by write_columnar
+                return self.read_columnar(file_or_filename)
+
         if bOpen:
             if file_or_filename.endswith(".gz"):
                 import gzip as _gzip
@@ -2996,6 +3220,8 @@ class DataSet(object):
             self.timeData = _np.lib.format.read_array(f)  # _np.load(f) doesn't play nice with gzip
             if useReps:
                 self.repData = _np.lib.format.read_array(f)  # _np.load(f) doesn't play nice with gzip
+            else:
+                self.repData = None
             self.cnt_cache = {opstr: _ld.OutcomeLabelDict() for opstr in self.cirIndex}  # init cnt_cache afresh
         else:
             self.oliData = []
@@ -3016,6 +3242,123 @@ class DataSet(object):
 
         if bOpen: f.close()
 
+    def write_columnar(self, filename):
+        """
+        Write this data set to a columnar, memory-mappable binary file.
+
+        The file holds a table of the circuits' string representations, an index of the
+        offsets of each circuit's data, and the raw little-endian outcome-index, time and
+        repetition-count columns, followed by a small (pickled) header containing everything
+        else.  Use :method:`read_columnar` to read it.
+
+        Parameters
+        ----------
+        filename : str or Path
+            The name of the file to write.  Unlike :method:`write_binary`, file objects and gzip
+            compression aren't supported, as the written file is meant to be memory-mapped.
+
+        Returns
+        -------
+        None
+        """
+        circuit_strs = [circuit.str.encode('utf-8') for circuit in self.cirIndex.keys()]
+        rows = list(self.cirIndex.values())  # slices (static case) or indices (non-static case)
+        circuit_offsets = _np.zeros(len(rows) + 1, '<i8')
+        circuit_offsets[1:] = _np.cumsum([len(s) for s in circuit_strs])
+        row_offsets = _np.zeros(len(rows) + 1, '<i8')
+        row_offsets[1:] = _np.cumsum([len(self.oliData[r]) for r in rows])
+
+        sections = _OrderedDict()  # name => (byte offset, dtype string, length)
+        with open(filename, "wb") as f:
+            f.write(_COLUMNAR_MAGIC)
+            f.write(_np.zeros(1, '<u8').tobytes())  # placeholder for the byte offset of the header
+
+            def begin_section(name, dtype, length):
+                f.write(b'\0' * (-f.tell() % _COLUMNAR_ALIGNMENT))
+                sections[name] = (f.tell(), dtype.str, int(length))
+
+            begin_section('circuit_table', _np.dtype(_np.uint8), circuit_offsets[-1])
+            f.write(b''.join(circuit_strs))
+            begin_section('circuit_offsets', circuit_offsets.dtype, len(circuit_offsets))
+            f.write(circuit_offsets.tobytes())
+            begin_section('row_offsets', row_offsets.dtype, len(row_offsets))
+            f.write(row_offsets.tobytes())
+
+            for name, data, typ in (('oli', self.oliData, self.oliType), ('time', self.timeData, self.timeType),
+                                    ('rep', self.repData, self.repType)):
+                if data is None: continue
+                dtype = _np.dtype(typ).newbyteorder('<')
+                begin_section(name, dtype, row_offsets[-1])
+                for r in rows:
+                    f.write(_np.asarray(data[r], dtype).tobytes())
+
+            header = {'sections': sections,
+                      'olIndex': self.olIndex,
+                      'olIndex_max': self.olIndex_max,
+                      'collisionAction': self.collisionAction,
+                      'uuid': self.uuid if (self.uuid is not None) else _uuid.uuid4(),
+                      'auxInfo': {circuit.str: info for circuit, info in self.auxInfo.items() if info},
+                      'comment': self.comment}  # no Circuit objects, so that nothing needs to be decoded upon reading
+            header_offset = f.tell()
+            _pickle.dump(header, f)
+            f.seek(len(_COLUMNAR_MAGIC))
+            f.write(_np.array([header_offset], '<u8').tobytes())
+
+    def read_columnar(self, filename, mmap_mode='r'):
+        """
+        Read a DataSet from a columnar binary file, clearing any data it contained previously.
+
+        The file should have been created with :method:`DataSet.write_columnar`.  The data columns
+        are memory-mapped, so that even a very large data set can be opened quickly and its pages
+        can be shared by several processes, and each circuit is only parsed when it's first needed.
+        The resulting data set is static.
+
+        Parameters
+        ----------
+        filename : str or Path
+            The file to read.
+
+        mmap_mode : {'r', 'c', None}, optional
+            The mode used to memory-map the data columns (see :class:`numpy.memmap`): `'r'` for
+            read-only or `'c'` for copy-on-write.  If `None`, the columns are read into memory.
+
+        Returns
+        -------
+        None
+        """
+        with open(filename, "rb") as f:
+            if f.read(len(_COLUMNAR_MAGIC)) != _COLUMNAR_MAGIC:
+                raise ValueError("%s is not a columnar DataSet file!" % str(filename))
+            f.seek(int(_np.frombuffer(f.read(8), '<u8')[0]))
+            with _compat.patched_uuid():
+                header = _pickle.load(f)
+
+            def column(name):
+                offset, dtype, length = header['sections'][name]
+                if mmap_mode is None or length == 0:  # (numpy can't memory-map zero bytes)
+                    f.seek(offset)
+                    return _np.fromfile(f, dtype, length)
+                return _np.memmap(filename, dtype, mmap_mode, offset, (length,))
+
+            self.cirIndex = _ColumnarCircuitIndex(column('circuit_table'), column('circuit_offsets'),
+                                                  column('row_offsets'))
+            self.oliData = column('oli')
+            self.timeData = column('time')
+            self.repData = column('rep') if ('rep' in header['sections']) else None
+
+        self.olIndex = header['olIndex']
+        self.olIndex_max = header['olIndex_max']
+        self.ol = _OrderedDict([(i, ol) for (ol, i) in self.olIndex.items()])
+        self.bStatic = True
+        self.oliType = _np.dtype(header['sections']['oli'][1]).type
+        self.timeType = _np.dtype(header['sections']['time'][1]).type
+        self.repType = _np.dtype(header['sections']['rep'][1]).type if (self.repData is not None) else Repcount_type
+        self.collisionAction = header['collisionAction']
+        self.uuid = header['uuid']
+        self.auxInfo = _defaultdict(dict, {_cir.Circuit(s): info for s, info in header['auxInfo'].items()})
+        self.comment = header['comment']
+        self.cnt_cache = _defaultdict(_ld.OutcomeLabelDict)  # filled as circuits are accessed
+
     def rename_outcome_labels(self, old_to_new_dict):
         """
         Replaces existing output labels with new ones as per `old_to_new_dict`.
@@ -0,0 +1,308 @@
+"""
+Defines the StreamingDataSet class
+"""
+#***************************************************************************************************
+# Copyright 2015, 2019 National Technology & Engineering Solutions of Sandia, LLC (NTESS).
+# Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights
+# in this software.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License.  You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0 or in the LICENSE file in the root pyGSTi directory.
+#***************************************************************************************************
+
+import threading as _threading
+import uuid as _uuid
+from collections import OrderedDict as _OrderedDict
+
+import numpy as _np
+
+from pygsti.circuits import circuit as _cir
+from pygsti.baseobjs import outcomelabeldict as _ld
+from pygsti.data.dataset import DataSet as _DataSet
+from pygsti.data.dataset import Oindex_type as _Oindex_type, Time_type as _Time_type, \
+    Repcount_type as _Repcount_type
+
+
+class StreamingDataSet(object):
+    """
+    An append-optimized accumulator of outcome data that is periodically compacted into static DataSets.
+
+    Data is appended, in any circuit order, as rows of `(circuit index, outcome index, count, time)`
+    to numpy buffers whose capacity grows geometrically.  Compacting the buffered rows (which can be
+    done periodically in a background thread) creates a static :class:`DataSet` snapshot.  Snapshots
+    are never modified, so readers (e.g. objective functions) always see a consistent data set, and
+    they never wait for data to be appended or compacted.
+
+    Parameters
+    ----------
+    circuits : list, optional
+        Circuits (or tuples of operation labels) to register initially, which are given indices
+        0, 1, etc.  More circuits can be registered later using :method:`add_circuits`.
+
+    outcome_labels : list, optional
+        Outcome labels to register initially.  More can be registered later using
+        :method:`add_outcome_labels`.
+
+    initial_capacity : int, optional
+        The initial number of rows the data buffers can hold.
+
+    compaction_interval : int, optional
+        If not `None`, a background compaction is started whenever at least this many rows
+        have been added since the last compaction.
+
+    comment : string, optional
+        A comment given to the compacted :class:`DataSet` snapshots.
+    """
+
+    def __init__(self, circuits=None, outcome_labels=None, initial_capacity=1024, compaction_interval=None,
+                 comment=None):
+        self.compaction_interval = compaction_interval
+        self.comment = comment
+
+        self.circuits = []
+        self.cirIndex = _OrderedDict()  # Circuit => integer index
+        self.olIndex = _OrderedDict()  # outcome label => integer index
+
+        capacity = max(int(initial_capacity), 1)
+        self._cirData = _np.empty(capacity, _np.int64)
+        self._oliData = _np.empty(capacity, _Oindex_type)
+        self._repData = _np.empty(capacity, _Repcount_type)
+        self._timeData = _np.empty(capacity, _Time_type)
+        self._num_rows = 0
+
+        self._lock = _threading.Lock()  # guards appending (and the registration of circuits & outcome labels)
+        self._compaction_lock = _threading.Lock()  # only one compaction at a time
+        self._compaction_thread = None
+        self._snapshot = None
+        self._snapshot_num_rows = 0
+
+        if circuits is not None: self.add_circuits(circuits)
+        if outcome_labels is not None: self.add_outcome_labels(outcome_labels)
+        self._snapshot = self._build_snapshot(*self._capture())
+
+    def __len__(self):
+        return len(self.circuits)
+
+    @property
+    def num_rows(self):
+        """
+        The total number of data rows that have been added.
+        """
+        return self._num_rows
+
+    @property
+    def num_pending_rows(self):
+        """
+        The number of data rows that have been added but aren't in the current snapshot.
+        """
+        return self._num_rows - self._snapshot_num_rows
+
+    def add_circuits(self, circuits):
+        """
+        Registers circuits, returning their indices.
+
+        Circuits that are already registered keep their existing indices.
+
+        Parameters
+        ----------
+        circuits : list
+            A list of :class:`Circuit` objects or tuples of operation labels.
+
+        Returns
+        -------
+        numpy.ndarray
+            The indices of `circuits`, for use with :method:`add_counts_bulk`.
+        """
+        circuits = [c if isinstance(c, _cir.Circuit) else _cir.Circuit(c) for c in circuits]
+        with self._lock:
+            for circuit in circuits:
+                if circuit not in self.cirIndex:
+                    self.cirIndex[circuit] = len(self.circuits)
+                    self.circuits.append(circuit)
+            return _np.array([self.cirIndex[circuit] for circuit in circuits], _np.int64)
+
+    def add_outcome_labels(self, outcome_labels):
+        """
+        Registers outcome labels, returning their indices.
+
+        Outcome labels that are already registered keep their existing indices.
+
+        Parameters
+        ----------
+        outcome_labels : list
+            A list of outcome labels (strings or tuples).
+
+        Returns
+        -------
+        numpy.ndarray
+            The indices of `outcome_labels`, for use with :method:`add_counts_bulk`.
+        """
+        outcome_labels = [_ld.OutcomeLabelDict.to_outcome(ol) for ol in outcome_labels]
+        with self._lock:
+            for ol in outcome_labels:
+                if ol not in self.olIndex:
+                    self.olIndex[ol] = len(self.olIndex)
+            return _np.array([self.olIndex[ol] for ol in outcome_labels], _np.int64)
+
+    def add_counts_bulk(self, circuit_indices, outcome_indices, counts, times=None):
+        """
+        Appends rows of outcome counts.
+
+        Each row gives the number of times an outcome was observed for a circuit at a time.
+        Rows for the same circuit needn't be adjacent, and are compacted in the order they're added.
+
+        Parameters
+        ----------
+        circuit_indices : numpy.ndarray
+            The index of each row's circuit, as returned by :method:`add_circuits`.
+
+        outcome_indices : numpy.ndarray
+            The index of each row's outcome label, as returned by :method:`add_outcome_labels`.
+
+        counts : numpy.ndarray
+            The count (number of repetitions) of each row.
+
+        times : numpy.ndarray or float, optional
+            The time stamp of each row, or a single time stamp for all the rows.  Defaults to 0.
+
+        Returns
+        -------
+        None
+        """
+        circuit_indices = _np.asarray(circuit_indices, _np.int64).ravel()
+        outcome_indices = _np.asarray(outcome_indices, _np.int64).ravel()
+        counts = _np.asarray(counts).ravel()
+        n = len(circuit_indices)
+        if len(outcome_indices) != n or len(counts) != n:
+            raise ValueError("`circuit_indices`, `outcome_indices` and `counts` must have the same length!")
+        times = _np.broadcast_to(_np.asarray(0.0 if (times is None) else times, _Time_type), (n,))
+
+        with self._lock:
+            if n > 0 and (circuit_indices.min() < 0 or circuit_indices.max() >= len(self.circuits)):
+                raise ValueError("Invalid circuit index: circuits must be registered with `add_circuits`")
+            if n > 0 and (outcome_indices.min() < 0 or outcome_indices.max() >= len(self.olIndex)):
+                raise ValueError("Invalid outcome index: outcome labels must be registered with `add_outcome_labels`")
+
+            start = self._num_rows
+            if start + n > len(self._cirData):
+                self._grow(start + n)
+            self._cirData[start:start + n] = circuit_indices
+            self._oliData[start:start + n] = outcome_indices
+            self._repData[start:start + n] = counts
+            self._timeData[start:start + n] = times
+            self._num_rows = start + n  # rows are only visible to compaction once they're written
+
+        if self.compaction_interval is not None and self.num_pending_rows >= self.compaction_interval:
+            self._start_background_compaction()
+
+    def add_count_dict(self, circuit, count_dict, time=0.0):
+        """
+        Appends the outcome counts of a single circuit.
+
+        This is a convenience wrapper around :method:`add_counts_bulk`.
+
+        Parameters
+        ----------
+        circuit : Circuit or tuple
+            The circuit, which is registered if it isn't already.
+
+        count_dict : dict
+            A dictionary with outcome-label keys and count values.
+
+        time : float, optional
+            The time stamp of the counts.
+
+        Returns
+        -------
+        None
+        """
+        circuit_index = self.add_circuits([circuit])[0]
+        outcome_indices = self.add_outcome_labels(list(count_dict.keys()))
+        self.add_counts_bulk(_np.full(len(outcome_indices), circuit_index), outcome_indices,
+                             list(count_dict.values()), time)
+
+    def _grow(self, min_capacity):
+        """ Reallocates the data buffers (called with `self._lock` held); existing buffers aren't modified """
+        capacity = max(min_capacity, 2 * len(self._cirData))
+        for attr in ('_cirData', '_oliData', '_repData', '_timeData'):
+            old = getattr(self, attr)
+            new = _np.empty(capacity, old.dtype)
+            new[0:self._num_rows] = old[0:self._num_rows]
+            setattr(self, attr, new)
+
+    def _capture(self):
+        """ Captures the rows, circuits and outcome labels that have been added so far (in O(1) time) """
+        with self._lock:
+            n = self._num_rows
+            return (self._cirData[0:n], self._oliData[0:n], self._repData[0:n], self._timeData[0:n],
+                    self.circuits[:], _OrderedDict(self.olIndex))
+
+    def _build_snapshot(self, cir_data, oli_data, rep_data, time_data, circuits, olIndex):
+        """ Builds a static DataSet by stably sorting the captured rows by circuit """
+        order = _np.argsort(cir_data, kind='stable')
+        offsets = _np.concatenate(([0], _np.cumsum(_np.bincount(cir_data, minlength=len(circuits)))))
+        circuit_indices = _OrderedDict([(circuit, slice(start, stop)) for circuit, start, stop
+                                        in zip(circuits, offsets[:-1].tolist(), offsets[1:].tolist())])
+        ds = _DataSet(oli_data[order], time_data[order], rep_data[order], circuit_indices=circuit_indices,
+                      outcome_label_indices=olIndex, static=True, comment=self.comment)
+        ds.uuid = _uuid.uuid4()  # as done_adding_data does
+        return ds
+
+    def compact(self, block=True):
+        """
+        Compacts all the rows added so far into a new static :class:`DataSet` snapshot.
+
+        Rows can continue to be added, and the current snapshot read, while compaction runs.
+
+        Parameters
+        ----------
+        block : bool, optional
+            If another compaction is running, whether to wait for it and then compact (`True`)
+            or to return the current snapshot immediately (`False`).
+
+        Returns
+        -------
+        DataSet
+            The latest snapshot.
+        """
+        if not self._compaction_lock.acquire(blocking=block):
+            return self._snapshot
+        try:
+            captured = self._capture()
+            num_rows = len(captured[0])
+            if num_rows > self._snapshot_num_rows or len(captured[4]) > len(self._snapshot) \
+               or len(captured[5]) > len(self._snapshot.olIndex):
+                snapshot = self._build_snapshot(*captured)
+                self._snapshot, self._snapshot_num_rows = snapshot, num_rows  # publish the new snapshot
+            return self._snapshot
+        finally:
+            self._compaction_lock.release()
+
+    def _start_background_compaction(self):
+        if self._compaction_thread is not None and self._compaction_thread.is_alive(): return
+        self._compaction_thread = _threading.Thread(target=self.compact, kwargs={'block': False}, daemon=True)
+        self._compaction_thread.start()
+
+    def wait_for_compaction(self):
+        """
+        Waits for any running background compaction to finish.
+
+        Returns
+        -------
+        None
+        """
+        thread = self._compaction_thread
+        if thread is not None: thread.join()
+
+    def snapshot(self):
+        """
+        The most recently compacted static :class:`DataSet`.
+
+        This never waits for data to be added or compacted, and so doesn't include rows that
+        have been added since the last compaction (see :method:`compact`).
+
+        Returns
+        -------
+        DataSet
+        """
+        return self._snapshot
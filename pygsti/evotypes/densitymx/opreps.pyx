@@ -59,6 +59,34 @@ cdef class OpRep(_basereps_cython.OpRep):
         self.c_rep.adjoint_acton(state.c_state, out_state.c_state)
         return out_state
 
+    def acton_batch(self, states):
+        """ Act this gate map on each column of a (dim, k) array of dense states """
+        return self._acton_batch(states, False)
+
+    def adjoint_acton_batch(self, states):
+        """ Act the adjoint of this gate map on each column of a (dim, k) array of dense states """
+        return self._acton_batch(states, True)
+
+    def _acton_batch(self, states, bool adjoint):
+        # Loop over the states at the C level: states are stored as the *rows* of C-contiguous
+        # (k, dim) arrays so that C-reps can be pointed directly at each state's data.
+        cdef INT dim = self.c_rep._dim
+        cdef INT i, nstates = states.shape[1]
+        cdef _np.ndarray[double, ndim=2, mode='c'] in_data = _np.ascontiguousarray(states.T, dtype='d')
+        cdef _np.ndarray[double, ndim=2, mode='c'] out_data = _np.empty((nstates, dim), 'd')
+        cdef StateCRep* in_crep
+        cdef StateCRep* out_crep
+        for i in range(nstates):
+            in_crep = new StateCRep(&in_data[i, 0], dim, <bool>0)
+            out_crep = new StateCRep(&out_data[i, 0], dim, <bool>0)
+            if adjoint:
+                self.c_rep.adjoint_acton(in_crep, out_crep)
+            else:
+                self.c_rep.acton(in_crep, out_crep)
+            del in_crep
+            del out_crep
+        return out_data.T
+
     def aslinearoperator(self):
         def mv(v):
             if v.ndim == 2 and v.shape[1] == 1: v = v[:,0]
@@ -98,6 +126,12 @@ cdef class OpRepDenseSuperop(OpRep):
     def to_dense_superop(self):
         return self.base
 
+    def acton_batch(self, states):
+        return _np.dot(self.base, states)
+
+    def adjoint_acton_batch(self, states):
+        return _np.dot(self.base.T, states)  # no conjugate b/c *real* data
+
     def __reduce__(self):
         # because serialization of numpy array flags is borked (around Numpy v1.16), we need to copy data
         # (so self.base *owns* it's data) and manually convey the writeable flag.
@@ -161,6 +195,15 @@ cdef class OpRepSparse(OpRep):
         sparsemx = _sps.csr_matrix((self.data, self.indices, self.indptr), shape=(dim, dim))
         return sparsemx.toarray()
 
+    def acton_batch(self, states):
+        dim = self.state_space.dim
+        return _sps.csr_matrix((self.data, self.indices, self.indptr), shape=(dim, dim)).dot(states)
+
+    def adjoint_acton_batch(self, states):
+        dim = self.state_space.dim
+        sparsemx = _sps.csr_matrix((self.data, self.indices, self.indptr), shape=(dim, dim))
+        return sparsemx.transpose().dot(states)  # no conjugate b/c *real* data
+
     def copy(self):
         return OpRepSparse(self.data.copy(), self.indices.copy(), self.indptr.copy(), self.state_space.copy())
 
@@ -247,6 +290,17 @@ cdef class OpRepComposed(OpRep):
             creps[i] = (<OpRep?>new_factor_op_reps[i]).c_rep
         (<OpCRep_Composed*>self.c_rep).reinit_factor_op_creps(creps)
 
+    def acton_batch(self, states):
+        # act with each factor in turn so that factors with batched (e.g. BLAS) actions can use them
+        for rep in self.factor_reps:
+            states = rep.acton_batch(states)
+        return states
+
+    def adjoint_acton_batch(self, states):
+        for rep in reversed(self.factor_reps):
+            states = rep.adjoint_acton_batch(states)
+        return states
+
     def copy(self):
         return OpRepComposed([f.copy() for f in self.factor_reps], self.c_rep._dim)
 
@@ -450,9 +504,11 @@ cdef class OpRepEmbedded(OpRep):
 
 cdef class OpRepExpErrorgen(OpRep):
     cdef public object errorgen_rep
+    cdef public object _adjoint_exp_params
 
     def __init__(self, errorgen_rep):
         self.errorgen_rep = errorgen_rep
+        self._adjoint_exp_params = None  # computed as needed by adjoint_acton_batch
         cdef INT dim = errorgen_rep.dim
         cdef double mu = 1.0
         cdef double eta = 1.0
@@ -476,6 +532,17 @@ cdef class OpRepExpErrorgen(OpRep):
         (<OpCRep_ExpErrorgen*>self.c_rep)._eta = eta
         (<OpCRep_ExpErrorgen*>self.c_rep)._m_star = m_star
         (<OpCRep_ExpErrorgen*>self.c_rep)._s = s
+        self._adjoint_exp_params = None
+
+    def adjoint_acton_batch(self, states):
+        """ Act the adjoint of this gate map on each column of a (dim, k) array of dense states """
+        # The C rep has no adjoint action, so use exp(L)^T = exp(L^T) with exponential params computed for L^T
+        tol = 1e-16  # 2^-53 (=Scipy default)
+        AT = self.errorgen_rep.aslinearoperator().T
+        if self._adjoint_exp_params is None:
+            self._adjoint_exp_params = _mt.expop_multiply_prep(AT)
+        mu, m_star, s, eta = self._adjoint_exp_params
+        return _mt._custom_expm_multiply_simple_core(AT, _np.array(states, 'd'), mu, m_star, s, tol, eta)
 
     def exp_params(self):
         return ( (<OpCRep_ExpErrorgen*>self.c_rep)._mu,
@@ -498,7 +565,8 @@ cdef class OpRepExpErrorgen(OpRep):
         self.c_rep = new OpCRep_ExpErrorgen((<OpRep?>errorgen_rep).c_rep,
                                             mu, eta, m_star, s, dim)
         self.state_space = errorgen_rep.state_space
-        
+        self._adjoint_exp_params = None
+
     def copy(self):
         return _copy.deepcopy(self)  # I think this should work using reduce/setstate framework TODO - test and maybe put in base class?
 
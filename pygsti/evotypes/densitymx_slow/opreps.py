@@ -40,6 +40,20 @@ class OpRep(_basereps.OpRep):
     def adjoint_acton(self, state):
         raise NotImplementedError()
 
+    def acton_batch(self, states):
+        """ Act this gate map on each column of a (dim, k) array of dense states """
+        out = _np.empty((self.dim, states.shape[1]), 'd')
+        for k in range(states.shape[1]):
+            out[:, k] = self.acton(_StateRepDense(_np.ascontiguousarray(states[:, k]), self.state_space)).data
+        return out
+
+    def adjoint_acton_batch(self, states):
+        """ Act the adjoint of this gate map on each column of a (dim, k) array of dense states """
+        out = _np.empty((self.dim, states.shape[1]), 'd')
+        for k in range(states.shape[1]):
+            out[:, k] = self.adjoint_acton(_StateRepDense(_np.ascontiguousarray(states[:, k]), self.state_space)).data
+        return out
+
     def aslinearoperator(self):
         def mv(v):
             if v.ndim == 2 and v.shape[1] == 1: v = v[:, 0]
@@ -50,7 +64,13 @@ class OpRep(_basereps.OpRep):
             if v.ndim == 2 and v.shape[1] == 1: v = v[:, 0]
             in_state = _StateRepDense(_np.ascontiguousarray(v, 'd'), self.state_space)
             return self.adjoint_acton(in_state).to_dense(on_space='HilbertSchmidt')
-        return LinearOperator((self.dim, self.dim), matvec=mv, rmatvec=rmv)  # transpose, adjoint, dot, matmat?
+
+        def mm(m):
+            return self.acton_batch(_np.asarray(m, 'd'))
+
+        def rmm(m):
+            return self.adjoint_acton_batch(_np.asarray(m, 'd'))
+        return LinearOperator((self.dim, self.dim), matvec=mv, rmatvec=rmv, matmat=mm, rmatmat=rmm)
 
 
 class OpRepDenseSuperop(OpRep):
@@ -77,6 +97,12 @@ class OpRepDenseSuperop(OpRep):
     def adjoint_acton(self, state):
         return _StateRepDense(_np.dot(self.base.T, state.data), state.state_space)  # no conjugate b/c *real* data
 
+    def acton_batch(self, states):
+        return _np.dot(self.base, states)
+
+    def adjoint_acton_batch(self, states):
+        return _np.dot(self.base.T, states)  # no conjugate b/c *real* data
+
     def __str__(self):
         return "OpRepDenseSuperop:\n" + str(self.base)
 
@@ -113,6 +139,14 @@ class OpRepSparse(OpRep):
         Aadj = self.A.conjugate(copy=True).transpose()
         return _StateRepDense(Aadj.dot(state.data), state.state_space)
 
+    def acton_batch(self, states):
+        """ Act this gate map on each column of a (dim, k) array of dense states """
+        return self.A.dot(states)
+
+    def adjoint_acton_batch(self, states):
+        """ Act the adjoint of this operation matrix on each column of a (dim, k) array of dense states """
+        return self.A.transpose().dot(states)  # no conjugate b/c *real* data
+
     def to_dense(self, on_space):
         if on_space not in ('minimal', 'HilbertSchmidt'):
             raise ValueError("'densitymx_slow' evotype cannot produce Hilbert-space ops!")
@@ -183,6 +217,18 @@ class OpRepComposed(OpRep):
             state = gate.adjoint_acton(state)
         return state
 
+    def acton_batch(self, states):
+        """ Act this gate map on each column of a (dim, k) array of dense states """
+        for gate in self.factor_reps:
+            states = gate.acton_batch(states)
+        return states
+
+    def adjoint_acton_batch(self, states):
+        """ Act the adjoint of this operation matrix on each column of a (dim, k) array of dense states """
+        for gate in reversed(self.factor_reps):
+            states = gate.adjoint_acton_batch(states)
+        return states
+
     def reinit_factor_op_reps(self, factor_reps):
         self.factor_reps = factor_reps
 
@@ -210,6 +256,20 @@ class OpRepSum(OpRep):
             output_state.data += f.adjoint_acton(state).data
         return output_state
 
+    def acton_batch(self, states):
+        """ Act this gate map on each column of a (dim, k) array of dense states """
+        out = _np.zeros(states.shape, 'd')
+        for f in self.factor_reps:
+            out += f.acton_batch(states)
+        return out
+
+    def adjoint_acton_batch(self, states):
+        """ Act the adjoint of this operation matrix on each column of a (dim, k) array of dense states """
+        out = _np.zeros(states.shape, 'd')
+        for f in self.factor_reps:
+            out += f.adjoint_acton_batch(states)
+        return out
+
 
 class OpRepEmbedded(OpRep):
 
@@ -271,13 +331,55 @@ class OpRepEmbedded(OpRep):
     #                              self.ncomponents, self.active_block_index,
     #                              self.nblocks, self.dim))
 
-    def _acton_other_blocks_trivially(self, output_state, state):
+    def _acton_other_blocks_trivially(self, output_data, data):
+        # works on 1D state vectors and on (dim, k) arrays of states alike
         offset = 0
         for iBlk, blockSize in enumerate(self.blocksizes):
             if iBlk != self.active_block_index:
-                output_state.data[offset:offset + blockSize] = state.data[offset:offset + blockSize]  # identity op
+                output_data[offset:offset + blockSize] = data[offset:offset + blockSize]  # identity op
             offset += blockSize
 
+    def _embedded_indices(self):
+        """ A (num_noop_combinations, embedded_dim) array of the state-vector indices acted on by `embedded_rep` """
+        if getattr(self, '_embedded_inds', None) is None:
+            all_inds = []
+            for b in _itertools.product(*self.basisInds_noop_blankaction):  # zeros in all action-index locations
+                vec_index_noop = _np.dot(self.multipliers, tuple(b))
+                inds = []
+                for op_b in _itertools.product(*self.basisInds_action):
+                    vec_index = vec_index_noop
+                    for i, bInd in zip(self.action_inds, op_b):
+                        vec_index += self.multipliers[i] * bInd
+                    inds.append(self.offset + vec_index)
+                all_inds.append(inds)
+            self._embedded_inds = _np.array(all_inds, _np.int64)
+        return self._embedded_inds
+
+    def _embedded_acton_batch(self, states, adjoint):
+        # Gather the (embedded_dim, k) sub-blocks acted on by `embedded_rep` for every no-op index combination
+        # into a single (embedded_dim, num_noop * k) array so the embedded rep is applied just once.
+        inds = self._embedded_indices()
+        nNoop, edim = inds.shape
+        k = states.shape[1]
+        embedded_instates = states[inds].transpose(1, 0, 2).reshape(edim, nNoop * k)
+        if adjoint:
+            embedded_outstates = self.embedded_rep.adjoint_acton_batch(embedded_instates)
+        else:
+            embedded_outstates = self.embedded_rep.acton_batch(embedded_instates)
+
+        out = _np.zeros(states.shape, 'd')
+        out[inds] = _np.asarray(embedded_outstates).reshape(edim, nNoop, k).transpose(1, 0, 2)
+        self._acton_other_blocks_trivially(out, states)
+        return out
+
+    def acton_batch(self, states):
+        """ Act this gate map on each column of a (dim, k) array of dense states """
+        return self._embedded_acton_batch(states, adjoint=False)
+
+    def adjoint_acton_batch(self, states):
+        """ Act the adjoint of this gate map on each column of a (dim, k) array of dense states """
+        return self._embedded_acton_batch(states, adjoint=True)
+
     def acton(self, state):
         output_state = _StateRepDense(_np.zeros(state.data.shape, 'd'), state.state_space)
         offset = self.offset  # if rel_to_block else self.offset (rel_to_block == False here)
@@ -295,11 +397,11 @@ class OpRepEmbedded(OpRep):
                     vec_index += self.multipliers[i] * bInd
                 inds.append(offset + vec_index)
             embedded_instate = _StateRepDense(state.data[inds], state.state_space)
-            embedded_outstate = self.embedded.acton(embedded_instate)
+            embedded_outstate = self.embedded_rep.acton(embedded_instate)
             output_state.data[inds] += embedded_outstate.data
 
         #act on other blocks trivially:
-        self._acton_other_blocks_trivially(output_state, state)
+        self._acton_other_blocks_trivially(output_state.data, state.data)
         return output_state
 
     def adjoint_acton(self, state):
@@ -318,11 +420,11 @@ class OpRepEmbedded(OpRep):
                     vec_index += self.multipliers[i] * bInd
                 inds.append(offset + vec_index)
             embedded_instate = _StateRepDense(state.data[inds], state.state_space)
-            embedded_outstate = self.embedded.adjoint_acton(embedded_instate)
+            embedded_outstate = self.embedded_rep.adjoint_acton(embedded_instate)
             output_state.data[inds] += embedded_outstate.data
 
         #act on other blocks trivially:
-        self._acton_other_blocks_trivially(output_state, state)
+        self._acton_other_blocks_trivially(output_state.data, state.data)
         return output_state
 
 
@@ -337,6 +439,7 @@ class OpRepExpErrorgen(OpRep):
         self.eta = 1.0
         self.m_star = 0
         self.s = 0
+        self._adjoint_exp_params = None  # computed as needed by adjoint_acton_batch
         super(OpRepExpErrorgen, self).__init__(state_space)
 
     def errgenrep_has_changed(self, onenorm_upperbound):
@@ -351,6 +454,7 @@ class OpRepExpErrorgen(OpRep):
         self.eta = eta
         self.m_star = m_star
         self.s = s
+        self._adjoint_exp_params = None
 
     def exp_params(self):
         return (self.mu, self.eta, self.m_star, self.s)
@@ -376,7 +480,24 @@ class OpRepExpErrorgen(OpRep):
 
     def adjoint_acton(self, state):
         """ Act the adjoint of this operation matrix on an input state """
-        raise NotImplementedError("No adjoint action implemented for sparse Lindblad LinearOperator Reps yet.")
+        return _StateRepDense(self.adjoint_acton_batch(state.data[:, None])[:, 0], state.state_space)
+
+    def acton_batch(self, states):
+        """ Act this gate map on each column of a (dim, k) array of dense states """
+        tol = 1e-16  # 2^-53 (=Scipy default) -- TODO: make into an arg?
+        A = self.errorgen_rep.aslinearoperator()  # A.dot(B) uses errorgen_rep.acton_batch for 2D B
+        return _mt._custom_expm_multiply_simple_core(
+            A, _np.array(states, 'd'), self.mu, self.m_star, self.s, tol, self.eta)
+
+    def adjoint_acton_batch(self, states):
+        """ Act the adjoint of this operation matrix on each column of a (dim, k) array of dense states """
+        # exp(L)^T = exp(L^T), whose exponential params (based on the operator norm) generally differ from exp(L)'s
+        tol = 1e-16  # 2^-53 (=Scipy default) -- TODO: make into an arg?
+        AT = self.errorgen_rep.aslinearoperator().T  # AT.dot(B) uses errorgen_rep.adjoint_acton_batch for 2D B
+        if self._adjoint_exp_params is None:
+            self._adjoint_exp_params = _mt.expop_multiply_prep(AT)
+        mu, m_star, s, eta = self._adjoint_exp_params
+        return _mt._custom_expm_multiply_simple_core(AT, _np.array(states, 'd'), mu, m_star, s, tol, eta)
 
 
 class OpRepRepeated(OpRep):
@@ -397,3 +518,15 @@ class OpRepRepeated(OpRep):
         for i in range(self.num_repetitions):
             state = self.repeated_rep.adjoint_acton(state)
         return state
+
+    def acton_batch(self, states):
+        """ Act this gate map on each column of a (dim, k) array of dense states """
+        for i in range(self.num_repetitions):
+            states = self.repeated_rep.acton_batch(states)
+        return states
+
+    def adjoint_acton_batch(self, states):
+        """ Act the adjoint of this operation matrix on each column of a (dim, k) array of dense states """
+        for i in range(self.num_repetitions):
+            states = self.repeated_rep.adjoint_acton_batch(states)
+        return states
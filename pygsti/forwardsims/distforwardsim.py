@@ -9,10 +9,18 @@ Defines the DistributableForwardSimulator calculator class
 # in compliance with the License.  You may obtain a copy of the License at
 # http://www.apache.org/licenses/LICENSE-2.0 or in the LICENSE file in the root pyGSTi directory.
 #***************************************************************************************************
+import collections as _collections
+import pickle as _pickle
+import threading as _threading
+import uuid as _uuid
+import warnings as _warnings
+import weakref as _weakref
+
 import numpy as _np
 
 from pygsti.forwardsims.forwardsim import ForwardSimulator as _ForwardSimulator
 from pygsti.forwardsims.forwardsim import _array_type_parameter_dimension_letters
+from pygsti.forwardsims.forwardsim import _fill_sparse_rows_by_param_blocks
 from pygsti.tools import mpitools as _mpit
 from pygsti.tools import slicetools as _slct
 from pygsti.tools import sharedmemtools as _smt
@@ -58,6 +66,15 @@ class DistributableForwardSimulator(_ForwardSimulator):
         this can be a 0-, 1- or 2-tuple of integers or `None` values.  A block size of `None`
         means that there should be no division into blocks, and that each block processor
         computes all of its parameter indices at once.
+
+    Notes
+    -----
+    Without MPI, the atoms of a layout can still be computed in parallel by local worker processes:
+    when the layout's resource allocation has `num_local_workers > 1` (see :class:`ResourceAllocation`),
+    :method:`bulk_fill_probs`, :method:`bulk_fill_dprobs` and :method:`bulk_fill_hprobs` divide the
+    atoms among the allocation's pool of worker processes, which write their results into shared memory.
+    The model and layout are sent to the workers (by pickling) on each call, so this pays off when
+    layouts have several atoms that are expensive to compute.
     """
 
     @classmethod
@@ -95,13 +112,17 @@ class DistributableForwardSimulator(_ForwardSimulator):
         atom_resource_alloc = layout.resource_alloc('atom-processing')
         atom_resource_alloc.host_comm_barrier()  # ensure all procs have finished w/shared memory before we reinit
 
-        for atom in layout.atoms:  # layout only holds local atoms
-            self._bulk_fill_probs_atom(array_to_fill[atom.element_slice], atom, atom_resource_alloc)
+        self._fill_atoms(layout, '_bulk_fill_probs_layout_atom', (array_to_fill,))  # layout only holds local atoms
 
         atom_resource_alloc.host_comm_barrier()  # don't exit until all procs' array_to_fill is ready
         # (may need to wait for the host leader to write to this proc's array_to_fill, as _block
         #  functions just ensure the lead proc eventually writes to the memory))
 
+    def _bulk_fill_probs_layout_atom(self, layout, atom, arrays):
+        # Fills the elements of `atom` within `arrays == (array_to_fill,)` for _bulk_fill_probs
+        array_to_fill, = arrays
+        self._bulk_fill_probs_atom(array_to_fill[atom.element_slice], atom, layout.resource_alloc('atom-processing'))
+
     def _bulk_fill_probs_atom(self, array_to_fill, layout_atom, resource_alloc):
         # if atom can be converted to a (sub)-layout, then we can just use machinery of base
         # class (note: layouts hold their own resource-alloc, atom's don't)
@@ -110,40 +131,90 @@ class DistributableForwardSimulator(_ForwardSimulator):
     def _bulk_fill_dprobs(self, array_to_fill, layout, pr_array_to_fill):
         """Note: we expect that array_to_fill points to the memory specifically for this processor
            (a subset of the memory for the host when memory is shared) """
-        blkSize = layout.param_dimension_blk_sizes[0]
         atom_resource_alloc = layout.resource_alloc('atom-processing')
-        param_resource_alloc = layout.resource_alloc('param-processing')
-
         atom_resource_alloc.host_comm_barrier()  # ensure all procs have finished w/shared memory before we reinit
         # Note: use *largest* host comm that we fill - so 'atom' comm, not 'param' comm
 
+        self._fill_atoms(layout, '_bulk_fill_dprobs_layout_atom', (array_to_fill, pr_array_to_fill))
+
+        atom_resource_alloc.host_comm_barrier()  # don't exit until all procs' array_to_fill is ready
+
+    def _bulk_fill_dprobs_layout_atom(self, layout, atom, arrays):
+        # Fills the elements of `atom` within `arrays == (array_to_fill, pr_array_to_fill)` for _bulk_fill_dprobs
+        array_to_fill, pr_array_to_fill = arrays
+        blkSize = layout.param_dimension_blk_sizes[0]
+        atom_resource_alloc = layout.resource_alloc('atom-processing')
+        param_resource_alloc = layout.resource_alloc('param-processing')
+
         host_param_slice = None  # layout.host_param_slice  # array_to_fill is already just this slice of the host mem
         global_param_slice = layout.global_param_slice
 
-        for atom in layout.atoms:
-            #assert(_slct.length(atom.element_slice) == atom.num_elements)  # for debugging
-            #print("DEBUG: Atom %d of %d slice=%s" % (iDB, len(layout.atoms), str(atom.element_slice)))
+        #assert(_slct.length(atom.element_slice) == atom.num_elements)  # for debugging
+        #print("DEBUG: Atom %d of %d slice=%s" % (iDB, len(layout.atoms), str(atom.element_slice)))
+
+        atom_probs = pr_array_to_fill[atom.element_slice] if (pr_array_to_fill is not None) else None
+
+        if blkSize is None:  # avoid unnecessary slice_up_range and block loop logic in 'else' block
+            #Compute all of our derivative columns at once
+            self._bulk_fill_probs_and_dprobs_atom(atom_probs, array_to_fill[atom.element_slice, :],
+                                                  host_param_slice, atom, global_param_slice,
+                                                  atom_resource_alloc, param_resource_alloc)
+
+        else:  # Divide columns into blocks of at most blkSize
+            Np = _slct.length(global_param_slice)  # total number of parameters we're computing
+            nBlks = int(_np.ceil(Np / blkSize))  # num blocks required to achieve desired average size == blkSize
+            blocks = _mpit.slice_up_range(Np, nBlks)  # blocks contain indices into final_array[host_param_slice]
+            if len(blocks) == 0 and atom_probs is not None:
+                self._bulk_fill_probs_atom(atom_probs, atom, atom_resource_alloc)
+
+            for iBlk, block in enumerate(blocks):
+                host_param_slice_part = block  # _slct.shift(block, host_param_slice.start)  # into host's memory
+                global_param_slice_part = _slct.shift(block, global_param_slice.start)  # actual parameter indices
+                self._bulk_fill_probs_and_dprobs_atom(atom_probs if (iBlk == 0) else None,  # probs just once
+                                                      array_to_fill[atom.element_slice, :], host_param_slice_part,
+                                                      atom, global_param_slice_part,
+                                                      atom_resource_alloc, param_resource_alloc)
+
+    def bulk_fill_sparse_dprobs(self, array_to_fill, layout, pr_array_to_fill=None):
+        """
+        Compute the outcome probability-derivatives for an entire tree of circuits as a sparse matrix.
 
-            if pr_array_to_fill is not None:
-                self._bulk_fill_probs_atom(pr_array_to_fill[atom.element_slice], atom, atom_resource_alloc)
+        See :method:`ForwardSimulator.bulk_fill_sparse_dprobs`.  Derivatives are computed
+        atom by atom, in blocks of (at most `layout.param_dimension_blk_sizes[0]`) parameters,
+        skipping blocks that none of an atom's circuits depend upon.  Only layouts that aren't
+        divided among multiple processors are supported.
+
+        Parameters
+        ----------
+        array_to_fill : scipy.sparse.csr_matrix
+            an already-allocated sparse matrix of shape `(len(layout), Np)`, where `Np` is the
+            number of model parameters, whose `data` array is filled.
 
-            if blkSize is None:  # avoid unnecessary slice_up_range and block loop logic in 'else' block
-                #Compute all of our derivative columns at once
-                self._bulk_fill_dprobs_atom(array_to_fill[atom.element_slice, :], host_param_slice, atom,
-                                            global_param_slice, param_resource_alloc)
+        layout : DistributableCOPALayout
+            A layout for `array_to_fill`, describing what circuit outcome each
+            element corresponds to.  Usually given by a prior call to :method:`create_layout`.
 
-            else:  # Divide columns into blocks of at most blkSize
-                Np = _slct.length(global_param_slice)  # total number of parameters we're computing
-                nBlks = int(_np.ceil(Np / blkSize))  # num blocks required to achieve desired average size == blkSize
-                blocks = _mpit.slice_up_range(Np, nBlks)  # blocks contain indices into final_array[host_param_slice]
+        pr_array_to_fill : numpy array, optional
+            when not None, an already-allocated length-`len(layout)` numpy array that is
+            filled with probabilities, just as in :method:`bulk_fill_probs`.
 
-                for block in blocks:
-                    host_param_slice_part = block  # _slct.shift(block, host_param_slice.start)  # into host's memory
-                    global_param_slice_part = _slct.shift(block, global_param_slice.start)  # actual parameter indices
-                    self._bulk_fill_dprobs_atom(array_to_fill[atom.element_slice, :], host_param_slice_part, atom,
-                                                global_param_slice_part, param_resource_alloc)
+        Returns
+        -------
+        None
+        """
+        atom_resource_alloc = layout.resource_alloc('atom-processing')
+        param_resource_alloc = layout.resource_alloc('param-processing')
+        if layout.resource_alloc().comm_size > 1:
+            raise NotImplementedError("Sparse derivatives are not supported for layouts divided among processors!")
+        blkSize = layout.param_dimension_blk_sizes[0] if len(layout.param_dimension_blk_sizes) > 0 else None
 
-        atom_resource_alloc.host_comm_barrier()  # don't exit until all procs' array_to_fill is ready
+        for atom in layout.atoms:
+            if pr_array_to_fill is not None:
+                self._bulk_fill_probs_atom(pr_array_to_fill[atom.element_slice], atom, atom_resource_alloc)
+            _fill_sparse_rows_by_param_blocks(
+                array_to_fill, atom.element_slice, blkSize,
+                lambda ar, param_slice: self._bulk_fill_dprobs_atom(ar, slice(0, ar.shape[1]), atom, param_slice,
+                                                                    param_resource_alloc))
 
     def _bulk_fill_dprobs_atom(self, array_to_fill, dest_param_slice, layout_atom, param_slice, resource_alloc):
         # if atom can be converted to a (sub)-layout, then we can just use machinery of base
@@ -151,10 +222,32 @@ class DistributableForwardSimulator(_ForwardSimulator):
         self._bulk_fill_dprobs_block(array_to_fill, dest_param_slice,
                                      layout_atom.as_layout(resource_alloc), param_slice)
 
+    def _bulk_fill_probs_and_dprobs_atom(self, pr_array_to_fill, array_to_fill, dest_param_slice, layout_atom,
+                                         param_slice, atom_resource_alloc, param_resource_alloc):
+        # Fills the probabilities (if `pr_array_to_fill` is not None) and a block of their derivatives for a single
+        # atom.  Simulators that compute the probabilities anyway when computing derivatives, e.g. by finite
+        # differences, override this to avoid a separate forward simulation.
+        if pr_array_to_fill is not None:
+            self._bulk_fill_probs_atom(pr_array_to_fill, layout_atom, atom_resource_alloc)
+        self._bulk_fill_dprobs_atom(array_to_fill, dest_param_slice, layout_atom, param_slice, param_resource_alloc)
+
     def _bulk_fill_hprobs(self, array_to_fill, layout,
                           pr_array_to_fill, deriv1_array_to_fill, deriv2_array_to_fill):
         """Note: we expect that array_to_fill points to the memory specifically for this processor
            (a subset of the memory for the host when memory is shared) """
+        atom_resource_alloc = layout.resource_alloc('atom-processing')
+        atom_resource_alloc.host_comm_barrier()  # ensure all procs have finished w/shared memory before we reinit
+        # Note: use *largest* host comm that we fill - so 'atom' comm, not 'param' comm
+
+        self._fill_atoms(layout, '_bulk_fill_hprobs_layout_atom',
+                         (array_to_fill, pr_array_to_fill, deriv1_array_to_fill, deriv2_array_to_fill))
+
+        atom_resource_alloc.host_comm_barrier()  # don't exit until all procs' array_to_fill is ready
+
+    def _bulk_fill_hprobs_layout_atom(self, layout, atom, arrays):
+        # Fills the elements of `atom` within `arrays == (array_to_fill, pr_array_to_fill, deriv1_array_to_fill,
+        # deriv2_array_to_fill)` for _bulk_fill_hprobs
+        array_to_fill, pr_array_to_fill, deriv1_array_to_fill, deriv2_array_to_fill = arrays
         blkSize1 = layout.param_dimension_blk_sizes[0]
         blkSize2 = layout.param_dimension_blk_sizes[1]
 
@@ -163,75 +256,68 @@ class DistributableForwardSimulator(_ForwardSimulator):
         param_resource_alloc = layout.resource_alloc('param-processing')
         param2_resource_alloc = layout.resource_alloc('param2-processing')
 
-        atom_resource_alloc.host_comm_barrier()  # ensure all procs have finished w/shared memory before we reinit
-        # Note: use *largest* host comm that we fill - so 'atom' comm, not 'param' comm
-
         host_param_slice = None  # layout.host_param_slice  # array_to_fill is already just this slice of the host mem
         host_param2_slice = None  # layout.host_param2_slice  # array_to_fill is already just this slice of the host mem
         global_param_slice = layout.global_param_slice
         global_param2_slice = layout.global_param2_slice
 
-        for atom in layout.atoms:
-
-            if pr_array_to_fill is not None:
-                self._bulk_fill_probs_atom(pr_array_to_fill[atom.element_slice], atom, atom_resource_alloc)
+        if pr_array_to_fill is not None:
+            self._bulk_fill_probs_atom(pr_array_to_fill[atom.element_slice], atom, atom_resource_alloc)
+
+        if blkSize1 is None and blkSize2 is None:  # run 'else' block without unnecessary logic
+            #Compute all our derivative columns at once
+            if deriv1_array_to_fill is not None:
+                self._bulk_fill_dprobs_atom(deriv1_array_to_fill[atom.element_slice, :], host_param_slice,
+                                            atom, global_param_slice, param_resource_alloc)
+            if deriv2_array_to_fill is not None:
+                if deriv1_array_to_fill is not None and global_param_slice == global_param2_slice:
+                    deriv2_array_to_fill[atom.element_slice, :] = deriv1_array_to_fill[atom.element_slice, :]
+                else:
+                    self._bulk_fill_dprobs_atom(deriv2_array_to_fill[atom.element_slice, :], host_param2_slice,
+                                                atom, global_param2_slice, param2_resource_alloc)
+
+            self._bulk_fill_hprobs_atom(array_to_fill[atom.element_slice, :, :], host_param_slice,
+                                        host_param2_slice, atom, global_param_slice, global_param2_slice,
+                                        param2_resource_alloc)
+
+        else:  # Divide columns into blocks of at most shape (blkSize1, blkSize2)
+            assert(blkSize1 is not None and blkSize2 is not None), \
+                "Both (or neither) of the Hessian block sizes must be specified!"
+            Np1 = _slct.length(global_param_slice)
+            Np2 = _slct.length(global_param2_slice)
+            nBlks1 = int(_np.ceil(Np1 / blkSize1))
+            nBlks2 = int(_np.ceil(Np2 / blkSize2))
+            # num blocks required to achieve desired average size == blkSize1 or blkSize2
+            blocks1 = _mpit.slice_up_range(Np1, nBlks1)
+            blocks2 = _mpit.slice_up_range(Np2, nBlks2)
+
+            for block1 in blocks1:
+                host_param_slice_part = block1  # _slct.shift(block1, host_param_slice.start)  # into host's memory
+                global_param_slice_part = _slct.shift(block1, global_param_slice.start)  # actual parameter indices
 
-            if blkSize1 is None and blkSize2 is None:  # run 'else' block without unnecessary logic
-                #Compute all our derivative columns at once
                 if deriv1_array_to_fill is not None:
-                    self._bulk_fill_dprobs_atom(deriv1_array_to_fill[atom.element_slice, :], host_param_slice,
-                                                atom, global_param_slice, param_resource_alloc)
-                if deriv2_array_to_fill is not None:
-                    if deriv1_array_to_fill is not None and global_param_slice == global_param2_slice:
-                        deriv2_array_to_fill[atom.element_slice, :] = deriv1_array_to_fill[atom.element_slice, :]
-                    else:
-                        self._bulk_fill_dprobs_atom(deriv2_array_to_fill[atom.element_slice, :], host_param2_slice,
-                                                    atom, global_param2_slice, param2_resource_alloc)
-
-                self._bulk_fill_hprobs_atom(array_to_fill[atom.element_slice, :, :], host_param_slice,
-                                            host_param2_slice, atom, global_param_slice, global_param2_slice,
-                                            param2_resource_alloc)
-
-            else:  # Divide columns into blocks of at most shape (blkSize1, blkSize2)
-                assert(blkSize1 is not None and blkSize2 is not None), \
-                    "Both (or neither) of the Hessian block sizes must be specified!"
-                Np1 = _slct.length(global_param_slice)
-                Np2 = _slct.length(global_param2_slice)
-                nBlks1 = int(_np.ceil(Np1 / blkSize1))
-                nBlks2 = int(_np.ceil(Np2 / blkSize2))
-                # num blocks required to achieve desired average size == blkSize1 or blkSize2
-                blocks1 = _mpit.slice_up_range(Np1, nBlks1)
-                blocks2 = _mpit.slice_up_range(Np2, nBlks2)
-
-                for block1 in blocks1:
-                    host_param_slice_part = block1  # _slct.shift(block1, host_param_slice.start)  # into host's memory
-                    global_param_slice_part = _slct.shift(block1, global_param_slice.start)  # actual parameter indices
-
-                    if deriv1_array_to_fill is not None:
-                        self._bulk_fill_dprobs_atom(deriv1_array_to_fill[atom.element_slice, :], host_param_slice_part,
-                                                    atom, global_param_slice_part, param_resource_alloc)
-
+                    self._bulk_fill_dprobs_atom(deriv1_array_to_fill[atom.element_slice, :], host_param_slice_part,
+                                                atom, global_param_slice_part, param_resource_alloc)
+
+                for block2 in blocks2:
+                    host_param2_slice_part = block2  # into host's memory
+                    global_param2_slice_part = _slct.shift(block2, global_param2_slice.start)  # parameter indices
+                    self._bulk_fill_hprobs_atom(array_to_fill[atom.element_slice, :],
+                                                host_param_slice_part, host_param2_slice_part, atom,
+                                                global_param_slice_part, global_param2_slice_part,
+                                                param2_resource_alloc)
+
+            #Fill deriv2_array_to_fill if we need to.
+            if deriv2_array_to_fill is not None:
+                if deriv1_array_to_fill is not None and global_param_slice == global_param2_slice:
+                    deriv2_array_to_fill[atom.element_slice, :] = deriv1_array_to_fill[atom.element_slice, :]
+                else:
                     for block2 in blocks2:
                         host_param2_slice_part = block2  # into host's memory
-                        global_param2_slice_part = _slct.shift(block2, global_param2_slice.start)  # parameter indices
-                        self._bulk_fill_hprobs_atom(array_to_fill[atom.element_slice, :],
-                                                    host_param_slice_part, host_param2_slice_part, atom,
-                                                    global_param_slice_part, global_param2_slice_part,
-                                                    param2_resource_alloc)
-
-                #Fill deriv2_array_to_fill if we need to.
-                if deriv2_array_to_fill is not None:
-                    if deriv1_array_to_fill is not None and global_param_slice == global_param2_slice:
-                        deriv2_array_to_fill[atom.element_slice, :] = deriv1_array_to_fill[atom.element_slice, :]
-                    else:
-                        for block2 in blocks2:
-                            host_param2_slice_part = block2  # into host's memory
-                            global_param2_slice_part = _slct.shift(block2, global_param2_slice.start)  # param indices
-                            self._bulk_fill_dprobs_atom(deriv2_array_to_fill[atom.element_slice, :],
-                                                        host_param2_slice_part, atom,
-                                                        global_param2_slice_part, param_resource_alloc)
-
-        atom_resource_alloc.host_comm_barrier()  # don't exit until all procs' array_to_fill is ready
+                        global_param2_slice_part = _slct.shift(block2, global_param2_slice.start)  # param indices
+                        self._bulk_fill_dprobs_atom(deriv2_array_to_fill[atom.element_slice, :],
+                                                    host_param2_slice_part, atom,
+                                                    global_param2_slice_part, param_resource_alloc)
 
     def _bulk_fill_hprobs_atom(self, array_to_fill, dest_param_slice1, dest_param_slice2, layout_atom,
                                param_slice1, param_slice2, resource_alloc):
@@ -442,6 +528,39 @@ class DistributableForwardSimulator(_ForwardSimulator):
 
         return local_results
 
+    def _fill_atoms(self, layout, method_name, arrays_to_fill):
+        """
+        Calls `getattr(self, method_name)(layout, atom, arrays_to_fill)` for each (local) atom of `layout`.
+
+        The named method fills the rows (elements) of `atom` within the arrays of the tuple `arrays_to_fill`,
+        any of which may be `None`.  When the layout's resource allocation has a pool of local worker processes
+        (see :method:`ResourceAllocation.local_process_pool`) and the layout has multiple atoms, the atoms are
+        divided among these processes, which fill shared-memory copies of the arrays.
+        """
+        pool = self._local_process_pool(layout)
+        if pool is not None:
+            _fill_atoms_in_process_pool(pool, self, layout, method_name, arrays_to_fill)
+        else:
+            fill_atom = getattr(self, method_name)
+            for atom in layout.atoms:
+                fill_atom(layout, atom, arrays_to_fill)
+
+    def _local_process_pool(self, layout):
+        """ The pool of local worker processes to run the atoms of `layout` on, or `None` to use this process only """
+        layout_resource_alloc = layout.resource_alloc()
+        pool = layout_resource_alloc.local_process_pool() if (layout_resource_alloc is not None) else None
+        if pool is None or len(layout.atoms) <= 1:
+            return None
+        if not _smt.shared_mem_is_enabled():
+            _warnings.warn("Local worker processes require shared memory; running serially instead.")
+            return None
+        return pool
+
+    def _default_num_atoms(self, resource_alloc, default_natoms):
+        """ `default_natoms`, or at least one atom per worker when `resource_alloc` has local worker processes """
+        pool = resource_alloc.local_process_pool()
+        return default_natoms if (pool is None) else max(default_natoms, pool.num_workers)
+
     def _compute_processor_distribution(self, array_types, nprocs, num_params, num_circuits, default_natoms):
         """ Computes commonly needed processor-grid info for distributed layout creation (a helper function)"""
         parameter_dim_letters = _array_type_parameter_dimension_letters()
@@ -483,3 +602,113 @@ class DistributableForwardSimulator(_ForwardSimulator):
                 na = _mpit.closest_divisor(pblk, natoms); pblk //= na  # last dim: don't demand we divide atoms evenly
                 npp = ()
         return natoms, na, npp, param_dimensions, param_blk_sizes
+
+
+class _PoolPayload(object):
+    """
+    A pickled (simulator, model, layout) tuple held in shared memory, so that the workers of a
+    :class:`LocalProcessPool` each load it only once (see :function:`_fill_atoms_in_process_pool`).
+    """
+
+    def __init__(self, fwdsim, layout):
+        self.token = _uuid.uuid4().hex
+        self.fwdsim_ref = _weakref.ref(fwdsim)
+        self.model_ref = _weakref.ref(fwdsim.model)
+        self.num_params = fwdsim.model.num_params
+        payload = _pickle.dumps((fwdsim, fwdsim.model, layout), protocol=_pickle.HIGHEST_PROTOCOL)
+        ar, shm = _smt.create_shared_ndarray(None, (len(payload),), 'u1', local_processes=True)
+        ar[:] = _np.frombuffer(payload, 'u1')
+        self.spec = (shm.name, len(payload))
+        _weakref.finalize(self, _smt.cleanup_shared_ndarray, shm)  # free the memory along with this object
+
+    def is_current(self, fwdsim):
+        """ Whether this payload holds `fwdsim` and (the structure of) its current model """
+        return self.fwdsim_ref() is fwdsim and self.model_ref() is fwdsim.model \
+            and self.num_params == fwdsim.model.num_params
+
+
+_pool_payloads = _weakref.WeakKeyDictionary()  # layout => _PoolPayload of the layout's most recent pooled fill
+_pool_payloads_lock = _threading.Lock()
+
+
+def _fill_atoms_in_process_pool(pool, fwdsim, layout, method_name, arrays_to_fill):
+    """
+    Runs :method:`DistributableForwardSimulator._fill_atoms` using the worker processes of `pool`.
+
+    The simulator, its model and the layout are pickled and sent to the (persistent) workers only
+    when they change, and otherwise just the model's parameter vector is sent, along with a
+    contiguous range of atom indices for each worker.  The workers fill shared-memory copies
+    of `arrays_to_fill`, which are then copied back into `arrays_to_fill`.
+    """
+    with _pool_payloads_lock:
+        payload = _pool_payloads.get(layout, None)
+        if payload is None or not payload.is_current(fwdsim):
+            payload = _pool_payloads[layout] = _PoolPayload(fwdsim, layout)
+    paramvec = fwdsim.model.to_vector()
+
+    shared_arrays = []; shms = []; array_specs = []
+    try:
+        for ar in arrays_to_fill:
+            if ar is None:
+                shared_arrays.append(None); array_specs.append(None); continue
+            shared_ar, shm = _smt.create_shared_ndarray(None, ar.shape, ar.dtype, local_processes=True)
+            shared_ar[...] = ar  # in case the atoms' methods read (e.g. accumulate into) existing values
+            shared_arrays.append(shared_ar); shms.append(shm)
+            array_specs.append((shm.name if (shm is not None) else None, ar.shape, ar.dtype.str))
+
+        num_groups = min(pool.num_workers, len(layout.atoms))
+        pool.map(_fill_atoms_in_worker, [(payload.token, payload.spec, paramvec, method_name,
+                                          (slc.start, slc.stop), tuple(array_specs))
+                                         for slc in _mpit.slice_up_range(len(layout.atoms), num_groups)])
+
+        for ar, shared_ar in zip(arrays_to_fill, shared_arrays):
+            if ar is not None: ar[...] = shared_ar
+    finally:
+        shared_arrays = shared_ar = None  # release views of the shared memory before it's freed
+        for shm in shms:
+            _smt.cleanup_shared_ndarray(shm)
+
+
+_worker_payloads = _collections.OrderedDict()  # token => [fwdsim, layout, paramvec], in each worker process
+_MAX_WORKER_PAYLOADS = 4
+
+
+def _fill_atoms_in_worker(token, payload_spec, paramvec, method_name, atom_range, array_specs):
+    """ Fills the shared arrays given by `array_specs` for the atoms in `range(*atom_range)` (in a worker process) """
+    if token in _worker_payloads:
+        _worker_payloads.move_to_end(token)
+        entry = _worker_payloads[token]
+    else:  # load the payload the first time this worker sees it
+        payload_ar, payload_shm = _smt.attach_shared_ndarray(payload_spec[0], (payload_spec[1],), 'u1')
+        try:
+            fwdsim, model, layout = _pickle.loads(payload_ar.tobytes())
+        finally:
+            payload_ar = None; payload_shm.close()  # the parent process unlinks the memory
+        fwdsim.model = model  # simulators don't pickle their model
+        entry = _worker_payloads[token] = [fwdsim, layout, model.to_vector()]
+        while len(_worker_payloads) > _MAX_WORKER_PAYLOADS:
+            _worker_payloads.popitem(last=False)
+
+    fwdsim, layout, current_paramvec = entry
+    if not _np.array_equal(paramvec, current_paramvec):
+        fwdsim.model.from_vector(paramvec)
+        entry[2] = paramvec
+
+    fill_atom = getattr(fwdsim, method_name)
+    arrays = []; shms = []
+    try:
+        for spec in array_specs:
+            if spec is None:
+                arrays.append(None)
+            elif spec[0] is None:  # an array without elements
+                arrays.append(_np.empty(spec[1], spec[2]))
+            else:
+                ar, shm = _smt.attach_shared_ndarray(*spec)
+                arrays.append(ar); shms.append(shm)
+        arrays = tuple(arrays)
+        for i in range(*atom_range):
+            fill_atom(layout, layout.atoms[i], arrays)
+    finally:
+        arrays = ar = None  # release views of the shared memory before closing it
+        for shm in shms:
+            shm.close()  # the parent process unlinks the memory
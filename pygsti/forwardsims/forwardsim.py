@@ -72,6 +72,7 @@ class ForwardSimulator(_NicelySerializable):
         if method_name == 'bulk_fill_probs': return cls._array_types_for_method('_bulk_fill_probs_block')
         if method_name == 'bulk_fill_dprobs': return cls._array_types_for_method('_bulk_fill_dprobs_block')
         if method_name == 'bulk_fill_hprobs': return cls._array_types_for_method('_bulk_fill_hprobs_block')
+        if method_name == 'bulk_fill_sparse_dprobs': return cls._array_types_for_method('_bulk_fill_dprobs_block')
         if method_name == '_bulk_fill_probs_block': return ()
         if method_name == '_bulk_fill_dprobs_block':
             return ('e',) + cls._array_types_for_method('_bulk_fill_probs_block')
@@ -645,6 +646,41 @@ class ForwardSimulator(_NicelySerializable):
                 array_to_fill[:, iFinal] = (probs2 - probs) / eps
         self.model.from_vector(orig_vec, close=True)
 
+    def bulk_fill_sparse_dprobs(self, array_to_fill, layout, pr_array_to_fill=None):
+        """
+        Compute the outcome probability-derivatives for an entire tree of circuits as a sparse matrix.
+
+        This routine is similar to :method:`bulk_fill_dprobs` except that `array_to_fill` is
+        a sparse matrix whose sparsity structure (which must be the one given by
+        `layout.param_dependency_index(self.model)`) is fixed, and only the values of its
+        structurally non-zero entries are computed.  Derivatives are computed in blocks of
+        parameters so that the intermediate (dense) memory required is roughly the size of
+        `array_to_fill`'s data rather than the number of elements times the number of parameters.
+
+        Parameters
+        ----------
+        array_to_fill : scipy.sparse.csr_matrix
+            an already-allocated sparse matrix of shape `(len(layout), Np)`, where `Np` is the
+            number of model parameters, whose `data` array is filled.
+
+        layout : CircuitOutcomeProbabilityArrayLayout
+            A layout for `array_to_fill`, describing what circuit outcome each
+            element corresponds to.  Usually given by a prior call to :method:`create_layout`.
+
+        pr_array_to_fill : numpy array, optional
+            when not None, an already-allocated length-`len(layout)` numpy array that is
+            filled with probabilities, just as in :method:`bulk_fill_probs`.
+
+        Returns
+        -------
+        None
+        """
+        if pr_array_to_fill is not None:
+            self._bulk_fill_probs_block(pr_array_to_fill, layout)
+        _fill_sparse_rows_by_param_blocks(
+            array_to_fill, slice(0, len(layout)), None,
+            lambda ar, param_slice: self._bulk_fill_dprobs_block(ar, None, layout, param_slice))
+
     def bulk_fill_hprobs(self, array_to_fill, layout,
                          pr_array_to_fill=None, deriv1_array_to_fill=None, deriv2_array_to_fill=None):
         """
@@ -902,6 +938,58 @@ class CacheForwardSimulator(ForwardSimulator):
         raise NotImplementedError("Derived classes can implement this to speed up derivative computation")
 
 
+def _fill_sparse_rows_by_param_blocks(sparse_mx, row_slice, block_size, fill_block):
+    """
+    Fill the values of a range of rows of a CSR matrix using dense blocks of columns.
+
+    Parameters
+    ----------
+    sparse_mx : scipy.sparse.csr_matrix
+        The matrix whose `data` is filled.  Its sparsity structure is not altered.
+
+    row_slice : slice
+        The (contiguous) rows of `sparse_mx` to fill.
+
+    block_size : int or None
+        The number of columns computed at once.  If `None`, the average number of
+        structurally non-zero entries per row is used, so that the dense intermediate
+        block is about as large as the filled part of `sparse_mx`.
+
+    fill_block : function
+        A function `fill_block(array_to_fill, param_slice)` that fills the dense array
+        `array_to_fill`, of shape `(num_rows, len(param_slice))`, with the values of the
+        given rows and columns.  Column blocks that contain no structurally non-zero
+        entries within the rows are skipped.
+
+    Returns
+    -------
+    None
+    """
+    nRows = _slct.length(row_slice); nCols = sparse_mx.shape[1]
+    row_ptrs = sparse_mx.indptr[row_slice.start:row_slice.stop + 1]
+    nz_slice = slice(row_ptrs[0], row_ptrs[-1])
+    if nRows == 0 or nz_slice.stop == nz_slice.start: return
+
+    cols = sparse_mx.indices[nz_slice]
+    rows = _np.repeat(_np.arange(nRows), _np.diff(row_ptrs))  # the row of each non-zero entry
+    by_col = _np.argsort(cols, kind='stable')  # non-zero entries ordered by column => blocks are contiguous ranges
+    sorted_cols = cols[by_col]
+    data = sparse_mx.data[nz_slice]
+
+    if block_size is None:
+        block_size = int(_np.ceil(len(cols) / nRows))
+    block_size = max(min(block_size, nCols), 1)
+    scratch = _np.empty((nRows, block_size), 'd')
+    for start in range(0, nCols, block_size):
+        stop = min(start + block_size, nCols)
+        i0, i1 = _np.searchsorted(sorted_cols, (start, stop))
+        if i0 == i1: continue  # no structurally non-zero entries in this block of columns
+        block = scratch[:, 0:stop - start]
+        fill_block(block, slice(start, stop))
+        nz_in_block = by_col[i0:i1]
+        data[nz_in_block] = block[rows[nz_in_block], cols[nz_in_block] - start]
+
+
 def _array_type_parameter_dimension_letters():
     """ Return all the array-type letters that stand for a parameter dimension """
     return ('P', 'p', 'b')
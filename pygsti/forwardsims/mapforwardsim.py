@@ -17,6 +17,7 @@ import numpy as _np
 from pygsti.forwardsims.distforwardsim import DistributableForwardSimulator as _DistributableForwardSimulator
 from pygsti.forwardsims.forwardsim import ForwardSimulator as _ForwardSimulator
 from pygsti.forwardsims.forwardsim import _bytes_for_array_types
+from pygsti.forwardsims import mapforwardsim_calc_generic as _generic_calclib
 from pygsti.layouts.maplayout import MapCOPALayout as _MapCOPALayout
 from pygsti.baseobjs.profiler import DummyProfiler as _DummyProfiler
 from pygsti.baseobjs.resourceallocation import ResourceAllocation as _ResourceAllocation
@@ -99,8 +100,9 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
 
     Interfaces with a model via its `circuit_layer_operator` method and applies the resulting
     operators in order to propagate states and finally compute outcome probabilities.  Derivatives
-    are computed using finite-differences, and the prefix tables construbed by :class:`MapCOPALayout`
-    layout object are used to avoid duplicating (some) computation.
+    are computed using finite-differences or the adjoint method (see `derivative_method`), and the
+    prefix tables construbed by :class:`MapCOPALayout` layout object are used to avoid duplicating
+    (some) computation.
 
     Parameters
     ----------
@@ -133,6 +135,27 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
         this can be a 0-, 1- or 2-tuple of integers or `None` values.  A block size of `None`
         means that there should be no division into blocks, and that each block processor
         computes all of its parameter indices at once.
+
+    derivative_eps : float, optional
+        The finite-difference step size used when computing derivatives.
+
+    hessian_eps : float, optional
+        The finite-difference step size used when computing Hessians.
+
+    table_method : {"sorted", "trie"}, optional
+        How the prefix tables of created layouts are constructed.  `"sorted"` only caches
+        the states of circuits that are prefixes of other circuits.  `"trie"` builds a
+        prefix trie and caches the (possibly synthetic) shared-prefix states that save the
+        most layer applications, subject to `max_cache_size`.
+
+    derivative_method : {"finitediff", "adjoint"}, optional
+        How derivatives of outcome probabilities are computed.  `"finitediff"` uses finite
+        differences, re-propagating states for each parameter.  `"adjoint"` computes analytic
+        derivatives by propagating states forward and effect vectors backward through each
+        circuit once, and contracting the results with each layer's `deriv_wrt_params`, so that
+        its cost barely depends on the number of parameters.  This requires operation reps that
+        act on dense states (e.g. the "densitymx" evotype).  Hessians are computed by finite
+        differences of these derivatives.
     """
 
     @classmethod
@@ -149,18 +172,24 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
         return super()._array_types_for_method(method_name)
 
     def __init__(self, model=None, max_cache_size=0, num_atoms=None, processor_grid=None, param_blk_sizes=None,
-                 derivative_eps=1e-7, hessian_eps=1e-5):
+                 derivative_eps=1e-7, hessian_eps=1e-5, table_method="sorted", derivative_method="finitediff"):
         #super().__init__(model, num_atoms, processor_grid, param_blk_sizes)
         _DistributableForwardSimulator.__init__(self, model, num_atoms, processor_grid, param_blk_sizes)
         self._max_cache_size = max_cache_size
         self.derivative_eps = derivative_eps  # for finite difference derivative calculations
         self.hessian_eps = hessian_eps
+        self.table_method = table_method
+        if derivative_method not in ("finitediff", "adjoint"):
+            raise ValueError("Invalid `derivative_method`: %s" % str(derivative_method))
+        self.derivative_method = derivative_method
 
     def _to_nice_serialization(self):
         state = super()._to_nice_serialization()
         state.update({'max_cache_size': self._max_cache_size,
                       'derivative_epsilon': self.derivative_eps,
                       'hessian_epsilon': self.hessian_eps,
+                      'table_method': self.table_method,
+                      'derivative_method': self.derivative_method,
                       # (don't serialize parent model or processor distribution info)
                       })
         return state
@@ -170,7 +199,9 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
         #Note: resets processor-distribution information
         return cls(None, state['max_cache_size'],
                    derivative_eps=state.get('derivative_epsilon', 1e-7),
-                   hessian_eps=state.get('hessian_epsilon', 1e-5))
+                   hessian_eps=state.get('hessian_epsilon', 1e-5),
+                   table_method=state.get('table_method', "sorted"),
+                   derivative_method=state.get('derivative_method', "finitediff"))
 
     def copy(self):
         """
@@ -181,10 +212,12 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
         MapForwardSimulator
         """
         return MapForwardSimulator(self.model, self._max_cache_size, self._num_atoms,
-                                   self._processor_grid, self._pblk_sizes)
+                                   self._processor_grid, self._pblk_sizes, self.derivative_eps,
+                                   self.hessian_eps, self.table_method, self.derivative_method)
 
     def create_layout(self, circuits, dataset=None, resource_alloc=None, array_types=('E',),
-                      derivative_dimension=None, verbosity=0):
+                      derivative_dimension=None, verbosity=0, table_method=None, previous_layout=None,
+                      layout_cache_dir=None):
         """
         Constructs an circuit-outcome-probability-array (COPA) layout for a list of circuits.
 
@@ -214,6 +247,24 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
             Determines how much output to send to stdout.  0 means no output, higher
             integers mean more output.
 
+        table_method : {"sorted", "trie"}, optional
+            How the layout's prefix tables are constructed.  If `None`, this simulator's
+            `table_method` is used.  The number of layer applications saved by caching is
+            reported (at verbosity >= 2) and available via the layout's `num_applies_saved`.
+
+        previous_layout : MapCOPALayout, optional
+            A layout previously created by this simulator for a subset of `circuits` (using the
+            same `dataset` and `resource_alloc`).  Its prefix tables are extended with the new
+            circuits rather than being rebuilt, which is useful when the circuit lists are nested,
+            as in iterative GST.
+
+        layout_cache_dir : str or Path, optional
+            A directory in which to cache the layout's circuit groups and atoms (prefix tables
+            and element/outcome index maps).  The cache is keyed by a digest of the (completed)
+            circuits, observed outcomes, model structure, processor grid and parameter-dimension
+            settings, so a repeated call with the same inputs, e.g. when analyzing a new data set for
+            the same experiment design, loads the layout's atoms instead of recomputing them.
+
         Returns
         -------
         MapCOPALayout
@@ -240,15 +291,18 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
         #work_per_proc = self.model.dim**2
 
         natoms, na, npp, param_dimensions, param_blk_sizes = self._compute_processor_distribution(
-            array_types, nprocs, num_params, len(circuits), default_natoms=2 * self.model.dim)  # heuristic?
+            array_types, nprocs, num_params, len(circuits),
+            default_natoms=self._default_num_atoms(resource_alloc, 2 * self.model.dim))  # heuristic?
 
         printer.log("MapLayout: %d processors divided into %s (= %d) grid along circuit and parameter directions." %
                     (nprocs, ' x '.join(map(str, (na,) + npp)), _np.product((na,) + npp)))
         printer.log("   %d atoms, parameter block size limits %s" % (natoms, str(param_blk_sizes)))
         assert(_np.product((na,) + npp) <= nprocs), "Processor grid size exceeds available processors!"
 
+        if table_method is None: table_method = self.table_method
         layout = _MapCOPALayout(circuits, self.model, dataset, self._max_cache_size, natoms, na, npp,
-                                param_dimensions, param_blk_sizes, resource_alloc, verbosity)
+                                param_dimensions, param_blk_sizes, resource_alloc, verbosity, table_method,
+                                previous_layout, layout_cache_dir)
 
         if mem_limit is not None:
             loc_nparams1 = num_params / npp[0] if len(npp) > 0 else 0
@@ -299,8 +353,32 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
     def _bulk_fill_dprobs_atom(self, array_to_fill, dest_param_slice, layout_atom, param_slice, resource_alloc):
         # Note: *don't* set dest_indices arg = layout.element_slice, as this is already done by caller
         resource_alloc.check_can_allocate_memory(layout_atom.cache_size * self.model.dim * _slct.length(param_slice))
-        self.calclib.mapfill_dprobs_atom(self, array_to_fill, slice(0, array_to_fill.shape[0]), dest_param_slice,
-                                         layout_atom, param_slice, resource_alloc, self.derivative_eps)
+        self._mapfill_dprobs_atom(array_to_fill, slice(0, array_to_fill.shape[0]), dest_param_slice,
+                                  layout_atom, param_slice, resource_alloc, self.derivative_eps)
+
+    def _bulk_fill_probs_and_dprobs_atom(self, pr_array_to_fill, array_to_fill, dest_param_slice, layout_atom,
+                                         param_slice, atom_resource_alloc, param_resource_alloc):
+        # The finite-difference derivatives begin with an unperturbed sweep that computes the probabilities,
+        # so fill `pr_array_to_fill` from it rather than performing a separate forward simulation.
+        if pr_array_to_fill is None or not atom_resource_alloc.is_host_leader:
+            return super()._bulk_fill_probs_and_dprobs_atom(pr_array_to_fill, array_to_fill, dest_param_slice,
+                                                            layout_atom, param_slice, atom_resource_alloc,
+                                                            param_resource_alloc)
+        param_resource_alloc.check_can_allocate_memory(layout_atom.cache_size * self.model.dim
+                                                       * _slct.length(param_slice))
+        self._mapfill_dprobs_atom(array_to_fill, slice(0, array_to_fill.shape[0]), dest_param_slice,
+                                  layout_atom, param_slice, param_resource_alloc, self.derivative_eps,
+                                  pr_array_to_fill)
+
+    def _mapfill_dprobs_atom(self, array_to_fill, dest_indices, dest_param_indices, layout_atom, param_indices,
+                             resource_alloc, eps, probs_to_fill=None):
+        # Dispatches to the derivative computation selected by `self.derivative_method`
+        if self.derivative_method == "adjoint":
+            _generic_calclib.mapfill_dprobs_atom_adjoint(self, array_to_fill, dest_indices, dest_param_indices,
+                                                         layout_atom, param_indices, resource_alloc, probs_to_fill)
+        else:
+            self.calclib.mapfill_dprobs_atom(self, array_to_fill, dest_indices, dest_param_indices,
+                                             layout_atom, param_indices, resource_alloc, eps, probs_to_fill)
 
     def _bulk_fill_hprobs_atom(self, array_to_fill, dest_param_slice1, dest_param_slice2, layout_atom,
                                param_slice1, param_slice2, resource_alloc):
@@ -341,8 +419,7 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
         nP2 = _slct.length(param_indices2) if isinstance(param_indices2, slice) else len(param_indices2)
         dprobs, shm = _smt.create_shared_ndarray(resource_alloc, (nEls, nP2), 'd')
         dprobs2, shm2 = _smt.create_shared_ndarray(resource_alloc, (nEls, nP2), 'd')
-        self.calclib.mapfill_dprobs_atom(self, dprobs, slice(0, nEls), None, layout_atom, param_indices2,
-                                         resource_alloc, eps)
+        self._mapfill_dprobs_atom(dprobs, slice(0, nEls), None, layout_atom, param_indices2, resource_alloc, eps)
 
         orig_vec = self.model.to_vector().copy()
         for i in range(self.model.num_params):
@@ -350,8 +427,8 @@ class MapForwardSimulator(_DistributableForwardSimulator, SimpleMapForwardSimula
                 iFinal = iParamToFinal[i]
                 vec = orig_vec.copy(); vec[i] += eps
                 self.model.from_vector(vec, close=True)
-                self.calclib.mapfill_dprobs_atom(self, dprobs2, slice(0, nEls), None, layout_atom,
-                                                 param_indices2, resource_alloc, eps)
+                self._mapfill_dprobs_atom(dprobs2, slice(0, nEls), None, layout_atom, param_indices2,
+                                          resource_alloc, eps)
                 if shared_mem_leader:
                     _fas(array_to_fill, [dest_indices, iFinal, dest_param_indices2], (dprobs2 - dprobs) / eps)
         self.model.from_vector(orig_vec)
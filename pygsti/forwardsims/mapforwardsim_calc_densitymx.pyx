@@ -62,9 +62,11 @@ def propagate_staterep(staterep, operationreps):
 cdef vector[vector[INT]] convert_maplayout(layout_atom, operation_lookup, rho_lookup):
     # c_layout :
     # an array of INT-arrays; each INT-array is [iDest,iStart,iCache,<remainder gate indices>]
+    # (iDest == -1 for shared-prefix items whose state is only computed to be cached)
     cdef vector[INT] intarray
     cdef vector[vector[INT]] c_layout_atom = vector[vector[INT]](len(layout_atom.table))
     for kk, (iDest, iStart, remainder, iCache) in enumerate(layout_atom.table.contents):
+        if iDest is None: iDest = -1 # a shared prefix that is only computed to be cached
         if iStart is None: iStart = -1 # so always an int
         if iCache is None: iCache = -1 # so always an int
         remainder = remainder.circuit_without_povm.layertup
@@ -274,16 +276,17 @@ cdef dm_mapfill_probs(double[:] array_to_fill,
         #print " final:"; print [ final_state._dataptr[t] for t in range(4) ]
 
         #print "begin prob comps: %.2fs since last, %.2fs elapsed" % (pytime.time()-t1, pytime.time()-t0) # DEBUG
-        final_indices = final_indices_per_circuit[i]
-        elabel_indices = elabel_indices_per_circuit[i]
-        #print("Op actons done - computing %d probs" % elabel_indices.size());t1 = pytime.time() # DEBUG
-
-        precomp_state = prop2  # used as cache/scratch space
-        precomp_id = 0  # this should be a number that is *never* a Python id()
-        for j in range(<INT>elabel_indices.size()):
-            #print("Erep prob %d of %d: elapsed = %.2fs" % (j, elabel_indices.size(), pytime.time() - t1))
-            #OLD: array_to_fill[ final_indices[j] ] = c_ereps[elabel_indices[j]].probability(final_state) #outcome probability
-            array_to_fill[ final_indices[j] ] = c_ereps[elabel_indices[j]].probability_using_cache(final_state, precomp_state, precomp_id) #outcome probability
+        if i != -1:  # i == -1 => a shared prefix with no outcomes
+            final_indices = final_indices_per_circuit[i]
+            elabel_indices = elabel_indices_per_circuit[i]
+            #print("Op actons done - computing %d probs" % elabel_indices.size());t1 = pytime.time() # DEBUG
+
+            precomp_state = prop2  # used as cache/scratch space
+            precomp_id = 0  # this should be a number that is *never* a Python id()
+            for j in range(<INT>elabel_indices.size()):
+                #print("Erep prob %d of %d: elapsed = %.2fs" % (j, elabel_indices.size(), pytime.time() - t1))
+                #OLD: array_to_fill[ final_indices[j] ] = c_ereps[elabel_indices[j]].probability(final_state) #outcome probability
+                array_to_fill[ final_indices[j] ] = c_ereps[elabel_indices[j]].probability_using_cache(final_state, precomp_state, precomp_id) #outcome probability
 
         if icache != -1:
             deref(prho_cache)[icache] = final_state # store this state in the cache
@@ -303,7 +306,7 @@ def mapfill_dprobs_atom(fwdsim,
                         np.ndarray[double, ndim=2] array_to_fill,
                         dest_indices,
                         dest_param_indices,
-                        layout_atom, param_indices, resource_alloc, double eps):
+                        layout_atom, param_indices, resource_alloc, double eps, probs_to_fill=None):
 
     #cdef double eps = 1e-7
 
@@ -355,6 +358,8 @@ def mapfill_dprobs_atom(fwdsim,
     #    print("MAPFILL DPROBS ATOM 2 %.3fs" % (pytime.time() - t)); t=pytime.time()
 
     shared_mem_leader = resource_alloc.is_host_leader
+    if probs_to_fill is not None and shared_mem_leader:
+        probs_to_fill[dest_indices] = probs  # the unperturbed probabilities (saves the caller a forward sweep)
 
     #Get a map from global parameter indices to the desired
     # final index within array_to_fill
@@ -475,6 +480,7 @@ def mapfill_TDterms(fwdsim, objective, array_to_fill, dest_indices, num_outcomes
     #comm is currently ignored
     #TODO: if layout_atom is split, distribute among processors
     for iDest, iStart, remainder, iCache in layout_atom.table.contents:
+        if iDest is None: continue  # a shared prefix with no outcomes
         remainder = remainder.circuit_without_povm.layertup
         rholabel = remainder[0]; remainder = remainder[1:]
         rhoVec = fwdsim.model._circuit_layer_operator(rholabel, 'prep')
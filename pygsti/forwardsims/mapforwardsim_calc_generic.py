@@ -15,6 +15,9 @@ from pygsti.tools import sharedmemtools as _smt
 from pygsti.tools import slicetools as _slct
 from pygsti.tools.matrixtools import _fas
 
+# Maximum number of state-vector elements propagated together in a single batch
+_MAX_BATCH_ELEMENTS = 2**22
+
 
 def propagate_staterep(staterep, operationreps):
     ret = staterep.actionable_staterep()
@@ -45,6 +48,11 @@ def mapfill_probs_atom(fwdsim, mx_to_fill, dest_indices, layout_atom, resource_a
     effectreps = {i: fwdsim.model._circuit_layer_operator(Elbl, 'povm')._rep
                   for i, Elbl in enumerate(layout_atom.full_effect_labels)}  # cache these in future
 
+    if all([hasattr(oprep, 'acton_batch') for oprep in operationreps.values()]):
+        _mapfill_probs_atom_batched(fwdsim, mx_to_fill, dest_indices, layout_atom, rhoreps, operationreps,
+                                    effectreps, shared_mem_leader)
+        return
+
     #TODO: if layout_atom is split, distribute somehow among processors(?) instead of punting for all but rank-0 above
     for iDest, iStart, remainder, iCache in layout_atom.table.contents:
         remainder = remainder.circuit_without_povm.layertup
@@ -59,6 +67,7 @@ def mapfill_probs_atom(fwdsim, mx_to_fill, dest_indices, layout_atom, resource_a
         #OLD final_state = self.propagate_state(init_state, remainder)
         final_state = propagate_staterep(init_state, [operationreps[gl] for gl in remainder])
         if iCache is not None: rho_cache[iCache] = final_state  # [:,0] #store this state in the cache
+        if iDest is None: continue  # a shared prefix that is only computed to be cached
 
         ereps = [effectreps[j] for j in layout_atom.elbl_indices_by_expcircuit[iDest]]
         final_indices = [dest_indices[j] for j in layout_atom.elindices_by_expcircuit[iDest]]
@@ -68,11 +77,44 @@ def mapfill_probs_atom(fwdsim, mx_to_fill, dest_indices, layout_atom, resource_a
                 mx_to_fill[j] = erep.probability(final_state)  # outcome probability
 
 
+def _mapfill_probs_atom_batched(fwdsim, mx_to_fill, dest_indices, layout_atom, rhoreps, operationreps,
+                                effectreps, shared_mem_leader):
+    # Propagates the states of independent prefix-table items together, so that each layer is applied
+    # (via `acton_batch`) to all the states that need it next at once, rather than one state at a time.
+    evotype = fwdsim.model.evotype
+    state_space = fwdsim.model.state_space
+    dim = state_space.dim
+    contents = layout_atom.table.contents
+    rho_cache = [None] * layout_atom.cache_size  # dense state vectors
+    rhovecs = {rholbl: rhorep.actionable_staterep().to_dense('HilbertSchmidt') for rholbl, rhorep in rhoreps.items()}
+
+    for table_indices, steps in layout_atom.table.evaluation_batches(max(_MAX_BATCH_ELEMENTS // dim, 1)):
+        states = _np.empty((dim, len(table_indices)), 'd')
+        for j, k in enumerate(table_indices):
+            _, iStart, remainder, _ = contents[k]
+            states[:, j] = rhovecs[remainder.circuit_without_povm.layertup[0]] if (iStart is None) \
+                else rho_cache[iStart]
+
+        for step in steps:
+            for gl, cols in step:
+                states[:, cols] = operationreps[gl].acton_batch(states[:, cols])
+
+        for j, k in enumerate(table_indices):
+            iDest, _, _, iCache = contents[k]
+            if iCache is not None: rho_cache[iCache] = states[:, j].copy()  # store this state in the cache
+
+            if shared_mem_leader and iDest is not None:
+                final_state = evotype.create_dense_state_rep(states[:, j], state_space)
+                for i, j_el in zip(layout_atom.elindices_by_expcircuit[iDest],
+                                   layout_atom.elbl_indices_by_expcircuit[iDest]):
+                    mx_to_fill[dest_indices[i]] = effectreps[j_el].probability(final_state)  # outcome probability
+
+
 def mapfill_dprobs_atom(fwdsim, mx_to_fill, dest_indices, dest_param_indices, layout_atom, param_indices,
-                        resource_alloc, eps):
+                        resource_alloc, eps, probs_to_fill=None):
 
     #eps = 1e-7
-    #shared_mem_leader = resource_alloc.is_host_leader if (resource_alloc is not None) else True
+    shared_mem_leader = resource_alloc.is_host_leader if (resource_alloc is not None) else True
 
     if param_indices is None:
         param_indices = list(range(fwdsim.model.num_params))
@@ -89,12 +131,21 @@ def mapfill_dprobs_atom(fwdsim, mx_to_fill, dest_indices, dest_param_indices, la
     orig_vec = fwdsim.model.to_vector().copy()
     fwdsim.model.from_vector(orig_vec, close=False)  # ensure we call with close=False first
 
+    operationreps = {gl: fwdsim.model._circuit_layer_operator(gl, 'op')._rep for gl in layout_atom.op_labels}
+    if fwdsim.model._param_interposer is None \
+       and all([hasattr(oprep, 'acton_batch') for oprep in operationreps.values()]):
+        _mapfill_dprobs_atom_reusing_states(fwdsim, mx_to_fill, dest_indices, layout_atom, iParamToFinal,
+                                            orig_vec, eps, probs_to_fill if shared_mem_leader else None)
+        return
+
     #Note: no real need for using shared memory here except so that we can pass
     # `resource_alloc` to mapfill_probs_block and have it potentially use multiple procs.
     nEls = layout_atom.num_elements
     probs, shm = _smt.create_shared_ndarray(resource_alloc, (nEls,), 'd', memory_tracker=None)
     probs2, shm2 = _smt.create_shared_ndarray(resource_alloc, (nEls,), 'd', memory_tracker=None)
     mapfill_probs_atom(fwdsim, probs, slice(0, nEls), layout_atom, resource_alloc)  # probs != shared
+    if probs_to_fill is not None and shared_mem_leader:
+        _fas(probs_to_fill, [dest_indices], probs)
 
     for i in range(fwdsim.model.num_params):
         #print("dprobs cache %d of %d" % (i,self.Np))
@@ -109,6 +160,317 @@ def mapfill_dprobs_atom(fwdsim, mx_to_fill, dest_indices, dest_param_indices, la
     _smt.cleanup_shared_ndarray(shm2)
 
 
+def _mapfill_dprobs_atom_reusing_states(fwdsim, mx_to_fill, dest_indices, layout_atom, param_to_final, orig_vec,
+                                        eps, probs_to_fill):
+    # Finite-difference derivatives that only re-propagate what a parameter perturbation changes.  The states of
+    # all the prefix-table items are kept from the unperturbed sweep (which also gives the probabilities), and
+    # when a parameter is perturbed only the items that depend on it - because their state preparation or one
+    # of their layers does, or because they start from the cached state of such an item - are re-propagated.
+    # Outcomes whose circuits and effects don't depend on the parameter have a zero derivative.
+    model = fwdsim.model
+    dest_indices = _slct.to_array(dest_indices)
+    contents = layout_atom.table.contents
+    nItems = len(contents)
+    op_labels = list(layout_atom.op_labels)
+    op_lookup = {gl: i for i, gl in enumerate(op_labels)}
+    rho_labels = list(layout_atom.rho_labels)
+
+    #Structure of the table: each item's starting point, layers, and level within the chain of cached prefixes
+    item_parent, item_rho, item_layers = _prefix_table_items(layout_atom)
+    item_level = _np.zeros(nItems, _np.int64)
+    item_ops = _np.zeros((nItems, len(op_labels)), bool)
+    for k, layers in enumerate(item_layers):
+        if item_parent[k] >= 0: item_level[k] = item_level[item_parent[k]] + 1
+        item_ops[k, [op_lookup[gl] for gl in layers]] = True
+    items_by_level = [_np.nonzero(item_level == lvl)[0] for lvl in range(1, item_level.max(initial=0) + 1)]
+
+    #The items and effects of each of the atom's elements (outcomes)
+    el_items = _np.empty(layout_atom.num_elements, _np.int64)
+    el_effects = _np.empty(layout_atom.num_elements, _np.int64)
+    for k, (iDest, _, _, _) in enumerate(contents):
+        if iDest is None: continue
+        el_items[layout_atom.elindices_by_expcircuit[iDest]] = k
+        el_effects[layout_atom.elindices_by_expcircuit[iDest]] = layout_atom.elbl_indices_by_expcircuit[iDest]
+
+    #Which model parameters each operation, state preparation and effect depends upon
+    def _param_mask(objs):
+        mask = _np.zeros((len(objs), model.num_params), bool)
+        for i, obj in enumerate(objs):
+            mask[i, obj.gpindices_as_array()] = True
+        return mask
+    op_params = _param_mask([model._circuit_layer_operator(gl, 'op') for gl in op_labels])
+    rho_params = _param_mask([model._circuit_layer_operator(lbl, 'prep') for lbl in rho_labels])
+    effect_params = _param_mask([model._circuit_layer_operator(elbl, 'povm')
+                                 for elbl in layout_atom.full_effect_labels])
+
+    def _layer_reps():
+        rhovecs = [model._circuit_layer_operator(lbl, 'prep')._rep.actionable_staterep().to_dense('HilbertSchmidt')
+                   for lbl in rho_labels]
+        operationreps = {gl: model._circuit_layer_operator(gl, 'op')._rep for gl in op_labels}
+        effectreps = [model._circuit_layer_operator(elbl, 'povm')._rep for elbl in layout_atom.full_effect_labels]
+        return rhovecs, operationreps, effectreps
+
+    def _fill_probs(states, elements, effectreps, probs):
+        final_states = {}
+        for e in elements:
+            k = el_items[e]
+            if k not in final_states:
+                final_states[k] = model.evotype.create_dense_state_rep(states[:, k].copy(), model.state_space)
+            probs[e] = effectreps[el_effects[e]].probability(final_states[k])
+
+    #Unperturbed sweep
+    rhovecs, operationreps, effectreps = _layer_reps()
+    states = _np.empty((model.state_space.dim, nItems), 'd')
+    _propagate_items_batched(_np.arange(nItems), item_parent, item_rho, item_layers, states, rhovecs, operationreps)
+    all_elements = _np.arange(layout_atom.num_elements)
+    probs = _np.empty(layout_atom.num_elements, 'd')
+    _fill_probs(states, all_elements, effectreps, probs)
+    if probs_to_fill is not None:
+        probs_to_fill[dest_indices] = probs
+
+    probs2 = probs.copy()
+    work_states = states.copy()
+    for i in range(model.num_params):
+        if i not in param_to_final: continue
+        iFinal = param_to_final[i]
+
+        dirty = item_ops[:, op_params[:, i]].any(axis=1)
+        dirty |= (item_rho >= 0) & rho_params[item_rho, i]
+        for lvl_items in items_by_level:
+            dirty[lvl_items] |= dirty[item_parent[lvl_items]]
+        changed_elements = _np.nonzero(dirty[el_items] | effect_params[el_effects, i])[0]
+
+        mx_to_fill[dest_indices, iFinal] = 0.0
+        if len(changed_elements) == 0: continue  # the atom's probabilities don't depend on this parameter
+
+        vec = orig_vec.copy(); vec[i] += eps
+        model.from_vector(vec, close=True)
+        rhovecs, operationreps, effectreps = _layer_reps()
+        dirty_items = _np.nonzero(dirty)[0]
+        _propagate_items_batched(dirty_items, item_parent, item_rho, item_layers, work_states, rhovecs,
+                                 operationreps, dirty)
+        _fill_probs(work_states, changed_elements, effectreps, probs2)
+        mx_to_fill[dest_indices[changed_elements], iFinal] = (probs2[changed_elements] - probs[changed_elements]) / eps
+
+        work_states[:, dirty_items] = states[:, dirty_items]  # restore the unperturbed states
+        probs2[changed_elements] = probs[changed_elements]
+
+    model.from_vector(orig_vec, close=True)
+
+
+def _prefix_table_items(layout_atom):
+    # The structure of `layout_atom`'s prefix table: for each item (entry of the table's contents), the index of
+    # the item whose cached state it starts from (-1 if it starts from a state preparation), the index of its state
+    # preparation within `layout_atom.rho_labels` (-1 if it starts from a cached state) and the layers it applies.
+    contents = layout_atom.table.contents
+    rho_lookup = {lbl: i for i, lbl in enumerate(layout_atom.rho_labels)}
+    producer = {iCache: k for k, (_, _, _, iCache) in enumerate(contents) if iCache is not None}
+    item_parent = _np.full(len(contents), -1, _np.int64)
+    item_rho = _np.full(len(contents), -1, _np.int64)
+    item_layers = []
+    for k, (_, iStart, remainder, _) in enumerate(contents):
+        layers = remainder.circuit_without_povm.layertup
+        if iStart is None:
+            item_rho[k] = rho_lookup[layers[0]]; layers = layers[1:]
+        else:
+            item_parent[k] = producer[iStart]
+        item_layers.append(layers)
+    return item_parent, item_rho, item_layers
+
+
+def mapfill_dprobs_atom_adjoint(fwdsim, mx_to_fill, dest_indices, dest_param_indices, layout_atom, param_indices,
+                                resource_alloc, probs_to_fill=None):
+    # Analytic derivatives by the adjoint method.  For a circuit with probability p = E^T G_n ... G_1 rho, the
+    # states a_t = G_t ... G_1 rho are propagated forward and the effect vectors b_t = G_{t+1}^T ... G_n^T E backward,
+    # so that dp/dG_t = outer(b_t, a_{t-1}).  These outer products are summed for each distinct layer and contracted
+    # with the layer's `deriv_wrt_params` (along with the state preparation and effect derivatives), giving all the
+    # parameter derivatives at the cost of about two forward passes.  Both passes follow the prefix table: the
+    # forward pass propagates each item only through its own layers, starting from the (cached) state of the item it
+    # extends, and the backward pass carries the effect vectors of all the outcomes from each item to the item it
+    # extends, applying each layer to all of the effect vectors that need it next at once.
+    shared_mem_leader = resource_alloc.is_host_leader if (resource_alloc is not None) else True
+    model = fwdsim.model
+
+    if param_indices is None:
+        param_indices = list(range(model.num_params))
+    if dest_param_indices is None:
+        dest_param_indices = list(range(_slct.length(param_indices)))
+    param_indices = _slct.to_array(param_indices)
+    dest_param_indices = _slct.to_array(dest_param_indices)
+    dest_indices = _slct.to_array(dest_indices)
+
+    ops = {gl: model._circuit_layer_operator(gl, 'op') for gl in layout_atom.op_labels}
+    if not all([hasattr(op._rep, 'acton_batch') and hasattr(op._rep, 'adjoint_acton_batch') for op in ops.values()]):
+        raise ValueError("Adjoint derivatives require operation reps that can act on batches of dense states!")
+    if not shared_mem_leader:
+        resource_alloc.host_comm_barrier()  # wait for the leader to fill the shared-memory destination arrays
+        return
+
+    #Interposers map model parameters to the operation parameters that objects' `gpindices` refer to
+    interposer = model._param_interposer
+    num_op_params = interposer.num_op_params if (interposer is not None) else model.num_params
+    dop_params_dparams = interposer.deriv_op_params_wrt_model_params()[:, param_indices] \
+        if (interposer is not None) else None
+
+    def _derivs(obj):
+        gpindices = obj.gpindices_as_array()
+        return (gpindices, obj.deriv_wrt_params()) if len(gpindices) > 0 else None  # None => no parameters
+
+    preps = [model._circuit_layer_operator(lbl, 'prep') for lbl in layout_atom.rho_labels]
+    effects = [model._circuit_layer_operator(elbl, 'povm') for elbl in layout_atom.full_effect_labels]
+    rhovecs = [prep._rep.actionable_staterep().to_dense('HilbertSchmidt') for prep in preps]
+    effectvecs = _np.array([effect.to_dense() for effect in effects]).T  # shape (dim, num_effects)
+    prep_derivs = [_derivs(prep) for prep in preps]
+    effect_derivs = [_derivs(effect) for effect in effects]
+    op_derivs = {gl: _derivs(op) for gl, op in ops.items()}
+    operationreps = {gl: op._rep for gl, op in ops.items()}
+
+    #Structure of the prefix table: each item's parent, level (length of its chain of parents) and root state prep
+    item_parent, item_rho, item_layers = _prefix_table_items(layout_atom)
+    nItems = len(item_layers)
+    item_level = _np.zeros(nItems, _np.int64)
+    root_rho = item_rho.copy()
+    for k in range(nItems):
+        if item_parent[k] >= 0:
+            item_level[k] = item_level[item_parent[k]] + 1
+            root_rho[k] = root_rho[item_parent[k]]
+
+    #The items and effects of each of the atom's elements (outcomes)
+    nEls = layout_atom.num_elements
+    el_items = _np.empty(nEls, _np.int64)
+    el_effects = _np.empty(nEls, _np.int64)
+    for k, (iDest, _, _, _) in enumerate(layout_atom.table.contents):
+        if iDest is None: continue
+        el_items[layout_atom.elindices_by_expcircuit[iDest]] = k
+        el_effects[layout_atom.elindices_by_expcircuit[iDest]] = layout_atom.elbl_indices_by_expcircuit[iDest]
+
+    #Forward: the final state of every item
+    dim = model.state_space.dim
+    final_states = _np.empty((dim, nItems), 'd')
+    _propagate_items_batched(_np.arange(nItems), item_parent, item_rho, item_layers, final_states, rhovecs,
+                             operationreps)
+
+    dprobs = _np.zeros((nEls, num_op_params), 'd')
+    for iE, effect_deriv in enumerate(effect_derivs):
+        if effect_deriv is None: continue
+        els = _np.nonzero(el_effects == iE)[0]
+        dprobs[_np.ix_(els, effect_deriv[0])] += _np.dot(final_states[:, el_items[els]].T, effect_deriv[1])
+
+    #Backward, for batches of elements (limiting the memory of the per-layer outer-product sums)
+    num_deriv_layers = sum([d is not None for d in op_derivs.values()])
+    max_cols = max(_MAX_BATCH_ELEMENTS // (dim**2 * max(num_deriv_layers, 1)), 1)
+    el_order = _np.argsort(el_items, kind='stable')  # so a circuit's elements are in the same batch
+    item_ends = _np.searchsorted(el_items[el_order], _np.arange(nItems), 'right')
+    batch_start = 0
+    for item_end in item_ends:
+        if item_end - batch_start >= max_cols or (item_end == nEls and item_end > batch_start):
+            _adjoint_backward_pass(el_order[batch_start:item_end], el_items, el_effects, dprobs, effectvecs,
+                                   rhovecs, final_states, item_parent, item_rho, item_layers, item_level, root_rho,
+                                   operationreps, op_derivs, prep_derivs)
+            batch_start = item_end
+
+    dprobs = _np.dot(dprobs, dop_params_dparams) if (interposer is not None) else dprobs[:, param_indices]
+    mx_to_fill[_np.ix_(dest_indices, dest_param_indices)] = dprobs
+    if probs_to_fill is not None:
+        probs_to_fill[dest_indices] = _np.einsum('ij,ij->j', final_states[:, el_items], effectvecs[:, el_effects])
+
+    if resource_alloc is not None: resource_alloc.host_comm_barrier()
+
+
+def _adjoint_backward_pass(cols, el_items, el_effects, dprobs, effectvecs, rhovecs, final_states, item_parent,
+                           item_rho, item_layers, item_level, root_rho, operationreps, op_derivs, prep_derivs):
+    # Pulls the effect vectors of the elements `cols` back through their circuits (see
+    # `mapfill_dprobs_atom_adjoint`), adding the resulting derivatives to the rows `cols` of `dprobs`.  Columns are
+    # processed by the level of the prefix-table item they're at, deepest first: for all the items at a level, the
+    # states before each of their own layers are propagated (starting from their parents' final states), the
+    # columns are pulled back through these layers, and then move on to the items' parents.
+    dim = effectvecs.shape[0]
+    B = effectvecs[:, el_effects[cols]]  # shape (dim, num_cols)
+    col_item = el_items[cols].copy()
+    col_level = item_level[col_item]
+    dprobs_dops = {}  # layer label => summed outer products, shape (num_cols, dim**2)
+
+    for lvl in range(col_level.max(initial=-1), -1, -1):
+        at_lvl = _np.nonzero(col_level == lvl)[0]
+        if len(at_lvl) == 0: continue
+        lvl_items, col_slots = _np.unique(col_item[at_lvl], return_inverse=True)
+
+        #Forward: the state before each of the items' own layers (A[t] is the state before layer t)
+        steps = []
+        for j, k in enumerate(lvl_items):
+            for t, gl in enumerate(item_layers[k]):
+                if t == len(steps): steps.append({})
+                steps[t].setdefault(gl, []).append(j)
+        A = _np.empty((max(len(steps), 1), dim, len(lvl_items)), 'd')
+        for j, k in enumerate(lvl_items):
+            A[0, :, j] = rhovecs[item_rho[k]] if (item_parent[k] < 0) else final_states[:, item_parent[k]]
+        for t in range(len(steps) - 1):
+            A[t + 1] = A[t]
+            for gl, slots in steps[t].items():
+                A[t + 1][:, slots] = operationreps[gl].acton_batch(A[t][:, slots])
+
+        #Backward: each layer is applied to all of the columns that need it at once
+        for t in range(len(steps) - 1, -1, -1):
+            for gl, slots in steps[t].items():
+                in_step = _np.zeros(len(lvl_items), bool); in_step[slots] = True
+                sel = in_step[col_slots]
+                step_cols, step_slots = at_lvl[sel], col_slots[sel]
+                if op_derivs[gl] is not None:
+                    outer = (B[:, step_cols].T[:, :, None] * A[t][:, step_slots].T[:, None, :]).reshape(-1, dim**2)
+                    if gl not in dprobs_dops: dprobs_dops[gl] = _np.zeros((len(cols), dim**2), 'd')
+                    dprobs_dops[gl][step_cols] += outer
+                B[:, step_cols] = operationreps[gl].adjoint_acton_batch(B[:, step_cols])
+
+        col_item[at_lvl] = item_parent[col_item[at_lvl]]
+        col_level[at_lvl] -= 1
+
+    for gl, dprobs_dop in dprobs_dops.items():
+        gpindices, deriv = op_derivs[gl]
+        dprobs[_np.ix_(cols, gpindices)] += _np.dot(dprobs_dop, deriv)  # deriv is d(flattened op)/d(op params)
+    col_rho = root_rho[el_items[cols]]
+    for iRho, prep_deriv in enumerate(prep_derivs):
+        if prep_deriv is None: continue
+        sel = _np.nonzero(col_rho == iRho)[0]
+        dprobs[_np.ix_(cols[sel], prep_deriv[0])] += _np.dot(B[:, sel].T, prep_deriv[1])
+
+
+def _propagate_items_batched(items, item_parent, item_rho, item_layers, states, rhovecs, operationreps,
+                             recompute_mask=None):
+    # Propagates the states of the prefix-table items `items`, writing them into the columns of `states`.  An item
+    # whose parent (the item whose cached state it starts from) is not being recomputed, as given by
+    # `recompute_mask`, starts from the parent's existing column of `states`.  Items are grouped by level (relative
+    # to the recomputed items) so that each layer is applied to all of the states that need it next at once.
+    dim = states.shape[0]
+    max_batch = max(_MAX_BATCH_ELEMENTS // dim, 1)
+    has_recomputed_parent = (item_parent[items] >= 0) if (recompute_mask is None) \
+        else ((item_parent[items] >= 0) & recompute_mask[_np.maximum(item_parent[items], 0)])
+
+    #Relative level = number of recomputed items in the chain of parents
+    rel_level = {}
+    items_by_level = {}
+    for k, has_parent in zip(items, has_recomputed_parent):
+        lvl = rel_level[item_parent[k]] + 1 if has_parent else 0
+        rel_level[k] = lvl
+        items_by_level.setdefault(lvl, []).append(k)
+
+    for lvl in sorted(items_by_level.keys()):
+        level_items = items_by_level[lvl]
+        for ib in range(0, len(level_items), max_batch):
+            batch = _np.array(level_items[ib:ib + max_batch], _np.int64)
+            batch_states = _np.empty((dim, len(batch)), 'd')
+            steps = []
+            for j, k in enumerate(batch):
+                batch_states[:, j] = rhovecs[item_rho[k]] if (item_parent[k] < 0) else states[:, item_parent[k]]
+                for t, layer_lbl in enumerate(item_layers[k]):
+                    if t == len(steps): steps.append({})
+                    steps[t].setdefault(layer_lbl, []).append(j)
+
+            for step in steps:
+                for gl, cols in step.items():
+                    batch_states[:, cols] = operationreps[gl].acton_batch(batch_states[:, cols])
+            states[:, batch] = batch_states
+
+
 def mapfill_TDchi2_terms(fwdsim, array_to_fill, dest_indices, num_outcomes, layout_atom, dataset_rows,
                          min_prob_clip_for_weighting, prob_clip_interval, comm, outcomes_cache):
 
@@ -186,7 +548,8 @@ def mapfill_TDterms(fwdsim, objfn, array_to_fill, dest_indices, num_outcomes, la
     #TODO: if layout_atom is split, distribute among processors
     for iDest, iStart, remainder, iCache in layout_atom.table.contents:
         remainder = remainder.circuit_without_povm.layertup
-        assert(iStart is None), "Cannot use trees with max-cache-size > 0 when performing time-dependent calcs!"
+        assert(iStart is None and iDest is not None), \
+            "Cannot use trees with max-cache-size > 0 when performing time-dependent calcs!"
         rholabel = remainder[0]; remainder = remainder[1:]
         rhoVec = fwdsim.model._circuit_layer_operator(rholabel, 'prep')
         datarow = dataset_rows[iDest]
@@ -38,6 +38,77 @@ _PSMALL = 1e-100
 _DSMALL = 1e-100
 _HSMALL = 1e-100
 
+# Maximum number of array elements in a temporary array created when evaluating
+# (part of) an evaluation-tree level as a single stacked product.
+_MAX_BATCH_ELEMENTS = 2**24
+
+
+def _level_chunks(level, item_size):
+    """ Split a level's (iDest, iLeft, iRight) index arrays into memory-bounded chunks """
+    dest, left, right = level
+    chunk_len = max(_MAX_BATCH_ELEMENTS // max(item_size, 1), 1)
+    if chunk_len >= len(dest):
+        yield dest, left, right
+    else:
+        for i in range(0, len(dest), chunk_len):
+            yield dest[i:i + chunk_len], left[i:i + chunk_len], right[i:i + chunk_len]
+
+
+def _streaming_slots(cache_size, initial_items, levels):
+    """
+    Assign reusable storage slots to the items of an evaluation tree.
+
+    An item is given a slot when it is computed and gives the slot back after the last level
+    that uses it as a factor, so that only the "live" items of a tree need to be stored at once.
+    Slot 0 is reserved for (and shared by) items that are known to be zero, and items that are
+    never used as a factor aren't given a slot at all (their slot is -1).
+
+    Parameters
+    ----------
+    cache_size : int
+        The number of items in the tree.
+
+    initial_items : list
+        A list of `(iDest, is_zero)` tuples for the level-0 items of the tree.
+
+    levels : list
+        The `(iDest, iLeft, iRight)` index-array tuples of the tree's levels, as
+        returned by :meth:`EvalTree.evaluation_levels`.
+
+    Returns
+    -------
+    slots : numpy.ndarray
+        An integer array giving the slot of each tree item, or -1 for items that needn't be stored.
+
+    num_slots : int
+        The total number of slots needed (including the zero slot).
+    """
+    last_use = _np.full(cache_size, -1, _np.int64)
+    for k, (_, left, right) in enumerate(levels):
+        last_use[left] = k; last_use[right] = k  # levels are in order, so the final assignment is the last use
+
+    slots = _np.zeros(cache_size, _np.int64)
+    free_slots = []; num_slots = 1
+    released_after_level = _collections.defaultdict(list)
+
+    def _assign(i):
+        nonlocal num_slots
+        if last_use[i] < 0:
+            slots[i] = -1; return  # never used as a factor, so never needs to be stored
+        if free_slots:
+            slots[i] = free_slots.pop()
+        else:
+            slots[i] = num_slots; num_slots += 1
+        released_after_level[last_use[i]].append(slots[i])
+
+    for iDest, is_zero in initial_items:
+        if not is_zero: _assign(iDest)
+
+    for k, (dest, _, _) in enumerate(levels):
+        for i in dest: _assign(i)
+        free_slots.extend(released_after_level.pop(k, []))
+    return slots, num_slots
+
 
 class SimpleMatrixForwardSimulator(_ForwardSimulator):
     """
@@ -139,12 +210,11 @@ class SimpleMatrixForwardSimulator(_ForwardSimulator):
                     relevant_gpindices.append(ii)
                     obj_wrtFilter.append(list(gpindices).index(i))
             relevant_gpindices = _np.array(relevant_gpindices, _np.int64)
-            if len(relevant_gpindices) == 1:
-                #Don't return a length-1 list, as this doesn't index numpy arrays
-                # like length>1 lists do... ugh.
-                relevant_gpindices = slice(relevant_gpindices[0],
-                                           relevant_gpindices[0] + 1)
-            elif len(relevant_gpindices) == 0:
+            if len(relevant_gpindices) > 0:
+                #Return a slice whenever possible - a length-1 list doesn't index numpy arrays
+                # like length>1 lists do... ugh, and slices make for much faster (fancy) assignments.
+                relevant_gpindices = _slct.list_to_slice(relevant_gpindices, array_ok=True)
+            else:
                 #Don't return a length-0 list, as this doesn't index numpy arrays
                 # like length>1 lists do... ugh.
                 relevant_gpindices = slice(0, 0)  # slice that results in a zero dimension
@@ -710,35 +780,40 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
         cacheSize = len(eval_tree)
         prodCache = _np.zeros((cacheSize, dim, dim), 'd')
         scaleCache = _np.zeros(cacheSize, 'd')
+        initial_items, levels = eval_tree.evaluation_levels()
 
-        for iDest, iRight, iLeft in eval_tree:
-
-            #Special case of an "initial operation" that can be filled directly
-            if iRight is None:  # then iLeft gives operation:
-                opLabel = iLeft
-                if opLabel is None:
-                    prodCache[iDest] = _np.identity(dim)
-                    # Note: scaleCache[i] = 0.0 from initialization
-                else:
-                    gate = self.model.circuit_layer_operator(opLabel, 'op').to_dense(on_space='minimal')
-                    nG = max(_nla.norm(gate), 1.0)
-                    prodCache[iDest] = gate / nG
-                    scaleCache[iDest] = _np.log(nG)
-                continue
-
-            # combine iLeft + iRight => iDest
-            # LEXICOGRAPHICAL VS MATRIX ORDER Note: we reverse iLeft <=> iRight from eval_tree because
-            # (iRight,iLeft,iFinal) = tup implies circuit[i] = circuit[iLeft] + circuit[iRight], but we want:
-            # since then matrixOf(circuit[i]) = matrixOf(circuit[iLeft]) * matrixOf(circuit[iRight])
-            L, R = prodCache[iLeft], prodCache[iRight]
-            prodCache[iDest] = _np.dot(L, R)
-            scaleCache[iDest] = scaleCache[iLeft] + scaleCache[iRight]
-
-            if prodCache[iDest].max() < _PSMALL and prodCache[iDest].min() > -_PSMALL:
-                nL, nR = max(_nla.norm(L), _np.exp(-scaleCache[iLeft]),
-                             1e-300), max(_nla.norm(R), _np.exp(-scaleCache[iRight]), 1e-300)
-                sL, sR = L / nL, R / nR
-                prodCache[iDest] = _np.dot(sL, sR); scaleCache[iDest] += _np.log(nL) + _np.log(nR)
+        #Fill the "initial operations" directly
+        for iDest, opLabel in initial_items:
+            if opLabel is None:
+                prodCache[iDest] = _np.identity(dim)
+                # Note: scaleCache[i] = 0.0 from initialization
+            else:
+                gate = self.model.circuit_layer_operator(opLabel, 'op').to_dense(on_space='minimal')
+                nG = max(_nla.norm(gate), 1.0)
+                prodCache[iDest] = gate / nG
+                scaleCache[iDest] = _np.log(nG)
+
+        #Compute all the (independent) products of each level at once
+        for level in levels:
+            for iDest, iRight, iLeft in _level_chunks(level, dim**2):
+                # combine iLeft + iRight => iDest
+                # LEXICOGRAPHICAL VS MATRIX ORDER Note: we reverse iLeft <=> iRight from eval_tree because
+                # (iRight,iLeft,iFinal) = tup implies circuit[i] = circuit[iLeft] + circuit[iRight], but we want:
+                # since then matrixOf(circuit[i]) = matrixOf(circuit[iLeft]) * matrixOf(circuit[iRight])
+                L, R = prodCache[iLeft], prodCache[iRight]
+                prods = _np.matmul(L, R)
+                scaleCache[iDest] = scaleCache[iLeft] + scaleCache[iRight]
+
+                small = _np.abs(prods).max(axis=(1, 2)) < _PSMALL
+                if small.any():
+                    nL = _np.maximum(_np.maximum(_nla.norm(L[small], axis=(1, 2)), _np.exp(-scaleCache[iLeft[small]])),
+                                     1e-300)
+                    nR = _np.maximum(_np.maximum(_nla.norm(R[small], axis=(1, 2)), _np.exp(-scaleCache[iRight[small]])),
+                                     1e-300)
+                    sL, sR = L[small] / nL[:, None, None], R[small] / nR[:, None, None]
+                    prods[small] = _np.matmul(sL, sR)
+                    scaleCache[iDest[small]] += _np.log(nL) + _np.log(nR)
+                prodCache[iDest] = prods
 
         nanOrInfCacheIndices = (~_np.isfinite(prodCache)).nonzero()[0]  # may be duplicates (a list, not a set)
         # since all scaled gates start with norm <= 1, products should all have norm <= 1
@@ -810,41 +885,40 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
         tSerialStart = _time.time()
         dProdCache = _np.zeros((cacheSize,) + deriv_shape)
         wrtIndices = _slct.indices(wrt_slice) if (wrt_slice is not None) else None
-
-        for iDest, iRight, iLeft in eval_tree:
-
-            #Special case of an "initial operation" that can be filled directly
-            if iRight is None:  # then iLeft gives operation:
-                opLabel = iLeft
-                if opLabel is None:
-                    dProdCache[iDest] = _np.zeros(deriv_shape)
-                else:
-                    #doperation = self.dproduct( (opLabel,) , wrt_filter=wrtIndices)
-                    doperation = self._doperation(opLabel, wrt_filter=wrtIndices)
-                    dProdCache[iDest] = doperation / _np.exp(scale_cache[iDest])
-                continue
-
-            tm = _time.time()
-
-            # combine iLeft + iRight => i
-            # LEXICOGRAPHICAL VS MATRIX ORDER Note: we reverse iLeft <=> iRight from eval_tree because
-            # (iRight,iLeft,iFinal) = tup implies circuit[i] = circuit[iLeft] + circuit[iRight], but we want:
-            # since then matrixOf(circuit[i]) = matrixOf(circuit[iLeft]) * matrixOf(circuit[iRight])
-            L, R = prod_cache[iLeft], prod_cache[iRight]
-            dL, dR = dProdCache[iLeft], dProdCache[iRight]
-            dProdCache[iDest] = _np.dot(dL, R) + \
-                _np.swapaxes(_np.dot(L, dR), 0, 1)  # dot(dS, T) + dot(S, dT)
-            profiler.add_time("compute_dproduct_cache: dots", tm)
-            profiler.add_count("compute_dproduct_cache: dots")
-
-            scale = scale_cache[iDest] - (scale_cache[iLeft] + scale_cache[iRight])
-            if abs(scale) > 1e-8:  # _np.isclose(scale,0) is SLOW!
-                dProdCache[iDest] /= _np.exp(scale)
-                if dProdCache[iDest].max() < _DSMALL and dProdCache[iDest].min() > -_DSMALL:
-                    _warnings.warn("Scaled dProd small in order to keep prod managable.")
-            elif (_np.count_nonzero(dProdCache[iDest]) and dProdCache[iDest].max() < _DSMALL
-                  and dProdCache[iDest].min() > -_DSMALL):
-                _warnings.warn("Would have scaled dProd but now will not alter scale_cache.")
+        initial_items, levels = eval_tree.evaluation_levels()
+
+        #Fill the "initial operations" directly
+        for iDest, opLabel in initial_items:
+            if opLabel is not None:  # (the derivative of the empty circuit is zero)
+                #doperation = self.dproduct( (opLabel,) , wrt_filter=wrtIndices)
+                doperation = self._doperation(opLabel, wrt_filter=wrtIndices)
+                dProdCache[iDest] = doperation / _np.exp(scale_cache[iDest])
+
+        for level in levels:
+            for iDest, iRight, iLeft in _level_chunks(level, nDerivCols * dim**2):
+                tm = _time.time()
+
+                # combine iLeft + iRight => i
+                # LEXICOGRAPHICAL VS MATRIX ORDER Note: we reverse iLeft <=> iRight from eval_tree because
+                # (iRight,iLeft,iFinal) = tup implies circuit[i] = circuit[iLeft] + circuit[iRight], but we want:
+                # since then matrixOf(circuit[i]) = matrixOf(circuit[iLeft]) * matrixOf(circuit[iRight])
+                L, R = prod_cache[iLeft], prod_cache[iRight]
+                dL, dR = dProdCache[iLeft], dProdCache[iRight]
+                dProds = _np.matmul(dL, R[:, None, :, :])  # dot(dS, T) + dot(S, dT)
+                dProds += _np.matmul(L[:, None, :, :], dR)
+                profiler.add_time("compute_dproduct_cache: dots", tm)
+                profiler.add_count("compute_dproduct_cache: dots", len(iDest))
+
+                scale = scale_cache[iDest] - (scale_cache[iLeft] + scale_cache[iRight])
+                rescale = _np.abs(scale) > 1e-8  # _np.isclose(scale,0) is SLOW!
+                dProdMax = _np.abs(dProds).max(axis=(1, 2, 3)) if dProds.size > 0 else _np.zeros(len(iDest))
+                if rescale.any():
+                    dProds[rescale] /= _np.exp(scale[rescale])[:, None, None, None]
+                    if _np.any(_np.abs(dProds[rescale]).max(axis=(1, 2, 3), initial=0.0) < _DSMALL):
+                        _warnings.warn("Scaled dProd small in order to keep prod managable.")
+                if _np.any(~rescale & (dProdMax > 0) & (dProdMax < _DSMALL)):
+                    _warnings.warn("Would have scaled dProd but now will not alter scale_cache.")
+                dProdCache[iDest] = dProds
 
         #profiler.print_mem("DEBUGMEM: POINT2"); profiler.comm.barrier()
 
@@ -957,54 +1031,175 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
         hProdCache = _np.zeros((cacheSize,) + hessn_shape)
         wrtIndices1 = _slct.indices(wrt_slice1) if (wrt_slice1 is not None) else None
         wrtIndices2 = _slct.indices(wrt_slice2) if (wrt_slice2 is not None) else None
-
-        for iDest, iRight, iLeft in eval_tree:
-
-            #Special case of an "initial operation" that can be filled directly
-            if iRight is None:  # then iLeft gives operation:
-                opLabel = iLeft
-                if opLabel is None:
-                    hProdCache[iDest] = _np.zeros(hessn_shape)
-                elif not self.model.circuit_layer_operator(opLabel, 'op').has_nonzero_hessian():
-                    #all gate elements are at most linear in params, so
-                    # all hessians for single- or zero-circuits are zero.
-                    hProdCache[iDest] = _np.zeros(hessn_shape)
-                else:
-                    hoperation = self._hoperation(opLabel,
-                                                  wrt_filter1=wrtIndices1,
-                                                  wrt_filter2=wrtIndices2)
-                    hProdCache[iDest] = hoperation / _np.exp(scale_cache[iDest])
+        initial_items, levels = eval_tree.evaluation_levels()
+
+        #Fill the "initial operations" directly
+        for iDest, opLabel in initial_items:
+            if opLabel is None:
+                continue  # hessian of the empty circuit is zero
+            elif not self.model.circuit_layer_operator(opLabel, 'op').has_nonzero_hessian():
+                #all gate elements are at most linear in params, so
+                # all hessians for single- or zero-circuits are zero.
                 continue
-
-            # combine iLeft + iRight => i
-            # LEXICOGRAPHICAL VS MATRIX ORDER Note: we reverse iLeft <=> iRight from eval_tree because
-            # (Dest,iLeft,iRight,iFinal) = tup implies circuit[iDest] = circuit[iLeft] + circuit[iRight], but we want:
-            # since then matrixOf(circuit[i]) = matrixOf(circuit[iLeft]) * matrixOf(circuit[iRight])
-            L, R = prod_cache[iLeft], prod_cache[iRight]
-            dL1, dR1 = d_prod_cache1[iLeft], d_prod_cache1[iRight]
-            dL2, dR2 = d_prod_cache2[iLeft], d_prod_cache2[iRight]
-            hL, hR = hProdCache[iLeft], hProdCache[iRight]
-            # Note: L, R = GxG ; dL,dR = vgs x GxG ; hL,hR = vgs x vgs x GxG
-
-            dLdRa = _np.swapaxes(_np.dot(dL1, dR2), 1, 2)
-            dLdRb = _np.swapaxes(_np.dot(dL2, dR1), 1, 2)
-            dLdR_sym = dLdRa + _np.swapaxes(dLdRb, 0, 1)
-
-            hProdCache[iDest] = _np.dot(hL, R) + dLdR_sym + _np.transpose(_np.dot(L, hR), (1, 2, 0, 3))
-
-            scale = scale_cache[iDest] - (scale_cache[iLeft] + scale_cache[iRight])
-            if abs(scale) > 1e-8:  # _np.isclose(scale,0) is SLOW!
-                hProdCache[iDest] /= _np.exp(scale)
-                if hProdCache[iDest].max() < _HSMALL and hProdCache[iDest].min() > -_HSMALL:
-                    _warnings.warn("Scaled hProd small in order to keep prod managable.")
-            elif (_np.count_nonzero(hProdCache[iDest]) and hProdCache[iDest].max() < _HSMALL
-                  and hProdCache[iDest].min() > -_HSMALL):
-                _warnings.warn("hProd is small (oh well!).")
+            else:
+                hoperation = self._hoperation(opLabel,
+                                              wrt_filter1=wrtIndices1,
+                                              wrt_filter2=wrtIndices2)
+                hProdCache[iDest] = hoperation / _np.exp(scale_cache[iDest])
+
+        for level in levels:
+            for iDest, iRight, iLeft in _level_chunks(level, 2 * nDerivCols1 * nDerivCols2 * dim**2):
+                # combine iLeft + iRight => i
+                # LEXICOGRAPHICAL VS MATRIX ORDER Note: we reverse iLeft <=> iRight from eval_tree because
+                # (Dest,iLeft,iRight,iFinal) = tup implies circuit[iDest] = circuit[iLeft] + circuit[iRight], but we
+                # want: since then matrixOf(circuit[i]) = matrixOf(circuit[iLeft]) * matrixOf(circuit[iRight])
+                L, R = prod_cache[iLeft], prod_cache[iRight]
+                dL1, dR1 = d_prod_cache1[iLeft], d_prod_cache1[iRight]
+                dL2, dR2 = d_prod_cache2[iLeft], d_prod_cache2[iRight]
+                hL, hR = hProdCache[iLeft], hProdCache[iRight]
+                # Note: L, R = N x GxG ; dL,dR = N x vgs x GxG ; hL,hR = N x vgs x vgs x GxG
+
+                hProds = _np.matmul(hL, R[:, None, None, :, :])
+                hProds += _np.matmul(L[:, None, None, :, :], hR)
+                hProds += _np.matmul(dL1[:, :, None, :, :], dR2[:, None, :, :, :])  # dLdR_sym
+                hProds += _np.matmul(dL2[:, None, :, :, :], dR1[:, :, None, :, :])
+
+                scale = scale_cache[iDest] - (scale_cache[iLeft] + scale_cache[iRight])
+                rescale = _np.abs(scale) > 1e-8  # _np.isclose(scale,0) is SLOW!
+                hProdMax = _np.abs(hProds).max(axis=(1, 2, 3, 4)) if hProds.size > 0 else _np.zeros(len(iDest))
+                if rescale.any():
+                    hProds[rescale] /= _np.exp(scale[rescale])[:, None, None, None, None]
+                    if _np.any(_np.abs(hProds[rescale]).max(axis=(1, 2, 3, 4), initial=0.0) < _HSMALL):
+                        _warnings.warn("Scaled hProd small in order to keep prod managable.")
+                if _np.any(~rescale & (hProdMax > 0) & (hProdMax < _HSMALL)):
+                    _warnings.warn("hProd is small (oh well!).")
+                hProdCache[iDest] = hProds
 
         return hProdCache
 
+    def _compute_hprobs_gate_terms(self, layout_atom, prod_cache, d_prod_cache1, d_prod_cache2, scale_cache,
+                                   resource_alloc=None, wrt_slice1=None, wrt_slice2=None):
+        """
+        Computes the gate-Hessian part of the outcome probability Hessians of a layout atom.
+
+        This evaluates the same level-batched recursion as :meth:`_compute_hproduct_cache` but
+        streams through the tree instead of storing it: each item's product Hessian is contracted
+        with the atom's SPAM vectors as soon as it's computed, and is only held in memory until its
+        last use as a factor of a later item.  The full (cache x nparams1 x nparams2 x dim x dim)
+        tensor is never materialized.  When `resource_alloc` has a memory limit that the live items
+        would exceed, the (wrt_slice1, wrt_slice2) rectangle is further divided into sub-rectangles.
+
+        Returns
+        -------
+        dict
+            A dictionary whose keys are the spam tuples of `layout_atom` and whose values are arrays
+            of shape `(num_tree_indices, nDerivCols1, nDerivCols2)` holding the *unscaled* products
+            `e^T hProd rho` for the circuits (tree indices) that use that spam tuple.
+        """
+        dim = self.model.evotype.minimal_dim(self.model.state_space)
+        nDerivCols1 = d_prod_cache1.shape[1]
+        nDerivCols2 = d_prod_cache2.shape[1]
+        eval_tree = layout_atom.tree
+        cacheSize = len(eval_tree)
+        initial_items, levels = eval_tree.evaluation_levels()
+
+        #Level-0 items whose hessians are zero (the empty circuit and gates that are at most linear in their params)
+        is_zero = {iDest: (opLabel is None
+                           or not self.model.circuit_layer_operator(opLabel, 'op').has_nonzero_hessian())
+                   for iDest, opLabel in initial_items}
+        slots, num_slots = _streaming_slots(cacheSize, [(i, is_zero[i]) for i, _ in initial_items], levels)
+
+        #Map each tree item to the positions it occupies in each spam tuple's (contracted) output
+        spam_info = []; d2pr_dops2 = _collections.OrderedDict()
+        for spam_tuple, (_, tree_indices) in layout_atom.indices_by_spamtuple.items():
+            tree_indices = _slct.to_array(tree_indices)
+            positions = _np.full(cacheSize, -1, _np.int64)
+            positions[tree_indices] = _np.arange(len(tree_indices))
+            rho, E = self._rho_e_from_spam_tuple(spam_tuple)
+            spam_info.append((spam_tuple, positions, rho, E))
+            d2pr_dops2[spam_tuple] = _np.zeros((len(tree_indices), nDerivCols1, nDerivCols2), 'd')
+
+        #Divide the rectangle into sub-rectangles whose live product Hessians fit within any memory limit
+        max_pairs = nDerivCols1 * nDerivCols2
+        if resource_alloc is not None and resource_alloc.mem_limit is not None:
+            avail = resource_alloc.mem_limit - resource_alloc.allocated_memory
+            max_pairs = min(max(int(avail // (8 * num_slots * dim**2)), 1), max_pairs)
+        if max_pairs < nDerivCols1 * nDerivCols2:
+            blkSize2 = min(nDerivCols2, max_pairs)
+            blkSize1 = max(max_pairs // blkSize2, 1)
+            blocks1 = _mpit.slice_up_range(nDerivCols1, int(_np.ceil(nDerivCols1 / blkSize1)))
+            blocks2 = _mpit.slice_up_range(nDerivCols2, int(_np.ceil(nDerivCols2 / blkSize2)))
+            if wrt_slice1 is None: wrt_slice1 = slice(0, nDerivCols1)
+            if wrt_slice2 is None: wrt_slice2 = slice(0, nDerivCols2)
+        else:
+            blocks1 = [slice(0, nDerivCols1)]; blocks2 = [slice(0, nDerivCols2)]
+
+        def _contract(dest, h_prods):
+            # accumulate e^T h_prods rho for the elements of `dest` that are final circuits
+            rho_prods = {}
+            for spam_tuple, positions, rho, E in spam_info:
+                pos = positions[dest]; sel = pos >= 0
+                if not sel.any(): continue
+                rholabel = spam_tuple[0]
+                if rholabel not in rho_prods:
+                    rho_prods[rholabel] = _np.matmul(h_prods, rho)  # N x vgs x vgs x G x 1
+                yield spam_tuple, pos[sel], _np.matmul(E, rho_prods[rholabel][sel])[:, :, :, 0, 0]
+
+        for block1 in blocks1:
+            for block2 in blocks2:
+                n1 = _slct.length(block1); n2 = _slct.length(block2)
+                dCache1 = d_prod_cache1[:, block1]
+                dCache2 = d_prod_cache2[:, block2]
+                wrtIndices1 = _slct.indices(_slct.shift(block1, wrt_slice1.start or 0)) \
+                    if (wrt_slice1 is not None) else None
+                wrtIndices2 = _slct.indices(_slct.shift(block2, wrt_slice2.start or 0)) \
+                    if (wrt_slice2 is not None) else None
+
+                hPool = _np.zeros((num_slots, n1, n2, dim, dim), 'd')  # slot 0 is always zero
+
+                #Fill the "initial operations" directly
+                for iDest, opLabel in initial_items:
+                    if is_zero[iDest]: continue
+                    hoperation = self._hoperation(opLabel, wrt_filter1=wrtIndices1,
+                                                  wrt_filter2=wrtIndices2) / _np.exp(scale_cache[iDest])
+                    for spam_tuple, pos, vals in _contract(_np.array([iDest]), hoperation[None, ...]):
+                        d2pr_dops2[spam_tuple][pos, block1, block2] = vals
+                    if slots[iDest] > 0: hPool[slots[iDest]] = hoperation
+
+                for level in levels:
+                    for iDest, iRight, iLeft in _level_chunks(level, 2 * n1 * n2 * dim**2):
+                        # (see _compute_hproduct_cache for details; only the storage differs)
+                        L, R = prod_cache[iLeft], prod_cache[iRight]
+                        dL1, dR1 = dCache1[iLeft], dCache1[iRight]
+                        dL2, dR2 = dCache2[iLeft], dCache2[iRight]
+                        hL, hR = hPool[slots[iLeft]], hPool[slots[iRight]]
+
+                        hProds = _np.matmul(hL, R[:, None, None, :, :])
+                        hProds += _np.matmul(L[:, None, None, :, :], hR)
+                        hProds += _np.matmul(dL1[:, :, None, :, :], dR2[:, None, :, :, :])  # dLdR_sym
+                        hProds += _np.matmul(dL2[:, None, :, :, :], dR1[:, :, None, :, :])
+
+                        scale = scale_cache[iDest] - (scale_cache[iLeft] + scale_cache[iRight])
+                        rescale = _np.abs(scale) > 1e-8  # _np.isclose(scale,0) is SLOW!
+                        hProdMax = _np.abs(hProds).max(axis=(1, 2, 3, 4)) if hProds.size > 0 \
+                            else _np.zeros(len(iDest))
+                        if rescale.any():
+                            hProds[rescale] /= _np.exp(scale[rescale])[:, None, None, None, None]
+                            if _np.any(_np.abs(hProds[rescale]).max(axis=(1, 2, 3, 4), initial=0.0) < _HSMALL):
+                                _warnings.warn("Scaled hProd small in order to keep prod managable.")
+                        if _np.any(~rescale & (hProdMax > 0) & (hProdMax < _HSMALL)):
+                            _warnings.warn("hProd is small (oh well!).")
+
+                        for spam_tuple, pos, vals in _contract(iDest, hProds):
+                            d2pr_dops2[spam_tuple][pos, block1, block2] = vals
+                        stored = slots[iDest] > 0
+                        hPool[slots[iDest[stored]]] = hProds[stored]
+
+        return d2pr_dops2
+
     def create_layout(self, circuits, dataset=None, resource_alloc=None, array_types=('E',),
-                      derivative_dimension=None, verbosity=0):
+                      derivative_dimension=None, verbosity=0, previous_layout=None,
+                      layout_cache_dir=None):
         """
         Constructs an circuit-outcome-probability-array (COPA) layout for a list of circuits.
 
@@ -1034,6 +1229,19 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
             Determines how much output to send to stdout.  0 means no output, higher
             integers mean more output.
 
+        previous_layout : MatrixCOPALayout, optional
+            A layout previously created by this simulator for a subset of `circuits` (using the
+            same `dataset` and `resource_alloc`).  When possible, its evaluation tree is extended
+            with the new circuits rather than being rebuilt, which is useful when the circuit lists
+            are nested, as in iterative GST.
+
+        layout_cache_dir : str or Path, optional
+            A directory in which to cache the layout's circuit groups and atoms (evaluation
+            trees and element/outcome index maps).  The cache is keyed by a digest of the (completed)
+            circuits, observed outcomes, model structure, processor grid and parameter-dimension
+            settings, so a repeated call with the same inputs, e.g. when analyzing a new data set for
+            the same experiment design, loads the layout's atoms instead of recomputing them.
+
         Returns
         -------
         MatrixCOPALayout
@@ -1063,7 +1271,7 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
             printer.log("Layout creation w/mem limit = %.2fGB" % (mem_limit * C))
 
         natoms, na, npp, param_dimensions, param_blk_sizes = self._compute_processor_distribution(
-            array_types, nprocs, num_params, len(circuits), default_natoms=1)
+            array_types, nprocs, num_params, len(circuits), default_natoms=self._default_num_atoms(resource_alloc, 1))
 
         if self._mode == "distribute_by_timestamp":
             #Special case: time dependent data that gets grouped & distributed by unique timestamp
@@ -1077,7 +1285,8 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
         assert(_np.product((na,) + npp) <= nprocs), "Processor grid size exceeds available processors!"
 
         layout = _MatrixCOPALayout(circuits, self.model, dataset, natoms,
-                                   na, npp, param_dimensions, param_blk_sizes, resource_alloc, verbosity)
+                                   na, npp, param_dimensions, param_blk_sizes, resource_alloc, verbosity,
+                                   previous_layout, layout_cache_dir)
 
         if mem_limit is not None:
             loc_nparams1 = num_params / npp[0] if len(npp) > 0 else 0
@@ -1205,7 +1414,7 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
         return sub_vdp
 
     def _hprobs_from_rho_e(self, spam_tuple, rho, e, gs, d_gs1, d_gs2, h_gs, scale_vals,
-                           wrt_slice1=None, wrt_slice2=None):
+                           wrt_slice1=None, wrt_slice2=None, unscaled_d2pr_dops2=None):
         if self.model.evotype == "statevec": raise NotImplementedError("Unitary evolution not fully supported yet!")
 
         rholabel, elabel = spam_tuple
@@ -1229,16 +1438,19 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
         #flt2 = self._get_filter_info(wrtSlices2)
 
         # GATE DERIVS (assume h_gs is already sized/filtered) -------------------
-        assert(h_gs.shape[1] == nDerivCols1), "h_gs must be pre-filtered!"
-        assert(h_gs.shape[2] == nDerivCols2), "h_gs must be pre-filtered!"
-
         #Compute d2(probability)/dGates2 and save in return list
         # d2pr_dOps2[i,j,k] = sum_l,m e[0,l] h_gs[i,j,k,l,m] rho[m,0]
         # d2pr_dOps2[i,j,k] = sum_l e[0,l] dot( d_gs, rho )[i,j,k,l,0]
         # d2pr_dOps2[i,j,k] = dot( e, dot( d_gs, rho ) )[0,i,j,k,0]
         # d2pr_dOps2        = squeeze( dot( e, dot( d_gs, rho ) ), axis=(0,4))
+        # (unless this contraction has already been performed, e.g. by _compute_hprobs_gate_terms)
+        if unscaled_d2pr_dops2 is None:
+            assert(h_gs.shape[1] == nDerivCols1), "h_gs must be pre-filtered!"
+            assert(h_gs.shape[2] == nDerivCols2), "h_gs must be pre-filtered!"
+            unscaled_d2pr_dops2 = _np.squeeze(_np.dot(e, _np.dot(h_gs, rho)), axis=(0, 4))
+        assert(unscaled_d2pr_dops2.shape == (nCircuits, nDerivCols1, nDerivCols2))
         old_err2 = _np.seterr(invalid='ignore', over='ignore')
-        d2pr_dOps2 = _np.squeeze(_np.dot(e, _np.dot(h_gs, rho)), axis=(0, 4)) * scale_vals[:, None, None]
+        d2pr_dOps2 = unscaled_d2pr_dops2 * scale_vals[:, None, None]
         _np.seterr(**old_err2)
 
         # may overflow, but OK ; shape == (len(circuit_list), nDerivCols, nDerivCols)
@@ -1397,10 +1609,14 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
                                                   resource_alloc, param_slice)
         if not resource_alloc.is_host_leader:
             return  # Non-root host processors aren't used anymore to compute the result on the root proc
+        self._fill_dprobs_from_caches(array_to_fill, dest_param_slice, layout_atom, param_slice,
+                                      prodCache, scaleCache, dProdCache)
 
-        scaleVals = self._scale_exp(layout_atom.nonscratch_cache_view(scaleCache))
-        Gs = layout_atom.nonscratch_cache_view(prodCache, axis=0)
-        dGs = layout_atom.nonscratch_cache_view(dProdCache, axis=0)
+    def _fill_dprobs_from_caches(self, array_to_fill, dest_param_slice, layout_atom, param_slice,
+                                 prod_cache, scale_cache, d_prod_cache):
+        scaleVals = self._scale_exp(layout_atom.nonscratch_cache_view(scale_cache))
+        Gs = layout_atom.nonscratch_cache_view(prod_cache, axis=0)
+        dGs = layout_atom.nonscratch_cache_view(d_prod_cache, axis=0)
 
         old_err = _np.seterr(over='ignore')
         for spam_tuple, (element_indices, tree_indices) in layout_atom.indices_by_spamtuple.items():
@@ -1414,38 +1630,70 @@ class MatrixForwardSimulator(_DistributableForwardSimulator, SimpleMatrixForward
                                param_slice1, param_slice2, resource_alloc):
         dim = self.model.evotype.minimal_dim(self.model.state_space)
         resource_alloc.check_can_allocate_memory(layout_atom.cache_size * dim**2
-                                                 * _slct.length(param_slice1) * _slct.length(param_slice2))
+                                                 * (_slct.length(param_slice1) + _slct.length(param_slice2)))
         prodCache, scaleCache = self._compute_product_cache(layout_atom.tree, resource_alloc)
         dProdCache1 = self._compute_dproduct_cache(
             layout_atom.tree, prodCache, scaleCache, resource_alloc, param_slice1)  # computed on rank=0 only
         dProdCache2 = dProdCache1 if (param_slice1 == param_slice2) else \
             self._compute_dproduct_cache(layout_atom.tree, prodCache, scaleCache,
                                          resource_alloc, param_slice2)  # computed on rank=0 only
-        hProdCache = self._compute_hproduct_cache(layout_atom.tree, prodCache, dProdCache1,
-                                                  dProdCache2, scaleCache, resource_alloc,
-                                                  param_slice1, param_slice2)  # computed on rank=0 only
 
         if not resource_alloc.is_host_leader:
             return  # Non-root host processors aren't used anymore to compute the result on the root proc
-
-        scaleVals = self._scale_exp(layout_atom.nonscratch_cache_view(scaleCache))
-        Gs = layout_atom.nonscratch_cache_view(prodCache, axis=0)
-        dGs1 = layout_atom.nonscratch_cache_view(dProdCache1, axis=0)
-        dGs2 = layout_atom.nonscratch_cache_view(dProdCache2, axis=0)
+        self._fill_hprobs_from_caches(array_to_fill, dest_param_slice1, dest_param_slice2, layout_atom,
+                                      param_slice1, param_slice2, prodCache, scaleCache, dProdCache1, dProdCache2,
+                                      resource_alloc)
+
+    def _fill_hprobs_from_caches(self, array_to_fill, dest_param_slice1, dest_param_slice2, layout_atom,
+                                 param_slice1, param_slice2, prod_cache, scale_cache, d_prod_cache1, d_prod_cache2,
+                                 resource_alloc):
+        # Stream through the tree to get the gate part of the Hessians (never storing the entire hproduct cache)
+        d2pr_dops2 = self._compute_hprobs_gate_terms(layout_atom, prod_cache, d_prod_cache1, d_prod_cache2,
+                                                     scale_cache, resource_alloc, param_slice1, param_slice2)
+
+        scaleVals = self._scale_exp(layout_atom.nonscratch_cache_view(scale_cache))
+        Gs = layout_atom.nonscratch_cache_view(prod_cache, axis=0)
+        dGs1 = layout_atom.nonscratch_cache_view(d_prod_cache1, axis=0)
+        dGs2 = layout_atom.nonscratch_cache_view(d_prod_cache2, axis=0)
         #( n_circuits, nDerivColsX, dim, dim )
 
-        hGs = layout_atom.nonscratch_cache_view(hProdCache, axis=0)
-        #( n_circuits, len(wrt_filter1), len(wrt_filter2), dim, dim )
-
         old_err = _np.seterr(over='ignore')
         for spam_tuple, (element_indices, tree_indices) in layout_atom.indices_by_spamtuple.items():
             rho, E = self._rho_e_from_spam_tuple(spam_tuple)
             _fas(array_to_fill, [element_indices, dest_param_slice1, dest_param_slice2], self._hprobs_from_rho_e(
                 spam_tuple, rho, E, Gs[tree_indices], dGs1[tree_indices], dGs2[tree_indices],
-                hGs[tree_indices], scaleVals[tree_indices], param_slice1, param_slice2))
+                None, scaleVals[tree_indices], param_slice1, param_slice2, d2pr_dops2[spam_tuple]))
 
         _np.seterr(**old_err)
 
+    def _bulk_fill_hprobs_dprobs_atom(self, array_to_fill, deriv1_array_to_fill, deriv2_array_to_fill, atom,
+                                      param_slice1, param_slice2, resource_alloc):
+        # Same as the base class version, except that the product and derivative caches are computed just
+        # once and then used to fill all of the arrays (rather than being recomputed for each array).
+        dim = self.model.evotype.minimal_dim(self.model.state_space)
+        resource_alloc.check_can_allocate_memory(atom.cache_size * dim**2
+                                                 * (_slct.length(param_slice1) + _slct.length(param_slice2)))
+        prodCache, scaleCache = self._compute_product_cache(atom.tree, resource_alloc)
+        dProdCache1 = self._compute_dproduct_cache(atom.tree, prodCache, scaleCache, resource_alloc, param_slice1)
+        dProdCache2 = dProdCache1 if (param_slice1 == param_slice2) else \
+            self._compute_dproduct_cache(atom.tree, prodCache, scaleCache, resource_alloc, param_slice2)
+
+        if not resource_alloc.is_host_leader:
+            return  # Non-root host processors aren't used anymore to compute the result on the root proc
+
+        if deriv1_array_to_fill is not None:
+            self._fill_dprobs_from_caches(deriv1_array_to_fill, None, atom, param_slice1,
+                                          prodCache, scaleCache, dProdCache1)
+        if deriv2_array_to_fill is not None:
+            if deriv1_array_to_fill is not None and param_slice1 == param_slice2:
+                deriv2_array_to_fill[:, :] = deriv1_array_to_fill[:, :]
+            else:
+                self._fill_dprobs_from_caches(deriv2_array_to_fill, None, atom, param_slice2,
+                                              prodCache, scaleCache, dProdCache2)
+
+        self._fill_hprobs_from_caches(array_to_fill, None, None, atom, param_slice1, param_slice2,
+                                      prodCache, scaleCache, dProdCache1, dProdCache2, resource_alloc)
+
     def bulk_product(self, circuits, scale=False, resource_alloc=None):
         """
         Compute the products of many circuits at once.
@@ -323,7 +323,8 @@ class TermForwardSimulator(_DistributableForwardSimulator):
             printer.log("Layout creation w/mem limit = %.2fGB" % (mem_limit * C))
 
         natoms, na, npp, param_dimensions, param_blk_sizes = self._compute_processor_distribution(
-            array_types, nprocs, num_params, len(circuits), default_natoms=nprocs)
+            array_types, nprocs, num_params, len(circuits),
+            default_natoms=self._default_num_atoms(resource_alloc, nprocs))
 
         printer.log("TermLayout: %d processors divided into %s (= %d) grid along circuit and parameter directions." %
                     (nprocs, ' x '.join(map(str, (na,) + npp)), _np.product((na,) + npp)))
@@ -35,7 +35,7 @@ def load_dataset(filename, cache=False, collision_action="aggregate",
 
 def read_dataset(filename, cache=False, collision_action="aggregate",
                  record_zero_counts=True, ignore_zero_count_lines=True,
-                 with_times="auto", circuit_parse_cache=None, verbosity=1):
+                 with_times="auto", circuit_parse_cache=None, verbosity=1, num_local_workers=None):
     """
     Load a DataSet from a file.
 
@@ -80,12 +80,18 @@ def read_dataset(filename, cache=False, collision_action="aggregate",
     circuit_parse_cache : dict, optional
         A dictionary mapping qubit string representations into created
         :class:`Circuit` objects, which can improve performance by reducing
-        or eliminating the need to parse circuit strings.
+        or eliminating the need to parse circuit strings.  This is used in
+        addition to the process-wide `pygsti.circuits.circuitparser.global_parse_cache`
+        (and isn't used by worker processes when `num_local_workers > 1`).
 
     verbosity : int, optional
         If zero, no output is shown.  If greater than zero,
         loading progress is shown.
 
+    num_local_workers : int, optional
+        If greater than 1, a text-formatted file is parsed in chunks by a pool of
+        this many worker processes.
+
     Returns
     -------
     DataSet
@@ -116,24 +122,24 @@ def read_dataset(filename, cache=False, collision_action="aggregate",
                             + "be created after loading is completed")
 
             # otherwise must use standard dataset file format
-            parser = _stdinput.StdInputParser()
+            parser = _stdinput.StdInputParser(circuit_parse_cache)
             ds = parser.parse_datafile(filename, bToStdout,
                                        collision_action=collision_action,
                                        record_zero_counts=record_zero_counts,
                                        ignore_zero_count_lines=ignore_zero_count_lines,
-                                       with_times=with_times)
+                                       with_times=with_times, num_local_workers=num_local_workers)
 
             printer.log("Writing cache file (to speed future loads): %s"
                         % cache_filename)
             ds.save(cache_filename)
         else:
             # otherwise must use standard dataset file format
-            parser = _stdinput.StdInputParser()
+            parser = _stdinput.StdInputParser(circuit_parse_cache)
             ds = parser.parse_datafile(filename, bToStdout,
                                        collision_action=collision_action,
                                        record_zero_counts=record_zero_counts,
                                        ignore_zero_count_lines=ignore_zero_count_lines,
-                                       with_times=with_times)
+                                       with_times=with_times, num_local_workers=num_local_workers)
         return ds
 
 
@@ -236,7 +242,7 @@ def load_time_dependent_dataset(filename, cache=False, record_zero_counts=True):
     return read_time_dependent_dataset(filename, cache, record_zero_counts)
 
 
-def read_time_dependent_dataset(filename, cache=False, record_zero_counts=True):
+def read_time_dependent_dataset(filename, cache=False, record_zero_counts=True, num_local_workers=None):
     """
     Load time-dependent (time-stamped) data as a DataSet.
 
@@ -254,6 +260,10 @@ def read_time_dependent_dataset(filename, cache=False, record_zero_counts=True):
         DataSet.  If False, then zero counts are ignored, except for
         potentially registering new outcome labels.
 
+    num_local_workers : int, optional
+        If greater than 1, the file is parsed in chunks by a pool of this many
+        worker processes.
+
     Returns
     -------
     DataSet
@@ -261,7 +271,7 @@ def read_time_dependent_dataset(filename, cache=False, record_zero_counts=True):
     parser = _stdinput.StdInputParser()
     create_subcircuits = not _circuits.Circuit.default_expand_subcircuits
     tdds = parser.parse_tddatafile(filename, record_zero_counts=record_zero_counts,
-                                   create_subcircuits=create_subcircuits)
+                                   create_subcircuits=create_subcircuits, num_local_workers=num_local_workers)
     return tdds
 
 
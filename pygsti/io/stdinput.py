@@ -15,6 +15,7 @@ import os as _os
 import re as _re
 import sys as _sys
 import time as _time
+import uuid as _uuid
 import warnings as _warnings
 from collections import OrderedDict as _OrderedDict
 
@@ -33,11 +34,6 @@ from pygsti.circuits.circuit import Circuit as _Circuit
 from pygsti.circuits.circuitparser import CircuitParser as _CircuitParser
 from pygsti.data import DataSet as _DataSet, MultiDataSet as _MultiDataSet
 
-# A dictionary mapping qubit string representations into created
-# :class:`Circuit` objects, which can improve performance by reducing
-# or eliminating the need to parse circuit strings we've already parsed.
-_global_parse_cache = {False: {}, True: {}}  # key == create_subcircuits
-
 
 def _create_display_progress_fn(show_progress):
     """
@@ -86,9 +82,19 @@ class StdInputParser(object):
     _circuit_parser = _CircuitParser()
     use_global_parse_cache = True
 
-    def __init__(self):
-        """ Create a new standard-input parser object """
-        pass
+    def __init__(self, circuit_parse_cache=None):
+        """
+        Create a new standard-input parser object
+
+        Parameters
+        ----------
+        circuit_parse_cache : dict, optional
+            A dictionary mapping circuit string representations to :class:`Circuit`
+            objects that is consulted (and updated) when parsing circuits.  Strings
+            that aren't in it are parsed using the process-wide
+            `pygsti.circuits.circuitparser.global_parse_cache`.
+        """
+        self.circuit_parse_cache = circuit_parse_cache
 
     def parse_circuit(self, s, lookup={}, create_subcircuits=True):
         """
@@ -111,27 +117,37 @@ class StdInputParser(object):
         Returns
         -------
         Circuit
-        """
-        circuit = None
-        if self.use_global_parse_cache:
-            circuit = _global_parse_cache[create_subcircuits].get(s, None)
-        if circuit is None:  # wasn't in cache
-            layer_tuple, line_lbls, occurrence_id, compilable_indices = \
-                self.parse_circuit_raw(s, lookup, create_subcircuits)
-            if line_lbls is None:  # if there are no line labels then we need to use "auto" and do a full init
-                circuit = _Circuit(layer_tuple, stringrep=s, line_labels="auto",
-                                   expand_subcircuits=False, check=False, occurrence=occurrence_id,
-                                   compilable_layer_indices=compilable_indices)
-                #Note: never expand subcircuits since parse_circuit_raw already does this w/create_subcircuits arg
-            else:
-                circuit = _Circuit._fastinit(layer_tuple, line_lbls, editable=False,
-                                             name='', stringrep=s, occurrence=occurrence_id,
-                                             compilable_layer_indices=compilable_indices)
 
-            if self.use_global_parse_cache:
-                _global_parse_cache[create_subcircuits][s] = circuit
+        Notes
+        -----
+        Circuits are only taken from (and added to) this parser's `circuit_parse_cache`
+        when `lookup` is empty.  Parsing itself uses the process-wide parse cache when
+        `use_global_parse_cache` is `True` (see :class:`CircuitParser`).
+        """
+        if lookup:  # S<reflbl> substitutions depend on `lookup`, so don't use (or fill) the cache
+            return self._create_circuit(s, lookup, create_subcircuits)
+
+        if self.circuit_parse_cache is not None:
+            circuit = self.circuit_parse_cache.get(s, None)
+            if circuit is not None: return circuit
+        circuit = self._create_circuit(s, lookup, create_subcircuits)
+        if self.circuit_parse_cache is not None:
+            self.circuit_parse_cache[s] = circuit
         return circuit
 
+    def _create_circuit(self, s, lookup, create_subcircuits):
+        """ Parse `s` and build a new :class:`Circuit` from it (no caching) """
+        layer_tuple, line_lbls, occurrence_id, compilable_indices = \
+            self.parse_circuit_raw(s, lookup, create_subcircuits)
+        if line_lbls is None:  # if there are no line labels then we need to use "auto" and do a full init
+            #Note: never expand subcircuits since parse_circuit_raw already does this w/create_subcircuits arg
+            return _Circuit(layer_tuple, stringrep=s, line_labels="auto",
+                            expand_subcircuits=False, check=False, occurrence=occurrence_id,
+                            compilable_layer_indices=compilable_indices)
+        return _Circuit._fastinit(layer_tuple, line_lbls, editable=False,
+                                  name='', stringrep=s, occurrence=occurrence_id,
+                                  compilable_layer_indices=compilable_indices)
+
     def parse_circuit_raw(self, s, lookup={}, create_subcircuits=True):
         """
         Parse a circuit's constituent pieces from a string.
@@ -169,6 +185,7 @@ class StdInputParser(object):
             the presence or absence of barriers.
         """
         self._circuit_parser.lookup = lookup
+        self._circuit_parser.use_global_parse_cache = self.use_global_parse_cache
         circuit_tuple, circuit_labels, occurrence_id, compilable_indices = \
             self._circuit_parser.parse(s, create_subcircuits)
         # print "DB: result = ",result
@@ -360,7 +377,7 @@ class StdInputParser(object):
 
     def parse_datafile(self, filename, show_progress=True,
                        collision_action="aggregate", record_zero_counts=True,
-                       ignore_zero_count_lines=True, with_times="auto"):
+                       ignore_zero_count_lines=True, with_times="auto", num_local_workers=None):
         """
         Parse a data set file into a DataSet object.
 
@@ -391,6 +408,11 @@ class StdInputParser(object):
             "auto", then this format is allowed but not required.  Typically
             you only need to set this to False when reading in a template file.
 
+        num_local_workers : int, optional
+            If greater than 1, the file is split at line boundaries into chunks that are
+            parsed by a pool of this many worker processes and then merged.  Files
+            containing (multi-line) time-stamped records are always parsed serially.
+
         Returns
         -------
         DataSet
@@ -457,6 +479,18 @@ class StdInputParser(object):
         else:
             fixed_column_outcome_indices = None
 
+        if num_local_workers is not None and num_local_workers > 1 and with_times is not True:
+            chunks = _parse_in_chunks(filename, _parse_datafile_chunk,
+                                      (lookupDict, nDataCols, fixed_column_outcome_labels, with_times,
+                                       ignore_zero_count_lines, not _Circuit.default_expand_subcircuits),
+                                      num_local_workers, show_progress)
+            if chunks is not None:  # otherwise the file has time-stamped records, and is parsed serially below
+                def add_row(circuit, oli_array, time_array, count_array, aux):
+                    dataset.add_count_arrays(circuit, oli_array, count_array,
+                                             record_zero_counts=record_zero_counts, aux=aux)
+                return _merge_parsed_chunks(dataset, chunks, filename, record_zero_counts,
+                                            not outcome_labels_specified_in_preamble, add_row)
+
         nLines = 0
         with open(filename, 'r') as datafile:
             nLines = sum(1 for line in datafile)
@@ -468,20 +502,11 @@ class StdInputParser(object):
         looking_for = "circuit_line"; current_item = {}
 
         def parse_comment(comment, filename, i_line):
-            commentDict = {}
-            comment = comment.strip()
-            if len(comment) == 0: return {}
-            try:
-                if comment.startswith("{") and comment.endswith("}"):
-                    commentDict = _ast.literal_eval(comment)
-                else:  # put brackets around it
-                    commentDict = _ast.literal_eval("{ " + comment + " }")
-                #commentDict = _json.loads("{ " + comment + " }")
-                #Alt: safer(?) & faster, but need quotes around all keys & vals
-            except:
+            commentDict = _parse_comment(comment)
+            if commentDict is None:
                 commentDict = {}
                 warnings.append("%s Line %d: Could not parse comment '%s'"
-                                % (filename, i_line, comment))
+                                % (filename, i_line, comment.strip()))
             return commentDict
 
         last_circuit = last_commentDict = None
@@ -852,7 +877,7 @@ class StdInputParser(object):
         return count_dicts
 
     def parse_tddatafile(self, filename, show_progress=True, record_zero_counts=True,
-                         create_subcircuits=True):
+                         create_subcircuits=True, num_local_workers=None):
         """
         Parse a timstamped data set file into a DataSet object.
 
@@ -874,6 +899,10 @@ class StdInputParser(object):
             string representations or to just expand these into non-subcircuit
             labels.
 
+        num_local_workers : int, optional
+            If greater than 1, the file is split at line boundaries into chunks that are
+            parsed by a pool of this many worker processes and then merged.
+
         Returns
         -------
         DataSet
@@ -910,6 +939,16 @@ class StdInputParser(object):
 
         #Read data lines of data file
         dataset = _DataSet(outcome_labels=outcomeLabels)
+        if num_local_workers is not None and num_local_workers > 1:
+            chunks = _parse_in_chunks(filename, _parse_tddatafile_chunk,
+                                      (lookupDict, outcomeLabelAbbrevs, create_subcircuits),
+                                      num_local_workers, show_progress)
+
+            def add_row(circuit, oli_array, time_array, count_array, aux):
+                dataset.add_raw_series_data(circuit, [dataset.ol[i] for i in oli_array], time_array,
+                                            record_zero_counts=record_zero_counts)
+            return _merge_parsed_chunks(dataset, chunks, filename, record_zero_counts, False, add_row)
+
         with open(filename, 'r') as f:
             nLines = sum(1 for line in f)
         nSkip = int(nLines / 100.0)
@@ -941,6 +980,306 @@ class StdInputParser(object):
         return dataset
 
 
+def _parse_comment(comment):
+    """ Parses a data-line comment into a dictionary, returning `None` if this isn't possible """
+    comment = comment.strip()
+    if len(comment) == 0: return {}
+    try:
+        if comment.startswith("{") and comment.endswith("}"):
+            return _ast.literal_eval(comment)
+        else:  # put brackets around it
+            return _ast.literal_eval("{ " + comment + " }")
+        #Alt: _json.loads("{ " + comment + " }") -- safer(?) & faster, but need quotes around all keys & vals
+    except:
+        return None
+
+
+class _ParsedChunk(object):
+    """
+    The data rows parsed from a chunk of a text data file, held as columnar arrays.
+
+    Row `i` is the data for `circuits[i]`, and is held in the `row_lengths[i]` elements of `oli`,
+    `times` and `counts` (if not `None`) that follow the elements of the preceding rows.  The values
+    of `oli` are indices into `outcome_labels`, which are particular to the chunk.
+
+    Parameters
+    ----------
+    num_lines : int
+        The number of lines in the chunk.
+
+    with_counts : bool
+        Whether the rows have repetition counts (`counts`) as well as outcomes and times.
+    """
+
+    def __init__(self, num_lines, with_counts):
+        self.num_lines = num_lines
+        self.circuits = []
+        self.outcome_labels = []
+        self.row_lengths = []
+        self.oli = []
+        self.times = []
+        self.counts = [] if with_counts else None
+        self.aux = []
+        self.warnings = []  # (line index within chunk or None, message) tuples
+        self.error = None  # (line index within chunk, message) of the line that couldn't be parsed
+        self.multiline_records = False  # whether parsing stopped at a (multi-line) time-stamped record
+
+    def add_row(self, circuit, oli, times, counts, aux):
+        self.circuits.append(circuit)
+        self.row_lengths.append(len(oli))
+        self.oli.extend(oli)
+        self.times.extend(times)
+        if self.counts is not None: self.counts.extend(counts)
+        self.aux.append(aux)
+
+    def finalize(self):
+        """ Convert the columns to numpy arrays, which are much cheaper to send between processes """
+        self.row_lengths = _np.array(self.row_lengths, _np.int64)
+        self.oli = _np.array(self.oli, _np.int64)
+        self.times = _np.array(self.times, 'd')
+        if self.counts is not None: self.counts = _np.array(self.counts, 'd')
+        return self
+
+
+def _split_at_line_boundaries(filename, num_chunks):
+    """
+    Split a file into (at most) `num_chunks` similarly sized `(start, end)` byte ranges that begin at line starts.
+    """
+    size = _os.path.getsize(filename)
+    boundaries = [0]
+    with open(filename, 'rb') as f:
+        for k in range(1, num_chunks):
+            pos = size * k // num_chunks
+            if pos <= boundaries[-1]: continue
+            f.seek(pos - 1); f.readline()  # advance to the beginning of a line
+            if f.tell() >= size: break
+            if f.tell() > boundaries[-1]: boundaries.append(f.tell())
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _read_chunk_lines(filename, byte_range):
+    """ Read the lines within a `(start, end)` byte range of a file """
+    start, end = byte_range
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        lines = f.read(end - start).decode('utf-8').split('\n')
+    if lines[-1] == '': del lines[-1]  # chunk ends with a newline
+    return lines
+
+
+def _parse_datafile_chunk(filename, byte_range, lookup, num_data_cols, fixed_column_outcome_labels,
+                          with_times, ignore_zero_count_lines, create_subcircuits):
+    """
+    Parse the single-line data records within a byte range of a text data file.
+
+    This is the work done by each worker process of :method:`StdInputParser.parse_datafile`.
+    Parsing stops (setting `multiline_records`) at the first circuit without any counts
+    when time-stamped records are allowed, as this may begin a multi-line record.
+
+    Returns
+    -------
+    _ParsedChunk
+    """
+    parser = StdInputParser()
+    lines = _read_chunk_lines(filename, byte_range)
+    chunk = _ParsedChunk(len(lines), with_counts=True)
+    local_olIndex = _OrderedDict()
+
+    for (iLine, line) in enumerate(lines):
+        line = line.strip()
+        if '#' in line:
+            i = line.index('#')
+            dataline, comment = line[:i], line[i + 1:].strip()
+        else:
+            dataline, comment = line, ""
+        if len(dataline) == 0: continue
+
+        try:
+            circuit, valueList = parser.parse_dataline(dataline, lookup, num_data_cols,
+                                                       create_subcircuits=create_subcircuits)
+        except ValueError as e:
+            chunk.error = (iLine, str(e)); break
+
+        if with_times is not False and len(valueList) == 0:
+            chunk.multiline_records = True; break
+
+        commentDict = _parse_comment(comment)
+        if commentDict is None:
+            commentDict = {}
+            chunk.warnings.append((iLine, "Could not parse comment '%s'" % comment))
+
+        if 'BAD' in valueList:  # entire line is known to be BAD => no data for this circuit
+            outcome_labels = count_values = ()
+        elif fixed_column_outcome_labels is not None:
+            labels_and_values = [(nm, v) for (nm, v) in zip(fixed_column_outcome_labels, valueList)
+                                 if v != '--']  # drop "empty" sentinels
+            outcome_labels, count_values = zip(*labels_and_values) if len(labels_and_values) else ((), ())
+        else:  # valueList is a list of (outcomeLabel, count) tuples -- see parse_dataline
+            outcome_labels, count_values = zip(*valueList) if len(valueList) else ((), ())
+        oli = [local_olIndex.setdefault(ol, len(local_olIndex)) for ol in outcome_labels]
+
+        if ignore_zero_count_lines is True and all([(abs(v) < 1e-9) for v in count_values]):
+            if not ('BAD' in valueList):  # supress "no data" warning for known-bad circuits
+                s = circuit.str if len(circuit.str) < 40 else circuit.str[0:37] + "..."
+                chunk.warnings.append((None, "Dataline for circuit '%s' has zero counts and will be ignored" % s))
+            continue
+
+        chunk.add_row(circuit, oli, [0.0] * len(oli), count_values, commentDict)
+
+    chunk.outcome_labels = list(local_olIndex.keys())
+    return chunk.finalize()
+
+
+def _parse_tddatafile_chunk(filename, byte_range, lookup, outcome_label_abbrevs, create_subcircuits):
+    """
+    Parse the data lines within a byte range of a time-stamped text data file.
+
+    This is the work done by each worker process of :method:`StdInputParser.parse_tddatafile`.
+
+    Returns
+    -------
+    _ParsedChunk
+    """
+    parser = StdInputParser()
+    lines = _read_chunk_lines(filename, byte_range)
+    chunk = _ParsedChunk(len(lines), with_counts=False)
+    chunk.outcome_labels = [_baseobjs.OutcomeLabelDict.to_outcome(ol) for ol in outcome_label_abbrevs.values()]
+    oli_of_abbrev = {abbrev: i for i, abbrev in enumerate(outcome_label_abbrevs.keys())}
+
+    for (iLine, line) in enumerate(lines):
+        line = line.strip()
+        if len(line) == 0 or line[0] == '#': continue
+        try:
+            parts = line.split()
+            lastpart = parts[-1]
+            circuitStr = line[:-len(lastpart)].strip()
+            circuit = parser.parse_circuit(circuitStr, lookup, create_subcircuits)
+            timeSeriesStr = lastpart.strip()
+        except ValueError as e:
+            chunk.error = (iLine, str(e)); break
+
+        oli = [oli_of_abbrev[abbrev] for abbrev in timeSeriesStr]  # iter over characters in str
+        chunk.add_row(circuit, oli, range(len(oli)), None, None)  # FUTURE: specify an offset and step??
+
+    return chunk.finalize()
+
+
+def _parse_in_chunks(filename, parse_chunk_fn, parse_chunk_args, num_workers, show_progress):
+    """
+    Parse a text data file in chunks, using a pool of worker processes.
+
+    Each chunk is parsed by `parse_chunk_fn(filename, byte_range, *parse_chunk_args)`.
+
+    Returns
+    -------
+    list or None
+        The :class:`_ParsedChunk` objects of all the chunks in file order, or `None` if any
+        chunk contains multi-line records (so that the file must be parsed serially).
+    """
+    byte_ranges = _split_at_line_boundaries(filename, 4 * num_workers)  # extra chunks balance the load
+    display_progress = _create_display_progress_fn(show_progress)
+
+    chunks = []
+    pool = _tools.LocalProcessPool(num_workers)
+    results = pool.imap(parse_chunk_fn, [(filename, byte_range) + tuple(parse_chunk_args)
+                                         for byte_range in byte_ranges])
+    try:
+        for i, chunk in enumerate(results):
+            chunks.append(chunk)
+            display_progress(i + 1, len(byte_ranges), filename)
+            if chunk.multiline_records:
+                return None
+    finally:
+        results.close()  # don't parse the remaining chunks if we're returning early
+        pool.shutdown()
+    return chunks
+
+
+def _merge_parsed_chunks(dataset, chunks, filename, record_zero_counts, add_outcome_labels, add_row):
+    """
+    Merge the rows of parsed chunks into a static data set.
+
+    Parameters
+    ----------
+    dataset : DataSet
+        An empty, non-static data set holding the outcome labels, collision action and comment
+        of the data set to create.
+
+    chunks : list
+        The :class:`_ParsedChunk` objects of a text data file, in file order.
+
+    filename : str
+        The name of the data file, used in error and warning messages.
+
+    record_zero_counts : bool
+        Whether zero-counts are recorded in the returned DataSet.
+
+    add_outcome_labels : bool
+        Whether outcome labels that aren't already in `dataset` should be added to it (otherwise
+        they're an error).
+
+    add_row : function
+        A function `add_row(circuit, oli_array, time_array, count_array, aux)` that adds a row to
+        `dataset`.  This is only used when the chunks contain duplicate circuits, so that the duplicates
+        are handled according to `dataset`'s collision action.
+
+    Returns
+    -------
+    DataSet
+    """
+    warnings = []
+    oli_arrays = []
+    first_line = 0
+    for chunk in chunks:
+        if chunk.error is not None:
+            raise ValueError("%s Line %d: %s" % (filename, first_line + chunk.error[0], chunk.error[1]))
+        warnings.extend([msg if (i is None) else "%s Line %d: %s" % (filename, first_line + i, msg)
+                         for i, msg in chunk.warnings])
+        first_line += chunk.num_lines
+
+        if add_outcome_labels: dataset.add_outcome_labels(chunk.outcome_labels, update_ol=False)
+        outcome_indices = _np.array([dataset.olIndex[ol] for ol in chunk.outcome_labels], dataset.oliType)
+        oli_arrays.append(outcome_indices[chunk.oli])
+
+    if warnings:
+        _warnings.warn('\n'.join(warnings))
+
+    circuits = [circuit for chunk in chunks for circuit in chunk.circuits]
+    aux = [a for chunk in chunks for a in chunk.aux]
+    oliData = _np.concatenate(oli_arrays)
+    timeData = _np.concatenate([chunk.times for chunk in chunks]).astype(dataset.timeType, copy=False)
+    repData = _np.concatenate([chunk.counts for chunk in chunks]).astype(dataset.repType, copy=False) \
+        if (chunks[0].counts is not None) else None
+    row_lengths = _np.concatenate([chunk.row_lengths for chunk in chunks])
+    offsets = _np.concatenate(([0], _np.cumsum(row_lengths)))
+
+    if len(set(circuits)) < len(circuits):
+        # add rows one by one so that duplicate circuits are aggregated (or not) as they would be serially
+        dataset.update_ol()
+        for i, circuit in enumerate(circuits):
+            slc = slice(offsets[i], offsets[i + 1])
+            add_row(circuit, oliData[slc], timeData[slc], None if (repData is None) else repData[slc], aux[i])
+        dataset.done_adding_data()
+        return dataset
+
+    if repData is not None and not record_zero_counts:
+        keep = repData != 0  # (note: == float comparison *is* desired)
+        row_lengths = _np.bincount(_np.repeat(_np.arange(len(circuits)), row_lengths)[keep],
+                                   minlength=len(circuits))
+        offsets = _np.concatenate(([0], _np.cumsum(row_lengths)))
+        oliData, timeData, repData = oliData[keep], timeData[keep], repData[keep]
+
+    circuit_indices = _OrderedDict([(circuit, slice(start, stop)) for circuit, start, stop
+                                    in zip(circuits, offsets[:-1].tolist(), offsets[1:].tolist())])
+    ds = _DataSet(oliData, timeData, repData, circuit_indices=circuit_indices,
+                  outcome_label_indices=dataset.olIndex, static=True,
+                  collision_action=dataset.collisionAction, comment=dataset.comment,
+                  aux_info={circuit: a for circuit, a in zip(circuits, aux) if a is not None})
+    ds.uuid = _uuid.uuid4()  # as done_adding_data does
+    return ds
+
+
 def _eval_element(el, b_complex):
     myLocal = {'pi': _np.pi, 'sqrt': _np.sqrt}
     exec("element = %s" % el, {"__builtins__": None}, myLocal)
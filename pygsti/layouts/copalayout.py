@@ -195,6 +195,7 @@ class CircuitOutcomeProbabilityArrayLayout(_NicelySerializable):
         self._unique_complete_circuits = unique_complete_circuits  # Note: can be None
         self._param_dimensions = param_dimensions
         self._resource_alloc = _ResourceAllocation.cast(resource_alloc)
+        self._param_dependencies = None  # (model key, indptr, indices) computed by `param_dependency_index`
 
         max_element_index = max(_it.chain(*[[ei for ei, _ in pairs] for pairs in elindex_outcome_tuples.values()])) \
             if len(elindex_outcome_tuples) > 0 else -1  # -1 makes _size = 0 below
@@ -597,6 +598,52 @@ class CircuitOutcomeProbabilityArrayLayout(_NicelySerializable):
         """
         jtj[:] = _np.dot(j.T, j)
 
+    def param_dependency_index(self, model):
+        """
+        The model parameters that each of this layout's (local) elements depends on.
+
+        A circuit outcome probability can only depend on the parameters of the operations
+        within its circuit, so for models whose circuit layers each depend on only a few of
+        the model's parameters (e.g. local-noise and cloud-noise models) most of the entries
+        of a `(num_elements, num_params)` jacobian are structurally zero.  This method
+        gives the column indices of the remaining entries, in compressed sparse row (CSR)
+        format.  The result is computed once and cached.
+
+        Parameters
+        ----------
+        model : Model
+            The model whose parameters are considered.  This should be the model used
+            to create this layout.
+
+        Returns
+        -------
+        indptr : numpy.ndarray
+            An array of length `num_elements + 1`.
+        indices : numpy.ndarray
+            The (sorted) indices of the parameters the `i`-th element depends on are
+            `indices[indptr[i]:indptr[i + 1]]`.  All the elements of a circuit depend
+            on the same parameters.
+        """
+        key = (id(model), model.num_params)
+        if self._param_dependencies is not None and self._param_dependencies[0] == key:
+            return self._param_dependencies[1:]
+
+        circuits = self._unique_complete_circuits if (self._unique_complete_circuits is not None) \
+            else self._unique_circuits
+        params_by_layer = {}  # cache of layer-operation parameter indices
+        params_by_element = [None] * self._size
+        for i, circuit in enumerate(circuits):
+            if i not in self._element_indices: continue  # circuit has no elements
+            params = _circuit_param_indices(model, circuit, params_by_layer)
+            for k in _slct.to_array(self._element_indices[i]):
+                params_by_element[k] = params
+
+        indptr = _np.zeros(self._size + 1, _np.int64)
+        indptr[1:] = _np.cumsum([len(params) for params in params_by_element])
+        indices = _np.concatenate(params_by_element) if (self._size > 0) else _np.zeros(0, _np.int64)
+        self._param_dependencies = (key, indptr, indices.astype(_np.int64))
+        return self._param_dependencies[1:]
+
     #Not needed
     #def allocate_jtj_shared_mem_buf(self):
     #    return _np.empty((self._param_dimensions[0], self._param_dimensions[0]), 'd'), None
@@ -764,6 +811,44 @@ class CircuitOutcomeProbabilityArrayLayout(_NicelySerializable):
         for circuit, i in self._unique_circuit_index.items():
             yield self._element_indices[i], circuit, self._outcomes[i]
 
+    def element_index_arrays(self, outcome_index=None):
+        """
+        Arrays that map this layout's circuits and elements to unique circuits and outcome indices.
+
+        These allow per-circuit and per-element quantities to be computed with vectorized
+        numpy operations instead of looping over circuits (e.g. with :method:`indices_for_index`).
+        Unique-circuit indices refer to the circuits iterated over by :method:`iter_unique_circuits`.
+
+        Parameters
+        ----------
+        outcome_index : dict, optional
+            A dictionary mapping outcome labels to integer indices, e.g. the `olIndex` of a
+            :class:`DataSet`.  If None, then `element_outcome_indices` is not computed.
+
+        Returns
+        -------
+        circuit_to_unique : numpy.ndarray
+            A 1D array of length `self.num_circuits` giving the unique-circuit index of each circuit.
+        element_unique_indices : numpy.ndarray
+            A 1D array of length `self.num_elements` giving the unique-circuit index of each element.
+        element_outcome_indices : numpy.ndarray or None
+            A 1D array of length `self.num_elements` giving the index of each element's outcome
+            label within `outcome_index`, or -1 if the label is not present.  `None` when
+            `outcome_index` is None.
+        """
+        circuit_to_unique = _np.array([self._to_unique[i] for i in range(len(self.circuits))], _np.int64)
+        element_unique_indices = _np.empty(self._size, _np.int64)
+        element_outcome_indices = _np.empty(self._size, _np.int64) if (outcome_index is not None) else None
+        outcome_indices_cache = {}  # outcome-label tuples are usually shared by many circuits
+        for i, element_indices in self._element_indices.items():
+            element_unique_indices[element_indices] = i
+            if outcome_index is not None:
+                outcomes = self._outcomes[i]
+                if outcomes not in outcome_indices_cache:
+                    outcome_indices_cache[outcomes] = [outcome_index.get(ol, -1) for ol in outcomes]
+                element_outcome_indices[element_indices] = outcome_indices_cache[outcomes]
+        return circuit_to_unique, element_unique_indices, element_outcome_indices
+
     def copy(self):
         """
         Create a copy of this layout.
@@ -800,3 +885,29 @@ class CircuitOutcomeProbabilityArrayLayout(_NicelySerializable):
         if empty_if_missing:
             return _ResourceAllocation(None)
         raise KeyError("COPA layout has no '%s' resource alloc" % str(sub_alloc_name))
+
+
+def _circuit_param_indices(model, circuit, params_by_layer):
+    """
+    The sorted indices of the parameters of `model` that the outcome probabilities of `circuit` depend on.
+
+    `circuit` must be a complete circuit (beginning with a state preparation and ending with a POVM),
+    and `params_by_layer` is a dictionary used to cache the parameter indices of each layer label.
+    When the dependencies can't be determined, e.g. for layers containing instruments or when
+    the model has a parameter interposer, *all* of the model's parameters are returned.
+    """
+    all_params = _np.arange(model.num_params, dtype=_np.int64)
+    if getattr(model, 'param_interposer', None) is not None:
+        return all_params  # model parameters aren't the parameters of the model's operations
+
+    num_layers = len(circuit)
+    params = set()
+    for i, layer in enumerate(circuit.layertup):
+        typ = 'prep' if (i == 0) else ('povm' if (i == num_layers - 1) else 'op')
+        if (layer, typ) not in params_by_layer:
+            try:
+                params_by_layer[(layer, typ)] = model.circuit_layer_operator(layer, typ).gpindices_as_array()
+            except (KeyError, ValueError):  # e.g. an instrument: we can't say what this layer depends on
+                params_by_layer[(layer, typ)] = all_params
+        params.update(params_by_layer[(layer, typ)])
+    return _np.array(sorted(params), _np.int64)
@@ -11,6 +11,11 @@ Defines the DistributableCOPALayout class.
 #***************************************************************************************************
 
 import collections as _collections
+import hashlib as _hashlib
+import os as _os
+import pathlib as _pathlib
+import pickle as _pickle
+import tempfile as _tempfile
 
 import numpy as _np
 
@@ -107,6 +112,126 @@ class _DistributableAtom(object):
         raise NotImplementedError("This probably should be implemented, but isn't yet: TODO!")
 
 
+class _LayoutCache(object):
+    """
+    An on-disk cache of the circuit groups and atoms of a :class:`DistributableCOPALayout`.
+
+    Creating a layout's atoms (evaluation trees, prefix tables, and element and outcome
+    index maps) can take a significant amount of time for large circuit lists.  This
+    class stores the atoms, as they are created, in a subdirectory of `directory` whose
+    name is a digest of everything that determines the atoms, so that a layout for the
+    same circuits, outcomes and processor grid can later be loaded instead of rebuilt.
+    Each atom is stored in its own (pickled) file so that processors only read and write
+    the atoms they own.
+
+    Parameters
+    ----------
+    directory : str or Path
+        The root cache directory, which is created if needed.
+
+    layout_type : str
+        A name for the kind of layout being cached, e.g. `"matrix"`.
+
+    model : Model
+        The model used to create the layout.  The structure of its SPAM and instrument
+        operations (which determine how circuits are expanded) is part of the cache key.
+
+    complete_circuits : list
+        The layout's unique *completed* circuits.
+
+    ds_circuits : list
+        The circuits used to look up observed outcomes in `dataset`, parallel to `complete_circuits`.
+
+    dataset : DataSet or None
+        The data set whose observed outcomes restrict the layout's elements.
+
+    settings : tuple
+        Additional hashable settings the atoms depend upon, e.g. the number of atoms,
+        processor grid, parameter dimensions and block sizes.
+    """
+
+    def __init__(self, directory, layout_type, model, complete_circuits, ds_circuits, dataset, settings):
+        from pygsti import __version__ as _version
+        digest = _hashlib.sha256()
+        digest.update(repr((_version, layout_type, settings, str(model.state_space))).encode('utf-8'))
+        digest.update(repr(model.primitive_prep_labels).encode('utf-8'))
+        digest.update(repr(model.primitive_instrument_labels).encode('utf-8'))
+        for povm_lbl in model.primitive_povm_labels:
+            digest.update(repr((povm_lbl, tuple(model.circuit_layer_operator(povm_lbl, 'povm').keys())))
+                          .encode('utf-8'))
+        for c, ds_c in zip(complete_circuits, ds_circuits):
+            outcomes = tuple(dataset[ds_c].outcomes) if (dataset is not None) else None
+            digest.update(repr((c, ds_c, outcomes)).encode('utf-8'))
+        self.path = _pathlib.Path(directory) / digest.hexdigest()
+
+    def load(self, name):
+        """
+        Load a previously saved object.
+
+        Parameters
+        ----------
+        name : str
+            The object's name, as given to :method:`save`.
+
+        Returns
+        -------
+        object or None
+            `None` if no object named `name` is in the cache.
+        """
+        try:
+            with open(str(self.path / (name + '.pkl')), 'rb') as f:
+                return _pickle.load(f)
+        except (OSError, EOFError, _pickle.UnpicklingError):
+            return None
+
+    def save(self, name, obj):
+        """
+        Save an object to the cache.
+
+        The object is written to a temporary file that is then renamed, so that
+        concurrent readers never see a partially written file.
+
+        Parameters
+        ----------
+        name : str
+            The object's name.
+
+        obj : object
+            The (picklable) object to save.
+
+        Returns
+        -------
+        None
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = _tempfile.mkstemp(dir=str(self.path), suffix='.tmp')
+        with _os.fdopen(fd, 'wb') as f:
+            _pickle.dump(obj, f, protocol=_pickle.HIGHEST_PROTOCOL)
+        _os.replace(tmp_path, str(self.path / (name + '.pkl')))
+
+    def atom(self, atom_index, create_atom_fn, *args):
+        """
+        Load an atom, or create and save it if it isn't cached.
+
+        Parameters
+        ----------
+        atom_index : int
+            The (global) index of the atom within its layout.
+
+        create_atom_fn : function
+            The function that creates the atom when it is called with `args`.
+
+        Returns
+        -------
+        _DistributableAtom
+        """
+        atom = self.load('atom%d' % atom_index)
+        if atom is None:
+            atom = create_atom_fn(*args)
+            self.save('atom%d' % atom_index, atom)  # before the layout updates the atom's indices
+        return atom
+
+
 class DistributableCOPALayout(_CircuitOutcomeProbabilityArrayLayout):
     """
     A circuit-outcome-probability-array (COPA) layout that is distributed among many processors.
@@ -247,6 +372,75 @@ class DistributableCOPALayout(_CircuitOutcomeProbabilityArrayLayout):
         integers mean more output.
     """
 
+    @classmethod
+    def _complete_circuits(cls, model, unique_circuits, previous_layout=None):
+        """ Complete `unique_circuits` using `model`, reusing the completed circuits of `previous_layout` """
+        if previous_layout is None or previous_layout.global_layout._unique_complete_circuits is None:
+            return [model.complete_circuit(c) for c in unique_circuits]
+
+        prev_global_layout = previous_layout.global_layout
+        previous_complete_circuits = {c: cc for c, cc in zip(prev_global_layout._unique_circuits,
+                                                             prev_global_layout._unique_complete_circuits)}
+        ret = []
+        for c in unique_circuits:
+            cc = previous_complete_circuits.get(c, None)
+            ret.append(model.complete_circuit(c) if (cc is None) else cc)
+        return ret
+
+    @classmethod
+    def _extend_groups(cls, previous_group_keys, keys, layertups, min_prefix_length=1):
+        """
+        Divide items into groups ("atoms") that extend the groups of a previous layout.
+
+        Items in a previous group are placed, in the same order, at the beginning of the
+        corresponding new group.  Every other item is appended to the group containing the
+        item with its longest prefix (of at least `min_prefix_length` layers), or to the
+        smallest group if there is no such prefix.
+
+        Parameters
+        ----------
+        previous_group_keys : list
+            A list of lists giving the keys of the items in each of the previous layout's groups.
+
+        keys : list
+            The (hashable) keys of the items to divide into groups.
+
+        layertups : list
+            A list of layer-label tuples, parallel to `keys`, used to find common prefixes.
+
+        min_prefix_length : int, optional
+            The minimum length of a common prefix that determines an item's group.
+
+        Returns
+        -------
+        list or None
+            A list of lists of indices into `keys`, or `None` if some previous item isn't present
+            in `keys` (so that the previous groups can't be extended).
+        """
+        index_by_key = {k: i for i, k in enumerate(keys)}
+        groups = []; group_by_layertup = {}; assigned = set()
+        for iGroup, group_keys in enumerate(previous_group_keys):
+            group = []
+            for k in group_keys:
+                i = index_by_key.get(k, None)
+                if i is None: return None  # previous item is missing => circuits aren't nested
+                if i in assigned: continue
+                group.append(i); assigned.add(i)
+                group_by_layertup[layertups[i]] = iGroup
+            groups.append(group)
+        if len(groups) == 0: return None
+
+        for i in sorted(set(range(len(keys))) - assigned, key=lambda i: len(layertups[i])):  # prefixes first
+            layertup = layertups[i]
+            for L in range(len(layertup), min_prefix_length - 1, -1):
+                iGroup = group_by_layertup.get(layertup[0:L], None)
+                if iGroup is not None: break
+            else:
+                iGroup = min(range(len(groups)), key=lambda j: len(groups[j]))
+            groups[iGroup].append(i)
+            group_by_layertup.setdefault(layertup, iGroup)
+        return groups
+
     def __init__(self, circuits, unique_circuits, to_unique, unique_complete_circuits,
                  create_atom_fn, create_atom_args, num_atom_processors,
                  num_param_dimension_processors=(), param_dimensions=(), param_dimension_blk_sizes=(),
@@ -1278,7 +1472,6 @@ class DistributableCOPALayout(_CircuitOutcomeProbabilityArrayLayout):
         -------
         None
         """
-        param_ralloc = self.resource_alloc('param-processing')  # acts on (element, param) blocks
         interatom_ralloc = self.resource_alloc('param-interatom')  # procs w/same param slice & diff atoms
 
         if interatom_ralloc.comm is None:  # only 1 atom, so no need to sum below
@@ -1286,6 +1479,21 @@ class DistributableCOPALayout(_CircuitOutcomeProbabilityArrayLayout):
             return
 
         local_jtf = _np.dot(j.T, f)  # need to sum this value across all atoms
+        self._allreduce_local_jtf(local_jtf, jtf)
+
+        #if param_comm.host_comm is not None and param_comm.host_comm.rank != 0:
+        #    return None  # this processor doesn't need to do any more - root host proc will fill returned shared mem
+
+    def _allreduce_local_jtf(self, local_jtf, jtf):
+        """
+        Sum a per-atom, `'jtf'`-like quantity over atoms and move it to the "fine" parameter distribution.
+        """
+        param_ralloc = self.resource_alloc('param-processing')  # acts on (element, param) blocks
+        interatom_ralloc = self.resource_alloc('param-interatom')  # procs w/same param slice & diff atoms
+
+        if interatom_ralloc.comm is None:  # only 1 atom, so no need to sum
+            jtf[:] = local_jtf[self.fine_param_subslice]
+            return
 
         # assume jtf is created from allocate_local_array('jtf', 'd')
         scratch, scratch_shm = _smt.create_shared_ndarray(
@@ -1296,8 +1504,68 @@ class DistributableCOPALayout(_CircuitOutcomeProbabilityArrayLayout):
         interatom_ralloc.comm.barrier()  # don't free scratch too early
         _smt.cleanup_shared_ndarray(scratch_shm)
 
-        #if param_comm.host_comm is not None and param_comm.host_comm.rank != 0:
-        #    return None  # this processor doesn't need to do any more - root host proc will fill returned shared mem
+    def fill_jtj_diag(self, j, jtj_diag):
+        """
+        Calculate the diagonal of the matrix-matrix product `j.T @ j` without forming the product.
+
+        This function performs any necessary MPI/shared-memory communication when the
+        arrays are distributed over multiple processors.
+
+        Parameters
+        ----------
+        j : LocalNumpyArray
+            A local 2D array (matrix) allocated using `allocate_local_array` with the `"ep"`
+            (jacobian) type.
+
+        jtj_diag : LocalNumpyArray
+            The result.  This must be a pre-allocated local array of type `"jtf"`.
+
+        Returns
+        -------
+        None
+        """
+        self._allreduce_local_jtf(_np.einsum('ij,ij->j', j, j), jtj_diag)
+
+    def fill_jv(self, j, v, jv):
+        """
+        Calculate the matrix-vector product `j @ v`.
+
+        Here `j` is often a jacobian matrix and `v` a global parameter-space vector,
+        so that the result holds the (local) objective function elements of a directional
+        derivative.  This function performs any necessary MPI/shared-memory communication
+        when the arrays are distributed over multiple processors.
+
+        Parameters
+        ----------
+        j : LocalNumpyArray
+            A local 2D array (matrix) allocated using `allocate_local_array` with the `"ep"`
+            (jacobian) type.
+
+        v : numpy.ndarray
+            A global (not distributed) vector of length `self.global_num_params`.
+
+        jv : numpy.ndarray
+            The result, a vector of the local elements, i.e. of length `j.shape[0]`.  This
+            need not be a shared-memory array.
+
+        Returns
+        -------
+        None
+        """
+        param_ralloc = self.resource_alloc('param-processing')  # acts on (element, param) blocks
+        atom_ralloc = self.resource_alloc('atom-processing')  # acts on (element,) blocks
+
+        local_jv = _np.dot(j, v[self.global_param_slice])  # need to sum this value across the atom's param slices
+        if atom_ralloc.comm is None:  # only 1 param slice, so no need to sum
+            jv[:] = local_jv
+            return
+
+        scratch, scratch_shm = _smt.create_shared_ndarray(atom_ralloc, (len(local_jv),), 'd')
+        atom_ralloc.comm.barrier()  # wait for scratch to be ready
+        atom_ralloc.allreduce_sum(scratch, local_jv, unit_ralloc=param_ralloc)
+        jv[:] = scratch
+        atom_ralloc.comm.barrier()  # don't free scratch too early
+        _smt.cleanup_shared_ndarray(scratch_shm)
 
     def _allocate_jtj_shared_mem_buf(self):
         """
@@ -30,11 +30,16 @@ def _walk_subtree(treedict, indx, running_inds):
 
 class EvalTree(list):
     @classmethod
-    def create(cls, circuits_to_evaluate):  # a class method instead of __init__ because we inherit from list
+    def create(cls, circuits_to_evaluate, previous_tree=None):  # a class method instead of __init__ b/c we inherit list
         """
         Note: circuits_to_evaluate can be either a list or an integer-keyed dict (for faster lookups), as we
         only take its length and index it.
 
+        If `previous_tree` is given, it must be a tree that was created for the first
+        `previous_tree.num_circuits` elements of `circuits_to_evaluate`.  Its instructions
+        are reused (with its scratch indices shifted to make room for the additional
+        circuits) and only the remaining circuits are added to the returned tree.
+
         Returns
         -------
         eval_tree : list
@@ -59,13 +64,18 @@ class EvalTree(list):
         evalDict = {}  # _collections.defaultdict(dict)
         evalDict_keys = []  # the sorted keys of evalDict
 
+        next_scratch_index = len(circuits_to_evaluate)
+        num_previous = 0
+        if previous_tree is not None:
+            num_previous = previous_tree.num_circuits
+            next_scratch_index = eval_tree._extend_from(previous_tree, circuits_to_evaluate, evalDict, evalDict_keys)
+
         #Process circuits in order of length, so that we always place short strings
         # in the right place (otherwise assert stmt below can fail)
         indices_sorted_by_circuit_len = \
-            sorted(list(range(len(circuits_to_evaluate))),
+            sorted(list(range(num_previous, len(circuits_to_evaluate))),
                    key=lambda i: len(circuits_to_evaluate[i]))
 
-        next_scratch_index = len(circuits_to_evaluate)
         for k in indices_sorted_by_circuit_len:
 
             circuit = circuits_to_evaluate[k]
@@ -186,8 +196,93 @@ class EvalTree(list):
                                     "(e.g. MapForwardSimulator).") % test_ratio)
                     break  # don't print multiple warnings about the same inefficient tree
 
+        eval_tree.num_circuits = len(circuits_to_evaluate)
         return eval_tree
 
+    def _extend_from(self, previous_tree, circuits_to_evaluate, eval_dict, eval_dict_keys):
+        """
+        Fill this (empty) tree with the instructions of `previous_tree` and rebuild its evaluation dictionary.
+
+        The scratch indices of `previous_tree` are shifted so that they begin at
+        `len(circuits_to_evaluate)`.  Returns the next available scratch index.
+        """
+        num_previous = previous_tree.num_circuits
+        if num_previous > len(circuits_to_evaluate):
+            raise ValueError("Previous tree contains more circuits (%d) than are being evaluated (%d)!"
+                             % (num_previous, len(circuits_to_evaluate)))
+        shift = len(circuits_to_evaluate) - num_previous
+
+        def new_index(i):
+            return i if (i < num_previous) else i + shift
+
+        layertups = {}  # new tree index => layer tuple
+        for iDest, iLeft, iRight in previous_tree:
+            iDest = new_index(iDest)
+            if iLeft is None:
+                self.append((iDest, None, iRight))  # iRight is an operation label (or None)
+                layertup = () if (iRight is None) else (iRight,)
+            else:
+                iLeft = new_index(iLeft); iRight = new_index(iRight)
+                self.append((iDest, iLeft, iRight))
+                layertup = layertups[iLeft] + layertups[iRight]
+            layertups[iDest] = layertup
+
+            L = len(layertup)
+            if L not in eval_dict:
+                eval_dict[L] = {}
+                _bisect.insort(eval_dict_keys, L)
+            eval_dict[L][layertup if L > 0 else None] = iDest
+
+        for k in range(num_previous):
+            circuit = circuits_to_evaluate[k]
+            if layertups[k] != (circuit.layertup if isinstance(circuit, _Circuit) else tuple(circuit)):
+                raise ValueError("Previous tree wasn't created for the leading circuits being evaluated!")
+
+        return len(previous_tree) + shift
+
+    def evaluation_levels(self):
+        """
+        Group the instructions of this tree into levels of mutually independent instructions.
+
+        An instruction's level is one more than the maximum level of the two tree items
+        it combines, and "initial" (length-0 and length-1) items have level 0.  This means
+        that all the instructions within a level can be evaluated simultaneously, e.g. as a
+        single stacked matrix product, once all the preceding levels have been evaluated.
+        The computed schedule is cached, as it only depends on the tree's structure.
+
+        Returns
+        -------
+        initial_items : list
+            A list of `(iDest, op_label)` tuples giving the level-0 items of this tree.  An
+            `op_label` of `None` denotes the empty (length-0) circuit.
+
+        levels : list
+            A list of `(iDest, iLeft, iRight)` tuples of integer arrays, one per level > 0 and
+            in evaluation order, such that for each `k` the instruction
+            `(iDest[k], iLeft[k], iRight[k])` belongs to this tree.
+        """
+        cached = getattr(self, '_evaluation_levels', None)
+        if cached is not None and cached[0] == len(self):
+            return cached[1], cached[2]
+
+        item_levels = _np.zeros(len(self), _np.int64)
+        initial_items = []; instructions_by_level = {}
+        for iDest, iLeft, iRight in self:
+            if iLeft is None:
+                initial_items.append((iDest, iRight))  # iRight is an operation label (or None)
+                continue
+            lvl = max(item_levels[iLeft], item_levels[iRight]) + 1
+            item_levels[iDest] = lvl
+            instructions_by_level.setdefault(lvl, []).append((iDest, iLeft, iRight))
+
+        levels = []
+        for lvl in sorted(instructions_by_level.keys()):
+            instructions = _np.array(instructions_by_level[lvl], _np.int64)
+            levels.append((instructions[:, 0].copy(), instructions[:, 1].copy(), instructions[:, 2].copy()))
+
+        self._evaluation_levels = (len(self), initial_items, levels)
+        return initial_items, levels
+
     def _create_single_item_trees(self, num_elements):
         # num_elements == number of elements *to evaluate* (can be < len(self))
         #  Create disjoint set of subtrees generated by single items
@@ -12,8 +12,10 @@ Defines the MapCOPALayout class.
 
 import collections as _collections
 
+from pygsti.baseobjs.verbosityprinter import VerbosityPrinter as _VerbosityPrinter
 from pygsti.layouts.distlayout import DistributableCOPALayout as _DistributableCOPALayout
 from pygsti.layouts.distlayout import _DistributableAtom
+from pygsti.layouts.distlayout import _LayoutCache
 from pygsti.layouts.prefixtable import PrefixTable as _PrefixTable
 from pygsti.circuits.circuitlist import CircuitList as _CircuitList
 from pygsti.tools import listtools as _lt
@@ -48,21 +50,41 @@ class _MapCOPALayoutAtom(_DistributableAtom):
 
     max_cache_size : int
         The maximum allowed cache size, given as number of quantum states.
+
+    table_method : {"sorted", "trie"}
+        How this atom's :class:`PrefixTable` is constructed.
+
+    previous_atom : _MapCOPALayoutAtom, optional
+        An atom of a previous layout, created with the same model and dataset, whose circuits
+        are the leading elements of `group`.  Its circuit expansions are reused and its prefix
+        table is extended rather than rebuilt.
     """
 
     def __init__(self, unique_complete_circuits, ds_circuits, group, model,
-                 dataset, max_cache_size):
+                 dataset, max_cache_size, table_method="sorted", previous_atom=None):
 
+        previous_expansions = previous_atom._expanded_circuit_infos if (previous_atom is not None) else {}
+        self._expanded_circuit_infos = _collections.OrderedDict()  # (complete circuit, ds circuit) => expansion
         expanded_circuit_info_by_unique = _collections.OrderedDict()
         expanded_circuit_set = _collections.OrderedDict()  # only use SeparatePOVMCircuit keys as ordered set
         for i in group:
-            observed_outcomes = None if (dataset is None) else dataset[ds_circuits[i]].outcomes
-            d = unique_complete_circuits[i].expand_instruments_and_separate_povm(model, observed_outcomes)
+            key = (unique_complete_circuits[i], ds_circuits[i])
+            d = previous_expansions.get(key, None)
+            if d is None:
+                observed_outcomes = None if (dataset is None) else dataset[ds_circuits[i]].outcomes
+                d = unique_complete_circuits[i].expand_instruments_and_separate_povm(model, observed_outcomes)
             expanded_circuit_info_by_unique[i] = d  # a dict of SeparatePOVMCircuits => tuples of outcome labels
             expanded_circuit_set.update(d)
+            self._expanded_circuit_infos[key] = d
 
         expanded_circuits = list(expanded_circuit_set.keys())
-        self.table = _PrefixTable(expanded_circuits, max_cache_size)
+        previous_table = None
+        if previous_atom is not None:
+            nPrev = len(previous_atom._expanded_circuits)
+            if expanded_circuits[0:nPrev] == previous_atom._expanded_circuits:
+                previous_table = previous_atom.table
+        self._expanded_circuits = expanded_circuits
+        self.table = _PrefixTable(expanded_circuits, max_cache_size, table_method, previous_table)
 
         #Create circuit element <=> integer index lookups for speed
         all_rholabels = set()
@@ -76,7 +98,7 @@ class _MapCOPALayoutAtom(_DistributableAtom):
 
         self.rho_labels = sorted(all_rholabels)
         self.op_labels = sorted(all_oplabels)
-        self.full_effect_labels = all_elabels
+        self.full_effect_labels = sorted(all_elabels)  # a fixed order (not a set) so elabel_lookup survives pickling
         self.elabel_lookup = {elbl: i for i, elbl in enumerate(self.full_effect_labels)}
 
         #Lookup arrays for faster replib computation.
@@ -171,6 +193,19 @@ class MapCOPALayout(_DistributableCOPALayout):
         The number of groups ("sub-tables") to divide the circuits into.  This is the
         number of *atoms* for this layout.
 
+    table_method : {"sorted", "trie"}, optional
+        How each atom's prefix table is constructed.  `"sorted"` caches the states of
+        circuits that are prefixes of other circuits, whereas `"trie"` also caches
+        shared prefixes that aren't themselves circuits, choosing the cached states
+        by the number of layer applications they save.  See :class:`PrefixTable`.
+
+    previous_layout : MapCOPALayout, optional
+        A layout created using the same model, dataset and processor distribution for a
+        subset of `circuits` (e.g. the circuits of the previous iteration of iterative GST).
+        When it has the same number of atoms, its atoms' circuits keep their atom, the other
+        circuits are added to the atom holding their longest prefix, and the atoms' prefix
+        tables and circuit expansions are extended rather than rebuilt.
+
     num_table_processors : int, optional
         The number of atom-processors, i.e. groups of processors that process sub-tables.
 
@@ -197,24 +232,50 @@ class MapCOPALayout(_DistributableCOPALayout):
     verbosity : int or VerbosityPrinter
         Determines how much output to send to stdout.  0 means no output, higher
         integers mean more output.
+
+    layout_cache_dir : str or Path, optional
+        A directory used to cache this layout's circuit groups and atoms on disk.  If
+        a layout with the same circuits, observed outcomes, model structure, cache settings
+        and processor distribution was previously cached there, its groups and atoms are
+        loaded instead of being recomputed (and `previous_layout` is ignored).
     """
 
     def __init__(self, circuits, model, dataset=None, max_cache_size=None,
                  num_sub_tables=None, num_table_processors=1, num_param_dimension_processors=(),
-                 param_dimensions=(), param_dimension_blk_sizes=(), resource_alloc=None, verbosity=0):
+                 param_dimensions=(), param_dimension_blk_sizes=(), resource_alloc=None, verbosity=0,
+                 table_method="sorted", previous_layout=None, layout_cache_dir=None):
 
         unique_circuits, to_unique = self._compute_unique_circuits(circuits)
         aliases = circuits.op_label_aliases if isinstance(circuits, _CircuitList) else None
         ds_circuits = _lt.apply_aliases_to_circuits(unique_circuits, aliases)
-        unique_complete_circuits = [model.complete_circuit(c) for c in unique_circuits]
+        unique_complete_circuits = self._complete_circuits(model, unique_circuits, previous_layout)
         unique_povmless_circuits = [model.split_circuit(c, split_prep=False)[1] for c in unique_complete_circuits]
+        circuit_keys = list(zip(unique_complete_circuits, ds_circuits))
+
+        groups = None
+        cache = _LayoutCache(layout_cache_dir, 'map', model, unique_complete_circuits, ds_circuits, dataset,
+                             (max_cache_size, table_method, num_sub_tables, num_table_processors,
+                              tuple(num_param_dimension_processors), tuple(param_dimensions),
+                              tuple(param_dimension_blk_sizes))) \
+            if (layout_cache_dir is not None) else None
+        cached_groups = cache.load('groups') if (cache is not None) else None
+        if cached_groups is not None:
+            groups = cached_groups
+            previous_layout = None  # cached atoms are loaded rather than extended
+        elif previous_layout is not None and len(previous_layout._group_keys) == max(num_sub_tables or 1, 1):
+            groups = self._extend_groups(previous_layout._group_keys, circuit_keys,
+                                         [c.layertup for c in unique_povmless_circuits], min_prefix_length=2)
 
         max_sub_table_size = None  # was an argument but never used; remove in future
-        if (num_sub_tables is not None and num_sub_tables > 1) or max_sub_table_size is not None:
+        if groups is not None:
+            pass  # groups were loaded from the cache or extend those of `previous_layout`
+        elif (num_sub_tables is not None and num_sub_tables > 1) or max_sub_table_size is not None:
             circuit_table = _PrefixTable(unique_povmless_circuits, max_cache_size)
             groups = circuit_table.find_splitting(max_sub_table_size, num_sub_tables, verbosity=verbosity)
         else:
             groups = [set(range(len(unique_complete_circuits)))]
+        if cache is not None and cached_groups is None:
+            cache.save('groups', groups)
 
         #atoms = []
         #elindex_outcome_tuples = _collections.OrderedDict(
@@ -226,12 +287,24 @@ class MapCOPALayout(_DistributableCOPALayout):
         #                                    model, dataset, offset, elindex_outcome_tuples, max_cache_size))
         #    offset += atoms[-1].num_elements
 
+        self._group_keys = [[circuit_keys[i] for i in group] for group in groups]
+        previous_atoms = {}  # first circuit key => atom of `previous_layout` (only those on this processor)
+        if previous_layout is not None:
+            previous_atoms = {next(iter(atom._expanded_circuit_infos)): atom for atom in previous_layout.atoms
+                              if len(atom._expanded_circuit_infos) > 0}
+
         def _create_atom(group):
+            previous_atom = previous_atoms.get(circuit_keys[next(iter(group))], None) if len(group) > 0 else None
             return _MapCOPALayoutAtom(unique_complete_circuits, ds_circuits, group,
-                                      model, dataset, max_cache_size)
+                                      model, dataset, max_cache_size, table_method, previous_atom)
+
+        def _load_or_create_atom(args):
+            i, group = args
+            return cache.atom(i, _create_atom, group)
 
         super().__init__(circuits, unique_circuits, to_unique, unique_complete_circuits,
-                         _create_atom, groups, num_table_processors,
+                         _create_atom if (cache is None) else _load_or_create_atom,
+                         groups if (cache is None) else list(enumerate(groups)), num_table_processors,
                          num_param_dimension_processors, param_dimensions,
                          param_dimension_blk_sizes, resource_alloc, verbosity)
 
@@ -243,3 +316,18 @@ class MapCOPALayout(_DistributableCOPALayout):
         for atom in self.atoms:
             for expanded_circuit_i, unique_i in atom.unique_indices_by_expcircuit.items():
                 atom.orig_indices_by_expcircuit[expanded_circuit_i] = unique_to_orig[unique_i]
+
+        printer = _VerbosityPrinter.create_printer(verbosity, resource_alloc)
+        printer.log("MapLayout: %d local atoms require %d layer applications (%d saved by caching %d states)" %
+                    (len(self.atoms), self.num_applies, self.num_applies_saved,
+                     sum([atom.cache_size for atom in self.atoms])), 2)
+
+    @property
+    def num_applies(self):
+        """ The number of layer applications (`acton` calls) needed to evaluate this layout's local atoms """
+        return sum([atom.table.num_applies for atom in self.atoms])
+
+    @property
+    def num_applies_saved(self):
+        """ The number of layer applications (`acton` calls) saved by caching within this layout's local atoms """
+        return sum([atom.table.num_applies_saved for atom in self.atoms])
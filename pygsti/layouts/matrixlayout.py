@@ -16,6 +16,7 @@ import numpy as _np
 
 from pygsti.layouts.distlayout import DistributableCOPALayout as _DistributableCOPALayout
 from pygsti.layouts.distlayout import _DistributableAtom
+from pygsti.layouts.distlayout import _LayoutCache
 from pygsti.layouts.evaltree import EvalTree as _EvalTree
 from pygsti.circuits.circuitlist import CircuitList as _CircuitList
 from pygsti.tools import listtools as _lt
@@ -65,10 +66,18 @@ class _MatrixCOPALayoutAtom(_DistributableAtom):
     dataset : DataSet
         The dataset, used to include only observed circuit outcomes in this atom
         and therefore the parent layout.
+
+    previous_atom : _MatrixCOPALayoutAtom, optional
+        An atom of a previous layout, created with the same model and dataset, whose circuits
+        are the leading elements of `group`.  Its circuit expansions are reused and, when this
+        atom has no helpful scratch circuits, its evaluation tree is extended rather than rebuilt.
     """
 
     def __init__(self, unique_complete_circuits, unique_nospam_circuits, circuits_by_unique_nospam_circuits,
-                 ds_circuits, group, helpful_scratch, model, dataset):
+                 ds_circuits, group, helpful_scratch, model, dataset, previous_atom=None):
+
+        previous_expansions = previous_atom._expanded_circuit_infos if (previous_atom is not None) else {}
+        self._expanded_circuit_infos = {}  # (complete circuit, ds circuit) => expansion
 
         #Note: group gives unique_nospam_circuits indices, which circuits_by_unique_nospam_circuits
         # turns into "unique complete circuit" indices, which the layout via it's to_unique can map
@@ -78,9 +87,14 @@ class _MatrixCOPALayoutAtom(_DistributableAtom):
             for i in indices:
                 nospam_c = unique_nospam_circuits[i]
                 for unique_i in circuits_by_unique_nospam_circuits[nospam_c]:  # "unique" circuits: add SPAM to nospam_c
-                    observed_outcomes = None if (dataset is None) else dataset[ds_circuits[unique_i]].unique_outcomes
-                    expc_outcomes = unique_complete_circuits[unique_i].expand_instruments_and_separate_povm(
-                        model, observed_outcomes)
+                    key = (unique_complete_circuits[unique_i], ds_circuits[unique_i])
+                    expc_outcomes = previous_expansions.get(key, None)
+                    if expc_outcomes is None:
+                        observed_outcomes = None if (dataset is None) else \
+                            dataset[ds_circuits[unique_i]].unique_outcomes
+                        expc_outcomes = unique_complete_circuits[unique_i].expand_instruments_and_separate_povm(
+                            model, observed_outcomes)
+                    self._expanded_circuit_infos[key] = expc_outcomes
                     #Note: unique_complete_circuits may have duplicates (they're only unique *pre*-completion)
 
                     for sep_povm_c, outcomes in expc_outcomes.items():  # for each expanded cir from unique_i-th circuit
@@ -128,7 +142,16 @@ class _MatrixCOPALayoutAtom(_DistributableAtom):
             cir.done_editing()
             double_expanded_nospam_circuits_plus_scratch[i] = cir
 
-        self.tree = _EvalTree.create(double_expanded_nospam_circuits_plus_scratch)
+        previous_tree = None
+        if previous_atom is not None and len(helpful_scratch) == 0:
+            nPrev = len(previous_atom._double_expanded_circuits)
+            if [double_expanded_nospam_circuits_plus_scratch[i] for i in range(min(nPrev, len(
+                    double_expanded_nospam_circuits_plus_scratch)))] == previous_atom._double_expanded_circuits:
+                previous_tree = previous_atom.tree
+        self._double_expanded_circuits = list(double_expanded_nospam_circuits_plus_scratch.values()) \
+            if len(helpful_scratch) == 0 else []  # only needed to extend the tree (which requires no scratch)
+
+        self.tree = _EvalTree.create(double_expanded_nospam_circuits_plus_scratch, previous_tree)
         #print("Atom tree: %d circuits => tree of size %d" % (len(expanded_nospam_circuits), len(self.tree)))
 
         self._num_nonscratch_tree_items = len(expanded_nospam_circuits)  # put this in EvalTree?
@@ -271,11 +294,24 @@ class MatrixCOPALayout(_DistributableCOPALayout):
     verbosity : int or VerbosityPrinter
         Determines how much output to send to stdout.  0 means no output, higher
         integers mean more output.
+
+    previous_layout : MatrixCOPALayout, optional
+        A layout created using the same model, dataset and processor distribution for a
+        subset of `circuits` (e.g. the circuits of the previous iteration of iterative GST).
+        When both layouts consist of a single atom, the previous atom's evaluation tree and
+        circuit expansions are extended rather than rebuilt.
+
+    layout_cache_dir : str or Path, optional
+        A directory used to cache this layout's circuit groups and atoms on disk.  If
+        a layout with the same circuits, observed outcomes, model structure and processor
+        distribution was previously cached there, its groups and atoms are loaded instead
+        of being recomputed (and `previous_layout` is ignored).
     """
 
     def __init__(self, circuits, model, dataset=None, num_sub_trees=None, num_tree_processors=1,
                  num_param_dimension_processors=(), param_dimensions=(),
-                 param_dimension_blk_sizes=(), resource_alloc=None, verbosity=0):
+                 param_dimension_blk_sizes=(), resource_alloc=None, verbosity=0, previous_layout=None,
+                 layout_cache_dir=None):
 
         #OUTDATED: TODO - revise this:
         # 1. pre-process => get complete circuits => spam-tuples list for each no-spam circuit (no expanding yet)
@@ -290,7 +326,7 @@ class MatrixCOPALayout(_DistributableCOPALayout):
         unique_circuits, to_unique = self._compute_unique_circuits(circuits)
         aliases = circuits.op_label_aliases if isinstance(circuits, _CircuitList) else None
         ds_circuits = _lt.apply_aliases_to_circuits(unique_circuits, aliases)
-        unique_complete_circuits = [model.complete_circuit(c) for c in unique_circuits]
+        unique_complete_circuits = self._complete_circuits(model, unique_circuits, previous_layout)
         #Note: "unique" means a unique circuit *before* circuit-completion, so there could be duplicate
         # "unique circuits" after completion, e.g. "rho0Gx" and "Gx" could both complete to "rho0GxMdefault_0".
 
@@ -305,7 +341,24 @@ class MatrixCOPALayout(_DistributableCOPALayout):
 
         # Split circuits into groups that will make good subtrees (all procs do this)
         max_sub_tree_size = None  # removed from being an argument (unused)
-        if (num_sub_trees is not None and num_sub_trees > 1) or max_sub_tree_size is not None:
+        groups = None
+        cache = _LayoutCache(layout_cache_dir, 'matrix', model, unique_complete_circuits, ds_circuits, dataset,
+                             (num_sub_trees, num_tree_processors, tuple(num_param_dimension_processors),
+                              tuple(param_dimensions), tuple(param_dimension_blk_sizes))) \
+            if (layout_cache_dir is not None) else None
+        cached_groups = cache.load('groups') if (cache is not None) else None
+        if cached_groups is not None:
+            groups, helpful_scratch = cached_groups
+            previous_layout = None  # cached atoms are loaded rather than extended
+        elif previous_layout is not None and len(previous_layout._group_keys) == 1 and (num_sub_trees or 1) == 1:
+            # a single atom that extends the previous (single) atom - its circuits come first
+            groups = self._extend_groups(previous_layout._group_keys, unique_nospam_circuits,
+                                         [c.layertup for c in unique_nospam_circuits])
+            helpful_scratch = [set()]
+
+        if groups is not None:
+            pass  # groups were loaded from the cache or extend those of `previous_layout`
+        elif (num_sub_trees is not None and num_sub_trees > 1) or max_sub_tree_size is not None:
             circuit_tree = _EvalTree.create(unique_nospam_circuits)
             groups, helpful_scratch = circuit_tree.find_splitting(len(unique_nospam_circuits),
                                                                   max_sub_tree_size, num_sub_trees, verbosity - 1)
@@ -314,6 +367,8 @@ class MatrixCOPALayout(_DistributableCOPALayout):
             groups = [set(range(len(unique_nospam_circuits)))]
             helpful_scratch = [set()]
         # (elements of `groups` contain indices into `unique_nospam_circuits`)
+        if cache is not None and cached_groups is None:
+            cache.save('groups', (groups, helpful_scratch))
 
         # Divide `groups` into num_tree_processors roughly equal sets (each containing
         # potentially multiple groups)
@@ -334,13 +389,23 @@ class MatrixCOPALayout(_DistributableCOPALayout):
         #                                       elindex_outcome_tuples))
         #    offset += my_atoms[-1].num_elements
 
+        self._group_keys = [[unique_nospam_circuits[i] for i in group] for group in groups]
+        previous_atom = previous_layout.atoms[0] if (previous_layout is not None and len(groups) == 1
+                                                     and len(previous_layout.atoms) == 1) else None
+
         def _create_atom(args):
             group, helpful_scratch_group = args
             return _MatrixCOPALayoutAtom(unique_complete_circuits, unique_nospam_circuits,
                                          circuits_by_unique_nospam_circuits, ds_circuits,
-                                         group, helpful_scratch_group, model, dataset)
+                                         group, helpful_scratch_group, model, dataset, previous_atom)
+
+        def _load_or_create_atom(args):
+            i, atom_args = args
+            return cache.atom(i, _create_atom, atom_args)
 
+        atom_args = list(zip(groups, helpful_scratch))
         super().__init__(circuits, unique_circuits, to_unique, unique_complete_circuits,
-                         _create_atom, list(zip(groups, helpful_scratch)), num_tree_processors,
+                         _create_atom if (cache is None) else _load_or_create_atom,
+                         atom_args if (cache is None) else list(enumerate(atom_args)), num_tree_processors,
                          num_param_dimension_processors, param_dimensions,
                          param_dimension_blk_sizes, resource_alloc, verbosity)
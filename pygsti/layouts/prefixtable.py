@@ -11,6 +11,9 @@ Defines the PrefixTable class.
 #***************************************************************************************************
 
 import collections as _collections
+import heapq as _heapq
+
+import numpy as _np
 
 from pygsti.circuits.circuit import SeparatePOVMCircuit as _SeparatePOVMCircuit
 
@@ -21,7 +24,7 @@ class PrefixTable(object):
 
     """
 
-    def __init__(self, circuits_to_evaluate, max_cache_size):
+    def __init__(self, circuits_to_evaluate, max_cache_size, method="sorted", previous_table=None):
         """
         Creates a "prefix table" for evaluating a set of circuits.
 
@@ -35,20 +38,55 @@ class PrefixTable(object):
         later reference as an iStart value).  The ordering of the returned list
         specifies the evaluation order.
 
-        `iDest` is always in the range [0,len(circuits_to_evaluate)-1], and
-        indexes the result computed for each of the circuits.
+        `iDest` is either in the range [0,len(circuits_to_evaluate)-1], and
+        indexes the result computed for each of the circuits, or is `None`,
+        indicating a shared prefix that isn't itself one of the circuits but whose
+        state is computed only so that it can be cached (these are only created by
+        the `"trie"` method).
 
-        Returns
-        -------
-        tuple
-            A tuple of `(table_contents, cache_size)` where `table_contents` is a list
-            of tuples as given above and `cache_size` is the total size of the state
-            cache used to hold intermediate results.
+        Parameters
+        ----------
+        circuits_to_evaluate : list
+            A list of :class:`Circuit` or :class:`SeparatePOVMCircuit` objects.
+
+        max_cache_size : int
+            The maximum number of states that may be cached.  `None` means there is no limit.
+
+        method : {"sorted", "trie"}
+            How the table is constructed.  `"sorted"` sorts the circuits and caches the
+            states of circuits that are prefixes of later ones.  `"trie"` builds a prefix
+            trie of the circuits and caches the (possibly synthetic) shared-prefix states
+            that save the most layer applications.
+
+        previous_table : PrefixTable, optional
+            A table that was created for the first `previous_table.num_circuits` elements of
+            `circuits_to_evaluate`.  If given, this table's contents begin with those of
+            `previous_table` and the remaining circuits are appended, each starting from the
+            longest already-evaluated prefix (caching that prefix's state if it wasn't already
+            cached and the cache isn't full).  In this case `method` is ignored.
         """
-        #Sort the operation sequences "alphabetically", so that it's trivial to find common prefixes
-        circuits_to_evaluate_fastlookup = {i: cir for i, cir in enumerate(circuits_to_evaluate)}
         circuits_to_sort_by = [cir.circuit_without_povm if isinstance(cir, _SeparatePOVMCircuit) else cir
                                for cir in circuits_to_evaluate]  # always Circuits - not SeparatePOVMCircuits
+        # number of layer applications (ignoring the leading state prep) needed to evaluate without any caching
+        self._num_uncached_applies = sum([max(len(cir) - 1, 0) for cir in circuits_to_sort_by])
+
+        self.num_circuits = len(circuits_to_evaluate)
+
+        if previous_table is not None:
+            self.contents, self.cache_size = self._extend_table(previous_table, circuits_to_evaluate,
+                                                                circuits_to_sort_by, max_cache_size)
+        elif method == "sorted":
+            self.contents, self.cache_size = self._create_sorted_table(circuits_to_evaluate, circuits_to_sort_by,
+                                                                       max_cache_size)
+        elif method == "trie":
+            self.contents, self.cache_size = self._create_trie_table(circuits_to_evaluate, circuits_to_sort_by,
+                                                                     max_cache_size)
+        else:
+            raise ValueError("Unknown prefix table method: %s" % str(method))
+
+    def _create_sorted_table(self, circuits_to_evaluate, circuits_to_sort_by, max_cache_size):
+        #Sort the operation sequences "alphabetically", so that it's trivial to find common prefixes
+        circuits_to_evaluate_fastlookup = {i: cir for i, cir in enumerate(circuits_to_evaluate)}
         sorted_circuits_to_sort_by = sorted(list(enumerate(circuits_to_sort_by)), key=lambda x: x[1])
         sorted_circuits_to_evaluate = [(i, circuits_to_evaluate_fastlookup[i]) for i, _ in sorted_circuits_to_sort_by]
 
@@ -116,12 +154,213 @@ class PrefixTable(object):
         # (beyond the #circuits index) which computes
         # the shared prefix and insert this into the eval
         # order.
-        self.contents = table_contents
-        self.cache_size = curCacheSize
+        return table_contents, curCacheSize
+
+    def _extend_table(self, previous_table, circuits_to_evaluate, circuits_to_sort_by, max_cache_size):
+        num_previous = previous_table.num_circuits
+        if num_previous > len(circuits_to_evaluate):
+            raise ValueError("Previous table contains more circuits (%d) than are being evaluated (%d)!"
+                             % (num_previous, len(circuits_to_evaluate)))
+        table_contents = list(previous_table.contents)
+        cache_size = previous_table.cache_size
+        cached_layertups = [None] * cache_size
+
+        #Record the layers of each evaluated item so they can be used as prefixes of the new circuits
+        item_by_layertup = {}  # layer tuple => index into table_contents
+        for k, (iDest, iStart, remainder, iCache) in enumerate(table_contents):
+            if isinstance(remainder, _SeparatePOVMCircuit): remainder = remainder.circuit_without_povm
+            layertup = remainder.layertup if (iStart is None) else cached_layertups[iStart] + remainder.layertup
+            if iCache is not None: cached_layertups[iCache] = layertup
+            if iDest is not None and iDest < num_previous and layertup != circuits_to_sort_by[iDest].layertup:
+                raise ValueError("Previous table wasn't created for the leading circuits being evaluated!")
+            item_by_layertup.setdefault(layertup, k)
+
+        #Add the new circuits in sorted order, so that prefixes are added before the circuits that extend them
+        new_indices = sorted(range(num_previous, len(circuits_to_evaluate)), key=lambda i: circuits_to_sort_by[i])
+        for i in new_indices:
+            layertup = circuits_to_sort_by[i].layertup
+            iStart = None; Lc = 0
+            for L in range(len(layertup), 0, -1):  # find longest already-evaluated prefix
+                k = item_by_layertup.get(layertup[0:L], None)
+                if k is None: continue
+                kDest, kStart, kRemainder, kCache = table_contents[k]
+                if kCache is None:
+                    if max_cache_size is not None and cache_size >= max_cache_size: continue  # can't cache it
+                    kCache = cache_size; cache_size += 1
+                    table_contents[k] = (kDest, kStart, kRemainder, kCache)  # now store this state in the cache
+                iStart = kCache; Lc = L
+                break
+
+            table_contents.append((i, iStart, circuits_to_evaluate[i][Lc:], None))
+            item_by_layertup.setdefault(layertup, len(table_contents) - 1)
+
+        return table_contents, cache_size
+
+    def _create_trie_table(self, circuits_to_evaluate, circuits_to_sort_by, max_cache_size):
+        #Build a trie of the circuits' layers (the first layer of each circuit is its state prep).
+        root = _PrefixTrieNode(None, 0, None)
+        for i, cir in sorted(enumerate(circuits_to_sort_by), key=lambda x: x[1]):
+            node = root
+            for layer_lbl in cir.layertup:
+                child = node.children.get(layer_lbl, None)
+                if child is None:
+                    child = node.children[layer_lbl] = _PrefixTrieNode(node, node.depth + 1, i)
+                node = child
+            node.circuit_indices.append(i)
+
+        #Compute the "flow" through each node: the number of propagations that pass through it
+        # (and would start from its state if it were cached) - computed bottom-up with no caching.
+        nodes = []  # in depth-first pre-order, so parents come before children
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(reversed(node.children.values()))
+        for node in reversed(nodes):
+            node.flow = len(node.circuit_indices) + sum([child.flow for child in node.children.values()])
+
+        def nearest_cached_depth(node):
+            node = node.parent
+            while node.depth > 1 and not node.cached:
+                node = node.parent
+            return max(node.depth, 1)  # the state prep (depth 1) is always "cached"
+
+        def savings(node):
+            # layer applications saved by caching `node`: each of its flow-1 *other* consumers starts from it
+            # rather than from its nearest cached ancestor (computing node's state once is unavoidable).
+            return (node.depth - nearest_cached_depth(node)) * (node.flow - 1)
+
+        #Choose which nodes to cache greedily by savings.  Every cached state requires the same amount of
+        # memory, so this is also a ranking by savings per byte.  Caching a node can only reduce the savings
+        # of other nodes (its ancestors' flows and its descendants' distances to a cached state decrease),
+        # so stale heap entries are lazily re-evaluated before being accepted.
+        heap = [(-savings(node), k, node) for k, node in enumerate(nodes) if node.depth > 1 and node.flow > 1]
+        _heapq.heapify(heap)
+        num_cached = 0
+        while heap and (max_cache_size is None or num_cached < max_cache_size):
+            neg_saved, k, node = _heapq.heappop(heap)
+            saved = savings(node)
+            if saved <= 0: continue
+            if saved < -neg_saved and heap and saved < -heap[0][0]:
+                _heapq.heappush(heap, (-saved, k, node))  # stale entry: re-evaluate against the others
+                continue
+
+            node.cached = True; num_cached += 1
+            delta = node.flow - 1  # consumers below `node` now start from `node` instead of passing through it
+            ancestor = node.parent
+            while ancestor.depth > 1:
+                ancestor.flow -= delta
+                if ancestor.cached: break
+                ancestor = ancestor.parent
+
+        #Build the table by a depth-first traversal, so each cached state is computed before it's used.
+        table_contents = []
+        cache_size = 0
+        stack = [(root, None, 0)]  # (node, cache index of nearest cached ancestor, depth of that ancestor)
+        while stack:
+            node, iStart, start_depth = stack.pop()
+            iCache = None
+            if node.cached:
+                iCache = cache_size; cache_size += 1
+                if len(node.circuit_indices) == 0:  # a synthetic shared-prefix item
+                    table_contents.append((None, iStart, circuits_to_evaluate[node.rep_index][start_depth:node.depth],
+                                           iCache))
+            for i in node.circuit_indices:
+                table_contents.append((i, iStart, circuits_to_evaluate[i][start_depth:], iCache))
+                if iCache is not None:  # any other circuits at this node just use the cached state
+                    iStart, start_depth, iCache = iCache, node.depth, None
+
+            if node.cached:
+                iStart, start_depth = cache_size - 1, node.depth
+            stack.extend([(child, iStart, start_depth) for child in reversed(node.children.values())])
+
+        return table_contents, cache_size
 
     def __len__(self):
         return len(self.contents)
 
+    @property
+    def num_applies(self):
+        """
+        The number of layer applications (`acton` calls) needed to evaluate this table.
+
+        Returns
+        -------
+        int
+        """
+        return sum([len(remainder) - (1 if iStart is None else 0) for _, iStart, remainder, _ in self.contents])
+
+    @property
+    def num_applies_saved(self):
+        """
+        The number of layer applications (`acton` calls) saved by this table's caching.
+
+        This is relative to evaluating each of the table's circuits separately.
+
+        Returns
+        -------
+        int
+        """
+        return self._num_uncached_applies - self.num_applies
+
+    def evaluation_batches(self, max_batch_size=None):
+        """
+        Group the items of this table into batches whose states can be propagated together.
+
+        An item's "level" is one more than the level of the item whose cached state it
+        starts from, and items that begin with a state preparation have level 0.  Items
+        within the same level don't depend on one another, so a level's items can be
+        propagated simultaneously, layer by layer, applying each distinct layer to all
+        the states that need it next at once (e.g. using an operation rep's `acton_batch`).
+        The computed batches are cached, as they only depend on the table's structure.
+
+        Parameters
+        ----------
+        max_batch_size : int, optional
+            The maximum number of items in a single batch.  Levels with more items
+            than this are split into multiple batches.  `None` means no limit.
+
+        Returns
+        -------
+        list
+            A list of `(table_indices, steps)` tuples in evaluation order.  `table_indices`
+            is a list of indices into this table's `contents`.  `steps` contains one element
+            per layer position (not counting any leading state preparation), and each element
+            is a list of `(layer_label, batch_indices)` tuples, where `batch_indices` is an
+            integer array of the positions within `table_indices` of the items whose next
+            layer is `layer_label`.
+        """
+        cache = self.__dict__.setdefault('_evaluation_batches', {})
+        if max_batch_size in cache:
+            return cache[max_batch_size]
+
+        items_by_level = _collections.defaultdict(list)
+        cache_levels = {}  # level of the item stored at each cache index
+        for k, (iDest, iStart, remainder, iCache) in enumerate(self.contents):
+            lvl = 0 if (iStart is None) else cache_levels[iStart] + 1
+            if iCache is not None: cache_levels[iCache] = lvl
+            items_by_level[lvl].append(k)
+
+        batches = []
+        for lvl in sorted(items_by_level.keys()):
+            level_items = items_by_level[lvl]
+            batch_size = len(level_items) if (max_batch_size is None) else max(max_batch_size, 1)
+            for i in range(0, len(level_items), batch_size):
+                table_indices = level_items[i:i + batch_size]
+                steps = []
+                for j, k in enumerate(table_indices):
+                    _, iStart, remainder, _ = self.contents[k]
+                    if isinstance(remainder, _SeparatePOVMCircuit): remainder = remainder.circuit_without_povm
+                    layers = remainder.layertup if (iStart is not None) else remainder.layertup[1:]  # skip prep
+                    for t, layer_lbl in enumerate(layers):
+                        if t == len(steps): steps.append(_collections.OrderedDict())
+                        steps[t].setdefault(layer_lbl, []).append(j)
+                steps = [[(layer_lbl, _np.array(js, _np.int64)) for layer_lbl, js in step.items()] for step in steps]
+                batches.append((table_indices, steps))
+
+        cache[max_batch_size] = batches
+        return batches
+
     def find_splitting(self, max_sub_table_size=None, num_sub_tables=None, cost_metric="size", verbosity=0):
         """
         Find a partition of the indices of this table to define a set of sub-tables with the desire properties.
@@ -150,6 +389,8 @@ class PrefixTable(object):
             A list of sets of elements to place in sub-tables.
         """
         table_contents = self.contents
+        if any([iDest is None for iDest, _, _, _ in table_contents]):
+            raise ValueError("Cannot split a prefix table containing synthetic (shared-prefix) items!")
         if max_sub_table_size is None and num_sub_tables is None:
             return [set(range(len(table_contents)))]  # no splitting needed
 
@@ -333,3 +574,30 @@ class PrefixTable(object):
 
         assert(sum(map(len, subTableSetList)) == len(self)), "sub-table sets are not disjoint!"
         return subTableSetList
+
+
+class _PrefixTrieNode(object):
+    """
+    A node of the prefix trie used to construct a :class:`PrefixTable`.
+
+    Parameters
+    ----------
+    parent : _PrefixTrieNode
+        The parent node (`None` for the root).
+
+    depth : int
+        The number of layers from the root to this node.
+
+    rep_index : int
+        The index of a circuit that has this node's layers as a prefix.
+    """
+    __slots__ = ('parent', 'depth', 'rep_index', 'children', 'circuit_indices', 'flow', 'cached')
+
+    def __init__(self, parent, depth, rep_index):
+        self.parent = parent
+        self.depth = depth
+        self.rep_index = rep_index
+        self.children = _collections.OrderedDict()
+        self.circuit_indices = []  # indices of the circuits ending at this node
+        self.flow = 0
+        self.cached = False
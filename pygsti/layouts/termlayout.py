@@ -75,7 +75,7 @@ class _TermCOPALayoutAtom(_DistributableAtom):
 
         self.rho_labels = sorted(all_rholabels)
         self.op_labels = sorted(all_oplabels)
-        self.full_effect_labels = all_elabels
+        self.full_effect_labels = sorted(all_elabels)  # a fixed order (not a set) so elabel_lookup survives pickling
         self.elabel_lookup = {elbl: i for i, elbl in enumerate(self.full_effect_labels)}
 
         #Lookup arrays for faster replib computation.
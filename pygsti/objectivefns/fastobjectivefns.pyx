@@ -0,0 +1,259 @@
+# encoding: utf-8
+# cython: profile=False
+# cython: linetrace=False
+# filename: fastobjectivefns.pyx
+
+#***************************************************************************************************
+# Copyright 2015, 2019 National Technology & Engineering Solutions of Sandia, LLC (NTESS).
+# Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights
+# in this software.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License.  You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0 or in the LICENSE file in the root pyGSTi directory.
+#***************************************************************************************************
+
+# Fused per-element kernels for the raw objective functions in objectivefns.py.  Each kernel makes a
+# single pass over the (probability, count, total-count, frequency) elements and writes its results
+# directly into caller-supplied output arrays, so that no intermediate arrays are allocated.  The
+# arithmetic mirrors the numpy implementations of RawPoissonPicDeltaLogLFunction and RawChi2Function
+# element for element.
+
+cimport cython
+from libc.math cimport sqrt, log, fabs
+
+ctypedef long INT
+
+
+cdef struct PicParams:
+    bint minp         # True for 'minp' regularization, False for 'pfratio'
+    double min_p
+    double x0
+    double x1
+    bint harsh        # True when zero-frequency terms use `radius`, False when they use `fmin`
+    double radius
+    double zc1        # curvature of the "relaxed" zero-frequency stitch
+    double zp0        # stitch point of the "relaxed" zero-frequency stitch
+
+
+cdef inline PicParams _pic_params(bint minp, double min_p, double x0, double x1,
+                                  bint harsh, double radius, double fmin):
+    cdef PicParams prm
+    prm.minp = minp
+    prm.min_p = min_p
+    prm.x0 = x0
+    prm.x1 = x1
+    prm.harsh = harsh
+    prm.radius = radius
+    prm.zc1 = 0.0 if harsh else (0.5 / fmin) * 1.0 / (x1 * x1)
+    prm.zp0 = 0.0 if harsh else 1.0 / prm.zc1
+    return prm
+
+
+@cython.cdivision(True)
+cdef inline double _pic_term(double p, double n, double tot, double f, PicParams* prm) nogil:
+    cdef double t, x, pos_x, pos_p, c0, c1, a
+    if n == 0:
+        if prm.harsh:
+            a = prm.radius
+            if p >= a: return tot * p
+            return tot * ((-1.0 / (3 * a * a)) * p * p * p + p * p / a + a / 3.0)
+        if p > prm.zp0: return tot * p
+        return tot * prm.zc1 * p * p
+
+    if prm.minp:
+        pos_p = prm.min_p if p < prm.min_p else p
+        t = n * (log(f) - 1.0) - n * log(pos_p) + tot * pos_p
+        if t < 0: t = 0.0
+        if p < prm.min_p:
+            c0 = tot - n / prm.min_p
+            c1 = 0.5 * n / (prm.min_p * prm.min_p)
+            t = t + c0 * (p - prm.min_p) + c1 * (p - prm.min_p) * (p - prm.min_p)
+    else:
+        x = p / f
+        pos_x = prm.x0 if x < prm.x0 else x
+        t = -n * (1.0 - pos_x + log(pos_x))
+        if t < 0: t = 0.0
+        if x < prm.x0:
+            c0 = n * (1 - 1 / prm.x1)
+            c1 = 0.5 * n / (prm.x1 * prm.x1)
+            t = t + c0 * (x - prm.x0) + c1 * (x - prm.x0) * (x - prm.x0)
+    return t
+
+
+@cython.cdivision(True)
+cdef inline double _pic_dterm(double p, double n, double tot, double f, PicParams* prm) nogil:
+    cdef double x, c0, c1, a
+    if n == 0:
+        if prm.harsh:
+            a = prm.radius
+            if p >= a: return tot
+            return tot * ((-1.0 / (a * a)) * p * p + 2 * p / a)
+        if p > prm.zp0: return tot
+        return tot * 2 * prm.zc1 * p
+
+    if prm.minp:
+        if p < prm.min_p:
+            c0 = tot - n / prm.min_p
+            c1 = 0.5 * n / (prm.min_p * prm.min_p)
+            return c0 + 2 * c1 * (p - prm.min_p)
+        return tot - n / p
+    else:
+        x = p / f
+        if x < prm.x0:
+            c0 = n * (1 - 1 / prm.x1)
+            c1 = 0.5 * n / (prm.x1 * prm.x1)
+            return (c0 + 2 * c1 * (x - prm.x0)) / f
+        return tot * (-1 / x + 1)
+
+
+@cython.cdivision(True)
+cdef inline double _pic_lsvec_el(double t, double p, double n, double f, PicParams* prm) nogil:
+    # lsvec = sqrt(terms), with the post-sqrt 1st order taylor patch for x near 1.0 in the 'pfratio' case
+    cdef double x
+    if not prm.minp:
+        x = p / (1.0 if n == 0 else f)
+        if fabs(x - 1) < 1e-6:
+            return sqrt(n) * fabs(x - 1) / sqrt(2.0)
+    return sqrt(t)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def poisson_pic_dlogl_terms(double[:] out, const double[:] probs, const double[:] counts,
+                            const double[:] total_counts, const double[:] freqs,
+                            bint minp, double min_p, double x0, double x1,
+                            bint harsh, double radius, double fmin):
+    """
+    Fill `out` with the terms of the regularized Poisson-picture delta log-likelihood.
+
+    Returns `True` if any of the terms are negative (due to regularization), `False` otherwise.
+    """
+    cdef INT i
+    cdef INT N = probs.shape[0]
+    cdef bint negative = False
+    cdef double t
+    cdef PicParams prm = _pic_params(minp, min_p, x0, x1, harsh, radius, fmin)
+    with nogil:
+        for i in range(N):
+            t = _pic_term(probs[i], counts[i], total_counts[i], freqs[i], &prm)
+            if t < 0.0: negative = True
+            out[i] = t
+    return negative
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def poisson_pic_dlogl_lsvec(double[:] out, const double[:] probs, const double[:] counts,
+                            const double[:] total_counts, const double[:] freqs,
+                            bint minp, double min_p, double x0, double x1,
+                            bint harsh, double radius, double fmin):
+    """
+    Fill `out` with the least-squares vector of the regularized Poisson-picture delta log-likelihood.
+
+    Returns `True` if any of the terms are negative (due to regularization), `False` otherwise.
+    """
+    cdef INT i
+    cdef INT N = probs.shape[0]
+    cdef bint negative = False
+    cdef double t
+    cdef PicParams prm = _pic_params(minp, min_p, x0, x1, harsh, radius, fmin)
+    with nogil:
+        for i in range(N):
+            t = _pic_term(probs[i], counts[i], total_counts[i], freqs[i], &prm)
+            if t < 0.0: negative = True
+            out[i] = _pic_lsvec_el(t, probs[i], counts[i], freqs[i], &prm)
+    return negative
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def poisson_pic_dlogl_dlsvec_and_lsvec(double[:] out_dlsvec, double[:] out_lsvec, const double[:] probs,
+                                       const double[:] counts, const double[:] total_counts, const double[:] freqs,
+                                       bint minp, double min_p, double x0, double x1,
+                                       bint harsh, double radius, double fmin):
+    """
+    Fill `out_dlsvec` and `out_lsvec` with the least-squares vector of the regularized Poisson-picture
+    delta log-likelihood and its element-wise derivative.
+
+    Returns `True` if any of the terms are negative (due to regularization), `False` otherwise.
+    """
+    cdef INT i
+    cdef INT N = probs.shape[0]
+    cdef bint negative = False
+    cdef double t, ls, p, n, tot, f
+    cdef PicParams prm = _pic_params(minp, min_p, x0, x1, harsh, radius, fmin)
+    with nogil:
+        for i in range(N):
+            p = probs[i]; n = counts[i]; tot = total_counts[i]; f = freqs[i]
+            t = _pic_term(p, n, tot, f, &prm)
+            if t < 0.0: negative = True
+            ls = _pic_lsvec_el(t, p, n, f, &prm)
+            out_lsvec[i] = ls
+            if ls < 1e-100:  # lsvec=0 is *min* w/0 deriv
+                out_dlsvec[i] = 0.0
+            else:
+                out_dlsvec[i] = 0.5 / ls * _pic_dterm(p, n, tot, f, &prm)
+    return negative
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def chi2_lsvec(double[:] out, const double[:] probs, const double[:] total_counts, const double[:] freqs,
+               double min_prob_clip_for_weighting):
+    """
+    Fill `out` with the least-squares vector of the chi-squared function, `(p-f) * sqrt(N / p)`.
+    """
+    cdef INT i
+    cdef INT N = probs.shape[0]
+    cdef double p, cp
+    with nogil:
+        for i in range(N):
+            p = probs[i]
+            cp = min_prob_clip_for_weighting if p < min_prob_clip_for_weighting else p
+            out[i] = (p - freqs[i]) * sqrt(total_counts[i] / cp)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def chi2_terms(double[:] out, const double[:] probs, const double[:] total_counts, const double[:] freqs,
+               double min_prob_clip_for_weighting):
+    """
+    Fill `out` with the terms of the chi-squared function, `N (p-f)^2 / p`.
+    """
+    cdef INT i
+    cdef INT N = probs.shape[0]
+    cdef double p, cp, ls
+    with nogil:
+        for i in range(N):
+            p = probs[i]
+            cp = min_prob_clip_for_weighting if p < min_prob_clip_for_weighting else p
+            ls = (p - freqs[i]) * sqrt(total_counts[i] / cp)
+            out[i] = ls * ls
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def chi2_dlsvec_and_lsvec(double[:] out_dlsvec, double[:] out_lsvec, const double[:] probs,
+                          const double[:] total_counts, const double[:] freqs, double min_prob_clip_for_weighting):
+    """
+    Fill `out_dlsvec` and `out_lsvec` with the least-squares vector of the chi-squared function
+    and its element-wise derivative.
+    """
+    cdef INT i
+    cdef INT N = probs.shape[0]
+    cdef double p, cp, w, dw
+    with nogil:
+        for i in range(N):
+            p = probs[i]
+            if p < min_prob_clip_for_weighting:
+                w = sqrt(total_counts[i] / min_prob_clip_for_weighting)
+                dw = 0.0
+            else:
+                w = sqrt(total_counts[i] / p)
+                dw = -0.5 * w / p
+            out_lsvec[i] = (p - freqs[i]) * w
+            out_dlsvec[i] = w + (p - freqs[i]) * dw
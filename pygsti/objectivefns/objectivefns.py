@@ -12,10 +12,12 @@ Defines objective-function objects
 
 import itertools as _itertools
 import sys as _sys
+from functools import lru_cache as _lru_cache
 import time as _time
 import pathlib as _pathlib
 
 import numpy as _np
+import scipy.sparse as _sps
 
 from pygsti import tools as _tools
 from pygsti.layouts.distlayout import DistributableCOPALayout as _DistributableCOPALayout
@@ -25,6 +27,11 @@ from pygsti.baseobjs.resourceallocation import ResourceAllocation as _ResourceAl
 from pygsti.baseobjs.nicelyserializable import NicelySerializable as _NicelySerializable
 from pygsti.baseobjs.verbosityprinter import VerbosityPrinter as _VerbosityPrinter
 
+try:
+    from . import fastobjectivefns as _fastobjfns
+except ImportError:
+    _fastobjfns = None
+
 
 def _objfn(objfn_cls, model, dataset, circuits=None,
            regularization=None, penalties=None, op_label_aliases=None,
@@ -168,7 +175,7 @@ class ObjectiveFunctionBuilder(_NicelySerializable):
         else: raise ValueError("Cannot create an %s object from '%s'" % (cls.__name__, str(type(obj))))
 
     @classmethod
-    def create_from(cls, objective='logl', freq_weighted_chi2=False):
+    def create_from(cls, objective='logl', freq_weighted_chi2=False, fused_kernels=False):
         """
         Creates common :class:`ObjectiveFunctionBuilder`s from a few arguments.
 
@@ -180,10 +187,17 @@ class ObjectiveFunctionBuilder(_NicelySerializable):
         freq_weighted_chi2 : bool, optional
             Whether to use 1/frequency values as the weights in the `"chi2"` case.
 
+        fused_kernels : bool, optional
+            Whether the built objective function evaluates its terms, least-squares vector, and
+            least-squares-vector derivatives using compiled, fused kernels that make a single pass
+            over the data.  Only the (non-frequency-weighted) `"chi2"` and `"logl"` objectives have
+            such kernels; this argument is ignored for other objectives.
+
         Returns
         -------
         ObjectiveFunctionBuilder
         """
+        fused_args = {'fused_kernels': True} if fused_kernels else {}
         if objective == "chi2":
             if freq_weighted_chi2:
                 builder = FreqWeightedChi2Function.builder(
@@ -194,7 +208,7 @@ class ObjectiveFunctionBuilder(_NicelySerializable):
                 builder = Chi2Function.builder(
                     name='chi2',
                     description="Sum of Chi^2",
-                    regularization={'min_prob_clip_for_weighting': 1e-4})
+                    regularization={'min_prob_clip_for_weighting': 1e-4}, **fused_args)
 
         elif objective == "logl":
             builder = PoissonPicDeltaLogLFunction.builder(
@@ -203,7 +217,7 @@ class ObjectiveFunctionBuilder(_NicelySerializable):
                 regularization={'min_prob_clip': 1e-4,
                                 'radius': 1e-4},
                 penalties={'cptp_penalty_factor': 0,
-                           'spam_penalty_factor': 0})
+                           'spam_penalty_factor': 0}, **fused_args)
 
         elif objective == "tvd":
             builder = TVDFunction.builder(
@@ -238,7 +252,7 @@ class ObjectiveFunctionBuilder(_NicelySerializable):
     def _from_nice_serialization(cls, state):
         from pygsti.io.metadir import _class_for_name
         return cls(_class_for_name(state['class_to_build']), state['name'], state['description'],
-                   state['regularization'], state['penalties'], *state['additional_arguments'])
+                   state['regularization'], state['penalties'], **state['additional_arguments'])
 
     def compute_array_types(self, method_names, forwardsim):
         return self.cls_to_build.compute_array_types(method_names, forwardsim)
@@ -672,6 +686,104 @@ class RawObjectiveFunction(ObjectiveFunction):
         dlsvec = self.dlsvec(probs, counts, total_counts, freqs, intermediates)
         return dlsvec, lsvec
 
+    def fill_terms(self, terms, probs, counts, total_counts, freqs):
+        """
+        Compute the terms of the objective function, writing them into a given array.
+
+        This is equivalent to `terms[:] = self.terms(probs, counts, total_counts, freqs)`, which
+        is what this default implementation does.  Subclasses override the `fill_*` methods to
+        compute their results in place, without allocating intermediate arrays (e.g. using
+        compiled, fused kernels).
+
+        Parameters
+        ----------
+        terms : numpy.ndarray
+            The 1D array to fill, of length equal to that of each other array argument.
+
+        probs : numpy.ndarray
+            Array of probability values.
+
+        counts : numpy.ndarray
+            Array of count values.
+
+        total_counts : numpy.ndarray
+            Array of total count values.
+
+        freqs : numpy.ndarray
+            Array of frequency values.  This should always equal `counts / total_counts`
+            but is supplied separately to increase performance.
+
+        Returns
+        -------
+        None
+        """
+        terms[:] = self.terms(probs, counts, total_counts, freqs)
+
+    def fill_lsvec(self, lsvec, probs, counts, total_counts, freqs):
+        """
+        Compute the least-squares vector of the objective function, writing it into a given array.
+
+        This is equivalent to `lsvec[:] = self.lsvec(probs, counts, total_counts, freqs)`.  See
+        :method:`fill_terms`.
+
+        Parameters
+        ----------
+        lsvec : numpy.ndarray
+            The 1D array to fill, of length equal to that of each other array argument.
+
+        probs : numpy.ndarray
+            Array of probability values.
+
+        counts : numpy.ndarray
+            Array of count values.
+
+        total_counts : numpy.ndarray
+            Array of total count values.
+
+        freqs : numpy.ndarray
+            Array of frequency values.  This should always equal `counts / total_counts`
+            but is supplied separately to increase performance.
+
+        Returns
+        -------
+        None
+        """
+        lsvec[:] = self.lsvec(probs, counts, total_counts, freqs)
+
+    def fill_dlsvec_and_lsvec(self, dlsvec, lsvec, probs, counts, total_counts, freqs):
+        """
+        Compute the derivatives of the least-squares vector and the vector itself, writing them into given arrays.
+
+        This is equivalent to `dlsvec[:], lsvec[:] = self.dlsvec_and_lsvec(probs, counts, total_counts, freqs)`.
+        See :method:`fill_terms`.
+
+        Parameters
+        ----------
+        dlsvec : numpy.ndarray
+            The 1D array to fill with the least-squares vector derivatives.
+
+        lsvec : numpy.ndarray
+            The 1D array to fill with the least-squares vector.
+
+        probs : numpy.ndarray
+            Array of probability values.
+
+        counts : numpy.ndarray
+            Array of count values.
+
+        total_counts : numpy.ndarray
+            Array of total count values.
+
+        freqs : numpy.ndarray
+            Array of frequency values.  This should always equal `counts / total_counts`
+            but is supplied separately to increase performance.
+
+        Returns
+        -------
+        None
+        """
+        dlsvec[:], lsvec[:] = self.dlsvec_and_lsvec(probs, counts, total_counts, freqs)
+
     def hterms(self, probs, counts, total_counts, freqs, intermediates=None):
         """
         Compute the 2nd derivatives of the terms of this objective function.
@@ -939,22 +1051,40 @@ class ModelDatasetCircuitsStore(object):
         """
         if self.firsts is None or force:
             # FUTURE: add any tracked memory? self.resource_alloc.add_tracked_memory(...)
-            self.firsts = []; self.indicesOfCircuitsWithOmittedData = []
-            for i, c in enumerate(self.circuits):
-                indices = _slct.to_array(self.layout.indices_for_index(i))
-                lklen = _slct.length(self.layout.indices_for_index(i))
-                if 0 < lklen < self.model.compute_num_outcomes(c):
-                    self.firsts.append(indices[0])
-                    self.indicesOfCircuitsWithOmittedData.append(i)
-            if len(self.firsts) > 0:
-                self.firsts = _np.array(self.firsts, 'i')
-                self.indicesOfCircuitsWithOmittedData = _np.array(self.indicesOfCircuitsWithOmittedData, 'i')
-                self.dprobs_omitted_rowsum = _np.empty((len(self.firsts), self.nparams), 'd')
+            circuit_to_unique, element_unique_indices, _ = self.layout.element_index_arrays()
+            num_unique = int(circuit_to_unique.max()) + 1 if len(circuit_to_unique) > 0 else 0
+            unique_lengths = _np.bincount(element_unique_indices, minlength=num_unique)
+            unique_firsts = _np.full(num_unique, len(element_unique_indices), _np.int64)
+            _np.minimum.at(unique_firsts, element_unique_indices, _np.arange(len(element_unique_indices)))
+
+            lengths = unique_lengths[circuit_to_unique]
+            candidates = _np.nonzero(lengths > 0)[0]
+            num_outcomes = self._compute_num_outcomes([self.circuits[i] for i in candidates])
+            omitted = candidates[lengths[candidates] < num_outcomes]
+
+            if len(omitted) > 0:
+                self.firsts = unique_firsts[circuit_to_unique[omitted]].astype('i')
+                self.indicesOfCircuitsWithOmittedData = omitted.astype('i')
+                self.dprobs_omitted_rowsum = None  # allocated when first needed (not needed by `sparse_dlsvec`)
                 #if printer: printer.log("SPARSE DATA: %d of %d rows have sparse data" %
                 #                        (len(self.firsts), len(self.circuits)))
             else:
                 self.firsts = None  # no omitted probs
 
+    def _compute_num_outcomes(self, circuits):
+        """ The number of outcomes of each of `circuits`, as an array """
+        if not getattr(self.model, '_has_instruments', lambda: True)():
+            # Without instruments a circuit's outcomes are just those of its POVM, so compute them once per POVM
+            num_outcomes_by_povm = {}
+            ret = _np.empty(len(circuits), _np.int64)
+            for i, circuit in enumerate(circuits):
+                povm_lbl = self.model.complete_circuit(circuit)[-1]
+                if povm_lbl not in num_outcomes_by_povm:
+                    num_outcomes_by_povm[povm_lbl] = self.model.compute_num_outcomes(circuit)
+                ret[i] = num_outcomes_by_povm[povm_lbl]
+            return ret
+        return _np.array([self.model.compute_num_outcomes(circuit) for circuit in circuits], _np.int64)
+
     def add_count_vectors(self, force=False):
         """
         Ensure this store contains count and total-count vectors.
@@ -968,23 +1098,60 @@ class ModelDatasetCircuitsStore(object):
             # Note: in distributed case self.layout only holds *local* quantities (e.g.
             # the .ds_circuits are a subset of all the circuits and .nelements is the local
             # number of elements).
-            counts = _np.empty(self.nelements, 'd')
-            totals = _np.empty(self.nelements, 'd')
+            if getattr(self.dataset, 'bStatic', False):
+                counts, totals = self._scatter_count_arrays()
+            else:
+                counts = _np.empty(self.nelements, 'd')
+                totals = _np.empty(self.nelements, 'd')
 
-            for (i, circuit) in enumerate(self.ds_circuits):
-                cnts = self.dataset[circuit].counts
-                totals[self.layout.indices_for_index(i)] = sum(cnts.values())  # dataset[opStr].total
-                counts[self.layout.indices_for_index(i)] = [cnts.get(x, 0) for x in self.layout.outcomes_for_index(i)]
+                for (i, circuit) in enumerate(self.ds_circuits):
+                    cnts = self.dataset[circuit].counts
+                    totals[self.layout.indices_for_index(i)] = sum(cnts.values())  # dataset[opStr].total
+                    counts[self.layout.indices_for_index(i)] = [cnts.get(x, 0)
+                                                                for x in self.layout.outcomes_for_index(i)]
 
-            if self.circuits.circuit_weights is not None:
-                for i in range(len(self.ds_circuits)):  # multiply N's by weights
-                    counts[self.layout.indices_for_index(i)] *= self.circuits.circuit_weights[i]
-                    totals[self.layout.indices_for_index(i)] *= self.circuits.circuit_weights[i]
+                if self.circuits.circuit_weights is not None:
+                    for i in range(len(self.ds_circuits)):  # multiply N's by weights
+                        counts[self.layout.indices_for_index(i)] *= self.circuits.circuit_weights[i]
+                        totals[self.layout.indices_for_index(i)] *= self.circuits.circuit_weights[i]
 
             self.counts = counts
             self.total_counts = totals
             self.freqs = counts / totals
 
+    def _scatter_count_arrays(self):
+        """
+        Computes the count and total-count vectors by scattering a static data set's count arrays into place.
+        """
+        circuit_to_unique, element_unique_indices, element_outcome_indices = \
+            self.layout.element_index_arrays(self.dataset.olIndex)
+        num_unique = int(circuit_to_unique.max()) + 1 if len(circuit_to_unique) > 0 else 0
+        unique_reps = _np.empty(num_unique, _np.int64)  # a representative circuit index for each unique circuit
+        unique_reps[circuit_to_unique] = _np.arange(len(circuit_to_unique))
+
+        unique_indices, outcome_indices, data_counts = \
+            self.dataset.count_arrays([self.ds_circuits[i] for i in unique_reps])
+        unique_totals = _np.bincount(unique_indices, weights=data_counts, minlength=num_unique)
+
+        #Sum counts by (unique circuit, outcome) key and look up the key of each element
+        num_outcome_lbls = max(len(self.dataset.olIndex), 1)
+        keys, key_inverse = _np.unique(unique_indices * num_outcome_lbls + outcome_indices, return_inverse=True)
+        key_counts = _np.bincount(key_inverse, weights=data_counts, minlength=len(keys))
+        element_keys = element_unique_indices * num_outcome_lbls + element_outcome_indices
+        counts = _np.zeros(len(element_keys), 'd')
+        if len(keys) > 0:
+            pos = _np.minimum(_np.searchsorted(keys, element_keys), len(keys) - 1)
+            found = (element_outcome_indices >= 0) & (keys[pos] == element_keys)
+            counts[found] = key_counts[pos[found]]
+        totals = unique_totals[element_unique_indices]
+
+        if self.circuits.circuit_weights is not None:  # multiply N's by weights
+            unique_weights = _np.ones(num_unique, 'd')
+            _np.multiply.at(unique_weights, circuit_to_unique, self.circuits.circuit_weights)
+            counts *= unique_weights[element_unique_indices]
+            totals *= unique_weights[element_unique_indices]
+        return counts, totals
+
 
 class EvaluatedModelDatasetCircuitsStore(ModelDatasetCircuitsStore):
     """
@@ -1172,6 +1339,26 @@ class MDCObjectiveFunction(ObjectiveFunction, EvaluatedModelDatasetCircuitsStore
         """
         raise NotImplementedError("Derived classes should implement this!")
 
+    def sparse_dlsvec(self, paramvec=None):
+        """
+        The derivative (jacobian) of the least-squares vector, as a sparse matrix.
+
+        Derivatives are taken with respect to model parameters.
+
+        Parameters
+        ----------
+        paramvec : numpy.ndarray, optional
+            The vector of (model) parameters to evaluate the objective function at.
+            If `None`, then the model's current parameter vector is used (held internally).
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            A matrix of shape `(nElements,nParams)` where `nElements` is the number
+            of circuit outcomes and `nParams` is the number of model parameters.
+        """
+        raise NotImplementedError("Derived classes should implement this!")
+
     def terms(self, paramvec=None):
         """
         Compute the terms of the objective function.
@@ -1719,9 +1906,17 @@ class RawChi2Function(RawObjectiveFunction):
 
     verbosity : int, optional
         Level of detail to print to stdout.
+
+    fused_kernels : bool, optional
+        Whether to compute the terms, least-squares vector, and its derivative using the
+        compiled kernels of the `fastobjectivefns` extension, which make a single pass over
+        the data without allocating intermediate arrays.  The numpy implementation is
+        used when the extension is not available.
     """
-    def __init__(self, regularization=None, resource_alloc=None, name="chi2", description="Sum of Chi^2", verbosity=0):
+    def __init__(self, regularization=None, resource_alloc=None, name="chi2", description="Sum of Chi^2", verbosity=0,
+                 fused_kernels=False):
         super().__init__(regularization, resource_alloc, name, description, verbosity)
+        self.fused_kernels = bool(fused_kernels and _fastobjfns is not None)
 
     def chi2k_distributed_qty(self, objective_function_value):
         """
@@ -1787,6 +1982,10 @@ class RawChi2Function(RawObjectiveFunction):
         numpy.ndarray
             A 1D array of length equal to that of each array argument.
         """
+        if self.fused_kernels:
+            lsvec = _np.empty(len(probs), 'd')
+            self.fill_lsvec(lsvec, probs, counts, total_counts, freqs)
+            return lsvec
         return (probs - freqs) * self._weights(probs, freqs, total_counts)  # Note: ok if this is negative
 
     def dlsvec(self, probs, counts, total_counts, freqs, intermediates=None):
@@ -1821,9 +2020,109 @@ class RawChi2Function(RawObjectiveFunction):
         numpy.ndarray
             A 1D array of length equal to that of each array argument.
         """
+        if self.fused_kernels:
+            return self.dlsvec_and_lsvec(probs, counts, total_counts, freqs)[0]
         weights = self._weights(probs, freqs, total_counts)
         return weights + (probs - freqs) * self._dweights(probs, freqs, weights)
 
+    def terms(self, probs, counts, total_counts, freqs, intermediates=None):
+        """
+        Compute the terms of the objective function.
+
+        The "terms" are the per-(probability, count, total-count) values
+        that get summed together to result in the objective function value.
+        These are the "local" or "per-element" values of the objective function.
+
+        Parameters
+        ----------
+        probs : numpy.ndarray
+            Array of probability values.
+
+        counts : numpy.ndarray
+            Array of count values.
+
+        total_counts : numpy.ndarray
+            Array of total count values.
+
+        freqs : numpy.ndarray
+            Array of frequency values.  This should always equal `counts / total_counts`
+            but is supplied separately to increase performance.
+
+        intermediates : tuple, optional
+            Used internally to speed up computations.
+
+        Returns
+        -------
+        numpy.ndarray
+            A 1D array of length equal to that of each array argument.
+        """
+        if self.fused_kernels:
+            terms = _np.empty(len(probs), 'd')
+            self.fill_terms(terms, probs, counts, total_counts, freqs)
+            return terms
+        return super().terms(probs, counts, total_counts, freqs, intermediates)
+
+    def dlsvec_and_lsvec(self, probs, counts, total_counts, freqs, intermediates=None):
+        """
+        Compute the derivatives of the least-squares vector together with the vector itself.
+
+        This is sometimes more computationally efficient than calling :method:`dlsvec` and
+        :method:`lsvec` separately, as the former call may require computing the latter.
+
+        Parameters
+        ----------
+        probs : numpy.ndarray
+            Array of probability values.
+
+        counts : numpy.ndarray
+            Array of count values.
+
+        total_counts : numpy.ndarray
+            Array of total count values.
+
+        freqs : numpy.ndarray
+            Array of frequency values.  This should always equal `counts / total_counts`
+            but is supplied separately to increase performance.
+
+        intermediates : tuple, optional
+            Used internally to speed up computations.
+
+        Returns
+        -------
+        dlsvec: numpy.ndarray
+            A 1D array of length equal to that of each array argument.
+
+        lsvec: numpy.ndarray
+            A 1D array of length equal to that of each array argument.
+        """
+        if self.fused_kernels:
+            dlsvec = _np.empty(len(probs), 'd'); lsvec = _np.empty(len(probs), 'd')
+            self.fill_dlsvec_and_lsvec(dlsvec, lsvec, probs, counts, total_counts, freqs)
+            return dlsvec, lsvec
+        return super().dlsvec_and_lsvec(probs, counts, total_counts, freqs, intermediates)
+
+    def fill_terms(self, terms, probs, counts, total_counts, freqs):
+        """ See :method:`RawObjectiveFunction.fill_terms` (uses fused kernels when enabled) """
+        if self.fused_kernels:
+            _fastobjfns.chi2_terms(terms, probs, total_counts, freqs, self.min_prob_clip_for_weighting)
+        else:
+            super().fill_terms(terms, probs, counts, total_counts, freqs)
+
+    def fill_lsvec(self, lsvec, probs, counts, total_counts, freqs):
+        """ See :method:`RawObjectiveFunction.fill_lsvec` (uses fused kernels when enabled) """
+        if self.fused_kernels:
+            _fastobjfns.chi2_lsvec(lsvec, probs, total_counts, freqs, self.min_prob_clip_for_weighting)
+        else:
+            super().fill_lsvec(lsvec, probs, counts, total_counts, freqs)
+
+    def fill_dlsvec_and_lsvec(self, dlsvec, lsvec, probs, counts, total_counts, freqs):
+        """ See :method:`RawObjectiveFunction.fill_dlsvec_and_lsvec` (uses fused kernels when enabled) """
+        if self.fused_kernels:
+            _fastobjfns.chi2_dlsvec_and_lsvec(dlsvec, lsvec, probs, total_counts, freqs,
+                                              self.min_prob_clip_for_weighting)
+        else:
+            super().fill_dlsvec_and_lsvec(dlsvec, lsvec, probs, counts, total_counts, freqs)
+
     def hlsvec(self, probs, counts, total_counts, freqs, intermediates=None):
         """
         Compute the 2nd derivatives of the least-squares vector of this objective function.
@@ -2778,10 +3077,17 @@ class RawPoissonPicDeltaLogLFunction(RawObjectiveFunction):
 
     verbosity : int, optional
         Level of detail to print to stdout.
+
+    fused_kernels : bool, optional
+        Whether to compute the terms, least-squares vector, and its derivative using the
+        compiled kernels of the `fastobjectivefns` extension, which make a single pass over
+        the data without allocating intermediate arrays.  The numpy implementation is
+        used when the extension is not available.
     """
     def __init__(self, regularization=None,
-                 resource_alloc=None, name='dlogl', description="2*Delta(log(L))", verbosity=0):
+                 resource_alloc=None, name='dlogl', description="2*Delta(log(L))", verbosity=0, fused_kernels=False):
         super().__init__(regularization, resource_alloc, name, description, verbosity)
+        self.fused_kernels = bool(fused_kernels and _fastobjfns is not None)
 
     def chi2k_distributed_qty(self, objective_function_value):
         """
@@ -2936,6 +3242,11 @@ class RawPoissonPicDeltaLogLFunction(RawObjectiveFunction):
         numpy.ndarray
             A 1D array of length equal to that of each array argument.
         """
+        if self.fused_kernels:
+            terms = _np.empty(len(probs), 'd')
+            self.fill_terms(terms, probs, counts, total_counts, freqs)
+            return terms
+
         if intermediates is None:
             intermediates = self._intermediates(probs, counts, total_counts, freqs)
 
@@ -2972,14 +3283,17 @@ class RawPoissonPicDeltaLogLFunction(RawObjectiveFunction):
 
         if terms.size > 0 and _np.min(terms) < 0.0:
             #Since we set terms = _np.maximum(terms, 0) above we know it was the regularization that caused this
-            if self.regtype == 'minp':
-                raise ValueError(("Regularization => negative terms!  Is min_prob_clip (%g) too large? "
-                                  "(it should be smaller than the smallest frequency)") % self.min_p)
-            else:
-                raise ValueError("Regularization => negative terms!")
+            self._raise_negative_terms()
 
         return terms
 
+    def _raise_negative_terms(self):
+        if self.regtype == 'minp':
+            raise ValueError(("Regularization => negative terms!  Is min_prob_clip (%g) too large? "
+                              "(it should be smaller than the smallest frequency)") % self.min_p)
+        else:
+            raise ValueError("Regularization => negative terms!")
+
     def lsvec(self, probs, counts, total_counts, freqs, intermediates=None):
         # lsvec = sqrt(terms), but don't use base class fn b/c of special taylor patch...
         """
@@ -3014,6 +3328,11 @@ class RawPoissonPicDeltaLogLFunction(RawObjectiveFunction):
         numpy.ndarray
             A 1D array of length equal to that of each array argument.
         """
+        if self.fused_kernels:
+            lsvec = _np.empty(len(probs), 'd')
+            self.fill_lsvec(lsvec, probs, counts, total_counts, freqs)
+            return lsvec
+
         lsvec = _np.sqrt(self.terms(probs, counts, total_counts, freqs, intermediates))
 
         if self.regtype == "pfratio":  # post-sqrt(v) 1st order taylor patch for x near 1.0 - maybe unnecessary
@@ -3124,6 +3443,112 @@ class RawPoissonPicDeltaLogLFunction(RawObjectiveFunction):
         d2terms_dp2 = _np.where(counts == 0, zfc, d2terms_dp2)
         return d2terms_dp2  # a 1D array of d2(logl)/dprobs2 values; shape = (nEls,)
 
+    def dlsvec(self, probs, counts, total_counts, freqs, intermediates=None):
+        """
+        Compute the derivatives of the least-squares vector of this objective function.
+
+        Note that because each `lsvec` element only depends on the corresponding probability,
+        this is just an element-wise derivative (or, the diagonal of a jacobian matrix),
+        i.e. the resulting values are the derivatives of the `local_function` at
+        each (probability, count, total-count) value.
+
+        Parameters
+        ----------
+        probs : numpy.ndarray
+            Array of probability values.
+
+        counts : numpy.ndarray
+            Array of count values.
+
+        total_counts : numpy.ndarray
+            Array of total count values.
+
+        freqs : numpy.ndarray
+            Array of frequency values.  This should always equal `counts / total_counts`
+            but is supplied separately to increase performance.
+
+        intermediates : tuple, optional
+            Used internally to speed up computations.
+
+        Returns
+        -------
+        numpy.ndarray
+            A 1D array of length equal to that of each array argument.
+        """
+        if self.fused_kernels:
+            return self.dlsvec_and_lsvec(probs, counts, total_counts, freqs)[0]
+        return super().dlsvec(probs, counts, total_counts, freqs, intermediates)
+
+    def dlsvec_and_lsvec(self, probs, counts, total_counts, freqs, intermediates=None):
+        """
+        Compute the derivatives of the least-squares vector together with the vector itself.
+
+        This is sometimes more computationally efficient than calling :method:`dlsvec` and
+        :method:`lsvec` separately, as the former call may require computing the latter.
+
+        Parameters
+        ----------
+        probs : numpy.ndarray
+            Array of probability values.
+
+        counts : numpy.ndarray
+            Array of count values.
+
+        total_counts : numpy.ndarray
+            Array of total count values.
+
+        freqs : numpy.ndarray
+            Array of frequency values.  This should always equal `counts / total_counts`
+            but is supplied separately to increase performance.
+
+        intermediates : tuple, optional
+            Used internally to speed up computations.
+
+        Returns
+        -------
+        dlsvec: numpy.ndarray
+            A 1D array of length equal to that of each array argument.
+
+        lsvec: numpy.ndarray
+            A 1D array of length equal to that of each array argument.
+        """
+        if self.fused_kernels:
+            dlsvec = _np.empty(len(probs), 'd'); lsvec = _np.empty(len(probs), 'd')
+            self.fill_dlsvec_and_lsvec(dlsvec, lsvec, probs, counts, total_counts, freqs)
+            return dlsvec, lsvec
+        return super().dlsvec_and_lsvec(probs, counts, total_counts, freqs, intermediates)
+
+    def fill_terms(self, terms, probs, counts, total_counts, freqs):
+        """ See :method:`RawObjectiveFunction.fill_terms` (uses fused kernels when enabled) """
+        if not self.fused_kernels:
+            return super().fill_terms(terms, probs, counts, total_counts, freqs)
+        if _fastobjfns.poisson_pic_dlogl_terms(terms, probs, counts, total_counts, freqs,
+                                               *self._fused_kernel_args()):
+            self._raise_negative_terms()
+
+    def fill_lsvec(self, lsvec, probs, counts, total_counts, freqs):
+        """ See :method:`RawObjectiveFunction.fill_lsvec` (uses fused kernels when enabled) """
+        if not self.fused_kernels:
+            return super().fill_lsvec(lsvec, probs, counts, total_counts, freqs)
+        if _fastobjfns.poisson_pic_dlogl_lsvec(lsvec, probs, counts, total_counts, freqs,
+                                               *self._fused_kernel_args()):
+            self._raise_negative_terms()
+
+    def fill_dlsvec_and_lsvec(self, dlsvec, lsvec, probs, counts, total_counts, freqs):
+        """ See :method:`RawObjectiveFunction.fill_dlsvec_and_lsvec` (uses fused kernels when enabled) """
+        if not self.fused_kernels:
+            return super().fill_dlsvec_and_lsvec(dlsvec, lsvec, probs, counts, total_counts, freqs)
+        if _fastobjfns.poisson_pic_dlogl_dlsvec_and_lsvec(dlsvec, lsvec, probs, counts, total_counts, freqs,
+                                                          *self._fused_kernel_args()):
+            self._raise_negative_terms()
+
+    def _fused_kernel_args(self):
+        """ The regularization arguments passed to the `fastobjectivefns` kernels """
+        minp = bool(self.regtype == 'minp')
+        return (minp, self.min_p if minp else 0.0, 0.0 if minp else self.x0, 0.0 if minp else self.x1,
+                self.radius is not None, self.radius if (self.radius is not None) else 0.0,
+                self.fmin if (self.fmin is not None) else 0.0)
+
     #Required zero-term methods for omitted probs support in model-based objective functions
     def _zero_freq_terms_harsh(self, total_counts, probs):
         a = self.radius
@@ -4267,11 +4692,13 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         if method_name == 'lsvec': return fsim._array_types_for_method('bulk_fill_probs') + ('e',)
         if method_name == 'terms': return fsim._array_types_for_method('bulk_fill_probs') + ('e',)
         if method_name == 'dlsvec': return fsim._array_types_for_method('bulk_fill_dprobs') + ('e', 'e')
+        if method_name == 'sparse_dlsvec': return fsim._array_types_for_method('bulk_fill_sparse_dprobs') + ('e', 'e')
         if method_name == 'dterms': return fsim._array_types_for_method('bulk_fill_dprobs')
         if method_name == 'hessian_brute': return fsim._array_types_for_method('bulk_fill_hprobs') \
            + ('e', 'e', 'epp', 'epp', 'PP')
         if method_name == 'hessian': return fsim._array_types_for_method('_iter_atom_hprobs_by_rectangle') + ('PP',)
-        if method_name == 'approximate_hessian': return fsim._array_types_for_method('bulk_fill_dprobs') + ('e', 'PP')
+        if method_name == 'approximate_hessian': return fsim._array_types_for_method('_bulk_fill_dprobs_block') \
+           + ('a', 'a', 'ab', 'ab', 'PP')
         return super()._array_types_for_method(method_name, fsim)
 
     @classmethod
@@ -4280,7 +4707,7 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         # (not-intermediate). These are filled in other routines and *not* included in
         # the output of _array_types_for_method since these are *not* allocated in methods.
         array_types = ('e',) * 4  # self.probs + 3x add_count_vectors
-        if any([x in ('dlsvec', 'dterms', 'dpercircuit', 'jacobian', 'approximate_hessian', 'hessian')
+        if any([x in ('dlsvec', 'dterms', 'dpercircuit', 'jacobian', 'hessian')
                 for x in method_names]):
             array_types += ('ep',)
 
@@ -4305,14 +4732,18 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
 
         #Note: allocate probs as a local array in case we want to gather it (though objfn routines don't need this)
         self.probs = self.layout.allocate_local_array('e', 'd', memory_tracker=self.resource_alloc)
+        self._probs_paramvec = None  # set when a jacobian method computes `self.probs` (see `_probs_are_current`)
+        self._probs_sim = None  # the forward simulator that computed them
         self.obj = self.layout.allocate_local_array('e', 'd', memory_tracker=self.resource_alloc,
                                                     extra_elements=self.ex)
+        self._dlsvec_work = None  # (dg_dprobs, lsvec) scratch arrays for computing jacobians (see `dlsvec`)
 
         self.jac = None
         if ('ep' in self.array_types or 'EP' in self.array_types
            or 'epp' in self.array_types or 'EPP' in self.array_types):
             self.jac = self.layout.allocate_local_array('ep', 'd', memory_tracker=self.resource_alloc,
                                                         extra_elements=self.ex)
+        self._sparse_jac = None  # allocated by `sparse_dlsvec` when needed
 
         #self.maxCircuitLength = max([len(x) for x in self.circuits])
         # If desired, we may need to make it local to this processor, which may not have data for all of self.circuits
@@ -4326,6 +4757,9 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         self.layout.free_local_array(self.probs)
         self.layout.free_local_array(self.obj)
         self.layout.free_local_array(self.jac)
+        if self._dlsvec_work is not None:
+            for work_array in self._dlsvec_work:
+                self.layout.free_local_array(work_array)
 
     #Model-based regularization and penalty support functions
     def set_penalties(self, regularize_factor=0, cptp_penalty_factor=0, spam_penalty_factor=0,
@@ -4423,30 +4857,61 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         -------
         numpy.ndarray
         """
+        lspenaltyvec = _np.empty(self.local_ex, 'd')
+        self._fill_lspenaltyvec(paramvec, lspenaltyvec)
+        return lspenaltyvec
+
+    def _fill_lspenaltyvec(self, paramvec, lspenaltyvec):
+        """
+        Fill `lspenaltyvec` with the least-squares penalty vector (see :method:`_lspenaltyvec`).
+
+        Parameters
+        ----------
+        paramvec : numpy.ndarray
+            The vector of (model) parameters to evaluate the objective function at.
+
+        lspenaltyvec : numpy.ndarray
+            The array to fill, of length `self.local_ex`.
+
+        Returns
+        -------
+        None
+        """
+        off = 0
+
         if self.forcefn_grad is not None:
-            force_vec = self.forceShift - _np.dot(self.forcefn_grad, self.model.to_vector())
+            n = self.forcefn_grad.shape[0]
+            force_vec = lspenaltyvec[off:off + n]
+            force_vec[:] = self.forceShift - _np.dot(self.forcefn_grad, self.model.to_vector())
             assert(_np.all(force_vec >= 0)), "Inadequate forcing shift!"
-            forcefn_penalty = _np.sqrt(force_vec)
-        else: forcefn_penalty = []
+            _np.sqrt(force_vec, out=force_vec)
+            off += n
 
         if self.regularize_factor != 0:
-            paramvec_norm = self.regularize_factor * _np.array([max(0, absx - 1.0) for absx in map(abs, paramvec)], 'd')
-        else: paramvec_norm = []  # so concatenate ignores
+            n = len(paramvec)
+            paramvec_norm = lspenaltyvec[off:off + n]
+            _np.abs(paramvec, out=paramvec_norm)
+            paramvec_norm -= 1.0
+            _np.maximum(paramvec_norm, 0, out=paramvec_norm)
+            paramvec_norm *= self.regularize_factor
+            off += n
 
         if self.cptp_penalty_factor > 0:
             cp_penalty_vec = _cptp_penalty(self.model, self.cptp_penalty_factor, self.opBasis)
-        else: cp_penalty_vec = []  # so concatenate ignores
+            lspenaltyvec[off:off + len(cp_penalty_vec)] = cp_penalty_vec
+            off += len(cp_penalty_vec)
 
         if self.spam_penalty_factor > 0:
             spam_penalty_vec = _spam_penalty(self.model, self.spam_penalty_factor, self.opBasis)
-        else: spam_penalty_vec = []  # so concatenate ignores
+            lspenaltyvec[off:off + len(spam_penalty_vec)] = spam_penalty_vec
+            off += len(spam_penalty_vec)
 
         if self.errorgen_penalty_factor > 0:
             errorgen_penalty_vec = _errorgen_penalty(self.model, self.errorgen_penalty_factor)
-        else:
-            errorgen_penalty_vec = []
+            lspenaltyvec[off:off + len(errorgen_penalty_vec)] = errorgen_penalty_vec
+            off += len(errorgen_penalty_vec)
 
-        return _np.concatenate((forcefn_penalty, paramvec_norm, cp_penalty_vec, spam_penalty_vec, errorgen_penalty_vec))
+        assert(off == len(lspenaltyvec))
 
     def _penaltyvec(self, paramvec):
         """
@@ -4726,7 +5191,40 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
 
     #Objective Function
 
-    def lsvec(self, paramvec=None, oob_check=False):
+    def _probs_are_current(self, paramvec):
+        """
+        Whether `self.probs` already holds the (clipped) probabilities at `paramvec`.
+
+        This is the case when the last method to compute the probabilities was a jacobian method,
+        e.g. :method:`dlsvec`, which computes them along with their derivatives, and it did so at the
+        same parameter vector using the model's current forward simulator.  This lets the first
+        :method:`lsvec` or :method:`terms` call following a jacobian evaluation (as in an optimizer's
+        step) skip recomputing the probabilities.  The saved state is consumed by this call, so the
+        probabilities are reused at most once and never outlive other changes to the model or
+        simulator.  Layouts holding a path set (of term-based simulators) are excluded, as their
+        probabilities can change when a new path set is selected.
+
+        Parameters
+        ----------
+        paramvec : numpy.ndarray
+            The model parameter vector.
+
+        Returns
+        -------
+        bool
+        """
+        current = (self._probs_paramvec is not None and self._probs_sim is self.model.sim
+                   and getattr(self.layout, 'pathset', None) is None
+                   and _np.array_equal(self._probs_paramvec, paramvec))
+        self._probs_paramvec = self._probs_sim = None
+        return current
+
+    def _set_probs_paramvec(self, paramvec):
+        """ Record that a jacobian method computed `self.probs` at `paramvec` (see :method:`_probs_are_current`) """
+        self._probs_paramvec = None if (paramvec is None) else paramvec.copy()
+        self._probs_sim = None if (paramvec is None) else self.model.sim
+
+    def lsvec(self, paramvec=None, oob_check=False, out=None):
         """
         Compute the least-squares vector of the objective function.
 
@@ -4746,6 +5244,13 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
             Whether the objective function should raise an error if it is being
             evaluated in an "out of bounds" region.
 
+        out : numpy.ndarray, optional
+            The array to write the least-squares vector into.  If `None`, this objective
+            function's own workspace array is used (and returned), so the returned array is
+            overwritten by the next evaluation.  A given `out` must be shaped and distributed
+            like the workspace, e.g. allocated by `layout.allocate_local_array('e', 'd',
+            extra_elements=self.ex)`.
+
         Returns
         -------
         numpy.ndarray
@@ -4764,7 +5269,7 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
             self.model.from_vector(paramvec)
         else:
             paramvec = self.model.to_vector()
-        lsvec = self.obj.view()
+        lsvec = self.obj.view() if (out is None) else out
 
         # Whether this rank is the "leader" of all the processors accessing the same shared self.jac and self.probs mem.
         #  Only leader processors should modify the contents of the shared memory, so we only apply operations *once*
@@ -4773,17 +5278,19 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         shared_mem_leader = unit_ralloc.is_host_leader
 
         with self.resource_alloc.temporarily_track_memory(self.nelements):  # 'e' (lsvec)
-            self.model.sim.bulk_fill_probs(self.probs, self.layout)  # syncs shared mem
-            self._clip_probs()  # clips self.probs in place w/shared mem sync
+            if not self._probs_are_current(paramvec):  # e.g. when computed along with the jacobian at paramvec
+                self.model.sim.bulk_fill_probs(self.probs, self.layout)  # syncs shared mem
+                self._clip_probs()  # clips self.probs in place w/shared mem sync
 
             if oob_check:  # Only used for termgap cases
                 if not self.model.sim.bulk_test_if_paths_are_sufficient(self.layout, self.probs, verbosity=1):
                     raise ValueError("Out of bounds!")  # signals LM optimizer
 
             if shared_mem_leader:
-                lsvec_no_penalty = self.raw_objfn.lsvec(self.probs, self.counts, self.total_counts, self.freqs)
-                lsvec[:] = _np.concatenate((lsvec_no_penalty, self._lspenaltyvec(paramvec))) \
-                    if self._process_penalties else lsvec_no_penalty
+                self.raw_objfn.fill_lsvec(lsvec[0:self.nelements], self.probs, self.counts, self.total_counts,
+                                          self.freqs)
+                if self._process_penalties:
+                    self._fill_lspenaltyvec(paramvec, lsvec[self.nelements:])
 
         if self.firsts is not None and shared_mem_leader:
             self._update_lsvec_for_omitted_probs(lsvec, self.probs)
@@ -4824,13 +5331,16 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         shared_mem_leader = unit_ralloc.is_host_leader
 
         with self.resource_alloc.temporarily_track_memory(self.nelements):  # 'e' (terms)
-            self.model.sim.bulk_fill_probs(self.probs, self.layout)
-            self._clip_probs()  # clips self.probs in place w/shared mem sync
+            if not self._probs_are_current(paramvec):
+                self.model.sim.bulk_fill_probs(self.probs, self.layout)
+                self._clip_probs()  # clips self.probs in place w/shared mem sync
 
             if shared_mem_leader:
-                terms_no_penalty = self.raw_objfn.terms(self.probs, self.counts, self.total_counts, self.freqs)
-                terms[:] = _np.concatenate((terms_no_penalty, self._penaltyvec(paramvec))) \
-                    if self._process_penalties else terms_no_penalty
+                self.raw_objfn.fill_terms(terms[0:self.nelements], self.probs, self.counts, self.total_counts,
+                                          self.freqs)
+                if self._process_penalties:
+                    self._fill_lspenaltyvec(paramvec, terms[self.nelements:])
+                    terms[self.nelements:] **= 2
 
         if self.firsts is not None and shared_mem_leader:
             self._update_terms_for_omitted_probs(terms, self.probs)
@@ -4840,8 +5350,22 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         assert(terms.shape == (self.nelements + self.local_ex,))
         return terms
 
+    def _dlsvec_work_arrays(self):
+        """
+        Scratch arrays, allocated once and reused, that jacobian computations fill with `(dlsvec, lsvec)`.
+
+        Returns
+        -------
+        tuple
+            A `(dg_dprobs, lsvec)` tuple of 1D arrays of length `nelements`.
+        """
+        if self._dlsvec_work is None:
+            self._dlsvec_work = (self.layout.allocate_local_array('e', 'd', memory_tracker=self.resource_alloc),
+                                 self.layout.allocate_local_array('e', 'd', memory_tracker=self.resource_alloc))
+        return self._dlsvec_work
+
     # Jacobian function
-    def dlsvec(self, paramvec=None):
+    def dlsvec(self, paramvec=None, out=None):
         """
         The derivative (jacobian) of the least-squares vector.
 
@@ -4853,6 +5377,13 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
             The vector of (model) parameters to evaluate the objective function at.
             If `None`, then the model's current parameter vector is used (held internally).
 
+        out : numpy.ndarray, optional
+            The array to write the jacobian into.  If `None`, this objective function's own
+            jacobian workspace array is used (and returned), so the returned array is
+            overwritten by the next evaluation.  A given `out` must be shaped and distributed
+            like the workspace, e.g. allocated by `layout.allocate_local_array('ep', 'd',
+            extra_elements=self.ex)`.
+
         Returns
         -------
         numpy.ndarray
@@ -4860,7 +5391,9 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
             of circuit outcomes and `nParams` is the number of model parameters.
         """
         tm = _time.time()
-        dprobs = self.jac[0:self.nelements, :]  # avoid mem copying: use jac mem for dprobs
+        jac = self.jac if (out is None) else out
+        dg_dprobs, lsvec = self._dlsvec_work_arrays()  # collective when first allocated, so before any leader branch
+        dprobs = jac[0:self.nelements, :]  # avoid mem copying: use jac mem for dprobs
         dprobs.shape = (self.nelements, self.nparams)
         if paramvec is not None:
             self.model.from_vector(paramvec)
@@ -4887,15 +5420,18 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
 
             self.model.sim.bulk_fill_dprobs(dprobs, self.layout, self.probs)  # wrtSlice)
             self._clip_probs()  # clips self.probs in place w/shared mem sync
+            self._set_probs_paramvec(paramvec)
 
             if shared_mem_leader:
                 if self.firsts is not None:
+                    if self.dprobs_omitted_rowsum is None:
+                        self.dprobs_omitted_rowsum = _np.empty((len(self.firsts), self.nparams), 'd')
                     for ii, i in enumerate(self.indicesOfCircuitsWithOmittedData):
                         self.dprobs_omitted_rowsum[ii, :] = _np.sum(dprobs[self.layout.indices_for_index(i), :], axis=0)
 
                 #if shared_mem_leader:  # Note: no need for barrier directly below as barrier further down suffices
-                dg_dprobs, lsvec = self.raw_objfn.dlsvec_and_lsvec(self.probs, self.counts, self.total_counts,
-                                                                   self.freqs)
+                self.raw_objfn.fill_dlsvec_and_lsvec(dg_dprobs, lsvec, self.probs, self.counts, self.total_counts,
+                                                     self.freqs)
                 dprobs *= dg_dprobs[:, None]
                 # (nelements,N) * (nelements,1)   (N = dim of vectorized model)
                 # this multiply also computes jac, which is just dprobs
@@ -4907,7 +5443,7 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
                 self._update_dlsvec_for_omitted_probs(dprobs, lsvec, self.probs, self.dprobs_omitted_rowsum)
 
             if self._process_penalties and shared_mem_leader:
-                self._fill_lspenaltyvec_jac(paramvec, self.jac[self.nelements:, :])  # jac.shape == (nelements+N,N)
+                self._fill_lspenaltyvec_jac(paramvec, jac[self.nelements:, :])  # jac.shape == (nelements+N,N)
         unit_ralloc.host_comm_barrier()  # have non-leader procs wait for leaders to set shared mem
 
         # REMOVE => unit tests?
@@ -4917,7 +5453,107 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         # dpr has shape == (nCircuits, nDerivCols), weights has shape == (nCircuits,)
         # return shape == (nCircuits, nDerivCols) where ret[i,j] = dP[i,j]*(weights+dweights*(p-f))[i]
         self.raw_objfn.resource_alloc.profiler.add_time("JACOBIAN", tm)
-        return self.jac
+        return jac
+
+    def sparse_dlsvec(self, paramvec=None):
+        """
+        The derivative (jacobian) of the least-squares vector, as a sparse matrix.
+
+        This is the same as :method:`dlsvec` except that the jacobian is returned as a
+        sparse matrix holding only the entries that aren't structurally zero, i.e. the
+        derivatives of each circuit outcome with respect to the parameters its circuit
+        depends upon (see :method:`CircuitOutcomeProbabilityArrayLayout.param_dependency_index`).
+        The memory required thereby scales with the number of these entries rather than the
+        number of elements times the number of parameters, which is much smaller for models,
+        like local-noise and cloud-noise models, whose gates each depend on few parameters.
+        Penalty-term rows are stored densely.
+
+        This method is only available when the objective function isn't divided among
+        multiple processors.
+
+        Parameters
+        ----------
+        paramvec : numpy.ndarray, optional
+            The vector of (model) parameters to evaluate the objective function at.
+            If `None`, then the model's current parameter vector is used (held internally).
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            A matrix of shape `(nElements,nParams)` where `nElements` is the number
+            of circuit outcomes and `nParams` is the number of model parameters.
+            This matrix (and its memory) is reused by subsequent calls.
+        """
+        tm = _time.time()
+        if self.resource_alloc.comm_size > 1:
+            raise NotImplementedError("Sparse jacobians are not supported when using multiple processors!")
+        if self._sparse_jac is None:
+            self._sparse_jac, self._sparse_dprobs = self._allocate_sparse_jac()
+        jac = self._sparse_jac
+        dprobs = self._sparse_dprobs  # shares memory with the first `nelements` rows of `jac`
+        if paramvec is not None:
+            self.model.from_vector(paramvec)
+        else:
+            paramvec = self.model.to_vector()
+
+        with self.resource_alloc.temporarily_track_memory(2 * self.nelements):  # 'e' (dg_dprobs, lsvec)
+            self.model.sim.bulk_fill_sparse_dprobs(dprobs, self.layout, self.probs)
+            self._clip_probs()
+            self._set_probs_paramvec(paramvec)
+
+            if self.firsts is not None:
+                # all the rows (elements) of a circuit have the same sparsity structure, so the sum of the rows
+                # of circuit with omitted outcomes is just the sum of the rows' data
+                dprobs_omitted_rowsum = [_np.sum([dprobs.data[dprobs.indptr[k]:dprobs.indptr[k + 1]]
+                                                  for k in _slct.to_array(self.layout.indices_for_index(i))], axis=0)
+                                         for i in self.indicesOfCircuitsWithOmittedData]
+
+            dg_dprobs, lsvec = self._dlsvec_work_arrays()
+            self.raw_objfn.fill_dlsvec_and_lsvec(dg_dprobs, lsvec, self.probs, self.counts, self.total_counts,
+                                                 self.freqs)
+            dprobs.data *= _np.repeat(dg_dprobs, _np.diff(dprobs.indptr))
+
+        if self.firsts is not None:
+            #Note: lsvec is assumed to be *not* updated w/omitted probs contribution (see _update_dlsvec_for_...)
+            lsvec_firsts = lsvec[self.firsts]
+            updated_lsvec = _np.sqrt(lsvec_firsts**2 + self._omitted_prob_first_terms(self.probs))
+            updated_lsvec = _np.where(updated_lsvec == 0, 1.0, updated_lsvec)  # avoid 0/0 where lsvec & deriv == 0
+            scale = lsvec_firsts / updated_lsvec
+            coeffs = (0.5 / updated_lsvec) * self._omitted_prob_first_dterms(self.probs)
+            for k, rowsum, a, b in zip(self.firsts, dprobs_omitted_rowsum, scale, coeffs):
+                row_data = dprobs.data[dprobs.indptr[k]:dprobs.indptr[k + 1]]
+                row_data *= a
+                row_data -= b * rowsum
+
+        if self._process_penalties and self.local_ex > 0:
+            penalty_jac = _np.empty((self.local_ex, self.nparams), 'd')  # penalty rows are dense
+            self._fill_lspenaltyvec_jac(paramvec, penalty_jac)
+            jac.data[jac.indptr[self.nelements]:] = penalty_jac.flat
+
+        self.raw_objfn.resource_alloc.profiler.add_time("SPARSE JACOBIAN", tm)
+        return jac
+
+    def _allocate_sparse_jac(self):
+        """
+        Allocate the sparse jacobian used by :method:`sparse_dlsvec`.
+
+        Returns
+        -------
+        jac : scipy.sparse.csr_matrix
+            The `(nelements + local_ex, nparams)` jacobian, whose last `local_ex` (penalty) rows are dense.
+        dprobs : scipy.sparse.csr_matrix
+            A `(nelements, nparams)` matrix sharing its memory with the first `nelements` rows of `jac`.
+        """
+        indptr, indices = self.layout.param_dependency_index(self.model)
+        nnz = indptr[-1]; nP = self.nparams
+        jac_indptr = _np.concatenate((indptr, nnz + nP * _np.arange(1, self.local_ex + 1, dtype=_np.int64)))
+        jac_indices = _np.concatenate((indices, _np.tile(_np.arange(nP, dtype=_np.int64), self.local_ex)))
+        jac = _sps.csr_matrix((_np.zeros(len(jac_indices), 'd'), jac_indices, jac_indptr),
+                              shape=(self.nelements + self.local_ex, nP))
+        dprobs = _sps.csr_matrix((jac.data[0:nnz], jac.indices[0:nnz], jac.indptr[0:self.nelements + 1]),
+                                 shape=(self.nelements, nP))
+        dprobs.data = jac.data[0:nnz]  # set after construction, as the constructor may copy small views
+        return jac, dprobs
 
     def dterms(self, paramvec=None):
         """
@@ -4956,9 +5592,12 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         with self.resource_alloc.temporarily_track_memory(2 * self.nelements):  # 'e' (dg_dprobs, lsvec)
             self.model.sim.bulk_fill_dprobs(dprobs, self.layout, self.probs)
             self._clip_probs()  # clips self.probs in place w/shared mem sync
+            self._set_probs_paramvec(paramvec)
 
             if shared_mem_leader:
                 if self.firsts is not None:
+                    if self.dprobs_omitted_rowsum is None:
+                        self.dprobs_omitted_rowsum = _np.empty((len(self.firsts), self.nparams), 'd')
                     for ii, i in enumerate(self.indicesOfCircuitsWithOmittedData):
                         self.dprobs_omitted_rowsum[ii, :] = _np.sum(dprobs[self.layout.indices_for_index(i), :], axis=0)
 
@@ -5027,6 +5666,7 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         with self.resource_alloc.temporarily_track_memory(2 * self.nelements + self.nelements * self.nparams**2):
             self.model.sim.bulk_fill_hprobs(hprobs, self.layout, self.probs, dprobs, dprobs2)
             self._clip_probs()  # clips self.probs in place w/shared mem sync
+            self._set_probs_paramvec(None)
 
             dg_dprobs = self.raw_objfn.dterms(self.probs, self.counts, self.total_counts, self.freqs)[:, None, None]
             d2g_dprobs2 = self.raw_objfn.hterms(self.probs, self.counts, self.total_counts, self.freqs)[:, None, None]
@@ -5083,12 +5723,19 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
         #shared_mem_leader = unit_ralloc.is_host_leader
 
         if paramvec is not None: self.model.from_vector(paramvec)
-        dprobs = self.jac[0:self.nelements, :]  # avoid mem copying: use jac mem for dprobs
-
-        # 'e', 'pp' (d2g_dprobs2, einsum result )
-        with self.resource_alloc.temporarily_track_memory(self.nelements + self.nparams**2):
+        if isinstance(self.layout, _DistributableCOPALayout):
+            # `hessian` is just the part of the (approximate) Hessian this proc "owns"
+            return self._gather_hessian(self._construct_approximate_hessian())
+
+        #Layouts without atoms: form the entire Jacobian at once
+        nJacElements = 0 if (self.jac is not None) else self.nelements * self.nparams
+        # 'e', 'pp' (d2g_dprobs2, einsum result ) (+ 'ep' when there's no jac mem)
+        with self.resource_alloc.temporarily_track_memory(self.nelements + self.nparams**2 + nJacElements):
+            dprobs = self.jac[0:self.nelements, :] if (self.jac is not None) \
+                else _np.empty((self.nelements, self.nparams), 'd')  # use jac mem for dprobs when we can
             self.model.sim.bulk_fill_dprobs(dprobs, self.layout, self.probs)
             self._clip_probs()  # clips self.probs in place w/shared mem sync
+            self._set_probs_paramvec(None)
 
             d2g_dprobs2 = self.raw_objfn.hterms(self.probs, self.counts, self.total_counts, self.freqs)  # [:,None,None]
             #dprobs_dp1 = dprobs[:, :, None]  # (nelements,N,1)
@@ -5099,6 +5746,94 @@ class TimeIndependentMDCObjectiveFunction(MDCObjectiveFunction):
 
         return self._gather_hessian(hessian)  # `hessian` is just the part of the (approximate) Hessian this proc "owns"
 
+    def _construct_approximate_hessian(self):
+        """
+        Accumulates this processor's portion of the approximate Hessian one layout atom at a time.
+
+        For each atom, the derivatives of its outcome probabilities with respect to (at most) two blocks of
+        parameters are computed at a time and contracted with the second derivatives of the raw objective
+        function, so that only `(atom-size, block-size)` portions of the Jacobian are ever held in memory.
+        Parameter blocks are as large as the layout's parameter-block sizes and this objective function's
+        memory limit (if any) allow.
+        """
+        layout = self.layout
+        nparams = self.model.num_params
+        atom_resource_alloc = layout.resource_alloc('atom-processing')
+        param2_resource_alloc = layout.resource_alloc('param2-processing')
+
+        param_slice = layout.global_param_slice if (layout.global_param_slice is not None) else slice(0, nparams)
+        param2_slice = layout.global_param2_slice if (layout.global_param2_slice is not None) else slice(0, nparams)
+        my_nparams1 = _slct.length(param_slice)
+        my_nparams2 = _slct.length(param2_slice)
+        symmetric = bool(param_slice == param2_slice)  # then only upper-triangle blocks need to be computed
+        max_atom_nelements = max([atom.num_elements for atom in layout.atoms] + [1])
+
+        with self.resource_alloc.temporarily_track_memory(my_nparams1 * my_nparams2):  # (local_hessian)
+            local_hessian = _np.zeros((my_nparams1, my_nparams2), 'd')
+
+            blk_size = max(my_nparams1, my_nparams2, 1)
+            blk_size = min([blk_size] + [b for b in layout.param_dimension_blk_sizes if b is not None])
+            if self.resource_alloc.mem_limit is not None:
+                # room for two (atom-size, blk_size) derivative arrays + an atom's probabilities & weights
+                avail = (self.resource_alloc.mem_limit - self.resource_alloc.allocated_memory) // 8 \
+                    - 2 * max_atom_nelements
+                blk_size = min(blk_size, int(avail // (2 * max_atom_nelements)))
+                if blk_size < 1:
+                    raise MemoryError("Not enough memory to compute the approximate Hessian of even a single "
+                                      "parameter block!")
+
+            blocks1 = _mpit.slice_up_range(my_nparams1, max(int(_np.ceil(my_nparams1 / blk_size)), 1),
+                                           param_slice.start)  # *global* parameter indices
+            blocks2 = blocks1 if symmetric else \
+                _mpit.slice_up_range(my_nparams2, max(int(_np.ceil(my_nparams2 / blk_size)), 1), param2_slice.start)
+
+            for atom in layout.atoms:  # iterates over *local* atoms
+                atom_nelements = atom.num_elements
+
+                # 'a', 'a', 'ab', 'ab' (probs, weights, dprobs_mem1, dprobs_mem2)
+                with self.resource_alloc.temporarily_track_memory(2 * atom_nelements * (blk_size + 1)):
+                    probs = _np.empty(atom_nelements, 'd')  # Note: this doesn't need to be shared as we never gather it
+                    dprobs_mem1 = _np.empty((atom_nelements, blk_size), 'd')
+                    dprobs_mem2 = _np.empty((atom_nelements, blk_size), 'd')
+
+                    self.model.sim._bulk_fill_probs_atom(probs, atom, atom_resource_alloc)
+                    if self.prob_clip_interval is not None:
+                        _np.clip(probs, self.prob_clip_interval[0], self.prob_clip_interval[1], out=probs)
+                    d2g_dprobs2 = self.raw_objfn.hterms(probs, self.counts[atom.element_slice],
+                                                        self.total_counts[atom.element_slice],
+                                                        self.freqs[atom.element_slice])[:, None]
+
+                    def fill_dprobs(mem, slc):
+                        dprobs = mem[:, 0:_slct.length(slc)]
+                        self.model.sim._bulk_fill_dprobs_atom(dprobs, slice(0, dprobs.shape[1]), atom, slc,
+                                                              param2_resource_alloc)
+                        return dprobs
+
+                    # Only the leader of each param2 group's processors computes derivatives (see _construct_hessian)
+                    accumulate = param2_resource_alloc.is_host_leader
+                    for i, slice1 in enumerate(blocks1):
+                        local_slice1 = _slct.shift(slice1, -param_slice.start)  # indices into local_hessian
+                        weighted_dprobs1 = dprobs_mem1[:, 0:_slct.length(slice1)]
+                        if symmetric:  # the diagonal block (i,i) re-uses the derivatives of the i-th block
+                            dprobs1 = fill_dprobs(dprobs_mem2, slice1)
+                            _np.multiply(d2g_dprobs2, dprobs1, out=weighted_dprobs1)
+                            if accumulate: local_hessian[local_slice1, local_slice1] += weighted_dprobs1.T @ dprobs1
+                            column_blocks = blocks2[i + 1:]
+                        else:
+                            fill_dprobs(dprobs_mem1, slice1)
+                            weighted_dprobs1 *= d2g_dprobs2
+                            column_blocks = blocks2
+
+                        for slice2 in column_blocks:
+                            local_slice2 = _slct.shift(slice2, -param2_slice.start)
+                            dprobs2 = fill_dprobs(dprobs_mem2, slice2)
+                            if not accumulate: continue
+                            hessian_blk = weighted_dprobs1.T @ dprobs2
+                            local_hessian[local_slice1, local_slice2] += hessian_blk
+                            if symmetric: local_hessian[local_slice2, local_slice1] += hessian_blk.T
+
+        return local_hessian  # (my_nparams1, my_nparams2)
+
     def hessian(self, paramvec=None):
         """
         Compute the Hessian of this objective function.
@@ -5212,16 +5947,23 @@ class Chi2Function(TimeIndependentMDCObjectiveFunction):
         Whether hessian calculations are allowed.  If `True` then more resources are
         needed.  If `False`, calls to hessian-requiring function will result in an
         error.
+
+    fused_kernels : bool, optional
+        Whether to evaluate the per-element terms, least-squares vector, and its derivative
+        using compiled, fused kernels (see the `fused_kernels` argument of :class:`RawChi2Function`).
     """
     @classmethod
     def create_from(cls, model, dataset, circuits, regularization=None, penalties=None, resource_alloc=None,
-                    name=None, description=None, verbosity=0, method_names=('fn',), array_types=()):
+                    name=None, description=None, verbosity=0, method_names=('fn',), array_types=(),
+                    fused_kernels=False):
         mdc_store = cls._create_mdc_store(model, dataset, circuits, resource_alloc, method_names,
                                           array_types, verbosity)
-        return cls(mdc_store, regularization, penalties, name, description, verbosity)
+        return cls(mdc_store, regularization, penalties, name, description, verbosity, fused_kernels)
 
-    def __init__(self, mdc_store, regularization=None, penalties=None, name=None, description=None, verbosity=0):
-        raw_objfn = RawChi2Function(regularization, mdc_store.resource_alloc, name, description, verbosity)
+    def __init__(self, mdc_store, regularization=None, penalties=None, name=None, description=None, verbosity=0,
+                 fused_kernels=False):
+        raw_objfn = RawChi2Function(regularization, mdc_store.resource_alloc, name, description, verbosity,
+                                    fused_kernels)
         super().__init__(raw_objfn, mdc_store, penalties, verbosity)
 
 
@@ -5445,19 +6187,25 @@ class PoissonPicDeltaLogLFunction(TimeIndependentMDCObjectiveFunction):
         Whether hessian calculations are allowed.  If `True` then more resources are
         needed.  If `False`, calls to hessian-requiring function will result in an
         error.
+
+    fused_kernels : bool, optional
+        Whether to evaluate the per-element terms, least-squares vector, and its derivative
+        using compiled, fused kernels (see the `fused_kernels` argument of
+        :class:`RawPoissonPicDeltaLogLFunction`).
     """
 
     @classmethod
     def create_from(cls, model, dataset, circuits, regularization=None, penalties=None,
                     resource_alloc=None, name=None, description=None, verbosity=0,
-                    method_names=('fn',), array_types=()):
+                    method_names=('fn',), array_types=(), fused_kernels=False):
         mdc_store = cls._create_mdc_store(model, dataset, circuits, resource_alloc, method_names,
                                           array_types, verbosity)
-        return cls(mdc_store, regularization, penalties, name, description, verbosity)
+        return cls(mdc_store, regularization, penalties, name, description, verbosity, fused_kernels)
 
-    def __init__(self, mdc_store, regularization=None, penalties=None, name=None, description=None, verbosity=0):
+    def __init__(self, mdc_store, regularization=None, penalties=None, name=None, description=None, verbosity=0,
+                 fused_kernels=False):
         raw_objfn = RawPoissonPicDeltaLogLFunction(regularization, mdc_store.resource_alloc, name, description,
-                                                   verbosity)
+                                                   verbosity, fused_kernels)
         super().__init__(raw_objfn, mdc_store, penalties, verbosity)
 
 
@@ -6172,6 +6920,124 @@ def _cptp_penalty_size(mdl):
     return len(mdl.operations)
 
 
+# The largest operation-matrix dimension for which the (dense, `dim**2 x dim**2`) Choi transform is
+# cached: two qubits (a 1MB transform), as a 3-qubit transform would take 268MB.
+_MAX_CACHED_CHOI_TRANSFORM_DIM = 16
+
+
+@_lru_cache(maxsize=4)
+def _choi_transform(op_basis, dim):
+    """
+    The (cached) linear map taking an operation matrix to its Choi matrix.
+
+    This is the matrix `C` such that `C @ op_mx.flatten()` equals
+    `fast_jamiolkowski_iso_std(op_mx, op_basis).flatten()` for any `dim x dim`
+    operation matrix `op_mx`.  Since this map depends only on the basis, it is computed
+    once (by applying the Choi-Jamiolkowski isomorphism to each matrix unit) and reused
+    by all penalty-term evaluations on models with the same basis.  It is only used when
+    `dim <= _MAX_CACHED_CHOI_TRANSFORM_DIM` (see :function:`_choi_matrix`).
+
+    Parameters
+    ----------
+    op_basis : Basis or str
+        The basis of the operation matrices.
+
+    dim : int
+        The dimension of the operation matrices.
+
+    Returns
+    -------
+    numpy.ndarray
+        A read-only array of shape `(choi_dim**2, dim**2)`.
+    """
+    units = _np.identity(dim * dim, 'd').reshape((dim * dim, dim, dim))
+    transform = _np.array([_tools.fast_jamiolkowski_iso_std(unit, op_basis).flatten() for unit in units]).T
+    transform.flags.writeable = False
+    return transform
+
+
+@_lru_cache(maxsize=32)
+def _stdmx_transform(op_basis):
+    """
+    The (cached) conjugated, flattened elements of `op_basis`.
+
+    Row `i` is the conjugate of the flattened `i`-th basis element, so that
+    `transform.conjugate().T @ v` is the flattened standard-basis matrix
+    `vec_to_stdmx(v, op_basis)` and `transform @ mx.flatten()` contracts (without
+    conjugating `mx`) an `elshape`-shaped matrix against each basis element.
+
+    Parameters
+    ----------
+    op_basis : Basis
+        The basis of the state and effect vectors.
+
+    Returns
+    -------
+    numpy.ndarray
+        A read-only array of shape `(dim, elsize)`.
+    """
+    basis_mxs = _np.asarray(op_basis.elements)  # shape [dim, dmDim, dmDim]
+    transform = basis_mxs.reshape((basis_mxs.shape[0], int(_np.prod(basis_mxs.shape[1:])))).conjugate()
+    transform.flags.writeable = False
+    return transform
+
+
+def _choi_matrix(op_mx, op_basis):
+    """ The (std-basis) Choi matrix of `op_mx`, using the cached transform for small dimensions """
+    dim = op_mx.shape[0]
+    if dim > _MAX_CACHED_CHOI_TRANSFORM_DIM:
+        return _tools.fast_jamiolkowski_iso_std(op_mx, op_basis)
+    chi = _np.dot(_choi_transform(op_basis, dim), op_mx.flatten())
+    nchi = int(round(_np.sqrt(chi.size)))
+    return chi.reshape((nchi, nchi))
+
+
+def _choi_tracenorm_and_grad(op_mx, op_basis):
+    """
+    The trace norm of the Choi matrix of `op_mx` and its gradient with respect to `op_mx`.
+
+    Parameters
+    ----------
+    op_mx : numpy.ndarray
+        A `dim x dim` operation matrix.
+
+    op_basis : Basis or str
+        The basis of `op_mx`.
+
+    Returns
+    -------
+    tracenorm : float
+        The trace norm of the (trace-normalized, std-basis) Choi matrix of `op_mx`.
+
+    grad : numpy.ndarray
+        A complex vector of length `dim**2` such that the derivative of the trace norm
+        along a direction `d_op_mx` is `real(d_op_mx.flatten().conjugate() @ grad)`.
+    """
+    dim = op_mx.shape[0]
+    chi = _choi_matrix(op_mx, op_basis)
+    assert(_np.linalg.norm(chi - chi.T.conjugate()) < 1e-4), \
+        "chi should be Hermitian!"
+
+    #get sgn(chi-matrix) == d(|chi|_Tr)/dchi in std basis
+    sgnchi = _tools.matrix_sign(chi)
+    assert(_np.linalg.norm(sgnchi - sgnchi.T.conjugate()) < 1e-4), \
+        "sgnchi should be Hermitian!"
+
+    # Let M be the (linear) Choi map, so that chi = M(G) and dchi/dp = M(dG/dp).  Then
+    # d(|chi|_Tr)/dp = sum_ij sgnchi_ij * conj(M(dG/dp))_ij, where the conjugation results in separately
+    # adding the Re and Im parts (see NOTE in _spam_penalty_jac_fill).  In terms of the transform matrix
+    # this is conj(dG/dp) . conj(transform^T . conj(sgnchi)), which is what `grad` holds.
+    if dim > _MAX_CACHED_CHOI_TRANSFORM_DIM:  # compute transform^T . conj(sgnchi) one column of transform at a time
+        unit = _np.zeros(dim * dim, 'd'); grad = _np.empty(dim * dim, complex)
+        for k in range(dim * dim):
+            unit[k] = 1.0
+            grad[k] = _np.vdot(_tools.fast_jamiolkowski_iso_std(unit.reshape((dim, dim)), op_basis), sgnchi)
+            unit[k] = 0.0
+        return _tools.tracenorm(chi), grad
+    grad = _np.dot(_choi_transform(op_basis, dim).T, sgnchi.flatten().conjugate()).conjugate()
+    return _tools.tracenorm(chi), grad
+
+
 def _spam_penalty_size(mdl):
     return len(mdl.preps) + sum([len(povm) for povm in mdl.povms.values()])
 
@@ -6191,9 +7057,10 @@ def _cptp_penalty(mdl, prefactor, op_basis):
     numpy array
         a (real) 1D array of length len(mdl.operations).
     """
-    return prefactor * _np.sqrt(_np.array([_tools.tracenorm(
-        _tools.fast_jamiolkowski_iso_std(gate, op_basis)
-    ) for gate in mdl.operations.values()], 'd'))
+    tracenorms = []
+    for gate in mdl.operations.values():
+        tracenorms.append(_tools.tracenorm(_choi_matrix(gate.to_dense(on_space='minimal'), op_basis)))
+    return prefactor * _np.sqrt(_np.array(tracenorms, 'd'))
 
 
 def _spam_penalty(mdl, prefactor, op_basis):
@@ -6248,63 +7115,20 @@ def _cptp_penalty_jac_fill(cp_penalty_vec_grad_to_fill, mdl, prefactor, op_basis
     Helper function - jacobian of CPTP penalty (sum of tracenorms of gates)
     Returns a (real) array of shape (len(mdl.operations), n_params).
     """
-    from .. import tools as _tools
-
     # d( sqrt(|chi|_Tr) ) = (0.5 / sqrt(|chi|_Tr)) * d( |chi|_Tr )
     for i, gate in enumerate(mdl.operations.values()):
-        nparams = gate.num_params
-
-        #get sgn(chi-matrix) == d(|chi|_Tr)/dchi in std basis
-        # so sgnchi == d(|chi_std|_Tr)/dchi_std
-        chi = _tools.fast_jamiolkowski_iso_std(gate, op_basis)
-        assert(_np.linalg.norm(chi - chi.T.conjugate()) < 1e-4), \
-            "chi should be Hermitian!"
-
-        # Alt#1 way to compute sgnchi (evals) - works equally well to svd below
-        #evals,U = _np.linalg.eig(chi)
-        #sgnevals = [ ev/abs(ev) if (abs(ev) > 1e-7) else 0.0 for ev in evals]
-        #sgnchi = _np.dot(U,_np.dot(_np.diag(sgnevals),_np.linalg.inv(U)))
-
-        # Alt#2 way to compute sgnchi (sqrtm) - DOESN'T work well; sgnchi NOT very hermitian!
-        #sgnchi = _np.dot(chi, _np.linalg.inv(
-        #        _spl.sqrtm(_np.matrix(_np.dot(chi.T.conjugate(),chi)))))
-
-        sgnchi = _tools.matrix_sign(chi)
-        assert(_np.linalg.norm(sgnchi - sgnchi.T.conjugate()) < 1e-4), \
-            "sgnchi should be Hermitian!"
-
-        # get d(gate)/dp in op_basis [shape == (nP,dim,dim)]
-        #OLD: dGdp = mdl.dproduct((gl,)) but wasteful
-        dgate_dp = gate.deriv_wrt_params()  # shape (dim**2, nP)
-        dgate_dp = _np.swapaxes(dgate_dp, 0, 1)  # shape (nP, dim**2, )
-        dgate_dp.shape = (nparams, mdl.dim, mdl.dim)
-
-        # Let M be the "shuffle" operation performed by fast_jamiolkowski_iso_std
-        # which maps a gate onto the choi-jamiolkowsky "basis" (i.e. performs that C-J
-        # transform).  This shuffle op commutes with the derivative, so that
-        # dchi_std/dp := d(M(G))/dp = M(dG/dp), which we call "MdGdp_std" (the choi
-        # mapping of dGdp in the std basis)
-        m_dgate_dp_std = _np.empty((nparams, mdl.dim, mdl.dim), 'complex')
-        for p in range(nparams):  # p indexes param
-            m_dgate_dp_std[p] = _tools.fast_jamiolkowski_iso_std(dgate_dp[p], op_basis)  # now "M(dGdp_std)"
-            assert(_np.linalg.norm(m_dgate_dp_std[p] - m_dgate_dp_std[p].T.conjugate()) < 1e-8)  # check hermitian
-
-        m_dgate_dp_std = _np.conjugate(m_dgate_dp_std)  # so element-wise multiply
-        # of complex number (einsum below) results in separately adding
-        # Re and Im parts (also see NOTE in spam_penalty_jac_fill below)
-
-        #contract to get (note contract along both mx indices b/c treat like a
-        # mx basis): d(|chi_std|_Tr)/dp = d(|chi_std|_Tr)/dchi_std * dchi_std/dp
-        #v =  _np.einsum("ij,aij->a",sgnchi,MdGdp_std)
-        v = _np.tensordot(sgnchi, m_dgate_dp_std, ((0, 1), (1, 2)))
-        v *= prefactor * (0.5 / _np.sqrt(_tools.tracenorm(chi)))  # add 0.5/|chi|_Tr factor
+        tracenorm, dtracenorm_dgate = _choi_tracenorm_and_grad(gate.to_dense(on_space='minimal'), op_basis)
+
+        # get d(gate)/dp in op_basis [shape == (dim**2, nP)], and contract with d(|chi|_Tr)/d(gate)
+        dgate_dp = gate.deriv_wrt_params()
+        v = _np.dot(dgate_dp.T.conjugate(), dtracenorm_dgate)
+        v *= prefactor * (0.5 / _np.sqrt(tracenorm))  # add 0.5/|chi|_Tr factor
         assert(_np.linalg.norm(v.imag) < 1e-4)
         cp_penalty_vec_grad_to_fill[i, :] = 0.0
 
         gate_gpinds_subset, within_wrtslice, within_gpinds = _slct.intersect_within(wrt_slice, gate.gpindices)
         cp_penalty_vec_grad_to_fill[i, within_wrtslice] = v.real[within_gpinds]  # indexing w/array OR
         #slice works as expected in this case
-        chi = sgnchi = dgate_dp = m_dgate_dp_std = v = None  # free mem
 
     return len(mdl.operations)  # the number of leading-dim indicies we filled in
 
@@ -6314,8 +7138,7 @@ def _spam_penalty_jac_fill(spam_penalty_vec_grad_to_fill, mdl, prefactor, op_bas
     Helper function - jacobian of CPTP penalty (sum of tracenorms of gates)
     Returns a (real) array of shape ( _spam_penalty_size(mdl), n_params).
     """
-    basis_mxs = op_basis.elements  # shape [mdl.dim, dmDim, dmDim]
-    ddenmx_dv = demx_dv = basis_mxs.conjugate()  # b/c denMx = sum( spamvec[i] * Bmx[i] ) and "V" == spamvec
+    ddenmx_dv = demx_dv = _stdmx_transform(op_basis)  # b/c denMx = sum( spamvec[i] * Bmx[i] ) and "V" == spamvec
     #NOTE: conjugate() above is because ddenMxdV and dEMxdV will get *elementwise*
     # multiplied (einsum below) by another complex matrix (sgndm or sgnE) and summed
     # in order to gather the different components of the total derivative of the trace-norm
@@ -6349,7 +7172,7 @@ def _spam_penalty_jac_fill(spam_penalty_vec_grad_to_fill, mdl, prefactor, op_bas
         # d(|denMx|_Tr)/dp = d(|denMx|_Tr)/d(denMx) * d(denMx)/d(spamvec) * d(spamvec)/dp
         # [dmDim,dmDim] * [mdl.dim, dmDim,dmDim] * [mdl.dim, nP]
         #v =  _np.einsum("ij,aij,ab->b",sgndm,ddenMxdV,dVdp)
-        v = _np.tensordot(_np.tensordot(sgndm, ddenmx_dv, ((0, 1), (1, 2))), dv_dp, (0, 0))
+        v = _np.dot(_np.dot(ddenmx_dv, sgndm.flatten()), dv_dp)
         v *= prefactor * (0.5 / _np.sqrt(_tools.tracenorm(denmx)))  # add 0.5/|denMx|_Tr factor
         assert(_np.linalg.norm(v.imag) < 1e-4)
         spam_penalty_vec_grad_to_fill[i, :] = 0.0
@@ -6385,7 +7208,7 @@ def _spam_penalty_jac_fill(spam_penalty_vec_grad_to_fill, mdl, prefactor, op_bas
             # d(|EMx|_Tr)/dp = d(|EMx|_Tr)/d(EMx) * d(EMx)/d(spamvec) * d(spamvec)/dp
             # [dmDim,dmDim] * [mdl.dim, dmDim,dmDim] * [mdl.dim, nP]
             #v =  _np.einsum("ij,aij,ab->b",sgnE,dEMxdV,dVdp)
-            v = _np.tensordot(_np.tensordot(sgn_e, demx_dv, ((0, 1), (1, 2))), dv_dp, (0, 0))
+            v = _np.dot(_np.dot(demx_dv, sgn_e.flatten()), dv_dp)
             v *= prefactor * (0.5 / _np.sqrt(_tools.tracenorm(emx)))  # add 0.5/|EMx|_Tr factor
             assert(_np.linalg.norm(v.imag) < 1e-4)
 
@@ -6561,6 +7384,7 @@ class LogLWildcardFunction(ObjectiveFunction):
                                           self.logl_objfn.freqs,
                                           self.logl_objfn.layout,
                                           self.wildcard_budget_precomp)
+        self.logl_objfn._set_probs_paramvec(None)  # logl_objfn.probs now holds the wildcard-updated probabilities
 
         counts, N, freqs = self.logl_objfn.counts, self.logl_objfn.total_counts, self.logl_objfn.freqs
         return self.logl_objfn.raw_objfn.lsvec(self.logl_objfn.probs, counts, N, freqs)
@@ -6703,4 +7527,4 @@ class CachedObjectiveFunction(_NicelySerializable):
     def _from_nice_serialization(cls, state):
         from pygsti.io.metadir import _class_for_name
         return cls(_class_for_name(state['class_to_build']), state['name'], state['description'],
-                   state['regularization'], state['penalties'], *state['additional_arguments'])
+                   state['regularization'], state['penalties'], **state['additional_arguments'])
@@ -11,6 +11,7 @@ Implements the ArraysInterface object and supporting functionality.
 #***************************************************************************************************
 
 import numpy as _np
+import scipy.sparse as _sps
 
 from pygsti.tools import sharedmemtools as _smt
 
@@ -430,6 +431,21 @@ class UndistributedArraysInterface(ArraysInterface):
         """
         return _np.linalg.norm(x, ord=_np.inf)  # (max(sum(abs(x), axis=1))) = max(abs(x))
 
+    def min_x(self, x):
+        """
+        Compute the minimum of an `x`-type vector.
+
+        Parameters
+        ----------
+        x : numpy.ndarray or LocalNumpyArray
+            The vector to operate on.
+
+        Returns
+        -------
+        float
+        """
+        return _np.min(x)
+
     def max_x(self, x):
         """
         Compute the maximum of an `x`-type vector.
@@ -481,13 +497,15 @@ class UndistributedArraysInterface(ArraysInterface):
 
         Parameters
         ----------
-        j : numpy.ndarray or LocalNumpyArray
+        j : numpy.ndarray or LocalNumpyArray or scipy.sparse.csr_matrix
             The Jacobian to operate on.
 
         Returns
         -------
         float
         """
+        if _sps.issparse(j):
+            return _np.linalg.norm(j.data)
         return _np.linalg.norm(j)
 
     def fill_jtf(self, j, f, jtf):
@@ -496,7 +514,7 @@ class UndistributedArraysInterface(ArraysInterface):
 
         Parameters
         ----------
-        j : numpy.ndarray or LocalNumpyArray
+        j : numpy.ndarray or LocalNumpyArray or scipy.sparse.csr_matrix
             Jacobian matrix (type `ep`).
 
         f : numpy.ndarray or LocalNumpyArray
@@ -509,7 +527,10 @@ class UndistributedArraysInterface(ArraysInterface):
         -------
         None
         """
-        jtf[:] = _np.dot(j.T, f)
+        if _sps.issparse(j):
+            jtf[:] = j.T.dot(f)
+        else:
+            jtf[:] = _np.dot(j.T, f)
 
     def fill_jtj(self, j, jtj, shared_mem_buf=None):
         """
@@ -517,8 +538,9 @@ class UndistributedArraysInterface(ArraysInterface):
 
         Parameters
         ----------
-        j : numpy.ndarray or LocalNumpyArray
-            Jacobian matrix (type `ep`).
+        j : numpy.ndarray or LocalNumpyArray or scipy.sparse.csr_matrix
+            Jacobian matrix (type `ep`).  When sparse, the product is computed
+            with a sparse-sparse product and only densified at the end.
 
         jtf : numpy.ndarray or LocalNumpyArray
             Output array, type `jtj`.  Filled with `dot(j.T, j)` values.
@@ -531,7 +553,52 @@ class UndistributedArraysInterface(ArraysInterface):
         -------
         None
         """
-        jtj[:, :] = _np.dot(j.T, j)
+        if _sps.issparse(j):
+            jtj[:, :] = (j.T @ j).toarray()
+        else:
+            jtj[:, :] = _np.dot(j.T, j)
+
+    def fill_jv(self, j, global_v, jv):
+        """
+        Compute dot(Jacobian, v) in supplied memory.
+
+        Parameters
+        ----------
+        j : numpy.ndarray or LocalNumpyArray or scipy.sparse.csr_matrix
+            Jacobian matrix (type `ep`).
+
+        global_v : numpy.ndarray
+            A global parameter vector, e.g. as gathered by :method:`allgather_x`.
+
+        jv : numpy.ndarray
+            Output array, a local `e`-type vector.  Filled with `dot(j, v)` values.
+
+        Returns
+        -------
+        None
+        """
+        jv[:] = j.dot(global_v)
+
+    def fill_jtj_diag(self, j, jtj_diag):
+        """
+        Compute the diagonal of dot(Jacobian.T, Jacobian) in supplied memory, without forming the product.
+
+        Parameters
+        ----------
+        j : numpy.ndarray or LocalNumpyArray or scipy.sparse.csr_matrix
+            Jacobian matrix (type `ep`).
+
+        jtj_diag : numpy.ndarray or LocalNumpyArray
+            Output array, type `jtf`.  Filled with the squared norms of the columns of `j`.
+
+        Returns
+        -------
+        None
+        """
+        if _sps.issparse(j):
+            jtj_diag[:] = _np.asarray(j.multiply(j).sum(axis=0)).ravel()
+        else:
+            jtj_diag[:] = _np.einsum('ij,ij->j', j, j)
 
     def allocate_jtj_shared_mem_buf(self):
         """
@@ -1216,6 +1283,45 @@ class DistributedArraysInterface(ArraysInterface):
         """
         self.layout.fill_jtj(j, jtj, shared_mem_buf)
 
+    def fill_jv(self, j, global_v, jv):
+        """
+        Compute dot(Jacobian, v) in supplied memory.
+
+        Parameters
+        ----------
+        j : numpy.ndarray or LocalNumpyArray
+            Jacobian matrix (type `ep`).
+
+        global_v : numpy.ndarray
+            A global parameter vector, e.g. as gathered by :method:`allgather_x`.
+
+        jv : numpy.ndarray
+            Output array, a local `e`-type vector.  Filled with `dot(j, v)` values.
+
+        Returns
+        -------
+        None
+        """
+        self.layout.fill_jv(j, global_v, jv)
+
+    def fill_jtj_diag(self, j, jtj_diag):
+        """
+        Compute the diagonal of dot(Jacobian.T, Jacobian) in supplied memory, without forming the product.
+
+        Parameters
+        ----------
+        j : numpy.ndarray or LocalNumpyArray
+            Jacobian matrix (type `ep`).
+
+        jtj_diag : numpy.ndarray or LocalNumpyArray
+            Output array, type `jtf`.  Filled with the squared norms of the (global) columns of `j`.
+
+        Returns
+        -------
+        None
+        """
+        self.layout.fill_jtj_diag(j, jtj_diag)
+
     def allocate_jtj_shared_mem_buf(self):
         """
         Allocate scratch space to be used for repeated calls to :method:`fill_jtj`.
@@ -10,11 +10,13 @@ Custom implementation of the Levenberg-Marquardt Algorithm
 # http://www.apache.org/licenses/LICENSE-2.0 or in the LICENSE file in the root pyGSTi directory.
 #***************************************************************************************************
 
+import os as _os
 import signal as _signal
 import time as _time
 
 import numpy as _np
 import scipy as _scipy
+import scipy.sparse as _sps
 
 from pygsti.optimize import arraysinterface as _ari
 from pygsti.optimize.customsolve import custom_solve as _custom_solve
@@ -205,11 +207,62 @@ class CustomLMOptimizer(Optimizer):
         by the objective function's `.terms()` and `.lsvec()` methods (`'normal'` mode) or the
         "per-circuit quantities" computed by the objective function's `.percircuit()` and
         `.lsvec_percircuit()` methods (`'percircuit'` mode).
+
+    sparse_jacobian : bool, optional
+        Whether the Jacobian is computed and held as a sparse (CSR) matrix, using the objective
+        function's `.sparse_dlsvec()` method.  This is beneficial when model parameters only
+        affect a small fraction of circuits, as is typical for local- and cloud-noise models, since
+        the Jacobian's memory then scales with its number of nonzero elements rather than with
+        elements x parameters.  Only available in `'normal'` `lsvec_mode` on a single processor.
+
+    checkpoint_interval : int, optional
+        When this optimizer's `checkpoint_path` attribute is set (e.g. by :function:`run_iterative_gst`
+        when it's given a checkpoint directory), the optimizer's state is saved to this path every
+        `checkpoint_interval` outer iterations (and upon completion) so that an interrupted optimization
+        can be resumed.  Zero means the state is only saved upon completion.
+
+    warm_start : bool, optional
+        Whether successive, related optimizations (e.g. those of the same objective function
+        on the iterations of :function:`run_iterative_gst`) should be warm-started.  When True,
+        the final damping state of one optimization, available as the `'warm_start_state'`
+        element of its result's `optimizer_specific_qtys`, is used to initialize the damping
+        of the next instead of `init_munu`.  The warm-start state used by :method:`run` is
+        held in this optimizer's `warm_start_state` attribute.
+
+    linear_solver : {"direct", "cg", "lsqr"}
+        How the damped normal equations are solved on each iteration.  `"direct"` forms the
+        (parameters x parameters) JTJ matrix and solves the equations by factorization.
+        `"cg"` (preconditioned conjugate gradient on the normal equations) and `"lsqr"` are
+        matrix-free, using only products with the Jacobian and its transpose, and are
+        appropriate when there are so many model parameters that forming and factoring JTJ
+        is prohibitive.  The matrix-free modes require `damping_basis == "diagonal_values"`.
+
+    linear_solver_maxiter : int, optional
+        The maximum number of iterations of a matrix-free linear solve.  Steps obtained from
+        an unconverged solve are still used, as Levenberg-Marquardt only needs approximate steps.
+
+    linear_solver_tol : float, optional
+        The relative tolerance (on the residual of the normal equations) of a matrix-free linear solve.
+
+    linear_solver_precond : {"jacobi", None}
+        The preconditioner used by the matrix-free linear solves.  `"jacobi"` uses the diagonal of
+        the damped JTJ matrix (computed without forming JTJ).
+
+    broyden_updates : int, optional
+        The maximum number of consecutive outer iterations that use a rank-1 Broyden update of
+        the previous Jacobian instead of a full Jacobian evaluation.  A full evaluation is always
+        performed after a rejected step, or when an updated Jacobian indicates convergence.
+        Zero disables Broyden updates.  The number of Jacobian
+        evaluations saved is reported as the `'jacobian_evaluations_saved'` element of the result's
+        `optimizer_specific_qtys`.
     """
     def __init__(self, maxiter=100, maxfev=100, tol=1e-6, fditer=0, first_fditer=0, damping_mode="identity",
                  damping_basis="diagonal_values", damping_clip=None, use_acceleration=False,
                  uphill_step_threshold=0.0, init_munu="auto", oob_check_interval=0,
-                 oob_action="reject", oob_check_mode=0, serial_solve_proc_threshold=100, lsvec_mode="normal"):
+                 oob_action="reject", oob_check_mode=0, serial_solve_proc_threshold=100, lsvec_mode="normal",
+                 sparse_jacobian=False, checkpoint_interval=0, warm_start=False, linear_solver="direct",
+                 linear_solver_maxiter=100, linear_solver_tol=1e-6, linear_solver_precond="jacobi",
+                 broyden_updates=0):
 
         if isinstance(tol, float): tol = {'relx': 1e-8, 'relf': tol, 'f': 1.0, 'jac': tol, 'maxdx': 1.0}
         self.maxiter = maxiter
@@ -226,10 +279,24 @@ class CustomLMOptimizer(Optimizer):
         self.oob_check_interval = oob_check_interval
         self.oob_action = oob_action
         self.oob_check_mode = oob_check_mode
-        self.array_types = 3 * ('p',) + ('e', 'ep')  # see custom_leastsq fn "-type"s  -need to add 'jtj' type
-        self.called_objective_methods = ('lsvec', 'dlsvec')  # the objective function methods we use (for mem estimate)
+        if sparse_jacobian:  # the (sparse) Jacobian is allocated by the objective, so no dense 'ep' array
+            self.array_types = 3 * ('p',) + ('e',)
+            self.called_objective_methods = ('lsvec', 'sparse_dlsvec')
+        else:
+            self.array_types = 3 * ('p',) + ('e', 'ep')  # see custom_leastsq fn "-type"s  -need to add 'jtj' type
+            self.called_objective_methods = ('lsvec', 'dlsvec')  # objective function methods we use (for mem estimate)
         self.serial_solve_proc_threshold = serial_solve_proc_threshold
         self.lsvec_mode = lsvec_mode
+        self.sparse_jacobian = sparse_jacobian
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_path = None  # set per-optimization, e.g. by run_iterative_gst
+        self.warm_start = warm_start
+        self.warm_start_state = None  # set per-optimization, e.g. by run_iterative_gst
+        self.linear_solver = linear_solver
+        self.linear_solver_maxiter = linear_solver_maxiter
+        self.linear_solver_tol = linear_solver_tol
+        self.linear_solver_precond = linear_solver_precond
+        self.broyden_updates = broyden_updates
 
     def _to_nice_serialization(self):
         state = super()._to_nice_serialization()
@@ -251,7 +318,15 @@ class CustomLMOptimizer(Optimizer):
             'array_types': self.array_types,
             'called_objective_function_methods': self.called_objective_methods,
             'serial_solve_number_of_processors_threshold': self.serial_solve_proc_threshold,
-            'lsvec_mode': self.lsvec_mode
+            'lsvec_mode': self.lsvec_mode,
+            'sparse_jacobian': self.sparse_jacobian,
+            'checkpoint_interval': self.checkpoint_interval,
+            'warm_start': self.warm_start,
+            'linear_solver': self.linear_solver,
+            'linear_solver_maximum_iterations': self.linear_solver_maxiter,
+            'linear_solver_tolerance': self.linear_solver_tol,
+            'linear_solver_preconditioner': self.linear_solver_precond,
+            'broyden_updates': self.broyden_updates
         })
         return state
 
@@ -272,7 +347,15 @@ class CustomLMOptimizer(Optimizer):
                    oob_action=state['out_of_bounds_action'],
                    oob_check_mode=state['out_of_bounds_check_mode'],
                    serial_solve_proc_threshold=state['serial_solve_number_of_processors_threshold'],
-                   lsvec_mode=state.get('lsvec_mode', 'normal'))
+                   lsvec_mode=state.get('lsvec_mode', 'normal'),
+                   sparse_jacobian=state.get('sparse_jacobian', False),
+                   checkpoint_interval=state.get('checkpoint_interval', 0),
+                   warm_start=state.get('warm_start', False),
+                   linear_solver=state.get('linear_solver', 'direct'),
+                   linear_solver_maxiter=state.get('linear_solver_maximum_iterations', 100),
+                   linear_solver_tol=state.get('linear_solver_tolerance', 1e-6),
+                   linear_solver_precond=state.get('linear_solver_preconditioner', 'jacobi'),
+                   broyden_updates=state.get('broyden_updates', 0))
 
     def run(self, objective, profiler, printer):
 
@@ -292,9 +375,12 @@ class CustomLMOptimizer(Optimizer):
         """
         nExtra = objective.ex  # number of additional "extra" elements
 
+        if self.sparse_jacobian and self.lsvec_mode != 'normal':
+            raise ValueError("A sparse Jacobian can only be used with `lsvec_mode == 'normal'`")
+
         if self.lsvec_mode == 'normal':
             objective_func = objective.lsvec
-            jacobian = objective.dlsvec
+            jacobian = objective.sparse_dlsvec if self.sparse_jacobian else objective.dlsvec
             nEls = objective.layout.num_elements + nExtra  # 'e' for array types
         elif self.lsvec_mode == 'percircuit':
             objective_func = objective.lsvec_percircuit
@@ -310,13 +396,21 @@ class CustomLMOptimizer(Optimizer):
 
         # Check memory limit can handle what custom_leastsq will "allocate"
         nP = len(x0)  # 'p' for array types
-        objective.resource_alloc.check_can_allocate_memory(3 * nP + nEls + nEls * nP + nP * nP)  # see array_types above
+        if self.sparse_jacobian:
+            if objective.resource_alloc.comm_size > 1:
+                raise NotImplementedError("Sparse Jacobians are not supported when using multiple processors.")
+            nJacEls = objective.layout.param_dependency_index(objective.model)[0][-1] + nExtra * nP
+            objective.resource_alloc.check_can_allocate_memory(3 * nP + nEls + nJacEls + nP * nP)
+            ari = _ari.UndistributedArraysInterface(nEls, nP)
+        else:
+            objective.resource_alloc.check_can_allocate_memory(3 * nP + nEls + nEls * nP + nP * nP)  # see array_types
 
-        from ..layouts.distlayout import DistributableCOPALayout as _DL
-        ari = _ari.DistributedArraysInterface(objective.layout, self.lsvec_mode, nExtra) \
-            if isinstance(objective.layout, _DL) else _ari.UndistributedArraysInterface(nEls, nP)
+            from ..layouts.distlayout import DistributableCOPALayout as _DL
+            ari = _ari.DistributedArraysInterface(objective.layout, self.lsvec_mode, nExtra) \
+                if isinstance(objective.layout, _DL) else _ari.UndistributedArraysInterface(nEls, nP)
 
-        opt_x, converged, msg, mu, nu, norm_f, f, opt_jtj = custom_leastsq(
+        diagnostics = {}
+        opt_x, converged, msg, mu, nu, norm_f, f, opt_jtj, warm_start_state = custom_leastsq(
             objective_func, jacobian, x0,
             max_iter=self.maxiter,
             num_fd_iters=self.fditer,
@@ -338,6 +432,16 @@ class CustomLMOptimizer(Optimizer):
             arrays_interface=ari,
             serial_solve_proc_threshold=self.serial_solve_proc_threshold,
             x_limits=x_limits,
+            checkpoint_path=self.checkpoint_path,
+            checkpoint_interval=self.checkpoint_interval,
+            warm_start=self.warm_start_state if self.warm_start else None,
+            return_warm_start=True,
+            linear_solver=self.linear_solver,
+            linear_solver_maxiter=self.linear_solver_maxiter,
+            linear_solver_tol=self.linear_solver_tol,
+            linear_solver_precond=self.linear_solver_precond,
+            broyden_updates=self.broyden_updates,
+            diagnostics=diagnostics,
             verbosity=printer - 1, profiler=profiler)
 
         printer.log("Least squares message = %s" % msg, 2)
@@ -365,7 +469,8 @@ class CustomLMOptimizer(Optimizer):
         chi2k_qty = objective.chi2k_distributed_qty(norm_f)
 
         return OptimizerResult(objective, opt_x, norm_f, opt_jtj, unpenalized_normf, chi2k_qty,
-                               {'msg': msg, 'mu': mu, 'nu': nu, 'fvec': f})
+                               {'msg': msg, 'mu': mu, 'nu': nu, 'fvec': f, 'warm_start_state': warm_start_state,
+                                'jacobian_evaluations_saved': diagnostics['jacobian_evaluations_saved']})
 
 #Scipy version...
 #            opt_x, _, _, msg, flag = \
@@ -381,7 +486,9 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                    damping_clip=None, use_acceleration=False, uphill_step_threshold=0.0,
                    init_munu="auto", oob_check_interval=0, oob_action="reject", oob_check_mode=0,
                    resource_alloc=None, arrays_interface=None, serial_solve_proc_threshold=100,
-                   x_limits=None, verbosity=0, profiler=None):
+                   x_limits=None, checkpoint_path=None, checkpoint_interval=0, warm_start=None,
+                   return_warm_start=False, linear_solver="direct", linear_solver_maxiter=100, linear_solver_tol=1e-6,
+                   linear_solver_precond="jacobi", broyden_updates=0, diagnostics=None, verbosity=0, profiler=None):
     """
     An implementation of the Levenberg-Marquardt least-squares optimization algorithm customized for use within pyGSTi.
 
@@ -511,6 +618,63 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
         A (num_params, 2)-shaped array, holding on each row the (min, max) values for the corresponding
         parameter (element of the "x" vector).  If `None`, then no limits are imposed.
 
+    checkpoint_path : str, optional
+        If not None, the path of a file where the optimizer's state (the best x found so far, its
+        objective function value, mu, nu and the outer iteration index) is saved, so that the
+        optimization can be resumed.  If this file exists when this function is called, the
+        optimization resumes from the saved state instead of starting from `x0`.
+
+    checkpoint_interval : int, optional
+        Save the optimizer's state to `checkpoint_path` every `checkpoint_interval` outer
+        iterations.  The state is also saved when the optimization completes.  Zero means the
+        state is only saved upon completion.
+
+    warm_start : dict, optional
+        The `warm_start_state` returned by a previous, related optimization (e.g. of the same
+        objective function on a subset of this optimization's circuits).  When not None, its final
+        damping parameters are used to initialize mu and nu (instead of `init_munu`).  With
+        `damping_mode == "identity"`, mu is rescaled by the ratio of the maximum diagonal elements
+        of the two optimizations' JTJ matrices, so the *relative* damping carries over.  Ignored
+        if it was created with a different damping mode or basis, or when resuming from a checkpoint.
+
+    return_warm_start : bool, optional
+        Whether to also return the final damping state, `warm_start_state`, which can be given as
+        the `warm_start` argument of a subsequent, related optimization.
+
+    linear_solver : {"direct", "cg", "lsqr"}
+        How the damped normal equations, `(JTJ + D) dx = -JTf`, are solved.  `"direct"` forms
+        JTJ and factors it (see `serial_solve_proc_threshold`).  `"cg"` and `"lsqr"` are
+        matrix-free: they use only products with the Jacobian and its transpose, solving the
+        normal equations by preconditioned conjugate gradient or the equivalent damped
+        least-squares problem by LSQR, respectively.  Matrix-free solves require
+        `damping_basis == "diagonal_values"`, and the returned `jtj` is None.
+
+    linear_solver_maxiter : int, optional
+        The maximum number of iterations of a matrix-free linear solve.
+
+    linear_solver_tol : float, optional
+        The relative tolerance of a matrix-free linear solve, i.e. the solve stops when the
+        norm of the normal equations' residual is below `linear_solver_tol` times that of `JTf`.
+
+    linear_solver_precond : {"jacobi", None}
+        The preconditioner for matrix-free linear solves.  `"jacobi"` scales by the diagonal
+        of the damped JTJ matrix, which is computed without forming JTJ.
+
+    broyden_updates : int, optional
+        The maximum number of consecutive outer iterations that, instead of calling `jac_fn`,
+        approximate the Jacobian by a rank-1 (Broyden) update of the previous one,
+        `J += (df - J dx) dx^T / |dx|^2`, using the accepted step `dx` and the resulting change in
+        the objective, `df`.  A full Jacobian is computed after any outer iteration with a rejected
+        step and before declaring convergence.  When a step computed using an updated Jacobian is
+        rejected, the full Jacobian is computed instead of increasing the damping.  Zero disables
+        Broyden updates.  Updates are not applied to sparse Jacobians, and the returned `jtj`
+        is always computed from a full Jacobian.
+
+    diagnostics : dict, optional
+        When not None, this dictionary is updated with information about the optimization.  Currently
+        this is just `"jacobian_evaluations_saved"`, the number of calls to `jac_fn` that were replaced
+        by Broyden updates.
+
     verbosity : int, optional
         Amount of detail to print to stdout.
 
@@ -525,11 +689,27 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
         Whether the solution converged.
     msg : str
         A message indicating why the solution converged (or didn't).
+    mu, nu : float
+        The final damping parameters.
+    norm_f : float
+        The final (minimal) value of the sum of squares.
+    f : numpy.ndarray
+        The final least-squares vector.
+    jtj : numpy.ndarray or None
+        The (undamped) JTJ matrix at `x`, if it was computed.
+    warm_start_state : dict
+        Only returned when `return_warm_start` is True.  The final damping state, which can be
+        given as the `warm_start` argument of a subsequent, related optimization.
     """
     resource_alloc = _ResourceAllocation.cast(resource_alloc)
     comm = resource_alloc.comm
     printer = _VerbosityPrinter.create_printer(verbosity, comm)
     ari = arrays_interface  # shorthand
+    matrix_free = (linear_solver != "direct")
+    if linear_solver not in ("direct", "cg", "lsqr"):
+        raise ValueError("Invalid linear_solver: %s" % str(linear_solver))
+    if matrix_free and damping_basis != "diagonal_values":
+        raise ValueError("Matrix-free linear solves require damping_basis == 'diagonal_values'")
 
     # MEM from ..baseobjs.profiler import Profiler
     # MEM debug_prof = Profiler(comm, True)
@@ -538,6 +718,16 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
     msg = ""
     converged = False
     global_x = x0.copy()
+
+    k_start = 0
+    if checkpoint_path is not None and _os.path.exists(checkpoint_path):
+        global_x, init_munu, k_start = _read_leastsq_checkpoint(checkpoint_path, len(x0))
+        warm_start = None  # the checkpoint's mu & nu take precedence
+        printer.log("Resuming optimization at outer iteration %d from checkpoint %s" % (k_start, checkpoint_path))
+
+    # Compute the initial jacobian *before* f, as objective functions that compute probabilities along with
+    # their derivatives (see :method:`TimeIndependentMDCObjectiveFunction.dlsvec`) can then reuse them for f.
+    initial_jac = jac_fn(global_x) if (num_fd_iters == 0 and max_iter > 0 and len(global_x) > 0) else None
     f = obj_fn(global_x)  # 'E'-type array
     norm_f = ari.norm2_f(f)  # _np.linalg.norm(f)**2
     half_max_nu = 2**62  # what should this be??
@@ -547,8 +737,12 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
     mu = 1  # just a guess - initialized on 1st iter and only used if rejected
 
     #Allocate potentially shared memory used in loop
-    JTJ = ari.allocate_jtj()
+    JTJ = ari.allocate_jtj() if not matrix_free else None  # matrix-free solves never form JTJ
     JTf = ari.allocate_jtf()
+    if matrix_free:
+        undamped_JTJ_diag_mem = ari.allocate_jtf()
+        mf_solve_kwargs = {'method': linear_solver, 'max_iter': linear_solver_maxiter, 'tol': linear_solver_tol,
+                           'precond': linear_solver_precond}
     x = ari.allocate_jtf()
     #x_for_jac = ari.allocate_x_for_jac()
     if num_fd_iters > 0:
@@ -606,20 +800,36 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
     else:
         def dclip(ar): return ar
 
+    if warm_start is not None and (warm_start['damping_mode'] != damping_mode
+                                   or warm_start['damping_basis'] != damping_basis):
+        warm_start = None  # mu has a different meaning, so can't be reused
     if init_munu != "auto":
         mu, nu = init_munu
+    undamped_JTJ_diag = None
     best_x_state = (mu, nu, norm_f, f.copy(), spow, None)  # need f.copy() b/c f is objfn mem
     rawJTJ_scratch = None
-    jtj_buf = ari.allocate_jtj_shared_mem_buf()
+    jtj_buf = ari.allocate_jtj_shared_mem_buf() if not matrix_free else None
+
+    broyden_step = None  # the (dx, df) of the last accepted step, when the Jacobian can be Broyden-updated
+    jac_is_approx = False  # whether `Jac` is a Broyden-updated approximation
+    num_consecutive_updates = num_broyden_updates = 0
+    rawJTJ_is_approx = False  # whether rawJTJ_scratch was computed from a Broyden-updated Jacobian
+    if broyden_updates > 0:
+        broyden_global_dx = global_x.copy()
 
+    k = k_start
     try:
 
-        for k in range(max_iter):  # outer loop
+        for k in range(k_start, max_iter):  # outer loop
             # assume global_x, x, f, fnorm hold valid values
 
             if len(msg) > 0:
                 break  # exit outer loop if an exit-message has been set
 
+            if checkpoint_path is not None and checkpoint_interval > 0 and k > k_start \
+               and (k - k_start) % checkpoint_interval == 0:
+                _write_leastsq_checkpoint(checkpoint_path, ari, len(global_x), best_x, best_x_state, k, comm)
+
             if norm_f < f_norm2_tol:
                 if oob_check_interval <= 1:
                     msg = "Sum of squares is at most %g" % f_norm2_tol
@@ -640,8 +850,18 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
             if profiler: profiler.memory_check("custom_leastsq: begin outer iter")
 
             # unnecessary b/c global_x is already valid: ari.allgather_x(x, global_x)
-            if k >= num_fd_iters:
+            if initial_jac is not None:  # global_x is still x0 (b/c best_x == x0 until an iteration completes)
+                Jac = initial_jac; initial_jac = None
+                jac_is_approx = False; num_consecutive_updates = 0
+            elif broyden_step is not None and num_consecutive_updates < broyden_updates \
+                    and not _sps.issparse(last_jac):
+                Jac = last_jac  # update the previous Jacobian (memory) in place
+                _broyden_update(Jac, broyden_step[0], broyden_step[1], broyden_global_dx, ari, resource_alloc)
+                jac_is_approx = True; num_consecutive_updates += 1; num_broyden_updates += 1
+                printer.log("  (Broyden update of Jacobian)", 3)
+            elif k >= num_fd_iters:
                 Jac = jac_fn(global_x)  # 'EP'-type, but doesn't actually allocate any more mem (!)
+                jac_is_approx = False; num_consecutive_updates = 0
             else:
                 # Note: x holds only number of "fine"-division params - need to use global_x, and
                 # Jac only holds a subset of the derivative and element columns and rows, respectively.
@@ -658,6 +878,8 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                         fdJac[:, i - pslice.start] = fd
                     #if comm is not None: comm.barrier()  # overkill for shared memory leader host barrier
                 Jac = fdJac
+                jac_is_approx = False; num_consecutive_updates = 0
+            broyden_step = None; last_jac = Jac
 
             #DEBUG: compare with analytic jacobian (need to uncomment num_fd_iters DEBUG line above too)
             #Jac_analytic = jac_fn(x)
@@ -669,7 +891,7 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
             # DB: print("DB JAC (%s)=" % str(Jac.shape)); _mt.print_mx(Jac,prec=0,width=4); assert(False)
             if profiler: profiler.memory_check("custom_leastsq: after jacobian:"
                                                + "shape=%s, GB=%.2f" % (str(Jac.shape),
-                                                                        Jac.nbytes / (1024.0**3)))
+                                                                        _jac_nbytes(Jac) / (1024.0**3)))
             Jnorm = _np.sqrt(ari.norm2_jac(Jac))
             xnorm = _np.sqrt(ari.norm2_x(x))
             printer.log("--- Outer Iter %d: norm_f = %g, mu=%g, |x|=%g, |J|=%g" % (k, norm_f, mu, xnorm, Jnorm))
@@ -685,7 +907,10 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
             #JTJ, JTJ_shm = _mpit.mpidot(Jac.T, Jac, my_mpidot_qtys[0], my_mpidot_qtys[1],
             #                            my_mpidot_qtys[2], resource_alloc, JTJ, JTJ_shm)  # _np.dot(Jac.T,Jac) 'PP'
 
-            ari.fill_jtj(Jac, JTJ, jtj_buf)
+            if matrix_free:
+                ari.fill_jtj_diag(Jac, undamped_JTJ_diag_mem)
+            else:
+                ari.fill_jtj(Jac, JTJ, jtj_buf)
             ari.fill_jtf(Jac, f, JTf)  # 'P'-type
 
             if profiler: profiler.add_time("custom_leastsq: dotprods", tm)
@@ -694,13 +919,17 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
             #assert(_np.isfinite(JTJ).all()), "Non-finite JTJ!" # NaNs tracking
             #assert(_np.isfinite(JTf).all()), "Non-finite JTf!" # NaNs tracking
 
-            idiag = ari.jtj_diag_indices(JTJ)
             norm_JTf = ari.infnorm_x(JTf)
             norm_x = ari.norm2_x(x)  # _np.linalg.norm(x)**2
-            undamped_JTJ_diag = JTJ[idiag].copy()  # 'P'-type
+            if matrix_free:
+                undamped_JTJ_diag = undamped_JTJ_diag_mem.copy()  # 'P'-type
+            else:
+                idiag = ari.jtj_diag_indices(JTJ)
+                undamped_JTJ_diag = JTJ[idiag].copy()  # 'P'-type
             #max_JTJ_diag = JTJ.diagonal().copy()
 
             JTf *= -1.0; minus_JTf = JTf  # use the same memory for -JTf below (shouldn't use JTf anymore)
+            if matrix_free: minus_f = -f  # 'E'-type; the right hand side of the (damped) least-squares problem
             #Maybe just have a minus_JTf variable?
 
             # FUTURE TODO: keep tallying allocated memory, i.e. array_types (stopped here)
@@ -734,7 +963,10 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                 #    JTJ.shape[0], _np.min(_np.abs(JTJ_evals)), _np.max(_np.abs(JTJ_evals)),
                 #                          num_large_svals, len(Jac_s)))
 
-            if norm_JTf < jac_norm_tol:
+            if norm_JTf < jac_norm_tol and jac_is_approx:
+                printer.log("  Approximate (Broyden) Jacobian indicates convergence - recomputing", 2)
+                continue  # `broyden_step` is None, so the next iteration computes the full Jacobian
+            elif norm_JTf < jac_norm_tol:
                 if oob_check_interval <= 1:
                     msg = "norm(jacobian) is at most %g" % jac_norm_tol
                     converged = True; break
@@ -746,8 +978,13 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                     mu, nu, norm_f, f[:], spow, _ = best_x_state
                     continue  # can't make use of saved JTJ yet - recompute on nxt iter
 
-            if k == 0:
-                if init_munu == "auto":
+            if k == k_start:  # first iteration (of this run)
+                if warm_start is not None:
+                    mu, nu = warm_start['mu'], warm_start['nu']
+                    if damping_mode == 'identity' and warm_start['max_jtj_diag']:
+                        mu *= ari.max_x(undamped_JTJ_diag) / warm_start['max_jtj_diag']  # same *relative* damping
+                    printer.log("Warm-starting damping with mu=%g, nu=%g" % (mu, nu), 2)
+                elif init_munu == "auto":
                     if damping_mode == 'identity':
                         mu = tau * ari.max_x(undamped_JTJ_diag)  # initial damping element
                         #mu = min(mu, MU_TOL1)
@@ -758,17 +995,21 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                         #tries to avoid making mu so large that dx is tiny and we declare victory prematurely
                 else:
                     mu, nu = init_munu
-                rawJTJ_scratch = JTJ.copy()  # allocates the memory for a copy of JTJ so only update mem elsewhere
+                if not matrix_free:
+                    rawJTJ_scratch = JTJ.copy()  # allocates the memory for a copy of JTJ so only update mem elsewhere
+                    rawJTJ_is_approx = jac_is_approx
                 best_x_state = mu, nu, norm_f, f.copy(), spow, rawJTJ_scratch  # update mu,nu,JTJ of initial best state
             else:
                 #on all other iterations, update JTJ of best_x_state if best_x == x, i.e. if we've just evaluated
                 # a previously accepted step that was deemed the best we've seen so far
-                if _np.allclose(x, best_x):
+                if not matrix_free and _np.allclose(x, best_x):
                     rawJTJ_scratch[:, :] = JTJ[:, :]  # use pre-allocated memory
                     rawJTJ_scratch[idiag] = undamped_JTJ_diag  # no damping; the "raw" JTJ
+                    rawJTJ_is_approx = jac_is_approx
                     best_x_state = best_x_state[0:5] + (rawJTJ_scratch,)  # update mu,nu,JTJ of initial "best state"
 
             #determing increment using adaptive damping
+            step_rejected = False
             while True:  # inner loop
 
                 if profiler: profiler.memory_check("custom_leastsq: begin inner iter")
@@ -785,22 +1026,25 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                         # dx = _np.dot(Jac_V, _np.diag(1 / reg_Jac_s**2), global_Jac_VT_mJTf
                         #But now we just compute reg_Jac_s here, and so the rest below.
                     else:
+                        add_to_diag = mu
                         # ok if assume fine-param-proc.size == 1 (otherwise need to sync setting local JTJ)
-                        JTJ[idiag] = undamped_JTJ_diag + mu  # augment normal equations
+                        if not matrix_free: JTJ[idiag] = undamped_JTJ_diag + mu  # augment normal equations
 
                 elif damping_mode == 'JTJ':
                     if damping_basis == "singular_values":
                         reg_Jac_s = global_Jac_s + mu * dclip(global_Jac_s)
                     else:
                         add_to_diag = mu * dclip(undamped_JTJ_diag)
-                        JTJ[idiag] = undamped_JTJ_diag + add_to_diag  # ok if assume fine-param-proc.size == 1
+                        if not matrix_free:
+                            JTJ[idiag] = undamped_JTJ_diag + add_to_diag  # ok if assume fine-param-proc.size == 1
 
                 elif damping_mode == 'invJTJ':
                     if damping_basis == "singular_values":
                         reg_Jac_s = global_Jac_s + mu * dclip(1.0 / global_Jac_s)
                     else:
                         add_to_diag = mu * dclip(1.0 / undamped_JTJ_diag)
-                        JTJ[idiag] = undamped_JTJ_diag + add_to_diag  # ok if assume fine-param-proc.size == 1
+                        if not matrix_free:
+                            JTJ[idiag] = undamped_JTJ_diag + add_to_diag  # ok if assume fine-param-proc.size == 1
 
                 elif damping_mode == 'adaptive':
                     if damping_basis == "singular_values":
@@ -825,11 +1069,20 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                     if damping_basis == 'diagonal_values':
                         if damping_mode == 'adaptive':
                             for ii, add_to_diag in enumerate(add_to_diag_lst):
+                                if matrix_free:
+                                    _matrix_free_solve(Jac, minus_f, minus_JTf, undamped_JTJ_diag, add_to_diag,
+                                                       dx_lst[ii], ari, len(global_x), **mf_solve_kwargs)
+                                    continue
                                 JTJ[idiag] = undamped_JTJ_diag + add_to_diag  # ok if assume fine-param-proc.size == 1
                                 #dx_lst.append(_scipy.linalg.solve(JTJ, -JTf, sym_pos=True))
                                 #dx_lst.append(custom_solve(JTJ, -JTf, resource_alloc))
                                 _custom_solve(JTJ, minus_JTf, dx_lst[ii], ari, resource_alloc,
                                               serial_solve_proc_threshold)
+                        elif matrix_free:
+                            n_linsolve_iters = _matrix_free_solve(Jac, minus_f, minus_JTf, undamped_JTJ_diag,
+                                                                  add_to_diag, dx, ari, len(global_x),
+                                                                  **mf_solve_kwargs)
+                            printer.log("    %s solve: %d iterations" % (linear_solver, n_linsolve_iters), 3)
                         else:
                             #dx = _scipy.linalg.solve(JTJ, -JTf, sym_pos=True)
                             _custom_solve(JTJ, minus_JTf, dx, ari, resource_alloc, serial_solve_proc_threshold)
@@ -875,7 +1128,11 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                         ari.fill_jtf(Jac, df2, JTdf2)
                         JTdf2 *= -0.5  # keep using JTdf2 memory in solve call below
                         #dx2 = _scipy.linalg.solve(JTJ, -0.5 * JTdf2, sym_pos=True)  # Note: JTJ not init w/'adaptive'
-                        _custom_solve(JTJ, JTdf2, dx2, ari, resource_alloc, serial_solve_proc_threshold)
+                        if matrix_free:
+                            _matrix_free_solve(Jac, -0.5 * df2, JTdf2, undamped_JTJ_diag, add_to_diag, dx2, ari,
+                                               len(global_x), **mf_solve_kwargs)
+                        else:
+                            _custom_solve(JTJ, JTdf2, dx2, ari, resource_alloc, serial_solve_proc_threshold)
                         dx1[:] = dx[:]
                         dx += dx2  # add acceleration term to dx
                     except _scipy.linalg.LinAlgError:
@@ -985,7 +1242,10 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                     #MEM if profiler: profiler.memory_check("custom_leastsq: mid inner loop")
                     #print("DB: new_x = ", new_x)
 
-                    if norm_dx < (rel_xtol**2) * norm_x:  # and mu < MU_TOL2:
+                    if norm_dx < (rel_xtol**2) * norm_x and jac_is_approx:
+                        printer.log("  Approximate (Broyden) Jacobian indicates convergence - recomputing", 2)
+                        break  # `broyden_step` is None, so the next outer iteration computes the full Jacobian
+                    elif norm_dx < (rel_xtol**2) * norm_x:  # and mu < MU_TOL2:
                         if oob_check_interval <= 1:
                             msg = "Relative change, |dx|/|x|, is at most %g" % rel_xtol
                             converged = True; break
@@ -1142,7 +1402,10 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
 
                         if dL / norm_f < rel_ftol and dF >= 0 and dF / norm_f < rel_ftol \
                            and dF / dL < 2.0 and accel_ratio <= alpha:
-                            if oob_check_interval <= 1:  # (if 0 then no oob checking is done)
+                            if jac_is_approx:
+                                printer.log("  Approximate (Broyden) Jacobian indicates convergence - recomputing", 2)
+                                break  # `broyden_step` is None, so the next outer iteration computes the full Jacobian
+                            elif oob_check_interval <= 1:  # (if 0 then no oob checking is done)
                                 msg = "Both actual and predicted relative reductions in the" + \
                                     " sum of squares are at most %g" % rel_ftol
                                 converged = True; break
@@ -1197,6 +1460,8 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                                 mu_factor = max(t, 1.0 / 3.0) if norm_dx > 1e-8 else 0.3
                                 mu *= mu_factor
                                 nu = 2
+                                if broyden_updates > 0 and not step_rejected:  # for updating Jac next iteration
+                                    broyden_step = (dx.copy(), new_f - f)
                                 x[:] = new_x[:]; f[:] = new_f[:]; norm_f = norm_new_f
                                 global_x[:] = global_new_x[:]
                                 printer.log("      Accepted%s! gain ratio=%g  mu * %g => %g"
@@ -1233,6 +1498,11 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
 
                 #Increase damping (mu), then increase damping factor to
                 # accelerate further damping increases.
+                if jac_is_approx:  # the approximate Jacobian may be to blame, so recompute it rather than damp more
+                    printer.log("      Rejected%s!  Recomputing (non-Broyden) Jacobian" % reject_msg, 2)
+                    break  # `broyden_step` is None, so the next outer iteration computes the full Jacobian
+
+                step_rejected = True
                 mu *= nu
                 if nu > half_max_nu:  # watch for nu getting too large (&overflow)
                     msg = "Stopping after nu overflow!"; break
@@ -1259,13 +1529,26 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
         msg = "Keyboard interrupt!"
         converged = True
 
+    if checkpoint_path is not None:
+        _write_leastsq_checkpoint(checkpoint_path, ari, len(global_x), best_x, best_x_state, k, comm)
+
     if comm is not None:
         comm.barrier()  # Just to be safe, so procs stay synchronized and we don't free anything too soon
 
-    ari.deallocate_jtj(JTJ)
+    if rawJTJ_is_approx and best_x_state[5] is not None:
+        # don't return the JTJ of an approximate (Broyden-updated) Jacobian - recompute it at best_x
+        global_best_x = _np.empty(len(global_x), 'd')
+        ari.allgather_x(best_x, global_best_x)
+        ari.fill_jtj(jac_fn(global_best_x), JTJ, jtj_buf)
+        best_x_state[5][:, :] = JTJ[:, :]
+
+    if matrix_free:
+        ari.deallocate_jtf(undamped_JTJ_diag_mem)
+    else:
+        ari.deallocate_jtj(JTJ)
+        ari.deallocate_jtj_shared_mem_buf(jtj_buf)
     ari.deallocate_jtf(JTf)
     ari.deallocate_jtf(x)
-    ari.deallocate_jtj_shared_mem_buf(jtj_buf)
     #ari.deallocate_x_for_jac(x_for_jac)
 
     if x_limits is not None:
@@ -1299,6 +1582,15 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
     global_f = _np.empty(ari.global_num_elements(), 'd')
     ari.allgather_f(f, global_f)
 
+    if broyden_updates > 0:
+        printer.log("%d Jacobian evaluations replaced by Broyden updates" % num_broyden_updates, 2)
+        if profiler: profiler.add_count("custom_leastsq: Broyden Jacobian updates", num_broyden_updates)
+    if diagnostics is not None:
+        diagnostics['jacobian_evaluations_saved'] = num_broyden_updates
+    if return_warm_start:
+        warm_start_state = {'mu': mu, 'nu': nu, 'damping_mode': damping_mode, 'damping_basis': damping_basis,
+                            'max_jtj_diag': ari.max_x(undamped_JTJ_diag) if (undamped_JTJ_diag is not None) else None}
+        return global_x, converged, msg, mu, nu, norm_f, global_f, rawJTJ, warm_start_state
     return global_x, converged, msg, mu, nu, norm_f, global_f, rawJTJ
     #solution = _optResult()
     #solution.x = x; solution.fun = f
@@ -1307,6 +1599,227 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
     #return solution
 
 
+def _write_leastsq_checkpoint(path, ari, num_params, best_x, best_x_state, iteration, comm):
+    """ Saves the state of :function:`custom_leastsq` needed to resume it to `path` (on the root processor) """
+    global_best_x = _np.empty(num_params, 'd')
+    ari.allgather_x(best_x, global_best_x)
+    if comm is None or comm.rank == 0:
+        mu, nu, norm_f = best_x_state[0:3]
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:  # write to a temporary file first so `path` is never left half-written
+            _np.savez(f, x=global_best_x, mu=mu, nu=nu, norm_f=norm_f, iteration=iteration)
+        _os.replace(tmp_path, path)
+
+
+def _read_leastsq_checkpoint(path, num_params):
+    """ Loads the (x, (mu, nu), outer iteration) state saved by :function:`_write_leastsq_checkpoint` """
+    with _np.load(path) as checkpoint:
+        if len(checkpoint['x']) != num_params:
+            raise ValueError("Optimizer checkpoint %s is for %d (not %d) parameters!"
+                             % (path, len(checkpoint['x']), num_params))
+        return checkpoint['x'].copy(), (float(checkpoint['mu']), float(checkpoint['nu'])), \
+            int(checkpoint['iteration'])
+
+
+def _broyden_update(jac, dx, df, global_dx, ari, resource_alloc):
+    """
+    Perform, in place, the rank-1 Broyden update `jac += (df - jac dx) dx^T / |dx|^2`.
+
+    Parameters
+    ----------
+    jac : numpy.ndarray or LocalNumpyArray
+        The (dense) Jacobian to update (type `ep`).
+
+    dx : numpy.ndarray or LocalNumpyArray
+        The step in parameter space (type `jtf`).
+
+    df : numpy.ndarray or LocalNumpyArray
+        The resulting change in the objective function vector (type `e`).
+
+    global_dx : numpy.ndarray
+        Scratch space for the global `dx` vector.
+
+    ari : ArraysInterface
+        The arrays interface used to operate on the (potentially distributed) arrays.
+
+    resource_alloc : ResourceAllocation
+        The resource allocation, used to synchronize processors sharing memory.
+
+    Returns
+    -------
+    None
+    """
+    norm2_dx = ari.norm2_x(dx)
+    if norm2_dx == 0: return
+    ari.allgather_x(dx, global_dx)
+    jdx = _np.empty(jac.shape[0], 'd')
+    ari.fill_jv(jac, global_dx, jdx)
+    jdx -= df; jdx /= -norm2_dx  # now (df - jac dx) / |dx|^2
+
+    pslice = ari.jac_param_slice(only_if_leader=True)  # only 1 proc updates shared-memory Jacobian blocks
+    jac[:, 0:pslice.stop - pslice.start] += _np.outer(jdx, global_dx[pslice])
+    resource_alloc.host_comm_barrier()  # make sure all shared memory is updated before it's used
+
+
+def _matrix_free_solve(jac, b, jtb, jtj_diag, damping, result, ari, num_params, method="cg", max_iter=100, tol=1e-6,
+                       precond="jacobi"):
+    """
+    Solve the damped normal equations `(J^T J + D) x = J^T b` using only products with `J` and `J^T`.
+
+    Here `D` is a diagonal (damping) matrix.  With `method == "cg"` the normal equations are
+    solved using (preconditioned) conjugate gradient; with `method == "lsqr"` the equivalent
+    least-squares problem `min |J x - b|^2 + |D^(1/2) x|^2` is solved using LSQR, which is
+    numerically better behaved when `J` is ill-conditioned.  All the vector operations are
+    performed through `ari`, so this works for distributed arrays too.
+
+    Parameters
+    ----------
+    jac : numpy.ndarray or LocalNumpyArray or scipy.sparse.csr_matrix
+        The Jacobian, `J` (type `ep`).
+
+    b : numpy.ndarray or LocalNumpyArray
+        The (local) right hand side of the least-squares problem (type `e`).
+
+    jtb : numpy.ndarray or LocalNumpyArray
+        The right hand side of the normal equations, `J^T b` (type `jtf`).
+
+    jtj_diag : numpy.ndarray or LocalNumpyArray
+        The diagonal of `J^T J` (type `jtf`).
+
+    damping : float or numpy.ndarray
+        The diagonal of `D`, either a `jtf`-type vector or a scalar (for `D` proportional to the identity).
+
+    result : numpy.ndarray or LocalNumpyArray
+        The solution, `x` (type `jtf`), is placed here.
+
+    ari : ArraysInterface
+        The arrays interface used to operate on the (potentially distributed) arrays.
+
+    num_params : int
+        The (global) number of parameters, i.e. the length of the global `x` vector.
+
+    method : {"cg", "lsqr"}
+        The iterative method used.
+
+    max_iter : int, optional
+        The maximum number of iterations.  If this is reached, the current approximate
+        solution is placed in `result`.
+
+    tol : float, optional
+        The solve stops when the norm of the normal equations' residual is less than `tol`
+        times the norm of `jtb`.
+
+    precond : {"jacobi", None}
+        Whether to precondition using the diagonal of `J^T J + D`.
+
+    Returns
+    -------
+    int
+        The number of iterations performed.
+    """
+    damping = damping * _np.ones(len(jtj_diag), 'd')  # (also copies)
+    damped_jtj_diag = jtj_diag + damping
+    if precond == "jacobi":
+        scale = 1.0 / _np.sqrt(_np.where(damped_jtj_diag > 0, damped_jtj_diag, 1.0))
+    elif precond is None:
+        scale = _np.ones(len(jtj_diag), 'd')
+    else:
+        raise ValueError("Invalid linear solver preconditioner: %s" % str(precond))
+
+    global_v = _np.empty(num_params, 'd')
+    jv = _np.empty(jac.shape[0], 'd')  # (local) 'e'-type
+    jtv = _np.empty(len(jtj_diag), 'd')  # 'jtf'-type
+
+    def apply_j(v, out):  # out = J v, for 'jtf'-type v and 'e'-type out
+        ari.allgather_x(v, global_v)
+        ari.fill_jv(jac, global_v, out)
+
+    result[:] = 0.0
+    jtb_norm = _np.sqrt(ari.norm2_x(jtb))
+    if jtb_norm == 0.0:
+        return 0
+
+    if method == "cg":
+        # Conjugate gradient on (J^T J + D) x = J^T b, with preconditioner M^-1 = diag(scale^2)
+        residual = _np.array(jtb, 'd')  # = J^T b - (J^T J + D) x, since x == 0
+        z = scale**2 * residual
+        p = z.copy()
+        rz = ari.dot_x(residual, z)
+        for i in range(max_iter):
+            apply_j(p, jv)
+            ari.fill_jtf(jac, jv, jtv)
+            jtv += damping * p  # now (J^T J + D) p
+            pAp = ari.dot_x(p, jtv)
+            if pAp <= 0:
+                raise _scipy.linalg.LinAlgError("Damped normal equations are not positive definite!")
+            step = rz / pAp
+            result += step * p
+            residual -= step * jtv
+            if _np.sqrt(ari.norm2_x(residual)) <= tol * jtb_norm:
+                return i + 1
+            z = scale**2 * residual
+            rz_new = ari.dot_x(residual, z)
+            p *= rz_new / rz; p += z
+            rz = rz_new
+        return max_iter
+
+    elif method == "lsqr":
+        # LSQR (Paige & Saunders, 1982) on min |A S y - (b, 0)|, where A = [J; D^(1/2)] and x = S y, for the
+        # (right-)preconditioner S = diag(scale).  Vectors in A's range are (u_e, u_p) pairs of 'e' & 'jtf'-types.
+        sqrt_damping = _np.sqrt(damping)
+        min_scale = ari.min_x(scale)  # global minimum, so all processors stop on the same iteration
+        u_e = _np.array(b, 'd'); u_p = _np.zeros(len(jtj_diag), 'd')
+        beta = _np.sqrt(ari.norm2_f(u_e))
+        u_e /= beta
+        v = scale * jtb / beta  # = (AS)^T u, as A^T (b, 0) = J^T b
+        alpha = _np.sqrt(ari.norm2_x(v))
+        v /= alpha
+        w = v.copy()
+        y = _np.zeros(len(jtj_diag), 'd')
+        phibar = beta; rhobar = alpha
+        for i in range(max_iter):
+            # bidiagonalization: beta*u = (AS) v - alpha*u;  alpha*v = (AS)^T u - beta*v
+            apply_j(scale * v, jv)
+            u_e *= -alpha; u_e += jv
+            u_p *= -alpha; u_p += sqrt_damping * scale * v
+            beta = _np.sqrt(ari.norm2_f(u_e) + ari.norm2_x(u_p))
+            if beta > 0:
+                u_e /= beta; u_p /= beta
+            ari.fill_jtf(jac, u_e, jtv)
+            v *= -beta; v += scale * (jtv + sqrt_damping * u_p)
+            alpha = _np.sqrt(ari.norm2_x(v))
+            if alpha > 0:
+                v /= alpha
+
+            # plane rotation to eliminate the subdiagonal of the bidiagonal matrix
+            rho = _np.hypot(rhobar, beta)
+            c = rhobar / rho; sn = beta / rho
+            theta = sn * alpha
+            rhobar = -c * alpha
+            phi = c * phibar
+            phibar = sn * phibar
+
+            y += (phi / rho) * w
+            w *= -theta / rho; w += v
+
+            # |(AS)^T r| = phibar * alpha * |c|, and the normal equations' residual is |A^T r| = |S^-1 (AS)^T r|
+            if phibar * alpha * abs(c) / min_scale <= tol * jtb_norm or alpha == 0:
+                result[:] = scale * y
+                return i + 1
+        result[:] = scale * y
+        return max_iter
+
+    else:
+        raise ValueError("Invalid matrix-free linear solver: %s" % str(method))
+
+
+def _jac_nbytes(jac):
+    """ The number of bytes used by a dense or sparse (CSR) Jacobian """
+    if _sps.issparse(jac):
+        return jac.data.nbytes + jac.indices.nbytes + jac.indptr.nbytes
+    return jac.nbytes
+
+
 def _hack_dx(obj_fn, x, dx, jac, jtj, jtf, f, norm_f):
     #HACK1
     #if nRejects >= 2:
@@ -272,7 +272,9 @@ class ConfidenceRegionFactory(_NicelySerializable):
         approximate : bool, optional
             Whether to compute the true Hessian or just an approximation of it.
             See :function:`logl_approximate_hessian`.  Setting to True can
-            significantly reduce the run time.
+            significantly reduce the run time, and the approximate Hessian is
+            accumulated one layout atom (and parameter block) at a time so that
+            its memory use stays within `mem_limit`.
 
         Returns
         -------
@@ -340,10 +342,12 @@ class ConfidenceRegionFactory(_NicelySerializable):
                                   - (nDataParams - nModelParams), MIN_NON_MARK_RADIUS)
 
         elif obj == 'chi2':
+            hessian_fn = _tools.chi2_approximate_hessian if approximate \
+                else _tools.chi2_hessian
             chi2, hessian = [f(model, dataset, circuit_list,
                                minProbClipForWeighting,
                                probClipInterval, mem_limit=mem_limit,
-                               op_label_aliases=aliases) for f in (_tools.chi2, _tools.chi2_hessian)]
+                               op_label_aliases=aliases) for f in (_tools.chi2, hessian_fn)]
             jacobian = _tools.chi2_jacobian(model, dataset, circuit_list,
                                             minProbClipForWeighting, probClipInterval, mem_limit=mem_limit,
                                             comm=comm, op_label_aliases=aliases)
@@ -295,6 +295,27 @@ class Estimate(object):
                 if (label not in self._gaugeopt_suite.gaugeopt_argument_dicts) and \
                    (label not in self.models): break
 
+        gsopt, goparams_to_store = self._compute_gaugeoptimized(goparams, model, label, comm, verbosity)
+        self.models[label] = gsopt
+        self._gaugeopt_suite.gaugeopt_argument_dicts[label] = goparams_to_store
+
+    def _compute_gaugeoptimized(self, goparams, model=None, label=None, comm=None, verbosity=None):
+        """
+        Computes (if needed) a gauge-optimized model without adding it to this estimate.
+
+        Arguments are the same as those of :method:`add_gaugeoptimized`.  This method doesn't modify
+        this estimate, so several gauge optimizations may be computed independently (e.g. by different
+        processes) and then stored, in a deterministic order, using :method:`add_gaugeoptimized`.
+
+        Returns
+        -------
+        model : Model
+            The gauge-optimized model.
+
+        goparams : dict or list
+            The gauge-optimization parameters to store alongside `model`, sorted by key and
+            with the computed gauge group element(s) included.
+        """
         goparams_list = [goparams] if hasattr(goparams, 'keys') else goparams
         ordered_goparams = []
         last_gs = None
@@ -366,9 +387,7 @@ class Estimate(object):
                 [(k, gop[k]) for k in sorted(list(gop.keys()))]))
 
         assert(last_gs is not None)
-        self.models[label] = last_gs
-        self._gaugeopt_suite.gaugeopt_argument_dicts[label] = ordered_goparams \
-            if len(goparams_list) > 1 else ordered_goparams[0]
+        return last_gs, (ordered_goparams if len(goparams_list) > 1 else ordered_goparams[0])
 
     def add_confidence_region_factory(self,
                                       model_label='final iteration estimate',
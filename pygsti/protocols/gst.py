@@ -628,7 +628,8 @@ class GSTObjFnBuilders(_NicelySerializable):
         else: raise ValueError("Cannot create an %s object from '%s'" % (cls.__name__, str(type(obj))))
 
     @classmethod
-    def create_from(cls, objective='logl', freq_weighted_chi2=False, always_perform_mle=False, only_perform_mle=False):
+    def create_from(cls, objective='logl', freq_weighted_chi2=False, always_perform_mle=False, only_perform_mle=False,
+                    fused_kernels=False):
         """
         Creates a common :class:`GSTObjFnBuilders` object from several arguments.
 
@@ -649,12 +650,16 @@ class GSTObjFnBuilders(_NicelySerializable):
             Only perform a ML-GST step on each iteration, i.e. do *not* perform any chi2
             minimization to "seed" the ML-GST step.
 
+        fused_kernels : bool, optional
+            Whether the built objective functions evaluate their per-element quantities using
+            compiled, fused kernels (see :method:`ObjectiveFunctionBuilder.create_from`).
+
         Returns
         -------
         GSTObjFnBuilders
         """
-        chi2_builder = _objfns.ObjectiveFunctionBuilder.create_from('chi2', freq_weighted_chi2)
-        mle_builder = _objfns.ObjectiveFunctionBuilder.create_from('logl')
+        chi2_builder = _objfns.ObjectiveFunctionBuilder.create_from('chi2', freq_weighted_chi2, fused_kernels)
+        mle_builder = _objfns.ObjectiveFunctionBuilder.create_from('logl', fused_kernels=fused_kernels)
 
         if objective == "chi2":
             iteration_builders = [chi2_builder]
@@ -1083,11 +1088,16 @@ class GateSetTomography(_proto.Protocol):
         The name of this protocol, also used to (by default) name the
         results produced by this protocol.  If None, the class name will
         be used.
+
+    checkpoint_dir : str, optional
+        A directory where the progress of the iterative GST optimization is saved, so that
+        an interrupted run can be resumed by running this protocol again (on the same data)
+        with the same `checkpoint_dir`.  See :function:`run_iterative_gst`.
     """
 
     def __init__(self, initial_model=None, gaugeopt_suite='stdgaugeopt',
                  objfn_builders=None, optimizer=None,
-                 badfit_options=None, verbosity=2, name=None):
+                 badfit_options=None, verbosity=2, name=None, checkpoint_dir=None):
         super().__init__(name)
         self.initial_model = GSTInitialModel.cast(initial_model)
         self.gaugeopt_suite = GSTGaugeOptSuite.cast(gaugeopt_suite)
@@ -1112,6 +1122,7 @@ class GateSetTomography(_proto.Protocol):
             self.optimizer = _opt.CustomLMOptimizer.cast(optimizer)
 
         self.objfn_builders = GSTObjFnBuilders.cast(objfn_builders)
+        self.checkpoint_dir = checkpoint_dir
 
         self.auxfile_types['initial_model'] = 'serialized-object'
         self.auxfile_types['badfit_options'] = 'serialized-object'
@@ -1198,7 +1209,8 @@ class GateSetTomography(_proto.Protocol):
         mdl_lsgst_list, optimums_list, final_objfn = _alg.run_iterative_gst(
             ds, mdl_start, bulk_circuit_lists, self.optimizer,
             self.objfn_builders.iteration_builders, self.objfn_builders.final_builders,
-            resource_alloc, printer)
+            resource_alloc, printer,
+            checkpoint_dir=getattr(self, 'checkpoint_dir', None))  # (protocols saved before it have no attribute)
 
         tnxt = _time.time(); profiler.add_time('GST: total iterative optimization', tref); tref = tnxt
 
@@ -1653,7 +1665,7 @@ def _add_gaugeopt_and_badfit(results, estlbl, target_model, gaugeopt_suite,
             gaugeopt_suite = _copy.deepcopy(gaugeopt_suite)
             gaugeopt_suite.gaugeopt_target = target_model
         _add_gauge_opt(results, estlbl, gaugeopt_suite,
-                       model_to_gaugeopt, unreliable_ops, comm, printer - 1)
+                       model_to_gaugeopt, unreliable_ops, comm, printer - 1, resource_alloc.local_process_pool())
     profiler.add_time('%s: gauge optimization' % estlbl, tref); tref = _time.time()
 
     _add_badfit_estimates(results, estlbl, badfit_options, optimizer, resource_alloc, printer)
@@ -1668,10 +1680,17 @@ def _add_gaugeopt_and_badfit(results, estlbl, target_model, gaugeopt_suite,
 
 
 def _add_gauge_opt(results, base_est_label, gaugeopt_suite, starting_model,
-                   unreliable_ops, comm=None, verbosity=0):
+                   unreliable_ops, comm=None, verbosity=0, process_pool=None):
     """
     Add a gauge optimization to an estimate.
 
+    The gauge optimizations of the different members of `gaugeopt_suite`, and of the estimate
+    and its related (e.g. data-scaled) estimates, are independent of one another.  When `comm`
+    has multiple processors these are divided among groups of the processors, and otherwise when
+    `process_pool` is given they are run by its worker processes.  In either case,
+    the results are added to the estimates in the same order as they would be if the gauge
+    optimizations were run one after another.
+
     Parameters
     ----------
     results : ModelEstimateResults
@@ -1706,6 +1725,12 @@ def _add_gauge_opt(results, base_est_label, gaugeopt_suite, starting_model,
     verbosity : int, optional
         The level of detail printed to stdout.
 
+    process_pool : LocalProcessPool, optional
+        A pool of local worker processes used to perform independent gauge optimizations in
+        parallel when `comm` is ``None`` (or has a single processor), usually obtained from
+        :method:`ResourceAllocation.local_process_pool`.  When ``None``, gauge optimizations
+        are performed by this process only.
+
     Returns
     -------
     None
@@ -1716,13 +1741,11 @@ def _add_gauge_opt(results, base_est_label, gaugeopt_suite, starting_model,
     gaugeopt_suite_dict = gaugeopt_suite.to_dictionary(starting_model,
                                                        unreliable_ops, printer - 1)
 
-    #Gauge optimize to list of gauge optimization parameters
+    #Plan the gauge optimizations: each item is (estimate label, go_label, goparams, convey), where
+    # `convey == True` means the base estimate's result is copied rather than re-computed.
+    plan = []
     for go_label, goparams in gaugeopt_suite_dict.items():
-
-        printer.log("-- Performing '%s' gauge optimization on %s estimate --" % (go_label, base_est_label), 2)
-
-        #Get starting model
-        results.estimates[base_est_label].add_gaugeoptimized(goparams, None, go_label, comm, printer - 3)
+        plan.append((base_est_label, go_label, goparams, False))
         mdl_start = results.estimates[base_est_label].retrieve_start_model(goparams)
 
         #Gauge optimize data-scaled estimate also
@@ -1730,17 +1753,93 @@ def _add_gauge_opt(results, base_est_label, gaugeopt_suite, starting_model,
             robust_est_label = base_est_label + suffix
             if robust_est_label in results.estimates:
                 mdl_start_robust = results.estimates[robust_est_label].retrieve_start_model(goparams)
+                convey = bool(mdl_start_robust.frobeniusdist(mdl_start) < 1e-8)
+                plan.append((robust_est_label, go_label, goparams, convey))
+
+    tasks = [(est_label, go_label, goparams) for est_label, go_label, goparams, convey in plan if not convey]
+    gaugeopt_results = _run_gaugeopt_tasks(results, tasks, comm, process_pool, printer)
+
+    #Add the gauge-optimized models to the estimates, in order
+    itask = 0
+    for est_label, go_label, goparams, convey in plan:
+        if convey:
+            printer.log("-- Conveying '%s' gauge optimization from %s to %s estimate --" %
+                        (go_label, base_est_label, est_label), 2)
+            params = results.estimates[base_est_label].goparameters[go_label]  # no need to copy here
+            gsopt = results.estimates[base_est_label].models[go_label].copy()
+            results.estimates[est_label].add_gaugeoptimized(params, gsopt, go_label, comm, printer - 3)
+        else:
+            gsopt, params = gaugeopt_results[itask]; itask += 1
+            results.estimates[est_label].add_gaugeoptimized(params, gsopt, go_label, comm, 0)  # already logged
 
-                if mdl_start_robust.frobeniusdist(mdl_start) < 1e-8:
-                    printer.log("-- Conveying '%s' gauge optimization from %s to %s estimate --" %
-                                (go_label, base_est_label, robust_est_label), 2)
-                    params = results.estimates[base_est_label].goparameters[go_label]  # no need to copy here
-                    gsopt = results.estimates[base_est_label].models[go_label].copy()
-                    results.estimates[robust_est_label].add_gaugeoptimized(params, gsopt, go_label, comm, printer - 3)
-                else:
-                    printer.log("-- Performing '%s' gauge optimization on %s estimate --" %
-                                (go_label, robust_est_label), 2)
-                    results.estimates[robust_est_label].add_gaugeoptimized(goparams, None, go_label, comm, printer - 3)
+
+def _run_gaugeopt_tasks(results, tasks, comm, process_pool, printer):
+    """
+    Computes the gauge optimizations given by `tasks`, a list of `(estimate_label, go_label, goparams)` tuples.
+
+    Returns a list of the `(model, goparams_to_store)` results of :method:`Estimate._compute_gaugeoptimized`
+    in the order of `tasks`, on all processors.  Tasks are divided among groups of `comm`'s processors, or run
+    by the worker processes of `process_pool`, when possible.
+    """
+    def compute(task, task_comm):
+        est_label, go_label, goparams = task
+        printer.log("-- Performing '%s' gauge optimization on %s estimate --" % (go_label, est_label), 2)
+        return results.estimates[est_label]._compute_gaugeoptimized(goparams, None, go_label, task_comm,
+                                                                    printer - 3)
+
+    nprocs = comm.Get_size() if (comm is not None) else 1
+    goparams_comms = [gop.get('comm', None) for _, _, goparams in tasks
+                      for gop in ([goparams] if hasattr(goparams, 'keys') else goparams)]
+    if nprocs > 1 and len(tasks) > 1 and all([c is None for c in goparams_comms]):
+        # Divide the processors into groups, each of which performs every ngroups-th task using its own comm
+        ngroups = min(nprocs, len(tasks))
+        igroup = comm.Get_rank() % ngroups
+        group_comm = comm.Split(color=igroup, key=comm.Get_rank())
+        my_results = {i: compute(task, group_comm) for i, task in enumerate(tasks) if i % ngroups == igroup}
+        group_comm.Free()
+
+        gaugeopt_results = []
+        for i in range(len(tasks)):
+            # the root of group g is rank g; communicators can't be pickled, so they're restored after bcast
+            gsopt, params = my_results[i] if (i % ngroups == igroup) else (None, None)
+            params_to_send = _strip_goparams_comm(params) if (i % ngroups == igroup) else None
+            gsopt, params_to_send = comm.bcast((gsopt, params_to_send), root=i % ngroups)
+            gaugeopt_results.append((gsopt, _restore_goparams_comm(params_to_send, comm)))
+        return gaugeopt_results
+
+    if process_pool is not None and nprocs == 1 and len(tasks) > 1 and all([c is None for c in goparams_comms]):
+        # Workers are only sent the models that _compute_gaugeoptimized uses, not the entire results object
+        task_args = []
+        for est_label, go_label, goparams in tasks:
+            printer.log("-- Performing '%s' gauge optimization on %s estimate --" % (go_label, est_label), 2)
+            models = {k: v for k, v in results.estimates[est_label].models.items()
+                      if k in ('final iteration estimate', 'target')}
+            task_args.append((models, goparams, go_label, printer.verbosity - 3))
+        gaugeopt_results = process_pool.map(_compute_gaugeoptimized_in_worker, task_args)
+        if comm is None:
+            return gaugeopt_results
+        return [(gsopt, _restore_goparams_comm(params, comm)) for gsopt, params in gaugeopt_results]
+
+    return [compute(task, comm) for task in tasks]
+
+
+def _compute_gaugeoptimized_in_worker(models, goparams, go_label, verbosity):
+    """ Computes a single gauge optimization (in a worker process) of an estimate holding `models` """
+    return _Estimate(None, models)._compute_gaugeoptimized(goparams, None, go_label, None, verbosity)
+
+
+def _strip_goparams_comm(goparams):
+    """ Removes any (unpicklable) 'comm' elements of gauge optimization parameters """
+    if hasattr(goparams, 'keys'):
+        return goparams.__class__([(k, v) for k, v in goparams.items() if k != 'comm'])
+    return [_strip_goparams_comm(gop) for gop in goparams]
+
+
+def _restore_goparams_comm(goparams, comm):
+    """ Sets the 'comm' elements of gauge optimization parameters, as :method:`Estimate.add_gaugeoptimized` would """
+    if hasattr(goparams, 'keys'):
+        return goparams.__class__(sorted(list(goparams.items()) + [('comm', comm)], key=lambda kv: kv[0]))
+    return [_restore_goparams_comm(gop, comm) for gop in goparams]
 
 
 def _add_badfit_estimates(results, base_estimate_label, badfit_options,
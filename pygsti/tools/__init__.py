@@ -24,7 +24,7 @@ from .listtools import *
 from .matrixmod2 import *
 from .matrixtools import *
 from .mpitools import parallel_apply, mpi4py_comm
-from .mptools import starmap_with_kwargs
+from .mptools import starmap_with_kwargs, LocalProcessPool
 from .nameddict import NamedDict
 from .optools import *
 from .gatetools import *
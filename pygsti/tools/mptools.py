@@ -10,8 +10,10 @@ Functions for working with Python multiprocessing (more than just map)
 # http://www.apache.org/licenses/LICENSE-2.0 or in the LICENSE file in the root pyGSTi directory.
 #***************************************************************************************************
 
+import concurrent.futures as _futures
 import itertools as _itertools
 import multiprocessing as _mp
+import threading as _threading
 
 
 # Modified from https://stackoverflow.com/a/53173433
@@ -30,3 +32,119 @@ def starmap_with_kwargs(fn, num_runs, num_processors, args_list, kwargs_list):
 
 def _apply_args_and_kwargs(fn, args, kwargs):
     return fn(*args, **kwargs)
+
+
+class LocalProcessPool(object):
+    """
+    A pool of local worker processes that is created once and reused for the lifetime of this object.
+
+    The worker processes are started when first needed, using the "forkserver" start method when it is
+    available and the "spawn" method otherwise.  Workers therefore never inherit the threads (e.g. those of a
+    multi-threaded BLAS library) or locks of the process that uses the pool, but work must be sent to them
+    explicitly: functions given to :method:`map` must be defined at the top level of a module and their
+    arguments must be picklable.  When used within a worker process, :method:`map` runs serially so that
+    pools are never nested.
+
+    Parameters
+    ----------
+    num_workers : int
+        The number of worker processes.
+    """
+
+    def __init__(self, num_workers):
+        self.num_workers = num_workers
+        self._executor = None
+        self._lock = _threading.Lock()
+
+    def map(self, fn, args_list):
+        """
+        Computes `fn(*args)` for each element `args` of `args_list` using the worker processes.
+
+        Parameters
+        ----------
+        fn : function
+            A function defined at the top level of a module.
+
+        args_list : list
+            A list of tuples of picklable arguments to `fn`.
+
+        Returns
+        -------
+        list
+            The return values of `fn`, in the order of `args_list`.
+        """
+        return list(self.imap(fn, args_list))
+
+    def imap(self, fn, args_list):
+        """
+        Like :method:`map`, but returns an iterator over the return values as they become available.
+
+        All of `args_list` is submitted to the worker processes at once, and closing the returned
+        iterator cancels any work that hasn't been started.
+
+        Parameters
+        ----------
+        fn : function
+            A function defined at the top level of a module.
+
+        args_list : list
+            A list of tuples of picklable arguments to `fn`.
+
+        Returns
+        -------
+        iterator
+            The return values of `fn`, in the order of `args_list`.
+        """
+        if self.num_workers <= 1 or len(args_list) <= 1 or _in_worker_process:
+            return (fn(*args) for args in args_list)
+
+        with self._lock:
+            if self._executor is None:
+                start_method = 'forkserver' if ('forkserver' in _mp.get_all_start_methods()) else 'spawn'
+                self._executor = _futures.ProcessPoolExecutor(self.num_workers, _mp.get_context(start_method),
+                                                              initializer=_init_worker_process)
+            executor = self._executor
+        try:
+            results = executor.map(_apply_args_and_kwargs, _itertools.repeat(fn), args_list, _itertools.repeat({}))
+        except _futures.BrokenExecutor:
+            self.shutdown()  # so the next call starts new worker processes
+            raise
+        return self._iter_results(results)
+
+    def _iter_results(self, results):
+        """ Yields from the iterator returned by an executor's `map`, handling broken executors """
+        try:
+            yield from results
+        except _futures.BrokenExecutor:
+            self.shutdown()
+            raise
+        finally:
+            results.close()  # cancels the work that hasn't started (when closed early)
+
+    def shutdown(self):
+        """
+        Stops the worker processes (new ones are started if the pool is used again).
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __getstate__(self):
+        # Worker processes belong to the process that started them
+        return {'num_workers': self.num_workers}
+
+    def __setstate__(self, state):
+        self.__init__(state['num_workers'])
+
+
+_in_worker_process = False
+
+
+def _init_worker_process():
+    global _in_worker_process
+    _in_worker_process = True
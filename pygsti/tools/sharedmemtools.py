@@ -90,13 +90,15 @@ def shared_mem_is_enabled():
     return bool(_shared_memory is not None)
 
 
-def create_shared_ndarray(resource_alloc, shape, dtype, zero_out=False, memory_tracker=None):
+def create_shared_ndarray(resource_alloc, shape, dtype, zero_out=False, memory_tracker=None,
+                          local_processes=False):
     """
     Creates a `numpy.ndarray` that is potentially shared between processors.
 
     A shared memory array is created when `resource_alloc.host_comm` is
     not `None`, in which case it indicates which processors belong to the
-    same host and have access to the same shared memory.
+    same host and have access to the same shared memory, or when
+    `local_processes` is `True`.
 
     Parameters
     ----------
@@ -118,6 +120,12 @@ def create_shared_ndarray(resource_alloc, shape, dtype, zero_out=False, memory_t
         If not none, callc `memory_tracker.add_tracked_memory` to track the
         size of the allocated array.
 
+    local_processes : bool, optional
+        Whether to create shared memory, without MPI, for use by local worker
+        processes (e.g. those of a :class:`LocalProcessPool`), which access it
+        using :function:`attach_shared_ndarray`.  In this case `resource_alloc`
+        is not used and may be `None`.
+
     Returns
     -------
     ar : numpy.ndarray
@@ -128,13 +136,20 @@ def create_shared_ndarray(resource_alloc, shape, dtype, zero_out=False, memory_t
         a normal array is created, this is `None`.  Provide this to
         :function:`cleanup_shared_ndarray` to ensure `ar` is deallocated properly.
     """
-    hostcomm = resource_alloc.host_comm if shared_mem_is_enabled() else None
+    if local_processes and not shared_mem_is_enabled():
+        raise ValueError("Shared memory is not available (requires Python 3.8+ and PYGSTI_USE_SHARED_MEMORY != 0)")
+    hostcomm = resource_alloc.host_comm if (shared_mem_is_enabled() and not local_processes) else None
     nelements = _np.product(shape)
-    if hostcomm is None or nelements == 0:  # Note: shared memory must be for size > 0
+    if (hostcomm is None and not local_processes) or nelements == 0:  # Note: shared memory must be for size > 0
         # every processor allocates its own memory
         if memory_tracker is not None: memory_tracker.add_tracked_memory(nelements)
         ar = _np.zeros(shape, dtype) if zero_out else _np.empty(shape, dtype)
         shm = None
+    elif hostcomm is None:  # memory shared with local worker processes
+        if memory_tracker is not None: memory_tracker.add_tracked_memory(nelements)
+        shm = _shared_memory.SharedMemory(create=True, size=nelements * _np.dtype(dtype).itemsize)
+        ar = _np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        if zero_out: ar.fill(0)
     else:
         if memory_tracker: memory_tracker.add_tracked_memory(nelements // hostcomm.size)
         if hostcomm.rank == 0:
@@ -152,6 +167,35 @@ def create_shared_ndarray(resource_alloc, shape, dtype, zero_out=False, memory_t
     return ar, shm
 
 
+def attach_shared_ndarray(shm_name, shape, dtype):
+    """
+    Accesses, from a local worker process, an array created by :function:`create_shared_ndarray`.
+
+    Parameters
+    ----------
+    shm_name : str
+        The `name` of the shared memory object returned by :function:`create_shared_ndarray`
+        (called with `local_processes=True`).
+
+    shape : tuple
+        The shape of the shared array.
+
+    dtype : numpy.dtype
+        The numpy data type of the shared array.
+
+    Returns
+    -------
+    ar : numpy.ndarray
+        The shared-memory array.
+
+    shm : multiprocessing.shared_memory.SharedMemory
+        The shared memory object, which should be closed (using `shm.close()`, after
+        all references to `ar` are released) but *not* unlinked by the worker process.
+    """
+    shm = _shared_memory.SharedMemory(name=shm_name)
+    return _np.ndarray(shape, dtype=dtype, buffer=shm.buf), shm
+
+
 def cleanup_shared_ndarray(shm):
     """
     De-allocates a (potentially) shared numpy array, created by :function:`create_shared_ndarray`.
@@ -174,6 +174,7 @@ def setup_with_extensions(extensions=None):
         package_dir={'': '.'},
         package_data={
             'pygsti.tools': ['fastcalc.pyx'],
+            'pygsti.objectivefns': ['fastobjectivefns.pyx'],
             'pygsti.evotypes': [
                 'basereps_cython.pxd',
                 'basereps_cython.pyx',
@@ -307,6 +308,11 @@ try:
             include_dirs=['.', np.get_include()]
             # libraries=['m'] #math lib?
         ),
+        Extension(
+            "pygsti.objectivefns.fastobjectivefns",
+            sources=["pygsti/objectivefns/fastobjectivefns.pyx"],
+            include_dirs=['.', np.get_include()]
+        ),
         Extension(
             "pygsti.baseobjs.opcalc.fastopcalc",
             sources=["pygsti/baseobjs/opcalc/fastopcalc.pyx"],
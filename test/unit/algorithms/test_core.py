@@ -1,3 +1,6 @@
+import os
+from unittest import mock
+
 import numpy as np
 
 import pygsti.circuits as pc
@@ -7,8 +10,9 @@ from pygsti.baseobjs import Label
 from pygsti.circuits import Circuit, CircuitList
 from pygsti.objectivefns import Chi2Function, FreqWeightedChi2Function, \
     PoissonPicDeltaLogLFunction
+from pygsti.optimize.customlm import CustomLMOptimizer
 from . import fixtures
-from ..util import BaseCase
+from ..util import BaseCase, with_temp_path
 
 
 class CoreStdData(object):
@@ -290,6 +294,21 @@ class CoreMLGSTTester(CoreStdData, BaseCase):
                                             )
         # TODO assert correctness
 
+    def test_do_mlgst_sparse_jacobian(self):
+        obj_builder = PoissonPicDeltaLogLFunction.builder(
+            name='logl',
+            description="2*DeltaLogL",
+            regularization={'min_prob_clip': 1e-4},
+            penalties={'cptp_penalty_factor': 1.0}
+        )
+        _, mdl_dense = core.run_gst_fit_simple(self.ds, self.mdl_clgst, self.lsgstStrings[0],
+                                               optimizer={'tol': 1e-5}, objective_function_builder=obj_builder,
+                                               resource_alloc=None)
+        _, mdl_sparse = core.run_gst_fit_simple(self.ds, self.mdl_clgst, self.lsgstStrings[0],
+                                                optimizer={'tol': 1e-5, 'sparse_jacobian': True},
+                                                objective_function_builder=obj_builder, resource_alloc=None)
+        self.assertArraysAlmostEqual(mdl_sparse.to_vector(), mdl_dense.to_vector(), places=5)
+
     def test_do_mlgst_CPTP_SPAM_penalty_factor(self):
         # this test often gives an assetion error "finite Jacobian has
         # inf norm!" on Travis CI Python 3 case. Just ignore for now.
@@ -338,6 +357,53 @@ class CoreMLGSTTester(CoreStdData, BaseCase):
             resource_alloc=None
         )
 
+    @with_temp_path
+    def test_do_iterative_mlgst_checkpoint_resume(self, tmp_path):
+        def run():
+            return core.run_iterative_gst(self.ds, self.mdl_clgst, self.lsgstStrings, optimizer={'tol': 1e-5},
+                                          iteration_objfn_builders=['chi2'], final_objfn_builders=['logl'],
+                                          resource_alloc=None, checkpoint_dir=tmp_path)
+        models, optimums, final_objfn = run()
+        nIters = len(self.lsgstStrings)
+        self.assertEqual(sorted(os.listdir(tmp_path)), sorted(['iteration_%d.npz' % i for i in range(nIters)]))
+
+        # "interrupt" the run during its second-to-last iteration
+        os.remove(os.path.join(tmp_path, 'iteration_%d.npz' % (nIters - 2)))
+        os.remove(os.path.join(tmp_path, 'iteration_%d.npz' % (nIters - 1)))
+        with mock.patch.object(core, 'run_gst_fit', wraps=core.run_gst_fit) as mock_fit:
+            resumed_models, resumed_optimums, resumed_final_objfn = run()
+            self.assertEqual(mock_fit.call_count, 3)  # chi2 for the last 2 iterations + final logl
+
+        self.assertEqual(len(resumed_models), nIters)
+        self.assertEqual(len(resumed_optimums), nIters)
+        self.assertIsNotNone(resumed_final_objfn)
+        for model, resumed_model in zip(models, resumed_models):
+            self.assertArraysAlmostEqual(model.to_vector(), resumed_model.to_vector())
+
+    @with_temp_path
+    def test_do_iterative_mlgst_checkpoint_path_reset_on_error(self, tmp_path):
+        optimizer = CustomLMOptimizer(tol=1e-5)
+        with mock.patch.object(core, 'run_gst_fit', side_effect=RuntimeError("interrupted")):
+            with self.assertRaises(RuntimeError):
+                core.run_iterative_gst(self.ds, self.mdl_clgst, self.lsgstStrings, optimizer=optimizer,
+                                       iteration_objfn_builders=['chi2'], final_objfn_builders=['logl'],
+                                       resource_alloc=None, checkpoint_dir=tmp_path)
+        self.assertIsNone(optimizer.checkpoint_path)
+
+    def test_do_iterative_mlgst_warm_start(self):
+        optimizer = CustomLMOptimizer(tol=1e-5, warm_start=True)
+        models, optimums, final_objfn = core.run_iterative_gst(
+            self.ds, self.mdl_clgst, self.lsgstStrings, optimizer=optimizer, iteration_objfn_builders=['chi2'],
+            final_objfn_builders=['logl'], resource_alloc=None)
+        self.assertIsNone(optimizer.warm_start_state)
+        self.assertIsNotNone(optimums[0].optimizer_specific_qtys['warm_start_state'])
+
+        # the warm-started fits should reach (essentially) the same optimum as the cold-started ones
+        _, _, cold_final_objfn = core.run_iterative_gst(
+            self.ds, self.mdl_clgst, self.lsgstStrings, optimizer={'tol': 1e-5}, iteration_objfn_builders=['chi2'],
+            final_objfn_builders=['logl'], resource_alloc=None)
+        self.assertAlmostEqual(final_objfn.fn() / cold_final_objfn.fn(), 1.0, places=3)
+
     # # XXX This probably shouldn't exist?
     # # From the core.do_iterative_mlgst docstring:
     # #   check : boolean, optional
@@ -1,4 +1,6 @@
 # XXX rewrite and optimize
+import numpy as np
+
 import pygsti.algorithms as alg
 import pygsti.algorithms.gaugeopt as go
 from pygsti.models.gaugegroup import TPGaugeGroup
@@ -55,6 +57,40 @@ class GaugeOptMetricMethods(GaugeOptMethodBase):
             )
 
 
+class GaugeOptPenaltyJacobianTester(BaseCase):
+    def setUp(self):
+        self.model = fixtures.model.depolarize(op_noise=0.05, spam_noise=0.1)
+        # move the (projector) effects away from zero eigenvalues, where the trace norm isn't differentiable
+        rand = np.random.RandomState(1234)
+        self.model.from_vector(self.model.to_vector() + 0.01 * rand.standard_normal(self.model.num_params))
+        self.gauge_group = TPGaugeGroup(self.model.state_space)
+        self.gauge_params = self.gauge_group.initial_params + 0.01 * rand.standard_normal(self.gauge_group.num_params)
+
+    def _transformed_model(self, gauge_params):
+        mdl_post = self.model.copy()
+        mdl_post.transform_inplace(self.gauge_group.compute_element(gauge_params))
+        return mdl_post
+
+    def _check_penalty_jacobian(self, penalty_fn, jac_fill_fn, size):
+        gauge_group_el = self.gauge_group.compute_element(self.gauge_params)
+        mdl_post = self._transformed_model(self.gauge_params)
+        jac = np.empty((size, self.gauge_group.num_params), 'd')
+        self.assertEqual(jac_fill_fn(jac, self.model, mdl_post, gauge_group_el, 1.0, self.model.basis, None), size)
+
+        penalty0 = penalty_fn(mdl_post, 1.0, self.model.basis)
+        eps = 1e-7
+        for i in range(self.gauge_group.num_params):
+            params = self.gauge_params.copy(); params[i] += eps
+            fd_col = (penalty_fn(self._transformed_model(params), 1.0, self.model.basis) - penalty0) / eps
+            self.assertArraysAlmostEqual(fd_col, jac[:, i], places=4)  # compare with finite-difference
+
+    def test_cptp_penalty_jacobian(self):
+        self._check_penalty_jacobian(go._cptp_penalty, go._cptp_penalty_jac_fill, go._cptp_penalty_size(self.model))
+
+    def test_spam_penalty_jacobian(self):
+        self._check_penalty_jacobian(go._spam_penalty, go._spam_penalty_jac_fill, go._spam_penalty_size(self.model))
+
+
 class GaugeOptInstanceBase(object):
     def setUp(self):
         super(GaugeOptInstanceBase, self).setUp()
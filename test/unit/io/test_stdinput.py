@@ -121,3 +121,52 @@ class DataSetLoaderTester(BaseCase):
         self.assertEqual(ds[Circuit('Gc2')].aux['test'], 1)
         self.assertEqual(ds[Circuit('Gc3')].aux['test'], 1)
         self.assertEqual(ds[Circuit('Gc4')].aux['test'], 1)
+
+    @with_temp_path
+    def test_load_in_chunks(self, pth):
+        contents = ("## Outcomes = 0, 1\n"
+                    + "".join(["Gx^%d 0:%d 1:%d # {'test': %d}\n" % (i, i, 2 * i, i) for i in range(40)])
+                    + "Gy BAD\n"
+                    + "Gx^3 0:5 1:1\n")  # a duplicate circuit
+        with open(pth, 'w') as f:
+            f.write(contents)
+
+        for ignore_zero_count_lines in (True, False):
+            ds = io.read_dataset(pth, ignore_zero_count_lines=ignore_zero_count_lines)
+            ds_chunked = io.read_dataset(pth, ignore_zero_count_lines=ignore_zero_count_lines, num_local_workers=2)
+            self.assertEqual(list(ds_chunked.keys()), list(ds.keys()))
+            for circuit in ds:
+                self.assertEqual(ds_chunked[circuit].counts, ds[circuit].counts)
+                self.assertEqual(ds_chunked[circuit].aux, ds[circuit].aux)
+        self.assertEqual(ds_chunked[Circuit('Gx^3')]['0'], 8)
+
+    @with_temp_path
+    def test_load_in_chunks_with_times(self, pth):
+        contents = ("Gc0 0:1 1:2\n"
+                    "Gc1\n"
+                    "times: 0 1\n"
+                    "outcomes: 0 1\n"
+                    "\n"
+                    "Gc2 0:3\n")
+        with open(pth, 'w') as f:
+            f.write(contents)
+
+        ds = io.read_dataset(pth, num_local_workers=2)  # falls back to serial parsing
+        self.assertEqual(ds[Circuit('Gc0')]['1'], 2)
+        self.assertArraysAlmostEqual(ds[Circuit('Gc1')].time, [0, 1])
+        self.assertEqual(ds[Circuit('Gc2')]['0'], 3)
+
+    @with_temp_path
+    def test_load_time_dependent_in_chunks(self, pth):
+        contents = ("## 0 = 0\n"
+                    "## 1 = 1\n"
+                    + "".join(["Gx^%d %s\n" % (i, "0110"[:i % 4 + 1]) for i in range(20)]))
+        with open(pth, 'w') as f:
+            f.write(contents)
+
+        ds = io.read_time_dependent_dataset(pth)
+        ds_chunked = io.read_time_dependent_dataset(pth, num_local_workers=2)
+        self.assertEqual(list(ds_chunked.keys()), list(ds.keys()))
+        for circuit in ds:
+            self.assertArraysAlmostEqual(ds_chunked[circuit].time, ds[circuit].time)
+            self.assertEqual(ds_chunked[circuit].counts, ds[circuit].counts)
@@ -0,0 +1,114 @@
+import threading
+
+import pygsti
+
+from ..util import BaseCase, with_temp_path
+
+import pygsti.circuits.circuitparser as cp
+from pygsti.circuits import Circuit
+from pygsti.circuits.circuitparser import CircuitParseCache
+from pygsti.io import stdinput
+
+
+class CircuitParseCacheTester(BaseCase):
+    def test_lru_eviction(self):
+        cache = CircuitParseCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)  # 'a' is now the most recently used
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_stats(self):
+        cache = CircuitParseCache()
+        cache.put('a', 1)
+        cache.get('a'); cache.get('a'); cache.get('b')
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 3)
+        self.assertEqual(stats['size'], 1)
+
+        cache.clear()
+        self.assertEqual(cache.stats()['hits'], 0)
+        self.assertEqual(len(cache), 0)
+
+    @with_temp_path
+    def test_save_and_load(self, tmp_path):
+        cache = CircuitParseCache()
+        cache.put(('GxGy', True), Circuit('GxGy'))
+        cache.save(tmp_path)
+
+        cache2 = CircuitParseCache()
+        cache2.set_persistence_file(tmp_path)
+        self.assertEqual(cache2.get(('GxGy', True)), Circuit('GxGy'))
+        cache2.set_persistence_file(None)
+
+    def test_thread_safety(self):
+        cache = CircuitParseCache(maxsize=50)
+
+        def work(offset):
+            for i in range(2000):
+                cache.put(i % 100 + offset, i)
+                cache.get((i + 7) % 100 + offset)
+
+        threads = [threading.Thread(target=work, args=(k * 1000,)) for k in range(4)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual(len(cache), 50)
+        self.assertEqual(cache.hits + cache.misses, 8000)
+
+
+class GlobalParseCacheTester(BaseCase):
+    def setUp(self):
+        cp.global_parse_cache.clear()
+        self.num_parses = 0
+        orig_parse_circuit = cp.parse_circuit
+
+        def counting_parse_circuit(*args):
+            self.num_parses += 1
+            return orig_parse_circuit(*args)
+        cp.parse_circuit = counting_parse_circuit
+        self.addCleanup(setattr, cp, 'parse_circuit', orig_parse_circuit)
+
+    def test_strings_parsed_once(self):
+        std = stdinput.StdInputParser()
+        c1 = std.parse_circuit("GxGy^2", create_subcircuits=True)
+        c2 = stdinput.StdInputParser().parse_circuit("GxGy^2", create_subcircuits=True)
+        c3 = Circuit("GxGy^2")
+        self.assertEqual(c1, c2)
+        self.assertEqual(c1, c3)
+        self.assertEqual(self.num_parses, 1)
+        self.assertEqual(len(cp.global_parse_cache), 1)  # each string is cached once
+
+    def test_lookup_bypasses_cache(self):
+        std = stdinput.StdInputParser()
+        c1 = std.parse_circuit("GxGy", lookup={'a': ('Gx',)})
+        c2 = std.parse_circuit("GxGy", lookup={'a': ('Gy',)})
+        self.assertFalse(c1 is c2)
+        self.assertEqual(self.num_parses, 2)
+        self.assertEqual(len(cp.global_parse_cache), 0)
+
+    def test_local_cache(self):
+        local_cache = {}
+        std = stdinput.StdInputParser(circuit_parse_cache=local_cache)
+        c = std.parse_circuit("Gx(GyGx)^3")
+        self.assertTrue(local_cache["Gx(GyGx)^3"] is c)
+
+    @with_temp_path
+    def test_protocol_data_tree_parses_each_string_once(self, root):
+        from pygsti.modelpacks import smq1Q_XYI
+        from pygsti.protocols import ProtocolData
+        edesign = smq1Q_XYI.create_gst_experiment_design(4)
+        ds = pygsti.data.simulate_data(smq1Q_XYI.target_model(), edesign.all_circuits_needing_data, 100, seed=1234)
+        ProtocolData(edesign, ds).write(root)
+
+        cp.global_parse_cache.clear(); self.num_parses = 0
+        data = pygsti.io.read_data_from_dir(root)
+        self.assertEqual(len(data.dataset), len(edesign.all_circuits_needing_data))
+        # the circuit list files and the dataset file repeat the same strings, but each is parsed only once
+        self.assertGreater(cp.global_parse_cache.hits, 0)
+        self.assertEqual(self.num_parses, len(cp.global_parse_cache))
@@ -1,5 +1,7 @@
 import pickle
 from collections import OrderedDict
+from pathlib import Path
+from tempfile import TemporaryDirectory
 
 import numpy as np
 
@@ -7,7 +9,7 @@ import pygsti.circuits as pc
 from pygsti.baseobjs import outcomelabeldict as ld
 from pygsti.circuits import Circuit
 from pygsti.data import DataSet
-from ..util import BaseCase
+from ..util import BaseCase, with_temp_path
 
 
 class DataSetTester(BaseCase):
@@ -275,6 +277,10 @@ class DataSetNonstaticInstanceTester(DataSetMethodBase, DefaultDataSetInstance,
         self.assertEqual(self.dsRow['0'], 20)
         self.assertEqual(self.dsRow['1'], 180)
 
+    def test_count_arrays_raises_on_nonstatic(self):
+        with self.assertRaises(ValueError):
+            self.ds.count_arrays(list(self.ds.keys()))
+
     def test_warn_on_nonintegral_scaled_row_access(self):
         self.dsRow.scale_inplace(3.141592)
         with self.assertWarns(Warning):
@@ -290,6 +296,14 @@ class DataSetStaticInstanceTester(DataSetMethodBase, DefaultDataSetInstance, Bas
         super(DataSetStaticInstanceTester, self).setUp()
         self.ds.done_adding_data()
 
+    def test_count_arrays(self):
+        circuits = list(reversed(list(self.ds.keys())))
+        circuit_indices, outcome_indices, counts = self.ds.count_arrays(circuits)
+        for i, circuit in enumerate(circuits):
+            for ol, j in self.ds.olIndex.items():
+                in_row = (circuit_indices == i) & (outcome_indices == j)
+                self.assertAlmostEqual(counts[in_row].sum(), self.ds[circuit].allcounts[ol])
+
     def test_raise_on_add_count_dict(self):
         with self.assertRaises(ValueError):
             self.ds.add_count_dict(('Gx',), {'0': 10, '1': 90})
@@ -315,6 +329,54 @@ class DataSetStaticInstanceTester(DataSetMethodBase, DefaultDataSetInstance, Bas
             self.dsRow.scale_inplace(2.0)
 
 
+class ColumnarDataSetInstance(object):
+    def setUp(self):
+        super(ColumnarDataSetInstance, self).setUp()
+        self.ds.done_adding_data()
+        self.ds_original = self.ds
+        tmpdir = TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.columnar_path = str(Path(tmpdir.name) / "dataset.pgds")
+        self.ds.write_columnar(self.columnar_path)
+        self.ds = DataSet(file_to_load_from=self.columnar_path)
+
+    def test_matches_original(self):
+        self.assertTrue(isinstance(self.ds.oliData, np.memmap))
+        self.assertEqual(list(self.ds.keys()), list(self.ds_original.keys()))
+        self.assertEqual(self.ds.olIndex, self.ds_original.olIndex)
+        self.assertEqual(self.ds.uuid, self.ds_original.uuid)
+        for circuit in self.ds_original:
+            self.assertArraysEqual(self.ds[circuit].oli, self.ds_original[circuit].oli)
+            self.assertArraysEqual(self.ds[circuit].time, self.ds_original[circuit].time)
+            self.assertEqual(self.ds[circuit].counts, self.ds_original[circuit].counts)
+
+    def test_circuits_decoded_lazily(self):
+        ds = DataSet(file_to_load_from=self.columnar_path)
+        circuit = list(self.ds_original.keys())[-1]
+        self.assertEqual(ds[circuit].counts, self.ds_original[circuit].counts)
+        self.assertEqual(sum([c is not None for c in ds.cirIndex._circuits]), 1)
+
+
+class ColumnarDataSetInstanceTester(DataSetMethodBase, ColumnarDataSetInstance, DefaultDataSetInstance, BaseCase):
+    def test_read_into_memory(self):
+        ds = DataSet(outcome_labels=['0', '1'])
+        ds.read_columnar(self.columnar_path, mmap_mode=None)
+        self.assertFalse(isinstance(ds.oliData, np.memmap))
+        for circuit in self.ds_original:
+            self.assertEqual(ds[circuit].counts, self.ds_original[circuit].counts)
+
+    @with_temp_path
+    def test_raise_on_non_columnar_file(self, tmp_path):
+        self.ds_original.write_binary(tmp_path)
+        with self.assertRaises(ValueError):
+            DataSet(outcome_labels=['0', '1']).read_columnar(tmp_path)
+
+
+class ColumnarRawSeriesDataSetInstanceTester(DataSetMethodBase, ColumnarDataSetInstance, RawSeriesDataSetInstance,
+                                             BaseCase):
+    pass
+
+
 class RawSeriesDataSetInstanceTester(DataSetMethodBase, RawSeriesDataSetInstance, BaseCase):
     def test_build_repetition_counts(self):
         self.ds._add_explicit_repetition_counts()
@@ -333,3 +395,36 @@ class RawSeriesDatasetStaticInstanceTester(DataSetMethodBase, RawSeriesDataSetIn
     def test_raise_on_build_repetition_counts(self):
         with self.assertRaises(ValueError):
             self.ds._add_explicit_repetition_counts()
+
+    def test_views_share_data(self):
+        trunc = self.ds.truncate([('Gy', 'Gy')])
+        window = self.ds.time_slice(0.5, 1.2)
+        splits = self.ds.split_by_time()
+        for view in [trunc, window] + list(splits.values()):
+            self.assertTrue(view.oliData is self.ds.oliData)
+            self.assertTrue(view.timeData is self.ds.timeData)
+            self.assertTrue(view.bStatic)
+            self.assertNotEqual(view.uuid, self.ds.uuid)
+
+    def test_views_match_copies(self):
+        nonstatic = self.ds.copy_nonstatic()
+        window, window_copy = self.ds.time_slice(0.5, 1.2), nonstatic.time_slice(0.5, 1.2)
+        splits, splits_copy = self.ds.split_by_time(), nonstatic.split_by_time()
+        self.assertEqual(list(splits.keys()), list(splits_copy.keys()))
+        for view, copy in [(window, window_copy)] + [(splits[t], splits_copy[t]) for t in splits]:
+            self.assertEqual(list(view.keys()), list(copy.keys()))
+            for circuit in copy:
+                self.assertArraysEqual(view[circuit].oli, copy[circuit].oli)
+                self.assertArraysAlmostEqual(view[circuit].time, copy[circuit].time)
+                self.assertEqual(view[circuit].counts, copy[circuit].counts)
+
+    @with_temp_path
+    def test_serialize_view(self, tmp_path):
+        window = self.ds.time_slice(0.5, 1.2)
+        expected_num_rows = sum([len(window[circuit].oli) for circuit in window])
+        window.write_binary(tmp_path)
+        for ds in (pickle.loads(pickle.dumps(window)), DataSet(file_to_load_from=tmp_path)):
+            self.assertEqual(len(ds.oliData), expected_num_rows)  # the parent's data isn't saved
+            for circuit in window:
+                self.assertArraysEqual(ds[circuit].oli, window[circuit].oli)
+                self.assertArraysAlmostEqual(ds[circuit].time, window[circuit].time)
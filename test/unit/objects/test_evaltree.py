@@ -1,5 +1,7 @@
 import numpy as np
 
+from pygsti.circuits import Circuit
+from pygsti.layouts.evaltree import EvalTree
 from ..util import BaseCase
 
 
@@ -56,3 +58,48 @@ from ..util import BaseCase
 #    else:
 #        assert(None not in circuits[0:nFinal])
 #        return circuits[0:nFinal]
+
+
+class EvalTreeTester(BaseCase):
+    def setUp(self):
+        self.circuits = [Circuit(s) for s in ('Gx', 'GxGy', 'GyGxGx', 'GxGyGxGyGi', 'GiGyGxGx', 'GxGy')]
+        self.tree = EvalTree.create(self.circuits)
+
+    def test_evaluation_levels(self):
+        initial_items, levels = self.tree.evaluation_levels()
+        seqs = {iDest: (() if lbl is None else (lbl,)) for iDest, lbl in initial_items}
+        for dest, left, right in levels:
+            for iDest, iLeft, iRight in zip(dest, left, right):
+                # items within a level may only depend on items from previous levels
+                self.assertIn(iLeft, seqs)
+                self.assertIn(iRight, seqs)
+            for iDest, iLeft, iRight in zip(dest, left, right):
+                seqs[iDest] = seqs[iLeft] + seqs[iRight]
+
+        self.assertEqual(len(seqs), len(self.tree))
+        for i, c in enumerate(self.circuits):
+            self.assertEqual(seqs[i], c.layertup)
+
+    def test_evaluation_levels_cached(self):
+        levels = self.tree.evaluation_levels()
+        self.assertIs(levels[1], self.tree.evaluation_levels()[1])
+
+    def test_create_from_previous_tree(self):
+        circuits = self.circuits + [Circuit(s) for s in ('GxGyGxGyGiGx', 'Gi', 'GyGxGxGy')]
+        tree = EvalTree.create(circuits, self.tree)
+        nPrev = len(self.circuits)
+        for (iDest, iLeft, iRight), (jDest, jLeft, jRight) in zip(tree, self.tree):  # shifted scratch indices
+            shift = lambda i: i if (i is None or i < nPrev) else i + len(circuits) - nPrev
+            self.assertEqual((iDest, iLeft), (shift(jDest), shift(jLeft)))
+            self.assertEqual(iRight, jRight if jLeft is None else shift(jRight))
+
+        initial_items, levels = tree.evaluation_levels()
+        seqs = {iDest: (() if lbl is None else (lbl,)) for iDest, lbl in initial_items}
+        for dest, left, right in levels:
+            for iDest, iLeft, iRight in zip(dest, left, right):
+                seqs[iDest] = seqs[iLeft] + seqs[iRight]
+        for i, c in enumerate(circuits):
+            self.assertEqual(seqs[i], c.layertup)
+
+        with self.assertRaises(ValueError):
+            EvalTree.create(list(reversed(circuits)), self.tree)
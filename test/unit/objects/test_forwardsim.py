@@ -1,16 +1,22 @@
 # XXX rewrite or remove
 
+import os
 from unittest import mock
 
 import numpy as np
+import scipy.sparse
 
+import pygsti
 import pygsti.models as models
+from pygsti.forwardsims import distforwardsim
 from pygsti.forwardsims.forwardsim import ForwardSimulator
 from pygsti.forwardsims.mapforwardsim import MapForwardSimulator
+from pygsti.layouts.evaltree import EvalTree
 from pygsti.models import ExplicitOpModel
 from pygsti.circuits import Circuit
 from pygsti.baseobjs import Label as L
-from ..util import BaseCase
+from pygsti.baseobjs.resourceallocation import ResourceAllocation
+from ..util import BaseCase, with_temp_path
 
 
 def Ls(*args):
@@ -83,6 +89,17 @@ class ForwardSimBase(object):
         self.fwdsim.bulk_fill_dprobs(dmx, self.layout)
         # TODO assert correctness
 
+    def test_bulk_fill_sparse_dprobs(self):
+        dmx = np.empty((self.nEls, self.nP), 'd')
+        self.fwdsim.bulk_fill_dprobs(dmx, self.layout)
+
+        indptr, indices = self.layout.param_dependency_index(self.model)
+        sparse_dmx = scipy.sparse.csr_matrix((np.zeros(len(indices), 'd'), indices, indptr),
+                                             shape=(self.nEls, self.nP))
+        pmx = np.empty(self.nEls, 'd')
+        self.fwdsim.bulk_fill_sparse_dprobs(sparse_dmx, self.layout, pr_array_to_fill=pmx)
+        self.assertArraysAlmostEqual(sparse_dmx.toarray(), dmx)
+
     def test_bulk_fill_hprobs(self):
         hmx = np.zeros((self.nEls, self.nP, self.nP), 'd')
         dmx = np.zeros((self.nEls, self.nP), 'd')
@@ -99,6 +116,90 @@ class ForwardSimBase(object):
                                      pr_array_to_fill=pmx, deriv1_array_to_fill=dmx1, deriv2_array_to_fill=dmx2)
         # TODO assert correctness
 
+    def test_create_layout_from_previous(self):
+        circuits1 = [Circuit(s) for s in ('Gx', 'GxGy', 'GyGxGx')]
+        circuits2 = circuits1 + [Circuit(s) for s in ('GxGyGxGyGi', 'GiGyGxGx', 'GyGxGxGy')]
+        previous = self.fwdsim.create_layout(circuits1)
+        layout = self.fwdsim.create_layout(circuits2, previous_layout=previous)
+        fresh = self.fwdsim.create_layout(circuits2)
+
+        probs = np.empty(layout.num_elements, 'd'); self.fwdsim.bulk_fill_probs(probs, layout)
+        fresh_probs = np.empty(fresh.num_elements, 'd'); self.fwdsim.bulk_fill_probs(fresh_probs, fresh)
+        for c in circuits2:
+            self.assertEqual(layout.outcomes(c), fresh.outcomes(c))
+            self.assertArraysAlmostEqual(probs[layout.indices(c)], fresh_probs[fresh.indices(c)])
+
+    @with_temp_path
+    def test_create_layout_with_cache_dir(self, tmp_path):
+        circuits = [Circuit(s) for s in ('Gx', 'GxGy', 'GyGxGx', 'GxGyGxGyGi', 'GiGyGxGx')]
+        fresh = self.fwdsim.create_layout(circuits, array_types=('e', 'ep'))
+        saved = self.fwdsim.create_layout(circuits, array_types=('e', 'ep'), layout_cache_dir=tmp_path)
+        self.assertEqual(len(os.listdir(tmp_path)), 1)
+
+        with mock.patch.object(pygsti.layouts.distlayout._LayoutCache, 'save') as mock_save:
+            loaded = self.fwdsim.create_layout(circuits, array_types=('e', 'ep'), layout_cache_dir=tmp_path)
+            mock_save.assert_not_called()  # everything was loaded from the cache
+
+        fresh_dprobs = np.empty((fresh.num_elements, self.nP), 'd')
+        self.fwdsim.bulk_fill_dprobs(fresh_dprobs, fresh)
+        for layout in (saved, loaded):
+            dprobs = np.empty((layout.num_elements, self.nP), 'd')
+            self.fwdsim.bulk_fill_dprobs(dprobs, layout)
+            for c in circuits:
+                self.assertEqual(layout.outcomes(c), fresh.outcomes(c))
+                self.assertArraysAlmostEqual(dprobs[layout.indices(c)], fresh_dprobs[fresh.indices(c)])
+
+        # a different circuit list doesn't use the cached layout
+        self.fwdsim.create_layout(circuits[1:], array_types=('e', 'ep'), layout_cache_dir=tmp_path)
+        self.assertEqual(len(os.listdir(tmp_path)), 2)
+
+    def test_local_worker_processes(self):
+        circuits = [Circuit(s) for s in ('Gx', 'GxGy', 'GyGxGx', 'GxGyGxGyGi', 'GiGyGxGx')]
+        resource_alloc = ResourceAllocation(num_local_workers=2)
+        pool = resource_alloc.local_process_pool()
+        self.assertIs(pool, resource_alloc.copy().local_process_pool())
+        self.addCleanup(pool.shutdown)
+
+        default_layout = self.fwdsim.create_layout(circuits, resource_alloc=resource_alloc)
+        self.assertGreaterEqual(len(default_layout.atoms), 2)  # at least one atom per worker by default
+
+        fwdsim = self.fwdsim.__class__(self.model, num_atoms=3)
+        serial = fwdsim.create_layout(circuits, array_types=('e', 'ep', 'epp'))
+        pooled = fwdsim.create_layout(circuits, array_types=('e', 'ep', 'epp'), resource_alloc=resource_alloc)
+        self.assertEqual(len(pooled.atoms), 3)  # an explicit number of atoms isn't changed
+
+        def fill_all(layout):
+            nEls = layout.num_elements
+            hmx = np.zeros((nEls, self.nP, self.nP), 'd')
+            dmx = np.zeros((nEls, self.nP), 'd')
+            pmx = np.zeros(nEls, 'd')
+            fwdsim.bulk_fill_hprobs(hmx, layout, pr_array_to_fill=pmx, deriv1_array_to_fill=dmx)
+            dmx2 = np.zeros((nEls, self.nP), 'd'); pmx2 = np.zeros(nEls, 'd')
+            fwdsim.bulk_fill_dprobs(dmx2, layout, pr_array_to_fill=pmx2)
+            pmx3 = np.zeros(nEls, 'd')
+            fwdsim.bulk_fill_probs(pmx3, layout)
+            return pmx, dmx, hmx, pmx2, dmx2, pmx3
+
+        v = self.model.to_vector()
+        self.addCleanup(self.model.from_vector, v)
+        with mock.patch.object(pool, 'map', wraps=pool.map) as mock_map:
+            pooled_arrays = fill_all(pooled)
+            self.assertEqual(mock_map.call_count, 3)  # every fill ran on the worker processes
+            payload_token = distforwardsim._pool_payloads[pooled].token
+
+            # new parameter values are sent to the workers without resending the simulator, model and layout
+            self.model.from_vector(v + 0.01)
+            perturbed_pooled_arrays = fill_all(pooled)
+            self.assertEqual(distforwardsim._pool_payloads[pooled].token, payload_token)
+        perturbed_serial_arrays = fill_all(serial)
+        self.model.from_vector(v)
+        serial_arrays = fill_all(serial)
+
+        for c in circuits:
+            for serial_ar, pooled_ar in zip(serial_arrays + perturbed_serial_arrays,
+                                            pooled_arrays + perturbed_pooled_arrays):
+                self.assertArraysAlmostEqual(pooled_ar[pooled.indices(c)], serial_ar[serial.indices(c)])
+
     def test_iter_hprobs_by_rectangle(self):
         # TODO optimize
         mx = np.zeros((self.nEls, self.nP, self.nP), 'd')
@@ -144,6 +245,52 @@ class MatrixForwardSimTester(ForwardSimBase, BaseCase):
         hgflat = self.fwdsim._hoperation(L('Gx'), flat=True)
         # TODO assert correctness
 
+    def test_level_batched_caches(self):
+        circuits = [Circuit(s) for s in ('Gx', 'GxGy', 'GyGxGx', 'GxGyGxGyGi', 'GiGyGxGx', 'GxGyGxGyGiGyGx')]
+        tree = EvalTree.create(circuits)
+        prodCache, scaleCache = self.fwdsim._compute_product_cache(tree, None)
+        dProdCache = self.fwdsim._compute_dproduct_cache(tree, prodCache, scaleCache)
+        hProdCache = self.fwdsim._compute_hproduct_cache(tree, prodCache, dProdCache, dProdCache, scaleCache)
+        for i, c in enumerate(circuits):
+            scale = np.exp(scaleCache[i])
+            self.assertArraysAlmostEqual(prodCache[i] * scale, self.fwdsim.product(c))
+            self.assertArraysAlmostEqual(dProdCache[i] * scale, self.fwdsim.dproduct(c))
+            self.assertArraysAlmostEqual(hProdCache[i] * scale, self.fwdsim.hproduct(c))
+
+    def test_streaming_hprobs(self):
+        circuits = [Circuit(s) for s in ('Gx', 'GxGy', 'GyGxGx', 'GxGyGxGyGi', 'GiGyGxGx', 'GxGyGxGyGiGyGx')]
+        layout = self.fwdsim.create_layout(circuits, array_types=('epp',))
+        atom = layout.atoms[0]
+
+        # reference: contract the full (materialized) hproduct cache
+        prodCache, scaleCache = self.fwdsim._compute_product_cache(atom.tree, None)
+        dProdCache = self.fwdsim._compute_dproduct_cache(atom.tree, prodCache, scaleCache)
+        hProdCache = self.fwdsim._compute_hproduct_cache(atom.tree, prodCache, dProdCache, dProdCache, scaleCache)
+        scaleVals = np.exp(atom.nonscratch_cache_view(scaleCache))
+        Gs, dGs, hGs = [atom.nonscratch_cache_view(c, axis=0) for c in (prodCache, dProdCache, hProdCache)]
+        hmx_ref = np.zeros((atom.num_elements, self.nP, self.nP), 'd')
+        for spam_tuple, (element_indices, tree_indices) in atom.indices_by_spamtuple.items():
+            rho, E = self.fwdsim._rho_e_from_spam_tuple(spam_tuple)
+            hmx_ref[element_indices] = self.fwdsim._hprobs_from_rho_e(
+                spam_tuple, rho, E, Gs[tree_indices], dGs[tree_indices], dGs[tree_indices], hGs[tree_indices],
+                scaleVals[tree_indices])
+
+        hmx = np.zeros((layout.num_elements, self.nP, self.nP), 'd')
+        self.fwdsim.bulk_fill_hprobs(hmx, layout)
+        self.assertArraysAlmostEqual(hmx[atom.element_slice], hmx_ref)
+
+        # a memory limit that only just holds the dproduct caches forces the rectangle to be divided up
+        hmx[:] = 0
+        mem_limit = 8 * self.fwdsim.model.dim**2 * len(atom.tree) * 3 * self.nP
+        resource_alloc = pygsti.baseobjs.ResourceAllocation(mem_limit=mem_limit)
+        self.fwdsim._bulk_fill_hprobs_atom(hmx[atom.element_slice], None, None, atom, slice(0, self.nP),
+                                           slice(0, self.nP), resource_alloc)
+        self.assertArraysAlmostEqual(hmx[atom.element_slice], hmx_ref)
+
+        s1, s2 = slice(1, self.nP), slice(0, self.nP - 1)
+        for slice1, slice2, hprobs, dprobs12 in self.fwdsim.iter_hprobs_by_rectangle(layout, [(s1, s2)], True):
+            self.assertArraysAlmostEqual(hprobs[atom.element_slice], hmx_ref[:, s1, s2])
+
     #REMOVE
     #def test_hproduct(self):
     #    self.fwdsim.hproduct(Ls('Gx', 'Gx'), flat=True, wrt_filter1=[0, 1], wrt_filter2=[1, 2, 3])
@@ -421,3 +568,101 @@ class MapForwardSimTester(ForwardSimBase, BaseCase):
         super(MapForwardSimTester, cls).setUpClass()
         cls.model = cls.model.copy()
         cls.model.sim = MapForwardSimulator()
+
+    def test_acton_batch(self):
+        np.random.seed(1234)
+        cptp_model = self.model.copy()
+        cptp_model.set_all_parameterizations("CPTP")  # exponentiated error generators
+        cptp_model.from_vector(np.random.random(cptp_model.num_params) * 0.01)
+        pspec = pygsti.processors.QubitProcessorSpec(2, ['Gxpi2', 'Gypi2'], geometry='line')
+        local_model = pygsti.models.create_crosstalk_free_model(pspec, depolarization_strengths={'Gxpi2': 0.1},
+                                                               ideal_gate_type="full")  # embedded & composed ops
+        for mdl in (self.model, cptp_model, local_model):
+            ss = mdl.state_space
+            states = np.random.random((ss.dim, 5))
+            for lbl in mdl.primitive_op_labels:
+                rep = mdl.circuit_layer_operator(lbl, 'op')._rep
+                batch = rep.acton_batch(states)
+                single = np.column_stack([rep.acton(mdl.evotype.create_dense_state_rep(states[:, j], ss))
+                                          .to_dense('HilbertSchmidt') for j in range(states.shape[1])])
+                self.assertArraysAlmostEqual(batch, single)
+
+    def test_adjoint_acton_batch(self):
+        np.random.seed(1234)
+        cptp_model = self.model.copy()
+        cptp_model.set_all_parameterizations("CPTP")  # exponentiated error generators
+        cptp_model.from_vector(np.random.random(cptp_model.num_params) * 0.01)
+        states = np.random.random((cptp_model.state_space.dim, 5))
+        for lbl in cptp_model.primitive_op_labels:
+            op = cptp_model.circuit_layer_operator(lbl, 'op')
+            self.assertArraysAlmostEqual(op._rep.adjoint_acton_batch(states), op.to_dense().T @ states)
+
+    def test_batched_probs_with_cache(self):
+        circuits = [('Gx',), ('Gx', 'Gy'), ('Gx', 'Gy', 'Gy'), ('Gx', 'Gy', 'Gx'), ('Gy', 'Gi'), ('Gy', 'Gi', 'Gx')]
+        mdl = self.model.copy()
+        mdl.sim = MapForwardSimulator(max_cache_size=None)
+        map_probs = mdl.sim.bulk_probs(circuits)
+        mdl.sim = 'matrix'
+        matrix_probs = mdl.sim.bulk_probs(circuits)
+        for c in circuits:
+            for outcome, p in map_probs[c].items():
+                self.assertAlmostEqual(p, matrix_probs[c][outcome])
+
+    def test_trie_table_method(self):
+        circuits = [('Gx',), ('Gx', 'Gy'), ('Gx', 'Gy', 'Gy'), ('Gx', 'Gy', 'Gx'), ('Gy', 'Gi', 'Gx'), ('Gy', 'Gi', 'Gy')]
+        mdl = self.model.copy()
+        mdl.sim = MapForwardSimulator(max_cache_size=None, num_atoms=1, table_method="trie")
+        layout = mdl.sim.create_layout(circuits)
+        self.assertGreater(layout.num_applies_saved, 0)
+        trie_probs = mdl.sim.bulk_probs(circuits)
+        mdl.sim = 'matrix'
+        matrix_probs = mdl.sim.bulk_probs(circuits)
+        for c in circuits:
+            for outcome, p in trie_probs[c].items():
+                self.assertAlmostEqual(p, matrix_probs[c][outcome])
+
+    def test_fused_probs_and_dprobs(self):
+        circuits = [('Gx',), ('Gx', 'Gy'), ('Gx', 'Gy', 'Gy'), ('Gx', 'Gy', 'Gx'), ('Gy', 'Gi'), ('Gy', 'Gi', 'Gx')]
+        np.random.seed(1234)
+        mdl = self.model.copy()
+        mdl.set_all_parameterizations("CPTP")
+        mdl.from_vector(np.random.random(mdl.num_params) * 0.01)
+        nP = mdl.num_params
+
+        mdl.sim = MapForwardSimulator(max_cache_size=None)
+        layout = mdl.sim.create_layout(circuits, array_types=('e', 'ep'))
+        pmx = np.empty(layout.num_elements, 'd')
+        dmx = np.empty((layout.num_elements, nP), 'd')
+        mdl.sim.bulk_fill_dprobs(dmx, layout, pr_array_to_fill=pmx)  # probs from the unperturbed sweep
+        check_pmx = np.empty(layout.num_elements, 'd')
+        mdl.sim.bulk_fill_probs(check_pmx, layout)
+        self.assertArraysAlmostEqual(pmx, check_pmx)
+
+        mdl.sim = 'matrix'
+        matrix_dprobs = mdl.sim.bulk_dprobs(circuits)
+        for c in layout.circuits:
+            indices, outcomes = layout.indices_and_outcomes(c)
+            for k, outcome in zip(pygsti.tools.slicetools.to_array(indices), outcomes):
+                self.assertArraysAlmostEqual(dmx[k], matrix_dprobs[c][outcome], places=4)
+
+    def test_adjoint_derivatives(self):
+        circuits = [('Gx',), ('Gx', 'Gy'), ('Gx', 'Gy', 'Gy'), ('Gx', 'Gy', 'Gx'), ('Gy', 'Gi'), ('Gy', 'Gi', 'Gx'),
+                    ('Gx', 'Gy', 'Gy', 'Gi', 'Gx'), ('Gx', 'Gy', 'Gy', 'Gi', 'Gy'), ()]
+        np.random.seed(1234)
+        for param, cache_size in (("full TP", 0), ("CPTP", 0), ("CPTP", None)):  # None => cached prefixes
+            mdl = self.model.copy()
+            mdl.set_all_parameterizations(param)
+            mdl.from_vector(mdl.to_vector() + np.random.random(mdl.num_params) * 0.01)
+            mdl.sim = 'matrix'
+            matrix_dprobs = mdl.sim.bulk_dprobs(circuits)
+            matrix_hprobs = mdl.sim.bulk_hprobs(circuits)
+            mdl.sim = MapForwardSimulator(max_cache_size=cache_size, num_atoms=1, derivative_method="adjoint")
+            adjoint_dprobs = mdl.sim.bulk_dprobs(circuits)
+            adjoint_hprobs = mdl.sim.bulk_hprobs(circuits)  # finite differences of adjoint derivatives
+            for c in circuits:
+                for outcome, dp in matrix_dprobs[c].items():
+                    self.assertArraysAlmostEqual(adjoint_dprobs[c][outcome], dp)
+                    self.assertArraysAlmostEqual(adjoint_hprobs[c][outcome], matrix_hprobs[c][outcome], places=2)
+
+        with self.assertRaises(ValueError):
+            MapForwardSimulator(derivative_method="backwards")
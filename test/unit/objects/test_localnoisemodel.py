@@ -1,4 +1,5 @@
 import numpy as np
+import scipy.sparse
 from pygsti.baseobjs.label import Label
 
 from pygsti.circuits.circuit import Circuit
@@ -45,6 +46,27 @@ class LocalNoiseModelInstanceTester(BaseCase):
         self.assertAlmostEqual(sum(mdl_local.probabilities(test_circuit).values()), 1.0)
         self.assertEqual(mdl_local.num_params, 66)
 
+    def test_sparse_param_dependencies(self):
+        mdl_local = create_crosstalk_free_model(self.pspec_2Q,
+                                                ideal_gate_type='H+S', ideal_spam_type='tensor product H+S',
+                                                independent_gates=True, ensure_composed_gates=False, simulator='map')
+        circuits = [Circuit([('Gx', 'qb0')], line_labels=('qb0', 'qb1')),
+                    Circuit([('Gy', 'qb1'), ('Gx', 'qb1')], line_labels=('qb0', 'qb1')),
+                    Circuit([('Gcnot', 'qb0', 'qb1')], line_labels=('qb0', 'qb1'))]
+        layout = mdl_local.sim.create_layout(circuits, array_types=('e', 'ep'))
+        nEls, nP = layout.num_elements, mdl_local.num_params
+        dprobs = np.empty((nEls, nP), 'd')
+        mdl_local.sim.bulk_fill_dprobs(dprobs, layout)
+
+        indptr, indices = layout.param_dependency_index(mdl_local)
+        self.assertLess(indptr[-1], nEls * nP)
+        for i in range(nEls):  # all structurally-nonzero derivatives are in the index
+            self.assertArraysAlmostEqual(np.delete(dprobs[i], indices[indptr[i]:indptr[i + 1]]), 0)
+
+        sparse_dprobs = scipy.sparse.csr_matrix((np.zeros(indptr[-1], 'd'), indices, indptr), shape=(nEls, nP))
+        mdl_local.sim.bulk_fill_sparse_dprobs(sparse_dprobs, layout)
+        self.assertArraysAlmostEqual(sparse_dprobs.toarray(), dprobs)
+
     def test_localnoise_1Q_global_idle(self):
         nQubits = 2
         noisy_idle = StaticArbitraryOp(np.array([[1, 0, 0, 0],
@@ -1,3 +1,6 @@
+import copy
+from unittest import mock
+
 import numpy as np
 
 import pygsti
@@ -47,6 +50,71 @@ class ObjectiveFunctionUtilTester(ObjectiveFunctionData, BaseCase):
         self.assertTrue(isinstance(fn, _objfns.PoissonPicDeltaLogLFunction))
 
 
+    def test_vectorized_count_vectors(self):
+        circuits = pygsti.circuits.CircuitList(list(self.circuits) + list(self.circuits[0:3]),  # w/duplicates
+                                               circuit_weights=np.linspace(0.5, 2.0, len(self.circuits) + 3))
+        for dataset in (self.dataset, self.sparse_dataset):
+            dataset.done_adding_data()
+            store = _objfns.ModelDatasetCircuitsStore(self.model, dataset, circuits)
+            store.add_count_vectors()
+            store.add_omitted_freqs()
+
+            loop_store = _objfns.ModelDatasetCircuitsStore(self.model, dataset.copy_nonstatic(), circuits,
+                                                           precomp_layout=store.layout)
+            loop_store.add_count_vectors()
+            self.assertArraysAlmostEqual(store.counts, loop_store.counts)
+            self.assertArraysAlmostEqual(store.total_counts, loop_store.total_counts)
+
+            for i, circuit in enumerate(circuits):
+                nomitted = self.model.compute_num_outcomes(circuit) - len(store.layout.outcomes_for_index(i))
+                self.assertEqual(nomitted > 0, store.firsts is not None and i in store.indicesOfCircuitsWithOmittedData)
+
+
+    def test_cptp_penalty_jacobian(self):
+        mdl = self.model.copy()
+        transform = _objfns._choi_transform(mdl.basis, mdl.dim)
+        for gate in mdl.operations.values():
+            chi = pygsti.tools.fast_jamiolkowski_iso_std(gate.to_dense(), mdl.basis)
+            self.assertArraysAlmostEqual(np.dot(transform, gate.to_dense().flatten()), chi.flatten())
+        self.assertTrue(_objfns._choi_transform(mdl.basis, mdl.dim) is transform)  # cached
+
+        nparams = mdl.num_params
+        jac = np.empty((_objfns._cptp_penalty_size(mdl), nparams), 'd')
+        _objfns._cptp_penalty_jac_fill(jac, mdl, 1.0, mdl.basis, slice(0, nparams))
+        v0 = mdl.to_vector()
+        penalty0 = _objfns._cptp_penalty(mdl, 1.0, mdl.basis)
+        eps = 1e-7
+        for i in range(nparams):
+            v1 = v0.copy(); v1[i] += eps
+            mdl.from_vector(v1)
+            self.assertArraysAlmostEqual((_objfns._cptp_penalty(mdl, 1.0, mdl.basis) - penalty0) / eps, jac[:, i],
+                                         places=4)
+        mdl.from_vector(v0)
+
+        # larger dimensions don't use (or cache) the dense transform, but give the same result
+        with mock.patch.object(_objfns, '_MAX_CACHED_CHOI_TRANSFORM_DIM', 0):
+            uncached_jac = np.empty(jac.shape, 'd')
+            _objfns._cptp_penalty_jac_fill(uncached_jac, mdl, 1.0, mdl.basis, slice(0, nparams))
+            self.assertArraysAlmostEqual(_objfns._cptp_penalty(mdl, 1.0, mdl.basis), penalty0)
+        self.assertArraysAlmostEqual(uncached_jac, jac)
+
+    def test_spam_penalty_jacobian(self):
+        mdl = self.model.copy()
+        nparams = mdl.num_params
+        # move the (projector) effects away from zero eigenvalues, where the trace norm isn't differentiable
+        mdl.from_vector(mdl.to_vector() + 0.01 * np.random.RandomState(1234).standard_normal(nparams))
+        jac = np.empty((_objfns._spam_penalty_size(mdl), nparams), 'd')
+        _objfns._spam_penalty_jac_fill(jac, mdl, 1.0, mdl.basis, slice(0, nparams))
+        v0 = mdl.to_vector()
+        penalty0 = _objfns._spam_penalty(mdl, 1.0, mdl.basis)
+        eps = 1e-7
+        for i in range(nparams):
+            v1 = v0.copy(); v1[i] += eps
+            mdl.from_vector(v1)
+            self.assertArraysAlmostEqual((_objfns._spam_penalty(mdl, 1.0, mdl.basis) - penalty0) / eps, jac[:, i],
+                                         places=4)
+
+
 class ObjectiveFunctionBuilderTester(ObjectiveFunctionData, BaseCase):
     """
     Tests for methods in the ObjectiveFunctionBuilder class.
@@ -81,6 +149,13 @@ class ObjectiveFunctionBuilderTester(ObjectiveFunctionData, BaseCase):
         fn = builder.build(self.model, self.dataset, self.circuits)
         self.assertTrue(isinstance(fn, builder.cls_to_build))
 
+    def test_fused_kernel_builds(self):
+        for objective in ('logl', 'chi2'):
+            builder = _objfns.ObjectiveFunctionBuilder.create_from(objective, fused_kernels=True)
+            builder = _objfns.ObjectiveFunctionBuilder.from_nice_serialization(builder.to_nice_serialization())
+            fn = builder.build(self.model, self.dataset, self.circuits)
+            self.assertEqual(fn.raw_objfn.fused_kernels, _objfns._fastobjfns is not None)
+
 
 #BASE CLASS - no testing
 #class ObjectiveFunctionTester(BaseCase):
@@ -231,6 +306,51 @@ class RawPoissonPicDeltaLogLFunctionTester(RawObjectiveFunctionTester, BaseCase)
                                                         'pfratio_derivpt': 0.1, 'fmin': 1e-4}, resource_alloc)]
 
 
+class RawFusedChi2FunctionTester(RawObjectiveFunctionTester, BaseCase):
+    computes_lsvec = True
+
+    @staticmethod
+    def build_objfns(cls):
+        resource_alloc = {'mem_limit': None, 'comm': None}
+        return [_objfns.RawChi2Function({'min_prob_clip_for_weighting': 1e-6}, resource_alloc, fused_kernels=True)]
+
+
+class RawFusedPoissonPicDeltaLogLFunctionTester(RawObjectiveFunctionTester, BaseCase):
+    computes_lsvec = True
+
+    @staticmethod
+    def build_objfns(cls):
+        resource_alloc = {'mem_limit': None, 'comm': None}
+        return [_objfns.RawPoissonPicDeltaLogLFunction({'min_prob_clip': 1e-6, 'radius': 0.001}, resource_alloc,
+                                                       fused_kernels=True),
+                _objfns.RawPoissonPicDeltaLogLFunction({'min_prob_clip': None, 'radius': None, 'pfratio_stitchpt': 0.1,
+                                                        'pfratio_derivpt': 0.1, 'fmin': 1e-4}, resource_alloc,
+                                                       fused_kernels=True)]
+
+    def test_matches_numpy(self):
+        if _objfns._fastobjfns is None:
+            self.skipTest("The fastobjectivefns extension is not built.")
+        probs = np.concatenate((self.probs, self.bad_probs[1:-1], [1e-7, 5e-4]))
+        counts = np.concatenate((self.counts, self.counts[1:-1], [0, 0]))
+        totalcounts = np.array([100] * len(counts), 'd')
+        freqs = counts / totalcounts
+        for fused_objfn in self.objfns:
+            reg = {'min_prob_clip': fused_objfn.min_p, 'radius': fused_objfn.radius} \
+                if fused_objfn.regtype == 'minp' else {'min_prob_clip': None, 'radius': None, 'fmin': fused_objfn.fmin,
+                                                       'pfratio_stitchpt': fused_objfn.x0,
+                                                       'pfratio_derivpt': fused_objfn.x1}
+            objfn = _objfns.RawPoissonPicDeltaLogLFunction(reg)
+            self.assertArraysAlmostEqual(fused_objfn.terms(probs, counts, totalcounts, freqs),
+                                         objfn.terms(probs, counts, totalcounts, freqs))
+            for fused_v, v in zip(fused_objfn.dlsvec_and_lsvec(probs, counts, totalcounts, freqs),
+                                  objfn.dlsvec_and_lsvec(probs, counts, totalcounts, freqs)):
+                self.assertArraysAlmostEqual(fused_v, v)
+
+        with self.assertRaises(ValueError):  # regularization that results in negative terms
+            _objfns.RawPoissonPicDeltaLogLFunction({'min_prob_clip': 0.5}, fused_kernels=True).lsvec(
+                probs, counts, totalcounts, freqs)
+
+
 class RawDeltaLogLFunctionTester(RawObjectiveFunctionTester, BaseCase):
     computes_lsvec = False
 
@@ -319,13 +439,86 @@ class TimeIndependentMDSObjectiveFunctionTester(ObjectiveFunctionData):
                 self.assertArraysAlmostEqual(dterms / nEls, 2 * lsvec[:, None] * dlsvec / nEls,
                                              places=4)  # each *element* should match to 4 places
 
+    def test_sparse_derivative(self):
+        if not self.computes_lsvec:
+            return  # sparse jacobians are only computed for least-squares vectors
+
+        for objfn in self.objfns:
+            dlsvec = objfn.dlsvec().copy()
+            sparse_dlsvec = objfn.sparse_dlsvec()
+            self.assertEqual(sparse_dlsvec.shape, dlsvec.shape)
+            self.assertArraysAlmostEqual(sparse_dlsvec.toarray(), dlsvec)
+
+    def test_workspace_and_out_arrays(self):
+        if not self.computes_lsvec:
+            return
+
+        for objfn in self.objfns:
+            v = objfn.model.to_vector() + 0.01
+            lsvec = objfn.lsvec(v)
+            self.assertTrue(np.shares_memory(lsvec, objfn.obj))  # evaluations write into the workspace
+            dlsvec = objfn.dlsvec(v)
+            self.assertTrue(dlsvec is objfn.jac)
+            work = objfn._dlsvec_work
+            objfn.dlsvec(v + 0.01)
+            self.assertTrue(objfn._dlsvec_work is work)  # scratch arrays are reused, not reallocated
+
+            lsvec_out = objfn.layout.allocate_local_array('e', 'd', extra_elements=objfn.ex)
+            dlsvec_out = objfn.layout.allocate_local_array('ep', 'd', extra_elements=objfn.ex)
+            self.assertTrue(objfn.lsvec(v, out=lsvec_out) is lsvec_out)
+            self.assertTrue(objfn.dlsvec(v, out=dlsvec_out) is dlsvec_out)
+            self.assertArraysAlmostEqual(lsvec_out, objfn.lsvec(v))
+            self.assertArraysAlmostEqual(dlsvec_out, objfn.dlsvec(v))
+
+    def test_probs_reused_after_jacobian(self):
+        if not self.computes_lsvec:
+            return
+
+        for objfn in self.objfns:
+            v0 = objfn.model.to_vector()
+            fresh_lsvec = objfn.lsvec(v0).copy()
+            objfn.lsvec(v0 + 0.01)  # move away from v0
+            objfn.dlsvec(v0)  # computes the probabilities at v0 along with their derivatives
+            with mock.patch.object(objfn.model.sim, 'bulk_fill_probs', wraps=objfn.model.sim.bulk_fill_probs) as m:
+                self.assertArraysAlmostEqual(objfn.lsvec(v0), fresh_lsvec)
+                m.assert_not_called()
+                objfn.lsvec(v0)  # the probabilities are only reused by the first call after the jacobian
+                m.assert_called_once()
+
+            objfn.dlsvec(v0)
+            objfn.model.sim = copy.copy(objfn.model.sim)  # a new forward simulator
+            with mock.patch.object(objfn.model.sim, 'bulk_fill_probs', wraps=objfn.model.sim.bulk_fill_probs) as m:
+                objfn.lsvec(v0)
+                m.assert_called_once()
+
     def test_approximate_hessian(self):
         if not self.enable_hessian_tests:
             return  # don't test the hessian for this objective function
 
         for objfn in self.objfns:
-            hessian = objfn.approximate_hessian()
-            #TODO: how to verify this hessian?
+            hessian = objfn.approximate_hessian().copy()
+
+            # compare with J^T * d2(terms)/dprobs2 * J, formed from the full Jacobian
+            nparams = self.model.num_params
+            probs = np.empty(len(objfn.layout), 'd')
+            dprobs = np.empty((len(objfn.layout), nparams), 'd')
+            objfn.model.sim.bulk_fill_dprobs(dprobs, objfn.layout, probs)
+            probs = np.clip(probs, objfn.prob_clip_interval[0], objfn.prob_clip_interval[1])
+            hterms = objfn.raw_objfn.hterms(probs, objfn.counts, objfn.total_counts, objfn.freqs)
+            self.assertArraysAlmostEqual(hessian, dprobs.T @ (hterms[:, None] * dprobs))
+
+            # a memory limit that only allows a few parameters' derivatives at a time splits up the computation
+            max_atom_nelements = max([atom.num_elements for atom in objfn.layout.atoms])
+            mem_limit = objfn.resource_alloc.mem_limit
+            objfn.resource_alloc.mem_limit = objfn.resource_alloc.allocated_memory \
+                + 8 * (nparams**2 + 2 * max_atom_nelements * (3 + 1))
+            try:
+                self.assertArraysAlmostEqual(objfn.approximate_hessian(), hessian)
+                objfn.resource_alloc.mem_limit = objfn.resource_alloc.allocated_memory + 8 * nparams**2
+                with self.assertRaises(MemoryError):
+                    objfn.approximate_hessian()
+            finally:
+                objfn.resource_alloc.mem_limit = mem_limit
 
     def test_hessian(self):
         if not self.enable_hessian_tests:
@@ -385,6 +578,32 @@ class PoissonPicDeltaLogLFunctionTester(TimeIndependentMDSObjectiveFunctionTeste
                                                     None, penalties, method_names=('terms', 'dterms', 'hessian'))
                 for penalties in self.penalty_dicts]
 
+    def test_sparse_derivative_with_omitted_outcomes(self):
+        dataset = pygsti.data.simulate_data(self.model, self.circuits, 1, seed=2020, record_zero_counts=False)
+        objfn = _objfns.PoissonPicDeltaLogLFunction.create_from(self.model, dataset, self.circuits,
+                                                                None, None, method_names=('terms', 'dterms'))
+        self.assertTrue(objfn.firsts is not None)
+        dlsvec = objfn.dlsvec().copy()
+        self.assertArraysAlmostEqual(objfn.sparse_dlsvec().toarray(), dlsvec)
+
+
+class FusedPoissonPicDeltaLogLFunctionTester(PoissonPicDeltaLogLFunctionTester):
+
+    def build_objfns(self):
+        return [_objfns.PoissonPicDeltaLogLFunction.create_from(self.model, self.dataset, self.circuits,
+                                                                None, penalties, method_names=('terms', 'dterms', 'hessian'),
+                                                                fused_kernels=True)
+                for penalties in self.penalty_dicts]
+
+    def test_matches_numpy(self):
+        objfn = _objfns.PoissonPicDeltaLogLFunction.create_from(self.model, self.dataset, self.circuits,
+                                                                None, None, method_names=('terms', 'dterms'))
+        fused_objfn = self.objfns[0]
+        v = self.model.to_vector() + 0.01
+        self.assertArraysAlmostEqual(fused_objfn.lsvec(v).copy(), objfn.lsvec(v).copy())
+        self.assertArraysAlmostEqual(fused_objfn.terms(v).copy(), objfn.terms(v).copy())
+        self.assertArraysAlmostEqual(fused_objfn.dlsvec(v).copy(), objfn.dlsvec(v).copy())
+
 
 class DeltaLogLFunctionTester(TimeIndependentMDSObjectiveFunctionTester, BaseCase):
     computes_lsvec = False
@@ -412,6 +631,15 @@ class TVDFunctionTester(TimeIndependentMDSObjectiveFunctionTester, BaseCase):
     def test_derivative(self):
         self.skipTest("Derivatives for TVDFunction aren't implemented yet.")
 
+    def test_sparse_derivative(self):
+        self.skipTest("Derivatives for TVDFunction aren't implemented yet.")
+
+    def test_probs_reused_after_jacobian(self):
+        self.skipTest("Derivatives for TVDFunction aren't implemented yet.")
+
+    def test_workspace_and_out_arrays(self):
+        self.skipTest("Derivatives for TVDFunction aren't implemented yet.")
+
 
 class TimeDependentMDSObjectiveFunctionTester(ObjectiveFunctionData):
     """
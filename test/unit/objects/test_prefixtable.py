@@ -1,5 +1,7 @@
 import numpy as np
 
+from pygsti.circuits import Circuit
+from pygsti.layouts.prefixtable import PrefixTable
 from ..util import BaseCase
 
 
@@ -60,3 +62,102 @@ from ..util import BaseCase
 #    else:
 #        assert(None not in circuits[0:nFinal])
 #        return circuits[0:nFinal]
+
+
+class PrefixTableTester(BaseCase):
+    def setUp(self):
+        self.circuits = [Circuit(s).copy(editable=True) for s in
+                         ["GxGy", "GxGyGy", "GxGyGx", "GyGi", "GyGiGxGx", "Gx", "GxGyGxGy",
+                          "GyGxGx", "GyGxGy"]]
+        for c in self.circuits:
+            c.insert_layer_inplace('rho0', 0); c.done_editing()
+        self.table = PrefixTable(self.circuits, None)
+
+    def test_evaluation_batches(self):
+        batches = self.table.evaluation_batches()
+        computed = {}  # table index -> computed layers
+        cached = {}
+        evaluated = []
+        for table_indices, steps in batches:
+            layers = []
+            for k in table_indices:
+                iDest, iStart, remainder, iCache = self.table.contents[k]
+                self.assertTrue(iStart is None or iStart in cached)  # cached item computed in an earlier batch
+                layers.append(list(remainder.layertup[0:1]) if iStart is None else list(cached[iStart]))
+            for step in steps:
+                for layer_lbl, batch_indices in step:
+                    for j in batch_indices:
+                        layers[j].append(layer_lbl)
+            for k, lyrs in zip(table_indices, layers):
+                iDest, _, _, iCache = self.table.contents[k]
+                computed[iDest] = tuple(lyrs)
+                if iCache is not None: cached[iCache] = lyrs
+                evaluated.append(k)
+
+        self.assertEqual(sorted(evaluated), list(range(len(self.table))))
+        for i, c in enumerate(self.circuits):
+            self.assertEqual(computed[i], c.layertup)
+        self.assertTrue(self.table.evaluation_batches() is batches)  # cached
+
+    def test_evaluation_batches_max_size(self):
+        batches = self.table.evaluation_batches(max_batch_size=2)
+        self.assertTrue(all([len(table_indices) <= 2 for table_indices, _ in batches]))
+        self.assertEqual(sorted([k for table_indices, _ in batches for k in table_indices]),
+                         list(range(len(self.table))))
+
+    def _reconstruct(self, table):
+        computed = {}
+        cached = [None] * table.cache_size
+        for iDest, iStart, remainder, iCache in table.contents:
+            layers = remainder.layertup if iStart is None else cached[iStart] + remainder.layertup
+            if iCache is not None: cached[iCache] = layers
+            if iDest is not None: computed[iDest] = layers
+        return computed
+
+    def test_trie_table(self):
+        table = PrefixTable(self.circuits, None, method="trie")
+        computed = self._reconstruct(table)
+        self.assertEqual(len(computed), len(self.circuits))
+        for i, c in enumerate(self.circuits):
+            self.assertEqual(computed[i], c.layertup)
+
+        self.assertTrue(any([iDest is None for iDest, _, _, _ in table.contents]))  # shared "rho0 Gy Gx" prefix
+        self.assertLessEqual(table.num_applies, self.table.num_applies)
+        self.assertEqual(table.num_applies + table.num_applies_saved,
+                         PrefixTable(self.circuits, 0, method="trie").num_applies)
+        with self.assertRaises(ValueError):
+            table.find_splitting(num_sub_tables=2)
+
+    def test_trie_table_max_cache_size(self):
+        for max_cache_size in (0, 1, 2):
+            table = PrefixTable(self.circuits, max_cache_size, method="trie")
+            self.assertLessEqual(table.cache_size, max_cache_size)
+            computed = self._reconstruct(table)
+            for i, c in enumerate(self.circuits):
+                self.assertEqual(computed[i], c.layertup)
+        self.assertEqual(PrefixTable(self.circuits, 0, method="trie").num_applies_saved, 0)
+
+    def test_unknown_method_raises(self):
+        with self.assertRaises(ValueError):
+            PrefixTable(self.circuits, None, method="foobar")
+
+    def test_extend_previous_table(self):
+        extra = [Circuit(s).copy(editable=True) for s in ["GxGyGxGyGx", "GiGi", "GyGiGxGxGy"]]
+        for c in extra:
+            c.insert_layer_inplace('rho0', 0); c.done_editing()
+        circuits = self.circuits + extra
+
+        for max_cache_size in (None, 3):
+            previous = PrefixTable(self.circuits, max_cache_size)
+            table = PrefixTable(circuits, max_cache_size, previous_table=previous)
+            for item, prev_item in zip(table.contents, previous.contents):  # previous items may become cached
+                self.assertEqual(item[0:3], prev_item[0:3])
+                self.assertTrue(prev_item[3] is None or item[3] == prev_item[3])
+            if max_cache_size is not None:
+                self.assertLessEqual(table.cache_size, max_cache_size)
+            computed = self._reconstruct(table)
+            for i, c in enumerate(circuits):
+                self.assertEqual(computed[i], c.layertup)
+
+        with self.assertRaises(ValueError):
+            PrefixTable(list(reversed(circuits)), None, previous_table=self.table)
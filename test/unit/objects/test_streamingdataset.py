@@ -0,0 +1,69 @@
+import threading
+
+import numpy as np
+
+from ..util import BaseCase
+
+from pygsti.circuits import Circuit
+from pygsti.data import DataSet, StreamingDataSet
+
+
+class StreamingDataSetTester(BaseCase):
+    def setUp(self):
+        self.circuits = [Circuit('Gx'), Circuit('Gy'), Circuit('GxGy')]
+        self.stream = StreamingDataSet(self.circuits, ['0', '1'], initial_capacity=2)
+
+    def test_compact_matches_dataset(self):
+        self.stream.add_counts_bulk([0, 1, 0, 2], [0, 1, 1, 0], [5, 3, 2, 7], times=[0.0, 0.0, 0.0, 1.0])
+        self.stream.add_count_dict(Circuit('Gx'), {'0': 1}, time=1.0)
+        snapshot = self.stream.compact()
+
+        ds = DataSet(outcome_labels=['0', '1'])
+        ds.add_raw_series_data(Circuit('Gx'), ['0', '1', '0'], [0.0, 0.0, 1.0], [5, 2, 1])
+        ds.add_raw_series_data(Circuit('Gy'), ['1'], [0.0], [3])
+        ds.add_raw_series_data(Circuit('GxGy'), ['0'], [1.0], [7])
+        ds.done_adding_data()
+
+        self.assertTrue(snapshot.bStatic)
+        self.assertEqual(list(snapshot.keys()), list(ds.keys()))
+        for circuit in ds:
+            self.assertArraysEqual(snapshot[circuit].oli, ds[circuit].oli)
+            self.assertArraysAlmostEqual(snapshot[circuit].time, ds[circuit].time)
+            self.assertEqual(snapshot[circuit].counts, ds[circuit].counts)
+
+    def test_snapshots_are_unaffected_by_appends(self):
+        self.stream.add_counts_bulk([0, 1], [0, 0], [1, 1])
+        snapshot = self.stream.compact()
+        self.stream.add_counts_bulk(np.zeros(100, int), np.ones(100, int), np.ones(100))  # grows the buffers
+        self.assertEqual(self.stream.snapshot().uuid, snapshot.uuid)
+        self.assertEqual(self.stream.num_pending_rows, 100)
+        self.assertEqual(snapshot[Circuit('Gx')].total, 1)
+        self.assertEqual(self.stream.compact()[Circuit('Gx')].total, 101)
+
+    def test_background_compaction(self):
+        stream = StreamingDataSet(self.circuits, ['0', '1'], compaction_interval=50)
+        for k in range(10):
+            stream.add_counts_bulk(np.arange(30) % 3, np.arange(30) % 2, np.ones(30), times=float(k))
+        stream.wait_for_compaction()
+        self.assertGreater(stream.snapshot()[Circuit('Gx')].total, 0)
+
+    def test_concurrent_appends_and_compactions(self):
+        def append():
+            for k in range(200):
+                self.stream.add_counts_bulk(np.arange(10) % 3, np.arange(10) % 2, np.ones(10), times=float(k))
+
+        writer = threading.Thread(target=append)
+        writer.start()
+        while writer.is_alive():
+            snapshot = self.stream.compact()
+            self.assertEqual(sum([snapshot[c].total for c in snapshot]), len(snapshot.oliData))
+        writer.join()
+        self.assertEqual(len(self.stream.compact().oliData), 2000)
+
+    def test_raises_on_unregistered_indices(self):
+        with self.assertRaises(ValueError):
+            self.stream.add_counts_bulk([3], [0], [1])
+        with self.assertRaises(ValueError):
+            self.stream.add_counts_bulk([0], [2], [1])
+        with self.assertRaises(ValueError):
+            self.stream.add_counts_bulk([0, 1], [0], [1])
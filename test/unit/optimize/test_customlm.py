@@ -2,7 +2,7 @@ import numpy as np
 
 from pygsti.optimize import arraysinterface as _ari
 from pygsti.optimize import customlm as lm
-from ..util import BaseCase
+from ..util import BaseCase, with_temp_path
 
 
 def f(x):
@@ -18,6 +18,12 @@ def g(x):
 def gjac(x):
     return np.array([2 * x[0]],'d')
 
+def rosenbrock(x):
+    return np.array([10 * (x[1] - x[0]**2), 1 - x[0]], 'd')
+
+def rosenbrock_jac(x):
+    return np.array([[-20 * x[0], 10], [-1, 0]], 'd')
+
 
 class CustomLMTester(BaseCase):
     def test_custom_leastsq_infinite_objective_fn_norm_at_x0(self):
@@ -41,3 +47,116 @@ class CustomLMTester(BaseCase):
         xf, converged, msg, *_ = lm.custom_leastsq(g, gjac, x0, max_iter=100, arrays_interface=ari,
                                                    x_limits=xlimits)
         self.assertAlmostEqual(xf[0], 1.0)
+
+    @with_temp_path
+    def test_custom_leastsq_checkpoint_resume(self, tmp_path):
+        x0 = np.array([-1.2, 1.0], 'd')
+        ari = _ari.UndistributedArraysInterface(2, 2)
+        xf, converged, msg, *_ = lm.custom_leastsq(rosenbrock, rosenbrock_jac, x0, f_norm2_tol=1e-20,
+                                                   max_iter=100, arrays_interface=ari)
+
+        # interrupt the optimization after a few iterations and then resume it
+        x_partial, *_ = lm.custom_leastsq(rosenbrock, rosenbrock_jac, x0, f_norm2_tol=1e-20, max_iter=3,
+                                          arrays_interface=ari, checkpoint_path=tmp_path, checkpoint_interval=1)
+        with np.load(tmp_path) as checkpoint:
+            self.assertArraysAlmostEqual(checkpoint['x'], x_partial)
+            self.assertEqual(int(checkpoint['iteration']), 2)
+
+        resumed_f = []
+        def counting_rosenbrock(x):
+            resumed_f.append(x.copy())
+            return rosenbrock(x)
+        xf_resumed, converged, msg, *_ = lm.custom_leastsq(counting_rosenbrock, rosenbrock_jac, x0,
+                                                           f_norm2_tol=1e-20, max_iter=100, arrays_interface=ari,
+                                                           checkpoint_path=tmp_path, checkpoint_interval=1)
+        self.assertArraysAlmostEqual(resumed_f[0], x_partial)  # started from the checkpoint, not x0
+        self.assertArraysAlmostEqual(xf_resumed, xf)
+
+    def test_custom_leastsq_warm_start(self):
+        x0 = np.array([-1.2, 1.0], 'd')
+        ari = _ari.UndistributedArraysInterface(2, 2)
+        self.assertEqual(len(lm.custom_leastsq(rosenbrock, rosenbrock_jac, x0, arrays_interface=ari)), 8)
+        xf, converged, msg, mu, nu, norm_f, f, jtj, warm_start_state = lm.custom_leastsq(
+            rosenbrock, rosenbrock_jac, x0, f_norm2_tol=1e-20, max_iter=100, arrays_interface=ari,
+            return_warm_start=True)
+        self.assertEqual(warm_start_state['mu'], mu)
+        self.assertEqual(warm_start_state['nu'], nu)
+        self.assertGreater(warm_start_state['max_jtj_diag'], 0)
+
+        x_warm, converged, msg, *_ = lm.custom_leastsq(rosenbrock, rosenbrock_jac, x0, f_norm2_tol=1e-20,
+                                                       max_iter=100, arrays_interface=ari,
+                                                       warm_start=warm_start_state)
+        self.assertTrue(converged)
+        self.assertArraysAlmostEqual(x_warm, xf, places=4)
+
+        # a warm-start state from a different damping mode is ignored
+        x_cold, *_ = lm.custom_leastsq(rosenbrock, rosenbrock_jac, x0, f_norm2_tol=1e-20, max_iter=100,
+                                       arrays_interface=ari, damping_mode='JTJ',
+                                       warm_start=dict(warm_start_state, mu=1e10))
+        self.assertArraysAlmostEqual(x_cold, xf, places=4)
+
+    def test_custom_leastsq_matrix_free_solvers(self):
+        x0 = np.array([-1.2, 1.0], 'd')
+        ari = _ari.UndistributedArraysInterface(2, 2)
+        xf, converged, msg, *_ = lm.custom_leastsq(rosenbrock, rosenbrock_jac, x0, f_norm2_tol=1e-20,
+                                                   max_iter=100, arrays_interface=ari)
+        for linear_solver in ('cg', 'lsqr'):
+            for damping_mode in ('identity', 'JTJ'):
+                xf_mf, converged, msg, mu, nu, norm_f, f, jtj, *_ = lm.custom_leastsq(
+                    rosenbrock, rosenbrock_jac, x0, f_norm2_tol=1e-20, max_iter=100, arrays_interface=ari,
+                    damping_mode=damping_mode, linear_solver=linear_solver, linear_solver_tol=1e-12)
+                self.assertTrue(converged)
+                self.assertIsNone(jtj)  # JTJ is never formed
+                self.assertArraysAlmostEqual(xf_mf, xf, places=4)
+
+    def test_matrix_free_solve(self):
+        np.random.seed(1234)
+        J = np.random.random((30, 8)); b = np.random.random(30)
+        damping = 0.1 * np.arange(1, 9)
+        expected = np.linalg.solve(J.T @ J + np.diag(damping), J.T @ b)
+        ari = _ari.UndistributedArraysInterface(30, 8)
+        jtj_diag = ari.allocate_jtf(); ari.fill_jtj_diag(J, jtj_diag)
+        self.assertArraysAlmostEqual(jtj_diag, np.diag(J.T @ J))
+        for method in ('cg', 'lsqr'):
+            x = ari.allocate_jtf()
+            niters = lm._matrix_free_solve(J, b, J.T @ b, jtj_diag, damping, x, ari, 8, method=method, max_iter=50,
+                                           tol=1e-12)
+            self.assertLessEqual(niters, 50)
+            self.assertArraysAlmostEqual(x, expected)
+
+    def test_custom_leastsq_broyden_updates(self):
+        x0 = np.array([-1.2, 1.0], 'd')
+        ari = _ari.UndistributedArraysInterface(2, 2)
+        xf, converged, msg, *_ = lm.custom_leastsq(rosenbrock, rosenbrock_jac, x0, f_norm2_tol=1e-20,
+                                                   max_iter=100, arrays_interface=ari)
+
+        jac_evals = []
+        def counting_rosenbrock_jac(x):
+            jac_evals.append(x.copy())
+            return rosenbrock_jac(x)
+        diagnostics = {}
+        xf_broyden, converged, msg, mu, nu, norm_f, f, jtj, *_ = lm.custom_leastsq(
+            rosenbrock, counting_rosenbrock_jac, x0, f_norm2_tol=1e-20, max_iter=100, arrays_interface=ari,
+            broyden_updates=3, diagnostics=diagnostics)
+        self.assertTrue(converged)
+        self.assertGreater(diagnostics['jacobian_evaluations_saved'], 0)
+        self.assertArraysAlmostEqual(xf_broyden, xf, places=4)
+
+        # the returned JTJ comes from a full Jacobian, even when the last ones were Broyden updates
+        num_checked = 0
+        for max_iter in range(1, 12):
+            x, converged, msg, mu, nu, norm_f, f, jtj, *_ = lm.custom_leastsq(
+                rosenbrock, rosenbrock_jac, x0, max_iter=max_iter, arrays_interface=ari, broyden_updates=3)
+            if jtj is not None:
+                J = rosenbrock_jac(x)
+                self.assertArraysAlmostEqual(jtj, J.T @ J); num_checked += 1
+        self.assertGreater(num_checked, 0)
+
+    def test_broyden_update(self):
+        np.random.seed(1234)
+        J = np.random.random((5, 3)); dx = np.random.random(3); df = np.random.random(5)
+        ari = _ari.UndistributedArraysInterface(5, 3)
+        updated_J = J.copy()
+        lm._broyden_update(updated_J, dx, df, np.empty(3, 'd'), ari, lm._ResourceAllocation(None))
+        self.assertArraysAlmostEqual(updated_J @ dx, df)  # the secant condition
+        self.assertArraysAlmostEqual(updated_J @ np.array([dx[1], -dx[0], 0]), J @ np.array([dx[1], -dx[0], 0]))
@@ -1,3 +1,6 @@
+import os
+from unittest import mock
+
 from pygsti.data import simulate_data
 from pygsti.modelpacks import smq1Q_XYI
 from pygsti.modelpacks.legacy import std1Q_XYI, std2Q_XYICNOT
@@ -10,7 +13,8 @@ from pygsti.protocols.estimate import Estimate
 from pygsti.protocols.protocol import ProtocolData, Protocol
 from pygsti.protocols.gst import GSTGaugeOptSuite
 from pygsti.tools import two_delta_logl
-from ..util import BaseCase
+from pygsti.tools.mptools import LocalProcessPool
+from ..util import BaseCase, with_temp_path
 
 
 class GSTUtilTester(BaseCase):
@@ -83,6 +87,42 @@ class GSTUtilTester(BaseCase):
         self.assertTrue('stdgaugeopt' in res.estimates['test-estimate'].models)
         self.assertTrue('stdgaugeopt' in res.estimates['test-estimate'].goparameters)
 
+    def test_add_gauge_opt_local_workers(self):
+        def results_with_robust_estimates():
+            res = self.results.copy()
+            base = res.estimates['test-estimate']
+            res.add_estimate(base.copy(), estimate_key='test-estimate.robust')  # same model: conveyed from base
+            robust = base.copy()
+            mdl = robust.models['final iteration estimate'].copy()
+            mdl.from_vector(mdl.to_vector() + 0.01)
+            robust.models['final iteration estimate'] = mdl
+            res.add_estimate(robust, estimate_key='test-estimate.Robust')  # different model: gauge optimized
+            return res
+
+        gaugeopt_suite = GSTGaugeOptSuite(('stdgaugeopt', 'varySpam'), gaugeopt_target=self.target_model)
+        res = results_with_robust_estimates()
+        gst._add_gauge_opt(res, 'test-estimate', gaugeopt_suite, self.target_model, ())
+        res_parallel = results_with_robust_estimates()
+        pool = LocalProcessPool(2)
+        self.addCleanup(pool.shutdown)
+        with mock.patch.object(pool, 'map', wraps=pool.map) as mock_map:
+            gst._add_gauge_opt(res_parallel, 'test-estimate', gaugeopt_suite, self.target_model, (),
+                               process_pool=pool)
+        num_gaugeopts = len(res.estimates['test-estimate'].goparameters)
+        self.assertEqual(len(mock_map.call_args[0][1]), 2 * num_gaugeopts)  # those of the base & .Robust estimates
+
+        for est_label in ('test-estimate', 'test-estimate.robust', 'test-estimate.Robust'):
+            est, est_parallel = res.estimates[est_label], res_parallel.estimates[est_label]
+            self.assertEqual(list(est.models.keys()), list(est_parallel.models.keys()))  # same (deterministic) order
+            self.assertEqual(list(est.goparameters.keys()), list(est_parallel.goparameters.keys()))
+            for go_label in est.goparameters:
+                self.assertAlmostEqual(est.models[go_label].frobeniusdist(est_parallel.models[go_label]), 0)
+
+        # the conveyed estimate's models equal the base estimate's
+        for go_label in res_parallel.estimates['test-estimate'].goparameters:
+            self.assertAlmostEqual(res_parallel.estimates['test-estimate.robust'].models[go_label].frobeniusdist(
+                res_parallel.estimates['test-estimate'].models[go_label]), 0)
+
 
 class StandardGSTDesignTester(BaseCase):
     """
@@ -226,6 +266,23 @@ class GateSetTomographyTester(BaseProtocolData, BaseCase):
         twoDLogL = two_delta_logl(mdl_result, self.gst_data.dataset)
         self.assertLessEqual(twoDLogL, 1.0)  # should be near 0 for perfect data
 
+    @with_temp_path
+    def test_run_with_checkpoint(self, tmp_path):
+        proto = gst.GateSetTomography(smq1Q_XYI.target_model(), None, name="testGST", checkpoint_dir=tmp_path)
+        results = proto.run(self.gst_data)
+        self.assertEqual(len(os.listdir(tmp_path)), len(self.gst_design.circuit_lists))
+
+        resumed_results = proto.run(self.gst_data)  # all iterations are loaded from the checkpoint
+        final_model = results.estimates["testGST"].models['final iteration estimate']
+        resumed_final_model = resumed_results.estimates["testGST"].models['final iteration estimate']
+        self.assertArraysAlmostEqual(resumed_final_model.to_vector(), final_model.to_vector())
+
+    def test_run_without_checkpoint_dir_attribute(self):
+        proto = gst.GateSetTomography(smq1Q_XYI.target_model(), None, name="testGST")
+        del proto.checkpoint_dir  # as for a protocol saved before `checkpoint_dir` existed
+        results = proto.run(self.gst_data)
+        self.assertIn('final iteration estimate', results.estimates["testGST"].models)
+
 
 class LinearGateSetTomographyTester(BaseProtocolData, BaseCase):
     """